@@ -0,0 +1,447 @@
+"""Asynchronous AI requests with bounded concurrency, deadlines and supersession.
+
+:class:`AsyncAiClient` runs every chat on one private event loop thread:
+
+* at most ``max_concurrency`` requests talk to the model at a time; the rest wait in the
+  semaphore queue (``stats()["queued"]``);
+* each request has a ``deadline_seconds`` budget covering queue wait, all attempts and backoff,
+  and every attempt's HTTP timeout is capped by what is left of it;
+* a request started on a ``channel`` cancels the previous, still unfinished request of the same
+  channel, so a newer user message never waits behind an answer nobody will read;
+* only retryable failures (timeouts, connection errors, rate limits, 5xx, malformed answers)
+  are retried, after a full-jitter exponential backoff. Auth and request errors raise at once;
+* consecutive transport failures open the :class:`ai.health.CircuitBreaker`, after which requests
+  fail at once with :class:`ai.health.CircuitOpenError` until a half-open trial succeeds.
+
+:class:`ai.client.AiClient` keeps its synchronous ``run_chat``/``stream_chat`` API as a facade
+over this client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import itertools
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Coroutine, Dict, Optional
+
+from pydantic import ValidationError
+
+from ai.health import OPEN, CircuitBreaker, CircuitOpenError
+from core.metrics import LatencyStats
+from core.state import AppState
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from openai import AsyncOpenAI
+
+    from ai.client import AiClient
+
+
+class AiRequestCancelled(RuntimeError):
+    """The request was superseded by a newer one on its channel (or the client closed)."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (ValidationError, ValueError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - openai is a hard dependency
+        return False
+    return isinstance(
+        exc, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+    )
+
+
+async def _cancel_all() -> None:
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class _LoopThread:
+    """Event loop on a daemon thread, started on first use."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def ensure(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None or self.loop.is_closed():
+                ready = threading.Event()
+                loop = self.loop = asyncio.new_event_loop()
+
+                def run() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+                    loop.close()
+
+                self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self.loop
+
+    def on_loop(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            self.loop = self._thread = None
+        if loop is not None and thread is not None and thread.is_alive():
+            # Cancel what is still running so blocked facade callers get AiRequestCancelled.
+            asyncio.run_coroutine_threadsafe(_cancel_all(), loop).result(timeout)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+
+
+class AsyncAiClient:
+    def __init__(
+        self,
+        client: "AiClient",
+        *,
+        max_concurrency: int = 2,
+        deadline_seconds: float = 60.0,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 8.0,
+        rng: Optional[random.Random] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.deadline_seconds = deadline_seconds
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.rng = rng or random.Random()
+        self.breaker = breaker or CircuitBreaker()
+        self.counters: Dict[str, int] = {
+            "requests": 0,
+            "completed": 0,
+            "retries": 0,
+            "cancelled": 0,
+            "deadline_exceeded": 0,
+            "failed": 0,
+            "invalid_answers": 0,
+            "short_circuited": 0,
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+        }
+        self.queue_wait = LatencyStats()
+        self.latency = LatencyStats()
+        self._queued = 0
+        self._in_flight: Dict[int, float] = {}
+        self._ids = itertools.count(1)
+        self._latest: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._openai: Optional["AsyncOpenAI"] = None
+        self._runner = _LoopThread("bbot-ai")
+
+    @property
+    def logger(self):
+        return self.client.logger
+
+    @property
+    def openai(self) -> Optional["AsyncOpenAI"]:
+        if self._openai is None and self.client.api_key:
+            from openai import AsyncOpenAI
+
+            self._openai = AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url, max_retries=0)
+        return self._openai
+
+    # Sync facade
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the client loop and block for its result; not callable from that loop."""
+
+        if self._runner.on_loop():
+            coro.close()
+            raise RuntimeError("AsyncAiClient.run() called from its own event loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self._runner.ensure())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.CancelledError as exc:
+            raise AiRequestCancelled("AI request superseded by a newer one") from exc
+
+    def spawn(self, coro: Coroutine[Any, Any, Any]) -> "concurrent.futures.Future":
+        """Schedule ``coro`` on the client loop without waiting (background work such as probes)."""
+
+        return asyncio.run_coroutine_threadsafe(coro, self._runner.ensure())
+
+    def close(self) -> None:
+        self._runner.stop()
+
+    # Requests
+    async def chat(
+        self, prompt: str, user_message: str, *, cache_key: Optional[str] = None, channel: Optional[str] = None
+    ) -> Dict:
+        """Validated ``AiChatResult`` dict, retried on retryable failures within the deadline."""
+
+        from ai.client import AiChatResult
+
+        result = await self.complete(
+            prompt,
+            user_message,
+            validate=lambda payload: AiChatResult(**payload).model_dump(),
+            cache_key=cache_key,
+            channel=channel,
+        )
+        self.logger.info("AI response valid with settings: %s", result["settings"])
+        return result
+
+    async def complete(
+        self,
+        prompt: str,
+        user_message: str,
+        *,
+        validate: Callable[[Dict], Dict],
+        cache_key: Optional[str] = None,
+        channel: Optional[str] = None,
+        mock: Optional[Callable[[str, str], Dict]] = None,
+    ) -> Dict:
+        """One request whose ``{"explanation", "settings"}`` sections are checked by ``validate``.
+
+        A ``validate`` error counts as a malformed answer and is retried like a transport error.
+        ``mock(prompt, user_message)`` answers instead of the model when no key is configured.
+        """
+
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return cached
+
+        async def attempt(timeout: float) -> Dict:
+            return validate(await self._request(prompt, user_message, timeout, mock=mock))
+
+        started = time.monotonic()
+        result = await self._submit(attempt, channel, retries=self.client.max_retries)
+        self._store(cache_key, result, started)
+        return result
+
+    async def stream(
+        self,
+        prompt: str,
+        user_message: str,
+        *,
+        on_text: Optional[Callable[[str], None]] = None,
+        on_settings: Optional[Callable[[Dict], None]] = None,
+        cache_key: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> Dict:
+        """Streamed :meth:`chat`; callbacks run on the client loop thread. Never retried."""
+
+        from ai.client import AiChatResult, TradeSettingsSchema
+        from ai.stream import SectionStreamParser
+
+        cached = self._cached(cache_key)
+        if cached is not None:
+            if on_text:
+                on_text(cached["explanation"])
+            if on_settings:
+                on_settings(cached["settings"])
+            return cached
+
+        async def attempt(timeout: float) -> Dict:
+            parser = SectionStreamParser(
+                on_explanation=on_text,
+                on_settings=on_settings,
+                validate=lambda data: TradeSettingsSchema(**data).model_dump(),
+            )
+            started = time.monotonic()
+            async for chunk in self._chunks(prompt, user_message, timeout):
+                if self.client.last_ttft_ms is None:
+                    self.client.last_ttft_ms = (time.monotonic() - started) * 1000
+                parser.feed(chunk)
+            return AiChatResult(**parser.finish()).model_dump()
+
+        self.client.last_ttft_ms = None
+        started = time.monotonic()
+        # Text already shown cannot be taken back, so a stream is never retried.
+        result = await self._submit(attempt, channel, retries=0)
+        self.logger.info(
+            "AI stream done: first token %.0fms, total %.0fms",
+            self.client.last_ttft_ms or 0.0,
+            (time.monotonic() - started) * 1000,
+        )
+        self._store(cache_key, result, started)
+        return result
+
+    async def _submit(self, attempt: Callable[[float], Any], channel: Optional[str], *, retries: int) -> Dict:
+        if not self.breaker.allow():
+            self.counters["short_circuited"] += 1
+            message = f"AI endpoint unavailable, next check in {self.breaker.retry_in():.0f}s"
+            self.client.state.set_state(AppState.ERROR, message)
+            raise CircuitOpenError(message)
+        task = asyncio.current_task()
+        if channel is not None:
+            previous = self._latest.get(channel)
+            if previous is not None and previous is not task and not previous.done():
+                previous.cancel()
+            self._latest[channel] = task
+        self.counters["requests"] += 1
+        deadline = time.monotonic() + self.deadline_seconds
+        try:
+            result = await asyncio.wait_for(self._with_slot(attempt, deadline, retries), self.deadline_seconds)
+        except asyncio.CancelledError:
+            self.counters["cancelled"] += 1
+            self.logger.info("AI request cancelled (superseded)")
+            raise
+        except asyncio.TimeoutError as exc:
+            self.counters["deadline_exceeded"] += 1
+            message = f"AI request exceeded its {self.deadline_seconds:.0f}s deadline"
+            self.client.state.set_state(AppState.ERROR, message)
+            self.logger.error(message)
+            raise TimeoutError(message) from exc
+        except Exception as exc:  # noqa: BLE001
+            self.counters["failed"] += 1
+            self.client.state.set_state(AppState.ERROR, str(exc))
+            raise
+        finally:
+            if channel is not None and self._latest.get(channel) is task:
+                del self._latest[channel]
+        self.counters["completed"] += 1
+        self.client.state.set_state(AppState.AI_READY)
+        return result
+
+    async def _with_slot(self, attempt: Callable[[float], Any], deadline: float, retries: int) -> Dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        queued_at = time.monotonic()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        request_id = next(self._ids)
+        started = time.monotonic()
+        self.queue_wait.record(started - queued_at)
+        self._in_flight[request_id] = started
+        try:
+            return await self._attempts(attempt, deadline, retries)
+        finally:
+            del self._in_flight[request_id]
+            self.latency.record(time.monotonic() - started)
+            self._semaphore.release()
+
+    async def _attempts(self, attempt: Callable[[float], Any], deadline: float, retries: int) -> Dict:
+        for number in range(retries + 1):
+            try:
+                result = await attempt(min(self.client.timeout_seconds, max(0.1, deadline - time.monotonic())))
+            except Exception as exc:  # noqa: BLE001
+                if isinstance(exc, (ValidationError, ValueError)):
+                    # A malformed answer still proves the endpoint is up.
+                    self.counters["invalid_answers"] += 1
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                if number == retries or not is_retryable(exc) or self.breaker.state == OPEN:
+                    self.logger.error("AI request failed (attempt %s): %s", number + 1, exc)
+                    if isinstance(exc, (ValidationError, ValueError)) and retries:
+                        raise ValueError("AI analysis failed after retries") from exc
+                    raise
+                delay = self.backoff_delay(number)
+                if time.monotonic() + delay >= deadline:
+                    self.logger.error("AI request failed (attempt %s), no time left to retry: %s", number + 1, exc)
+                    raise
+                self.counters["retries"] += 1
+                self.logger.warning("AI request failed (attempt %s), retrying in %.2fs: %s", number + 1, delay, exc)
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+        raise AssertionError("unreachable")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in ``[0, min(max, base * 2**attempt)]``."""
+
+        return self.rng.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2**attempt))
+
+    # Transport
+    async def _request(
+        self, prompt: str, user_message: str, timeout: float, *, mock: Optional[Callable[[str, str], Dict]] = None
+    ) -> Dict:
+        if self.openai is None:
+            # Mock (or a subclass overriding the sync path): keep the loop free while it runs.
+            return await asyncio.to_thread(mock or self.client._run, prompt, user_message)
+        started = time.monotonic()
+        try:
+            completion = await self.openai.chat.completions.create(
+                model=self.client.model,
+                messages=self._messages(prompt, user_message),
+                temperature=self.client.temperature,
+                timeout=timeout,
+            )
+        finally:
+            self.logger.info("OpenAI latency: %.0fms", (time.monotonic() - started) * 1000)
+        self._record_usage(getattr(completion, "usage", None))
+        content = completion.choices[0].message.content if completion.choices else ""
+        return self.client._parse_content(content or "")
+
+    async def _chunks(self, prompt: str, user_message: str, timeout: float) -> AsyncIterator[str]:
+        if self.openai is None:
+            for chunk in self.client._mock_chunks(user_message):
+                if self.client.mock_chunk_delay_s:
+                    await asyncio.sleep(self.client.mock_chunk_delay_s)
+                yield chunk
+            return
+        stream = await self.openai.chat.completions.create(
+            model=self.client.model,
+            messages=self._messages(prompt, user_message),
+            temperature=self.client.temperature,
+            timeout=timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for event in stream:
+            self._record_usage(getattr(event, "usage", None))
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+    def _record_usage(self, usage: Any) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        self.counters["prompt_tokens"] += usage.prompt_tokens or 0
+        self.counters["cached_prompt_tokens"] += cached
+        self.logger.info("OpenAI usage: prompt %s tokens (%s cached), completion %s", usage.prompt_tokens, cached, usage.completion_tokens)
+
+    @staticmethod
+    def _messages(prompt: str, user_message: str) -> list:
+        return [{"role": "system", "content": prompt}, {"role": "user", "content": user_message}]
+
+    # Cache
+    def _cached(self, cache_key: Optional[str]) -> Optional[Dict]:
+        cache = self.client.cache
+        if cache is None or not cache_key:
+            return None
+        cached = cache.get(cache_key)
+        if cached is None:
+            return None
+        self.client.state.set_state(AppState.AI_READY)
+        self.logger.info("AI cache hit (%s)", cache.stats())
+        return dict(cached)
+
+    def _store(self, cache_key: Optional[str], result: Dict, started: float) -> None:
+        if self.client.cache is not None and cache_key:
+            self.client.cache.put(cache_key, result, latency_ms=(time.monotonic() - started) * 1000)
+
+    # Reporting
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        started = list(self._in_flight.values())
+        return {
+            **self.counters,
+            "queued": self._queued,
+            "in_flight": len(started),
+            "oldest_in_flight_ms": round((now - min(started)) * 1000, 1) if started else 0.0,
+            "queue_wait": self.queue_wait.summary(),
+            "latency": self.latency.summary(),
+        }
+
+
+__all__ = ["AiRequestCancelled", "AsyncAiClient", "is_retryable"]
@@ -0,0 +1,160 @@
+"""Persistent cache of validated AI chat results.
+
+Entries are keyed by a hash of the prompt without its live market lines, the user message,
+the model settings and the market snapshot reduced to buckets (:func:`market_buckets`): mid
+price and 24h volume on a log scale with ``tolerance_pct`` wide buckets, spread in basis points.
+Asking the same question while the market stays inside the same buckets returns the stored
+answer without calling the model.
+
+Eviction is LRU over ``max_entries`` plus a TTL; the table is written atomically to a JSON file
+after every insert, so answers survive restarts. Stored payloads are re-validated against
+:class:`ai.client.AiChatResult` when loaded, so a schema change invalidates old entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_PATH = Path("data") / "ai_cache.json"
+_VERSION = 1
+
+
+def market_buckets(snapshot: Any, tolerance_pct: float) -> Dict[str, Optional[int]]:
+    """Bucket ids for the fields of a ``MarketSnapshot`` (``None`` when a field is missing)."""
+
+    if snapshot is None:
+        return {}
+    step = math.log1p(max(tolerance_pct, 1e-6) / 100)
+    bid, ask = snapshot.bid, snapshot.ask
+    mid = (bid + ask) / 2 if bid and ask else snapshot.last_price
+
+    def log_bucket(value: Optional[float]) -> Optional[int]:
+        return math.floor(math.log(value) / step) if value and value > 0 else None
+
+    spread_bps = (ask - bid) / mid * 10_000 if bid and ask and mid else None
+    return {
+        "mid": log_bucket(mid),
+        # Spread moves in ticks, so whole basis points are fine-grained enough.
+        "spread_bps": round(spread_bps) if spread_bps is not None else None,
+        "volume": log_bucket(snapshot.volume_24h) if snapshot.volume_24h else None,
+    }
+
+
+def cache_key(prompt: str, user_message: str, buckets: Dict[str, Any], **model: Any) -> str:
+    blob = json.dumps([prompt, user_message.strip(), buckets, model], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class AiResponseCache:
+    def __init__(
+        self,
+        path: Optional[Path] = CACHE_PATH,
+        *,
+        max_entries: int = 256,
+        ttl_seconds: float = 900,
+        validate: Optional[Callable[[Dict], Dict]] = None,
+        clock: Callable[[], float] = time.time,
+        logger=None,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.validate = validate
+        self.clock = clock
+        self.logger = logger
+        self.counters: Dict[str, float] = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "saved_ms": 0.0}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry["stored_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self.counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            self.counters["saved_ms"] += entry["latency_ms"]
+            return entry["payload"]
+
+    def put(self, key: str, payload: Dict, *, latency_ms: float = 0.0) -> None:
+        with self._lock:
+            self._entries[key] = {"stored_at": self.clock(), "latency_ms": round(latency_ms, 1), "payload": payload}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evicted"] += 1
+            snapshot = list(self._entries.items())
+        self._save(snapshot)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._save([])
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "saved_ms": round(self.counters["saved_ms"], 1),
+            "entries": len(self._entries),
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    # Persistence
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            self._log("warning", "Ignoring unreadable AI cache %s: %s", self.path, exc)
+            return
+        if data.get("version") != _VERSION:
+            return
+        now = self.clock()
+        for key, entry in data.get("entries", []):
+            if now - entry.get("stored_at", 0) > self.ttl_seconds:
+                continue
+            if self.validate is not None:
+                try:
+                    entry["payload"] = self.validate(entry["payload"])
+                except Exception:  # noqa: BLE001 - stale schema, drop the entry
+                    continue
+            self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self, entries) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps({"version": _VERSION, "entries": entries}), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            self._log("warning", "Failed to persist AI cache: %s", exc)
+
+
+__all__ = ["AiResponseCache", "cache_key", "market_buckets"]
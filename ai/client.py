@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import json
-import time
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
-from openai import OpenAI, OpenAIError
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, Field
 
 from core.logger import mask_secret
-from core.state import AppState, StateMachine
+from core.state import StateMachine
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from ai.async_client import AsyncAiClient
+    from ai.cache import AiResponseCache
+    from ai.health import AiHealthMonitor
 
 
 class TradeSettingsSchema(BaseModel):
@@ -26,62 +29,188 @@ class AiChatResult(BaseModel):
     settings: TradeSettingsSchema
 
 
+class PairSuggestion(BaseModel):
+    symbol: str
+    score: float = Field(ge=0, le=100)
+    reason: str = ""
+    settings: TradeSettingsSchema
+
+
+class AiScreeningResult(BaseModel):
+    """Screening answer: ``SETTINGS_JSON`` holds ``{"pairs": [PairSuggestion, ...]}``."""
+
+    explanation: str
+    pairs: List[PairSuggestion]
+
+
+MOCK_EXPLANATION = "Mock AI because no OpenAI key was provided."
+MOCK_SETTINGS = {
+    "budget_usdt": 150,
+    "max_orders": 4,
+    "grid_step_pct": 0.4,
+    "take_profit_pct": 1.8,
+    "stop_loss_pct": 1.2,
+    "cooldown_seconds": 12,
+    "update_interval_ms": 1200,
+}
+
+
 class AiClient:
+    # Settings :meth:`reconfigure` applies in place; ``max_concurrency`` and the cache need a new client.
+    RECONFIGURABLE = frozenset(
+        {
+            "api_key",
+            "base_url",
+            "model",
+            "temperature",
+            "timeout_seconds",
+            "max_retries",
+            "deadline_seconds",
+            "health_interval_seconds",
+            "breaker_failure_threshold",
+            "breaker_reset_seconds",
+        }
+    )
+
     def __init__(
         self,
         state: StateMachine,
         logger,
         *,
         api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
         model: str = "gpt-4.1-mini",
         temperature: float = 0.2,
         timeout_seconds: int = 20,
         max_retries: int = 2,
+        max_concurrency: int = 2,
+        deadline_seconds: float = 60.0,
+        health_interval_seconds: float = 120.0,
+        breaker_failure_threshold: int = 3,
+        breaker_reset_seconds: float = 30.0,
+        cache: Optional["AiResponseCache"] = None,
+        mock_chunk_delay_s: float = 0.0,
     ) -> None:
         self.state = state
         self.logger = logger
         self.api_key = api_key or ""
+        self.base_url = base_url or None
         self.model = model
         self.temperature = temperature
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
-
-    def run_chat(self, prompt: str, user_message: str) -> Dict:
-        for attempt in range(self.max_retries + 1):
-            try:
-                payload = self._run(prompt, user_message)
-                parsed = AiChatResult(**payload)
-                self.state.set_state(AppState.AI_READY)
-                self.logger.info("AI response valid with settings: %s", parsed.settings.model_dump())
-                return parsed.model_dump()
-            except (ValidationError, ValueError) as exc:
-                self.state.set_state(AppState.ERROR, str(exc))
-                self.logger.error("AI response validation failed (attempt %s): %s", attempt + 1, exc)
-        raise ValueError("AI analysis failed after retries")
+        self.max_concurrency = max_concurrency
+        self.deadline_seconds = deadline_seconds
+        self.health_interval_seconds = health_interval_seconds
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.cache = cache
+        self.mock_chunk_delay_s = mock_chunk_delay_s
+        self.last_ttft_ms: Optional[float] = None
+        self._aio: Optional["AsyncAiClient"] = None
+        self._health: Optional["AiHealthMonitor"] = None
 
-    def _run(self, prompt: str, user_message: str) -> Dict:
-        if not self.client:
-            return self._mock_response(user_message)
-        start = time.time()
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": user_message},
-                ],
-                temperature=self.temperature,
-                timeout=self.timeout_seconds,
+    @property
+    def aio(self) -> "AsyncAiClient":
+        """Async client that runs every request (see :mod:`ai.async_client`)."""
+
+        if self._aio is None:
+            from ai.async_client import AsyncAiClient
+            from ai.health import CircuitBreaker
+
+            self._aio = AsyncAiClient(
+                self,
+                max_concurrency=self.max_concurrency,
+                deadline_seconds=self.deadline_seconds,
+                breaker=CircuitBreaker(
+                    failure_threshold=self.breaker_failure_threshold, reset_timeout_s=self.breaker_reset_seconds
+                ),
             )
-        except OpenAIError as exc:  # noqa: BLE001
-            self.logger.error("OpenAI call failed: %s", exc)
-            raise ValueError(f"OpenAI error: {exc}") from exc
-        finally:
-            latency = (time.time() - start) * 1000
-            self.logger.info("OpenAI latency: %.0fms", latency)
-        content = completion.choices[0].message.content if completion.choices else ""
-        return self._parse_content(content)
+        return self._aio
+
+    @property
+    def health(self) -> "AiHealthMonitor":
+        """Cached endpoint health; :meth:`AiHealthMonitor.start` begins background probing."""
+
+        if self._health is None:
+            from ai.health import AiHealthMonitor
+
+            self._health = AiHealthMonitor(self, interval_s=self.health_interval_seconds, logger=self.logger)
+        return self._health
+
+    def run_chat(
+        self, prompt: str, user_message: str, *, cache_key: Optional[str] = None, channel: Optional[str] = None
+    ) -> Dict:
+        """Validated ``AiChatResult`` dict; with ``cache_key`` a cached answer is returned without a call.
+
+        Blocking facade over :meth:`AsyncAiClient.chat`. A newer request on the same ``channel``
+        cancels this one, which then raises :class:`ai.async_client.AiRequestCancelled`.
+        """
+
+        return self.aio.run(self.aio.chat(prompt, user_message, cache_key=cache_key, channel=channel))
+
+    def stream_chat(
+        self,
+        prompt: str,
+        user_message: str,
+        *,
+        on_text: Optional[Callable[[str], None]] = None,
+        on_settings: Optional[Callable[[Dict], None]] = None,
+        cache_key: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> Dict:
+        """:meth:`run_chat` with the completion streamed.
+
+        ``on_text`` receives explanation text as it arrives and ``on_settings`` the validated
+        settings as soon as their JSON object closes (both on the AI loop thread). A streamed
+        answer is not retried: text already shown cannot be taken back, so errors are raised.
+        """
+
+        return self.aio.run(
+            self.aio.stream(
+                prompt, user_message, on_text=on_text, on_settings=on_settings, cache_key=cache_key, channel=channel
+            )
+        )
+
+    def close(self) -> None:
+        if self._health is not None:
+            self._health.stop()
+        if self._aio is not None:
+            self._aio.close()
+
+    def reconfigure(self, **settings) -> None:
+        """Apply changed settings without dropping the loop, cache, counters or breaker history.
+
+        A new ``api_key``/``base_url`` only replaces the SDK client (and closes the breaker,
+        since its failures were about the old endpoint); everything else is read per request.
+        """
+
+        unknown = set(settings) - self.RECONFIGURABLE
+        if unknown:
+            raise ValueError(f"Cannot reconfigure in place: {', '.join(sorted(unknown))}")
+        for name, value in settings.items():
+            setattr(self, name, value)
+        self.api_key = self.api_key or ""
+        self.base_url = self.base_url or None
+        if self._aio is not None:
+            self._aio.deadline_seconds = self.deadline_seconds
+            self._aio.breaker.failure_threshold = max(1, self.breaker_failure_threshold)
+            self._aio.breaker.reset_timeout_s = self.breaker_reset_seconds
+        if self._health is not None:
+            self._health.interval_s = self.health_interval_seconds
+        if {"api_key", "base_url"} & settings.keys():
+            if self._aio is not None:
+                old, self._aio._openai = self._aio._openai, None
+                self._aio.breaker.record_success()
+                if old is not None:
+                    self._aio.spawn(old.close())
+            if self._health is not None:
+                self._health.status, self._health.error = "unknown", None
+
+    def _run(self, prompt: str, user_message: str) -> Dict:
+        """Answer without an API key (run off the AI loop); tests override it to script replies."""
+
+        return self._mock_response(user_message)
 
     def _parse_content(self, content: str) -> Dict:
         explanation, settings_blob = self._split_blocks(content)
@@ -107,38 +236,27 @@ class AiClient:
 
     def _mock_response(self, user_message: str) -> Dict:
         self.logger.info("Running mock AI (no key). User message: %s", user_message)
-        return {
-            "explanation": "Mock AI because no OpenAI key was provided.",
-            "settings": {
-                "budget_usdt": 150,
-                "max_orders": 4,
-                "grid_step_pct": 0.4,
-                "take_profit_pct": 1.8,
-                "stop_loss_pct": 1.2,
-                "cooldown_seconds": 12,
-                "update_interval_ms": 1200,
-            },
-        }
+        return {"explanation": MOCK_EXPLANATION, "settings": dict(MOCK_SETTINGS)}
+
+    def _mock_chunks(self, user_message: str, chunk_size: int = 8) -> List[str]:
+        """The mock answer as raw section text in small chunks (paced by ``mock_chunk_delay_s``)."""
+
+        self.logger.info("Running mock AI stream (no key). User message: %s", user_message)
+        text = f"### EXPLANATION\n{MOCK_EXPLANATION}\n\n### SETTINGS_JSON\n{json.dumps(MOCK_SETTINGS, indent=2)}\n"
+        return [text[start : start + chunk_size] for start in range(0, len(text), chunk_size)]
 
     def describe(self) -> str:
-        if not self.client:
+        if not self.api_key:
             return "Mock AI client (no key)"
-        return f"OpenAI client (key: {mask_secret(self.api_key)})"
+        endpoint = f", {self.base_url}" if self.base_url else ""
+        return f"OpenAI client (key: {mask_secret(self.api_key)}{endpoint})"
 
     def can_run_live(self) -> bool:
-        return bool(self.client)
+        return bool(self.api_key)
 
     def healthcheck(self) -> bool:
-        if not self.client:
-            return False
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "system", "content": "Say OK"}, {"role": "user", "content": "Ping"}],
-                temperature=0,
-                timeout=5,
-            )
-            return bool(completion.choices)
-        except OpenAIError:
-            return False
+        """Probe the endpoint now with a token-free ``GET /models`` and refresh the cached health."""
 
+        if not self.api_key:
+            return False
+        return self.health.check_now()
@@ -0,0 +1,201 @@
+"""Cached AI endpoint health with background probing and a circuit breaker.
+
+:class:`CircuitBreaker` opens after ``failure_threshold`` consecutive transport failures
+(timeouts, connection errors, 5xx/429, auth errors; a malformed answer still proves the
+endpoint is up). While it is open, requests fail at once with :class:`CircuitOpenError`
+instead of waiting out a timeout. After ``reset_timeout_s`` it turns half-open, lets one trial
+through, and a success closes it again.
+
+:class:`AiHealthMonitor` probes on the AI loop with the cheapest call there is
+(``GET /models``, no tokens), every ``interval_s`` while healthy. While the breaker is open it
+probes as soon as the breaker turns half-open. Readers such as the status bar only look at
+the cached :meth:`AiHealthMonitor.snapshot`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from concurrent.futures import Future
+
+    from ai.client import AiClient
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """The AI endpoint is considered down; the call was not attempted."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+        self.failures = 0
+        self.opened = 0
+        self._open_since: Optional[float] = None
+        self._trial_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._open_since is None:
+            return CLOSED
+        return HALF_OPEN if self.clock() - self._open_since >= self.reset_timeout_s else OPEN
+
+    def retry_in(self) -> float:
+        if self._open_since is None:
+            return 0.0
+        return max(0.0, self._open_since + self.reset_timeout_s - self.clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go out; half-open admits one trial per ``reset_timeout_s``."""
+
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            now = self.clock()
+            if self._trial_at is not None and now - self._trial_at < self.reset_timeout_s:
+                return False
+            self._trial_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._open_since = self._trial_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            half_open = self._open_since is not None
+            if half_open or self.failures >= self.failure_threshold:
+                if not half_open:
+                    self.opened += 1
+                self._open_since = self.clock()
+                self._trial_at = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "opened": self.opened, "retry_in_s": round(self.retry_in(), 1)}
+
+
+class AiHealthMonitor:
+    def __init__(
+        self,
+        client: "AiClient",
+        *,
+        interval_s: float = 120.0,
+        probe_timeout_s: float = 5.0,
+        clock: Callable[[], float] = time.time,
+        logger=None,
+    ) -> None:
+        self.client = client
+        self.interval_s = interval_s
+        self.probe_timeout_s = probe_timeout_s
+        self.clock = clock
+        self.logger = logger
+        self.status = "unknown"
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.probes = 0
+        self._future: Optional["Future"] = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self.client.aio.breaker
+
+    async def probe(self) -> bool:
+        aio = self.client.aio
+        if aio.openai is None:
+            self.status, self.error, self.checked_at = "mock", None, self.clock()
+            return True
+        self.probes += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(aio.openai.models.list(), self.probe_timeout_s)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - any failure means "not usable"
+            self.breaker.record_failure()
+            was = self.status
+            self.status, self.error, self.latency_ms = "down", str(exc) or type(exc).__name__, None
+            if was != "down":
+                self._log("warning", "AI endpoint probe failed: %s (breaker %s)", self.error, self.breaker.state)
+            return False
+        finally:
+            self.checked_at = self.clock()
+        self.breaker.record_success()
+        if self.status == "down":
+            self._log("info", "AI endpoint healthy again")
+        self.status, self.error = "ok", None
+        self.latency_ms = (time.monotonic() - started) * 1000
+        return True
+
+    def next_delay(self) -> float:
+        if self.breaker.state == CLOSED:
+            return self.interval_s
+        return max(1.0, self.breaker.retry_in())
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.next_delay())
+
+    def start(self) -> None:
+        if self._future is None or self._future.done():
+            self._future = self.client.aio.spawn(self._run())
+
+    def stop(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def check_now(self) -> bool:
+        """Probe right away (blocking); for explicit "test connection" actions."""
+
+        return self.client.aio.run(self.probe())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "checked_at": self.checked_at,
+            "error": self.error,
+            "breaker": self.breaker.snapshot(),
+        }
+
+    def status_text(self) -> str:
+        breaker = self.breaker.state
+        if breaker == OPEN:
+            return f"Down (retry in {self.breaker.retry_in():.0f}s)"
+        if breaker == HALF_OPEN:
+            return "Recovering"
+        if self.status == "ok":
+            return f"OK ({self.latency_ms:.0f}ms)"
+        if self.status == "down":
+            return "Degraded"
+        if self.status == "mock":
+            return "Mock"
+        return "Checking"
+
+
+__all__ = ["AiHealthMonitor", "CLOSED", "CircuitBreaker", "CircuitOpenError", "HALF_OPEN", "OPEN"]
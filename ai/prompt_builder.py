@@ -1,49 +1,263 @@
+"""System prompt assembly under a token budget.
+
+The prompt is a byte-stable prefix (:data:`STATIC_PREFIX`: role, output contract, rules) followed
+by the variable sections, ordered from slowest to fastest changing with the market block last.
+Providers that cache prompt prefixes (OpenAI does so automatically once the shared prefix is
+long enough) then reuse everything up to the first changed byte.
+
+Sizes are counted with ``tiktoken`` when it is installed, else estimated at four characters per
+token. Over ``budget_tokens`` the assembler first swaps sections for their compact forms and
+then drops droppable sections, lowest value first; the prefix, pair and market are never dropped.
+"""
+
 from __future__ import annotations
 
-from typing import Dict, Optional
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
 from core.config_service import Config
 from exchanges.binance.models import MarketSnapshot, PairFilters
 
 PROMPT_HEADER = "You are BBOT AI copilot. Respond with two sections: '### EXPLANATION' and '### SETTINGS_JSON'."
+SETTINGS_KEYS = (
+    "budget_usdt",
+    "max_orders",
+    "grid_step_pct",
+    "take_profit_pct",
+    "stop_loss_pct",
+    "cooldown_seconds",
+    "update_interval_ms",
+)
+# Must never contain anything call-specific: any changed byte here defeats prefix caching.
+STATIC_PREFIX = "\n".join(
+    [
+        PROMPT_HEADER,
+        "You must produce JSON that matches the schema exactly.",
+        "Required JSON keys: " + ", ".join(SETTINGS_KEYS),
+        "Settings are for a spot grid bot in paper trading: percentages are in percent, budget in the quote asset.",
+        "Keep orders above minNotional and prices on the tick grid when filters are given.",
+        "Be concise and professional.",
+    ]
+)
 
 
-def build_prompt(
+def _load_encoder() -> Callable[[str], int]:
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda text: math.ceil(len(text) / 4)
+    encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+_count: Optional[Callable[[str], int]] = None
+
+
+def count_tokens(text: str) -> int:
+    global _count
+    if _count is None:
+        _count = _load_encoder()
+    return _count(text)
+
+
+@dataclass
+class PromptSection:
+    name: str
+    title: str
+    text: str
+    compact: Optional[str] = None
+    value: int = 0  # lower is compacted/dropped first
+    droppable: bool = True
+
+    def render(self, compact: bool = False) -> str:
+        return f"{self.title}:\n{self.compact if compact and self.compact is not None else self.text}"
+
+
+@dataclass
+class AssembledPrompt:
+    prefix: str
+    sections: List[Tuple[str, str]]
+    prefix_tokens: int
+    tokens: int
+    budget_tokens: Optional[int]
+    compacted: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    input_usd_per_mtok: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return self.text_without()
+
+    def text_without(self, *names: str) -> str:
+        """The prompt minus the named sections (e.g. ``"market"`` for a market-free cache key)."""
+
+        return "\n".join([self.prefix, *(text for name, text in self.sections if name not in names)])
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget_tokens is not None and self.tokens > self.budget_tokens
+
+    @property
+    def est_cost_usd(self) -> float:
+        return self.tokens * self.input_usd_per_mtok / 1_000_000
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "tokens": self.tokens,
+            "prefix_tokens": self.prefix_tokens,
+            "budget_tokens": self.budget_tokens,
+            "compacted": list(self.compacted),
+            "dropped": list(self.dropped),
+            "est_cost_usd": round(self.est_cost_usd, 8),
+        }
+
+
+def _num(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.6g}"
+
+
+def _market_section(snapshot: Optional[MarketSnapshot]) -> PromptSection:
+    if not snapshot:
+        return PromptSection("market", "Market", "Market snapshot unavailable", droppable=False)
+    full = "\n".join(
+        [
+            f"Last: {snapshot.last_price} | Bid: {snapshot.bid} | Ask: {snapshot.ask} | Spread: {snapshot.spread}",
+            f"Vol24h: {snapshot.volume_24h} | Timestamp: {snapshot.timestamp}",
+        ]
+    )
+    bid, ask = snapshot.bid, snapshot.ask
+    mid = (bid + ask) / 2 if bid and ask else snapshot.last_price
+    spread_bps = f"{(ask - bid) / mid * 10_000:.1f}" if bid and ask and mid else "n/a"
+    compact = f"mid={_num(mid)} spread_bps={spread_bps} vol24h={_num(snapshot.volume_24h)}"
+    return PromptSection("market", "Market", full, compact=compact, value=9, droppable=False)
+
+
+def prompt_sections(
     *,
     config: Config,
     snapshot: Optional[MarketSnapshot],
     filters: Optional[PairFilters],
     constraints: Optional[Dict[str, str]] = None,
-) -> str:
-    pair = config.app.active_pair or "(not selected)"
-    market_lines = []
-    if snapshot:
-        market_lines.append(f"Last: {snapshot.last_price} | Bid: {snapshot.bid} | Ask: {snapshot.ask} | Spread: {snapshot.spread}")
-        market_lines.append(f"Vol24h: {snapshot.volume_24h} | Timestamp: {snapshot.timestamp}")
-    else:
-        market_lines.append("Market snapshot unavailable")
-    filter_lines = []
+) -> List[PromptSection]:
+    """Variable sections, slowest changing first; the market block is always last."""
+
+    constraint_lines = [f"- {k}: {v}" for k, v in (constraints or {}).items()]
+    settings = config.trading.model_dump()
     if filters:
-        filter_lines.append(f"tickSize={filters.tick_size} stepSize={filters.step_size} minNotional={filters.min_notional}")
+        filter_text = f"tickSize={filters.tick_size} stepSize={filters.step_size} minNotional={filters.min_notional}"
     else:
-        filter_lines.append("No filters")
-    constraint_lines = [f"- {k}: {v}" for k, v in (constraints or {}).items()]
-    constraint_block = "\n".join(constraint_lines) if constraint_lines else "- Follow Binance trading rules"
-    return "\n".join(
-        [
-            PROMPT_HEADER,
-            "You must produce JSON that matches the schema exactly.",
-            f"Active pair: {pair}",
-            "Market:",
-            "\n".join(market_lines),
-            "Filters:",
-            "\n".join(filter_lines),
-            "Current settings:",
-            str(config.trading.model_dump()),
-            "Constraints:",
-            constraint_block,
-            "Required JSON keys: budget_usdt, max_orders, grid_step_pct, take_profit_pct, stop_loss_pct, cooldown_seconds, update_interval_ms",
-            "Be concise and professional.",
-        ]
+        filter_text = "No filters"
+    return [
+        PromptSection(
+            "constraints",
+            "Constraints",
+            "\n".join(constraint_lines) if constraint_lines else "- Follow Binance trading rules",
+            value=1,
+        ),
+        PromptSection(
+            "settings",
+            "Current settings",
+            json.dumps(settings, sort_keys=True, separators=(", ", ": ")),
+            compact=json.dumps([settings.get(key) for key in SETTINGS_KEYS], separators=(",", ":")) + " (order as Required JSON keys)",
+            value=3,
+        ),
+        PromptSection("filters", "Filters", filter_text, value=2),
+        PromptSection("pair", "Active pair", config.app.active_pair or "(not selected)", droppable=False, value=8),
+        _market_section(snapshot),
+    ]
+
+
+class PromptAssembler:
+    def __init__(
+        self,
+        *,
+        budget_tokens: Optional[int] = None,
+        input_usd_per_mtok: float = 0.0,
+        count: Callable[[str], int] = count_tokens,
+    ) -> None:
+        self.budget_tokens = budget_tokens
+        self.input_usd_per_mtok = input_usd_per_mtok
+        self.count = count
+
+    def assemble(self, sections: List[PromptSection], *, prefix: str = STATIC_PREFIX) -> AssembledPrompt:
+        prefix_tokens = self.count(prefix)
+        compact: Dict[str, bool] = {s.name: False for s in sections}
+        kept = list(sections)
+        # One token for each joining newline.
+        sizes = {s.name: self.count(s.render()) + 1 for s in sections}
+        total = prefix_tokens + sum(sizes.values())
+        compacted: List[str] = []
+        dropped: List[str] = []
+        by_value = sorted(sections, key=lambda s: s.value)
+        if self.budget_tokens is not None and total > self.budget_tokens:
+            for section in by_value:
+                if total <= self.budget_tokens:
+                    break
+                if section.compact is None:
+                    continue
+                smaller = self.count(section.render(compact=True)) + 1
+                if smaller < sizes[section.name]:
+                    total -= sizes[section.name] - smaller
+                    sizes[section.name] = smaller
+                    compact[section.name] = True
+                    compacted.append(section.name)
+            for section in by_value:
+                if total <= self.budget_tokens:
+                    break
+                if section.droppable:
+                    total -= sizes[section.name]
+                    kept.remove(section)
+                    dropped.append(section.name)
+        prompt = AssembledPrompt(
+            prefix=prefix,
+            sections=[(s.name, s.render(compact=compact[s.name])) for s in kept],
+            prefix_tokens=prefix_tokens,
+            tokens=total,
+            budget_tokens=self.budget_tokens,
+            compacted=compacted,
+            dropped=dropped,
+            input_usd_per_mtok=self.input_usd_per_mtok,
+        )
+        # Section sizes are close but not additive under BPE; report the joined text's count.
+        prompt.tokens = self.count(prompt.text)
+        return prompt
+
+
+def assemble_prompt(
+    *,
+    config: Config,
+    snapshot: Optional[MarketSnapshot],
+    filters: Optional[PairFilters],
+    constraints: Optional[Dict[str, str]] = None,
+) -> AssembledPrompt:
+    """Prompt for the trade chat, within ``config.ai.prompt_budget_tokens``."""
+
+    assembler = PromptAssembler(
+        budget_tokens=config.ai.prompt_budget_tokens or None,
+        input_usd_per_mtok=config.ai.input_usd_per_mtok,
     )
+    return assembler.assemble(prompt_sections(config=config, snapshot=snapshot, filters=filters, constraints=constraints))
+
+
+def build_prompt(
+    *,
+    config: Config,
+    snapshot: Optional[MarketSnapshot],
+    filters: Optional[PairFilters],
+    constraints: Optional[Dict[str, str]] = None,
+) -> str:
+    return assemble_prompt(config=config, snapshot=snapshot, filters=filters, constraints=constraints).text
+
 
+__all__ = [
+    "AssembledPrompt",
+    "PromptAssembler",
+    "PromptSection",
+    "STATIC_PREFIX",
+    "assemble_prompt",
+    "build_prompt",
+    "count_tokens",
+    "prompt_sections",
+]
@@ -0,0 +1,246 @@
+"""AI screening of the top candidate pairs from the pair table.
+
+Each pair is reduced to one line of compact features (:func:`pair_features`) and up to
+``pairs_per_request`` lines are sent in one request; the ``SETTINGS_JSON`` section of the answer
+holds ``{"pairs": [...]}`` and the whole list is validated in one pass against
+:class:`ai.client.AiScreeningResult`. Batches fan out concurrently through the async AI client
+(its semaphore bounds in-flight requests) with request starts spaced to ``requests_per_minute``.
+
+All batches share one system prompt, so after the first request the provider's prefix cache is
+warm for the rest; the pair table travels in the user message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+from ai.client import MOCK_SETTINGS, AiScreeningResult
+from ai.prompt_builder import SETTINGS_KEYS, PromptAssembler, prompt_sections
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from ai.client import AiClient
+    from core.config_service import Config
+
+SCREENING_PREFIX = "\n".join(
+    [
+        "You are BBOT AI copilot screening spot pairs for a grid bot in paper trading.",
+        "Respond with two sections: '### EXPLANATION' and '### SETTINGS_JSON'.",
+        'SETTINGS_JSON is one JSON object: {"pairs": [{"symbol", "score", "reason", "settings"}, ...]} with one entry per input row.',
+        "score is 0-100 (higher = better grid candidate); reason is at most one short sentence.",
+        "settings has exactly these keys: " + ", ".join(SETTINGS_KEYS),
+        "Prefer tight spreads and deep volume; a grid step below the spread loses money.",
+        "Input rows are CSV: " + ",".join(("symbol", "last", "spread_bps", "qvol_musd", "tick", "min_notional")),
+    ]
+)
+DEFAULT_QUESTION = "Rank these pairs for grid trading and suggest settings for each."
+
+
+def pair_features(pair: Dict[str, Any]) -> Dict[str, Any]:
+    """Spread in basis points and 24h quote volume in millions, from a pair-table row."""
+
+    last = pair.get("last") or 0.0
+    spread = pair.get("spread")
+    volume = pair.get("volume") or 0.0
+    return {
+        "symbol": pair.get("symbol"),
+        "last": last,
+        "spread_bps": round(spread / last * 10_000, 2) if spread is not None and last else None,
+        "qvol_musd": round(volume * last / 1e6, 2),
+        "tick": pair.get("tick_size"),
+        "min_notional": pair.get("min_notional"),
+    }
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.8g}"
+    return str(value)
+
+
+def features_table(pairs: Sequence[Dict[str, Any]]) -> str:
+    return "\n".join(",".join(_cell(value) for value in pair_features(pair).values()) for pair in pairs)
+
+
+def validate_screening(payload: Dict[str, Any], symbols: Sequence[str]) -> Dict[str, Any]:
+    """``AiScreeningResult`` dict restricted to ``symbols`` (first entry wins); raises ``ValueError``."""
+
+    settings = payload.get("settings")
+    rows = settings.get("pairs") if isinstance(settings, dict) else settings
+    result = AiScreeningResult(explanation=payload.get("explanation", ""), pairs=rows or []).model_dump()
+    wanted, seen, pairs = set(symbols), set(), []
+    for row in result["pairs"]:
+        symbol = row["symbol"].upper()
+        if symbol in wanted and symbol not in seen:
+            seen.add(symbol)
+            pairs.append({**row, "symbol": symbol})
+    if not pairs:
+        raise ValueError("AI screening answer covers none of the requested pairs")
+    result["pairs"] = pairs
+    return result
+
+
+def mock_screening(prompt: str, user_message: str) -> Dict[str, Any]:
+    """Deterministic stand-in: scores by quote volume and spread, grid step at least 4 spreads."""
+
+    pairs = []
+    for line in user_message.splitlines():
+        cells = line.split(",")
+        if len(cells) != 6 or not cells[0] or cells[0] == "symbol":
+            continue
+        spread_bps = float(cells[2]) if cells[2] else 50.0
+        qvol = float(cells[3] or 0)
+        score = max(0.0, min(100.0, 20 * math.log10(1 + qvol) + 40 - spread_bps))
+        grid_step = max(MOCK_SETTINGS["grid_step_pct"], round(spread_bps * 4 / 100, 2))
+        pairs.append(
+            {
+                "symbol": cells[0],
+                "score": round(score, 1),
+                "reason": f"spread {spread_bps:.1f}bp, {qvol:.1f}M quote volume",
+                "settings": {**MOCK_SETTINGS, "grid_step_pct": grid_step, "take_profit_pct": round(grid_step * 3, 2)},
+            }
+        )
+    return {"explanation": "Mock screening because no OpenAI key was provided.", "settings": {"pairs": pairs}}
+
+
+class RequestPacer:
+    """Spaces request starts at least ``60 / requests_per_minute`` seconds apart."""
+
+    def __init__(self, requests_per_minute: float, *, clock=time.monotonic) -> None:
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.clock = clock
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        now = self.clock()
+        start = max(now, self._next_at)
+        self._next_at = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+@dataclass
+class ScreeningRow:
+    symbol: str
+    score: float
+    reason: str
+    settings: Dict[str, Any]
+    batch: int
+
+
+@dataclass
+class ScreeningReport:
+    rows: List[ScreeningRow]
+    missing: List[str] = field(default_factory=list)
+    failed: List[Tuple[List[str], str]] = field(default_factory=list)
+    requests: int = 0
+    elapsed_s: float = 0.0
+    prompt_tokens: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ranked": len(self.rows),
+            "missing": len(self.missing),
+            "failed_batches": len(self.failed),
+            "requests": self.requests,
+            "elapsed_s": round(self.elapsed_s, 2),
+            "prompt_tokens": self.prompt_tokens,
+        }
+
+
+class PairScreener:
+    def __init__(
+        self,
+        client: "AiClient",
+        config: "Config",
+        *,
+        pairs_per_request: int = 8,
+        requests_per_minute: float = 20,
+        logger=None,
+    ) -> None:
+        self.client = client
+        self.config = config
+        self.pairs_per_request = max(1, pairs_per_request)
+        self.requests_per_minute = requests_per_minute
+        self.logger = logger
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    def prompt(self):
+        sections = [
+            s
+            for s in prompt_sections(config=self.config, snapshot=None, filters=None, constraints={"mode": "Paper trading only"})
+            if s.name in ("constraints", "settings")
+        ]
+        return PromptAssembler(input_usd_per_mtok=self.config.ai.input_usd_per_mtok).assemble(sections, prefix=SCREENING_PREFIX)
+
+    def batches(self, pairs: Sequence[Dict[str, Any]], top_n: int) -> List[List[Dict[str, Any]]]:
+        chosen = [pair for pair in pairs if pair.get("symbol")][: max(0, top_n)]
+        size = self.pairs_per_request
+        return [chosen[i : i + size] for i in range(0, len(chosen), size)]
+
+    async def screen(
+        self, pairs: Sequence[Dict[str, Any]], *, top_n: int, question: str = DEFAULT_QUESTION
+    ) -> ScreeningReport:
+        """Rank the first ``top_n`` of ``pairs`` (in table order); failed batches are reported, not raised."""
+
+        started = time.monotonic()
+        prompt = self.prompt()
+        batches = self.batches(pairs, top_n)
+        pacer = RequestPacer(self.requests_per_minute)
+        aio = self.client.aio
+
+        async def run_batch(batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+            symbols = [pair["symbol"] for pair in batch]
+            await pacer.wait()
+            return await aio.complete(
+                prompt.text,
+                f"{question}\n{features_table(batch)}",
+                validate=lambda payload: validate_screening(payload, symbols),
+                mock=mock_screening,
+            )
+
+        outcomes = await asyncio.gather(*(run_batch(batch) for batch in batches), return_exceptions=True)
+        report = ScreeningReport(rows=[], requests=len(batches), prompt_tokens=prompt.tokens * len(batches))
+        for index, (batch, outcome) in enumerate(zip(batches, outcomes)):
+            symbols = [pair["symbol"] for pair in batch]
+            if isinstance(outcome, BaseException):
+                if isinstance(outcome, asyncio.CancelledError):
+                    raise outcome
+                report.failed.append((symbols, str(outcome)))
+                self._log("error", "AI screening batch %s failed: %s", index, outcome)
+                continue
+            answered = {row["symbol"] for row in outcome["pairs"]}
+            report.missing.extend(symbol for symbol in symbols if symbol not in answered)
+            report.rows.extend(
+                ScreeningRow(row["symbol"], row["score"], row["reason"], row["settings"], index) for row in outcome["pairs"]
+            )
+        report.rows.sort(key=lambda row: (-row.score, row.symbol))
+        report.elapsed_s = time.monotonic() - started
+        self._log("info", "AI screening done: %s", report.summary())
+        return report
+
+    def run(self, pairs: Sequence[Dict[str, Any]], *, top_n: int) -> ScreeningReport:
+        """Blocking :meth:`screen`; call it from a worker thread."""
+
+        return self.client.aio.run(self.screen(pairs, top_n=top_n))
+
+
+__all__ = [
+    "PairScreener",
+    "RequestPacer",
+    "SCREENING_PREFIX",
+    "ScreeningReport",
+    "ScreeningRow",
+    "features_table",
+    "mock_screening",
+    "pair_features",
+    "validate_screening",
+]
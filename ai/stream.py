@@ -0,0 +1,145 @@
+"""Incremental parser for streamed ``### EXPLANATION`` / ``### SETTINGS_JSON`` responses.
+
+Chunks are fed as they arrive. Explanation text is passed to ``on_explanation`` as soon as it
+cannot be the start of the next header (at most ``len(header) - 1`` characters are held back).
+After the ``SETTINGS_JSON`` header the parser tracks brace depth outside JSON strings, so the
+object is decoded and validated against :class:`ai.client.TradeSettingsSchema` on the chunk
+that closes it, and ``on_settings`` fires without waiting for the end of the stream.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+EXPLANATION_HEADER = "### explanation"
+SETTINGS_HEADER = "### settings_json"
+
+_PREAMBLE, _EXPLANATION, _SETTINGS, _DONE = range(4)
+
+
+class SectionStreamParser:
+    def __init__(
+        self,
+        *,
+        on_explanation: Optional[Callable[[str], None]] = None,
+        on_settings: Optional[Callable[[Dict[str, Any]], None]] = None,
+        validate: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> None:
+        self.on_explanation = on_explanation
+        self.on_settings = on_settings
+        self.validate = validate
+        self.settings: Optional[Dict[str, Any]] = None
+        self._state = _PREAMBLE
+        self._buffer = ""
+        self._explanation: List[str] = []
+        self._started_text = False
+        # JSON scanner state
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def explanation(self) -> str:
+        return "".join(self._explanation).strip()
+
+    def feed(self, chunk: str) -> None:
+        if self._state == _DONE or not chunk:
+            return
+        self._buffer += chunk
+        while True:
+            if self._state == _PREAMBLE:
+                if not self._find_header(EXPLANATION_HEADER, _EXPLANATION) and not self._find_header(SETTINGS_HEADER, _SETTINGS):
+                    return
+            elif self._state == _EXPLANATION:
+                if not self._find_header(SETTINGS_HEADER, _SETTINGS):
+                    self._emit_safe_text()
+                    return
+            elif self._state == _SETTINGS:
+                self._scan_json()
+                return
+            else:
+                return
+
+    def finish(self) -> Dict[str, Any]:
+        """Flush held-back text and return ``{"explanation", "settings"}``; raises ``ValueError``."""
+
+        if self._state == _EXPLANATION and self._buffer:
+            self._emit(self._buffer)
+            self._buffer = ""
+        if self.settings is None:
+            if self._state == _SETTINGS:
+                raise ValueError("Incomplete SETTINGS_JSON block in AI response")
+            raise ValueError("Missing SETTINGS_JSON block in AI response")
+        return {"explanation": self.explanation, "settings": self.settings}
+
+    # Sections
+    def _find_header(self, header: str, state: int) -> bool:
+        index = self._buffer.lower().find(header)
+        if index == -1:
+            return False
+        if self._state == _EXPLANATION:
+            self._emit(self._buffer[:index])
+        self._buffer = self._buffer[index + len(header) :]
+        self._state = state
+        return True
+
+    def _emit_safe_text(self) -> None:
+        # Hold back the longest tail that could still grow into the settings header.
+        hold = len(self._buffer)
+        for size in range(min(len(self._buffer), len(SETTINGS_HEADER) - 1), 0, -1):
+            if SETTINGS_HEADER.startswith(self._buffer[-size:].lower()):
+                hold -= size
+                break
+        if hold:
+            self._emit(self._buffer[:hold])
+            self._buffer = self._buffer[hold:]
+
+    def _emit(self, text: str) -> None:
+        if not self._started_text:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started_text = True
+        self._explanation.append(text)
+        if self.on_explanation:
+            self.on_explanation(text)
+
+    def _scan_json(self) -> None:
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._start != -1:
+                self._in_string = True
+            elif ch == "{":
+                if self._start == -1:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}" and self._start != -1:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(buffer[self._start : i + 1])
+                    return
+        self._pos = len(buffer)
+
+    def _complete(self, blob: str) -> None:
+        self._state = _DONE
+        try:
+            data = json.loads(blob)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Failed to parse SETTINGS_JSON: {exc}") from exc
+        self.settings = self.validate(data) if self.validate else data
+        if self.on_settings:
+            self.on_settings(self.settings)
+
+
+__all__ = ["SectionStreamParser"]
@@ -0,0 +1,253 @@
+"""Local OpenAI-compatible stub for exercising the real AI client path offline.
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream=True`` server-sent events) and
+``GET /v1/models`` on a background thread. Answers follow the BBOT contract and are produced
+with configurable time to first byte, token rate, HTTP error rate (5xx and 429) and
+malformed-answer rate, so retries, streaming and validation run exactly as against the real API.
+
+Run standalone::
+
+    python -m ai.stub_server --port 8765 --latency-ms 300 --error-rate 0.05
+
+then set ``ai.base_url: http://127.0.0.1:8765/v1`` (any API key is accepted).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from ai.client import MOCK_SETTINGS
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 200.0  # time to first byte
+    jitter_ms: float = 50.0
+    tokens_per_s: float = 400.0  # completion pacing; ~4 characters per token
+    error_rate: float = 0.0  # HTTP 500
+    rate_limit_rate: float = 0.0  # HTTP 429
+    malformed_rate: float = 0.0  # 200 with an answer that fails validation
+    seed: Optional[int] = None
+
+
+def _answer(settings: Dict, *, malformed: Optional[str] = None) -> str:
+    explanation = "Stub analysis: spread is tight and volatility moderate, so keep the grid near its current step."
+    if malformed == "missing_section":
+        return f"### EXPLANATION\n{explanation}\n"
+    if malformed == "bad_json":
+        return f"### EXPLANATION\n{explanation}\n### SETTINGS_JSON\n{json.dumps(settings)[:-8]}\n"
+    if malformed == "missing_key":
+        settings = {k: v for k, v in settings.items() if k != "stop_loss_pct"}
+    return f"### EXPLANATION\n{explanation}\n### SETTINGS_JSON\n{json.dumps(settings, indent=2)}\n"
+
+
+class StubServer:
+    MALFORMED_KINDS = ("missing_section", "bad_json", "missing_key")
+
+    def __init__(self, config: Optional[StubConfig] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self.rng = random.Random(self.config.seed)
+        self.counters: Counter = Counter()
+        self.attempts_by_message: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bbot-ai-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread (the standalone entry point)."""
+
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Behaviour
+    def _draw(self, user_message: str) -> Tuple[str, Optional[str], float]:
+        """Outcome (``ok``/``error``/``rate_limited``), malformed kind and first-byte delay."""
+
+        cfg = self.config
+        with self._lock:
+            self.counters["requests"] += 1
+            self.attempts_by_message[user_message] += 1
+            roll = self.rng.random()
+            malformed = self.rng.choice(self.MALFORMED_KINDS) if self.rng.random() < cfg.malformed_rate else None
+            delay = max(0.0, cfg.latency_ms + self.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000
+            if roll < cfg.error_rate:
+                outcome = "error"
+            elif roll < cfg.error_rate + cfg.rate_limit_rate:
+                outcome = "rate_limited"
+            else:
+                outcome = "ok"
+            self.counters[outcome] += 1
+            if outcome == "ok" and malformed:
+                self.counters["malformed"] += 1
+        return outcome, malformed, delay
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args) -> None:  # noqa: A002 - stdlib signature
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/").endswith("/models"):
+                    with stub._lock:
+                        stub.counters["models"] += 1
+                    self._json(200, {"object": "list", "data": [{"id": "stub", "object": "model", "created": 0, "owned_by": "bbot"}]})
+                else:
+                    self._json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                messages = body.get("messages") or []
+                user_message = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+                prompt_chars = sum(len(m.get("content") or "") for m in messages)
+                outcome, malformed, delay = stub._draw(user_message)
+                time.sleep(delay)
+                if outcome == "error":
+                    self._json(500, {"error": {"message": "stub internal error", "type": "server_error"}})
+                    return
+                if outcome == "rate_limited":
+                    self._json(429, {"error": {"message": "stub rate limit", "type": "rate_limit_error"}}, {"Retry-After": "0"})
+                    return
+                content = _answer(dict(MOCK_SETTINGS), malformed=malformed)
+                usage = {
+                    "prompt_tokens": prompt_chars // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": prompt_chars // 4 + len(content) // 4,
+                    "prompt_tokens_details": {"cached_tokens": 0},
+                }
+                model = body.get("model", "stub")
+                if body.get("stream"):
+                    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                    self._stream(model, content, usage if include_usage else None)
+                    return
+                # Non-streamed answers still take as long as generating every token would.
+                time.sleep(len(content) / 4 / stub.config.tokens_per_s if stub.config.tokens_per_s > 0 else 0)
+                self._json(
+                    200,
+                    {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                        "usage": usage,
+                    },
+                )
+
+            def _json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model: str, content: str, usage: Optional[Dict]) -> None:
+                with stub._lock:
+                    stub.counters["streamed"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                ident, created = f"chatcmpl-{uuid.uuid4().hex[:12]}", int(time.time())
+                pieces: List[str] = [content[i : i + 4] for i in range(0, len(content), 4)]
+                pace = 1 / stub.config.tokens_per_s if stub.config.tokens_per_s > 0 else 0.0
+                events = [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]
+                events += [{"index": 0, "delta": {"content": piece}, "finish_reason": None} for piece in pieces]
+                events.append({"index": 0, "delta": {}, "finish_reason": "stop"})
+                try:
+                    for i, choice in enumerate(events):
+                        if pace and 0 < i < len(events) - 1:
+                            time.sleep(pace)
+                        self._event({"id": ident, "object": "chat.completion.chunk", "created": created, "model": model, "choices": [choice]})
+                    if usage is not None:
+                        self._event({"id": ident, "object": "chat.completion.chunk", "created": created, "model": model, "choices": [], "usage": usage})
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client cancelled the stream (e.g. a superseded request).
+                    with stub._lock:
+                        stub.counters["disconnected"] += 1
+
+            def _event(self, payload: Dict) -> None:
+                self.wfile.write(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-s", type=float, default=400.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_s=args.tokens_per_s,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    server = StubServer(config, host=args.host, port=args.port)
+    print(f"OpenAI-compatible stub on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(dict(server.counters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""AI client under concurrent load against the local OpenAI-compatible stub.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_ai_client [--requests 200] [--concurrency 8] [--stream]
+        [--latency-ms 150] [--tokens-per-s 400] [--error-rate 0.05] [--malformed-rate 0.05]
+
+Every request goes through the real path (OpenAI SDK, HTTP, async client semaphore, deadline,
+retries, section parsing and validation). Each request carries a unique user message, so the
+stub's per-message attempt counts split requests into clean and retried ones: their latency gap is
+the retry overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from ai.client import AiClient
+from ai.stub_server import StubConfig, StubServer
+from core.metrics import LatencyStats
+from core.state import StateMachine
+
+
+async def _one(client: AiClient, index: int, stream: bool) -> Tuple[str, float, bool]:
+    message = f"bench request #{index}"
+    started = time.perf_counter()
+    try:
+        if stream:
+            await client.aio.stream("system prompt", message)
+        else:
+            await client.aio.chat("system prompt", message)
+        ok = True
+    except Exception:  # noqa: BLE001 - failures are what is being counted
+        ok = False
+    return message, time.perf_counter() - started, ok
+
+
+async def _drive(client: AiClient, count: int, stream: bool) -> List[Tuple[str, float, bool]]:
+    return await asyncio.gather(*(_one(client, i, stream) for i in range(count)))
+
+
+def run(args) -> Dict:
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_s=args.tokens_per_s,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    with StubServer(config) as server:
+        client = AiClient(
+            StateMachine(),
+            logging.getLogger("bench.ai"),
+            api_key="stub",
+            base_url=server.base_url,
+            max_retries=args.retries,
+            max_concurrency=args.concurrency,
+            deadline_seconds=args.deadline_s,
+            timeout_seconds=args.timeout_s,
+        )
+        client.aio.backoff_base_s = args.backoff_ms / 1000
+        # Warm the SDK import and connection pool outside the measurement.
+        client.aio.run(client.aio.chat("warm-up", "warm-up"))
+        server.counters.clear()
+        server.attempts_by_message.clear()
+        client.aio.latency, client.aio.queue_wait = LatencyStats(), LatencyStats()
+        client.aio.counters = dict.fromkeys(client.aio.counters, 0)
+        started = time.perf_counter()
+        results = client.aio.run(_drive(client, args.requests, args.stream))
+        wall = time.perf_counter() - started
+        stats = client.aio.stats()
+        client.close()
+        attempts = dict(server.attempts_by_message)
+        counters = dict(server.counters)
+
+    e2e, clean, retried = LatencyStats(), LatencyStats(), LatencyStats()
+    failures = 0
+    for message, seconds, ok in results:
+        if not ok:
+            failures += 1
+            continue
+        e2e.record(seconds)
+        (retried if attempts.get(message, 1) > 1 else clean).record(seconds)
+    total_attempts = sum(attempts.values())
+    return {
+        "requests": args.requests,
+        "wall_s": wall,
+        "throughput_rps": args.requests / wall if wall else 0.0,
+        "e2e": e2e.summary(),
+        "clean": clean.summary(),
+        "retried": retried.summary(),
+        "attempts_per_request": total_attempts / args.requests if args.requests else 0.0,
+        "retry_overhead_ms": retried.summary()["mean_ms"] - clean.summary()["mean_ms"] if retried.count and clean.count else 0.0,
+        "validation_failure_rate": stats["invalid_answers"] / total_attempts if total_attempts else 0.0,
+        "http_error_rate": (counters.get("error", 0) + counters.get("rate_limited", 0)) / total_attempts if total_attempts else 0.0,
+        "final_failure_rate": failures / args.requests if args.requests else 0.0,
+        "client": stats,
+        "stub": counters,
+    }
+
+
+def _fmt(summary: Dict) -> str:
+    return f"n={summary['count']:<5} mean {summary['mean_ms']:7.1f}  p50 {summary['p50_ms']:7.1f}  p99 {summary['p99_ms']:7.1f}  max {summary['max_ms']:7.1f} ms"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-s", type=float, default=400.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--backoff-ms", type=float, default=100.0)
+    parser.add_argument("--timeout-s", type=float, default=20.0)
+    parser.add_argument("--deadline-s", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+
+    report = run(args)
+    mode = "stream" if args.stream else "chat"
+    print(f"{report['requests']} {mode} requests, concurrency {args.concurrency}: {report['wall_s']:.2f}s ({report['throughput_rps']:.1f} req/s)")
+    print(f"  end-to-end  {_fmt(report['e2e'])}")
+    print(f"  clean       {_fmt(report['clean'])}")
+    print(f"  retried     {_fmt(report['retried'])}")
+    print(f"  attempts/request {report['attempts_per_request']:.3f}   retry overhead {report['retry_overhead_ms']:.1f} ms")
+    print(
+        f"  validation failures {report['validation_failure_rate']:.2%} of attempts   "
+        f"HTTP errors {report['http_error_rate']:.2%}   final failures {report['final_failure_rate']:.2%}"
+    )
+    print(f"  queue wait  {_fmt(report['client']['queue_wait'])}")
+    print(f"  stub counters {report['stub']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Grid backtest speed on a year of synthetic 1m bars.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_grid_backtest [--bars 525600] [--segment-bars 2048]
+
+Prints wall time, fills and return for a few grid steps; tight steps make the most trade rounds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from exchanges.binance.models import PairFilters
+from strategies.grid_backtest import GridBacktester, Klines
+
+SETTINGS = {
+    "budget_usdt": 100,
+    "max_orders": 4,
+    "grid_step_pct": 0.5,
+    "take_profit_pct": 0.8,
+    "stop_loss_pct": 1.5,
+    "cooldown_seconds": 120,
+}
+STEPS = ((0.5, 0.8, 1.5), (0.2, 0.3, 1.0), (0.1, 0.2, 1.0))
+
+
+def synthetic_klines(n: int, seed: int, vol: float = 0.001) -> Klines:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    return Klines(np.arange(n, dtype=np.int64) * 60_000, open_, high, low, close, np.ones(n))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=525_600)
+    parser.add_argument("--segment-bars", type=int, default=2048)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fee-free", action="store_true")
+    args = parser.parse_args(argv)
+
+    klines = synthetic_klines(args.bars, args.seed)
+    filters = PairFilters(tick_size=0.01, step_size=0.0001, min_notional=5)
+    start = time.perf_counter()
+    tester = GridBacktester(klines, filters=filters, fee_free=args.fee_free, segment_bars=args.segment_bars)
+    print(f"{args.bars} bars, index built in {time.perf_counter() - start:.3f}s")
+    for step, take_profit, stop_loss in STEPS:
+        settings = dict(SETTINGS, grid_step_pct=step, take_profit_pct=take_profit, stop_loss_pct=stop_loss)
+        start = time.perf_counter()
+        result = tester.run(settings)
+        elapsed = time.perf_counter() - start
+        summary = result.summary()
+        print(
+            f"  step {step:4}%: {elapsed:.3f}s  fills={result.fills:7d}  return={summary['return_pct']:8.2f}%  "
+            f"max_dd={summary['max_drawdown_pct']:6.2f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Policy guard latency: per-action ``check`` vs batched ``check_many``.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_policy_guard [--actions 20000] [--batch 64]
+
+The rule set mimics the paper engine's guard plus a few cheap synthetic rules, with the most
+selective rule deliberately listed last so the adaptive ordering has something to fix.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from core.decision_engine import OrderAction
+from core.policy_guard import AllowedSymbols, MaxOrderNotional, PolicyGuard
+
+
+class _Field:
+    def __init__(self, name: str, predicate) -> None:
+        self.name = name
+        self.predicate = predicate
+
+    def allow(self, action) -> bool:
+        return self.predicate(action)
+
+
+def _rules():
+    return [
+        _Field("positive_quantity", lambda a: a.quantity > 0),
+        _Field("has_client_id", lambda a: bool(a.client_order_id)),
+        MaxOrderNotional(1_000),
+        _Field("limit_only", lambda a: a.order_type == "LIMIT"),
+        AllowedSymbols({"BTCUSDT", "ETHUSDT"}),  # rejects ~60% of the generated flow
+    ]
+
+
+def _actions(count: int):
+    symbols = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT")
+    return [
+        OrderAction(symbols[i % 5], "BUY", 0.01 * (i % 13 + 1), 100.0 + i % 50, client_order_id=f"b{i}")
+        for i in range(count)
+    ]
+
+
+def _measure(label: str, guard: PolicyGuard, actions, batch: int) -> None:
+    started = time.perf_counter_ns()
+    if batch <= 1:
+        for action in actions:
+            guard.check(action)
+    else:
+        for offset in range(0, len(actions), batch):
+            guard.check_many(actions[offset : offset + batch])
+    per_action_us = (time.perf_counter_ns() - started) / len(actions) / 1000
+    print(f"{label:<34} {per_action_us:8.3f} us/action   order: {[name for name in guard.stats()]}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--actions", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    actions = _actions(args.actions)
+    warm = _actions(2_000)
+    for label, adaptive, batch in (
+        ("check, fixed order", False, 1),
+        ("check, adaptive order", True, 1),
+        (f"check_many({args.batch}), fixed order", False, args.batch),
+        (f"check_many({args.batch}), adaptive order", True, args.batch),
+    ):
+        guard = PolicyGuard(rules=_rules(), adaptive=adaptive)
+        guard.check_many(warm)
+        _measure(label, guard, actions, batch)
+    print("per-rule stats (last run):")
+    for name, stats in guard.stats().items():
+        print(f"  {name:<20} {stats}")
+
+
+if __name__ == "__main__":
+    main()
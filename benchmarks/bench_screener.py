@@ -0,0 +1,99 @@
+"""Rolling screener cost on synthetic all-market ``!ticker@arr`` traffic.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_screener [--symbols 2000] [--seconds 600] [--k 20]
+
+Feeds one ticker array per second (a random share of the market changing each second) and reports
+the per-tick update cost, a top-K query after one second of changes against a full recompute and
+sort of every symbol's metrics, and how many rows each query recomputed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from core.screener import METRICS, RollingScreener
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_760_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _arrays(symbols: int, seconds: int, changed: float, start: float, seed: int):
+    rng = random.Random(seed)
+    names = [f"S{i:04d}USDT" for i in range(symbols)]
+    prices = [rng.uniform(0.01, 50_000) for _ in names]
+    trade_ids = [rng.randint(0, 10**6) for _ in names]
+    out = []
+    for second in range(seconds):
+        batch = []
+        for i in rng.sample(range(symbols), int(symbols * changed)):
+            prices[i] *= 1 + rng.gauss(0, 5e-4)
+            trade_ids[i] += rng.randint(0, 40)
+            bid = prices[i]
+            batch.append(
+                {
+                    "e": "24hrTicker",
+                    "E": int((start + second) * 1000),
+                    "s": names[i],
+                    "b": f"{bid:.8f}",
+                    "a": f"{bid * (1 + rng.uniform(1e-5, 2e-3)):.8f}",
+                    "L": trade_ids[i],
+                    "n": 100_000,
+                    "q": "25000000",
+                }
+            )
+        out.append(batch)
+    return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--seconds", type=int, default=600)
+    parser.add_argument("--changed", type=float, default=0.5, help="share of symbols in each second's array")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    clock = _Clock()
+    arrays = _arrays(args.symbols, args.seconds, args.changed, clock.now, args.seed)
+    screener = RollingScreener(clock=clock)
+
+    ticks, update, incremental, queries = 0, 0.0, 0.0, 0
+    for batch in arrays:
+        clock.now += 1
+        started = time.perf_counter()
+        screener.on_message(batch)
+        update += time.perf_counter() - started
+        ticks += len(batch)
+        started = time.perf_counter()
+        screener.top("spread_bps", args.k, ascending=True)
+        incremental += time.perf_counter() - started
+        queries += 1
+    recomputed = screener.recomputed
+
+    # Baseline: recompute every symbol and sort the whole market for the same answer.
+    started = time.perf_counter()
+    for _ in range(20):
+        with screener._lock:
+            screener._dirty.update(range(len(screener._symbols)))
+        full = screener.snapshot()
+        ranked = sorted((m["spread_bps"], s) for s, m in full.items() if m["spread_bps"] is not None)[: args.k]
+    baseline = (time.perf_counter() - started) / 20
+    assert [s for _, s in ranked] == [s for s, _ in screener.top("spread_bps", args.k, ascending=True)]
+
+    print(f"{args.symbols} symbols, {args.seconds}s of !ticker@arr ({ticks} ticks), metrics {', '.join(METRICS)}")
+    print(f"  update             {update / ticks * 1e6:7.2f} us/tick ({ticks / update:,.0f} ticks/s on one core)")
+    print(f"  top-{args.k} per second   {incremental / queries * 1e3:7.2f} ms (recomputed {recomputed / queries:.0f} rows/query)")
+    print(f"  full recompute+sort {baseline * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
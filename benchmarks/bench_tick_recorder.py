@@ -0,0 +1,125 @@
+"""Tick recorder throughput on synthetic full-market bookTicker traffic.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_tick_recorder [--messages 400000] [--symbols 2000]
+
+Measures the stream-callback cost (enqueue only), the writer's parse+append rate on one core,
+end-to-end recording with the writer thread running, packing of the segments, and a 1% time-range
+read from a packed segment versus reading the whole day.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from core.tick_recorder import RAW_SUFFIX, TickReader, TickRecorder, compress_segment
+
+
+class _Clock:
+    """Synthetic receive time: ``rate`` messages per second from a fixed UTC morning."""
+
+    def __init__(self, rate: float) -> None:
+        self.step = 1.0 / rate
+        self.now = 1_760_000_000.0 - 1_760_000_000.0 % 86_400 + 3600
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+def _messages(count: int, symbols: int, seed: int):
+    rng = random.Random(seed)
+    names = [f"S{i:04d}USDT" for i in range(symbols)]
+    prices = [rng.uniform(0.01, 50_000) for _ in names]
+    # Activity is heavily skewed across the market, roughly Zipf.
+    picks = rng.choices(range(symbols), weights=[1 / (rank + 1) for rank in range(symbols)], k=count)
+    out = []
+    for update_id, i in enumerate(picks):
+        prices[i] *= 1 + rng.gauss(0, 1e-4)
+        bid = prices[i]
+        out.append(
+            {
+                "stream": f"{names[i].lower()}@bookTicker",
+                "data": {
+                    "u": update_id,
+                    "s": names[i],
+                    "b": f"{bid:.8f}",
+                    "B": f"{rng.uniform(0, 100):.4f}",
+                    "a": f"{bid * 1.0002:.8f}",
+                    "A": f"{rng.uniform(0, 100):.4f}",
+                },
+            }
+        )
+    return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=400_000)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=20_000, help="synthetic messages per second of market time")
+    parser.add_argument("--block-records", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    messages = _messages(args.messages, args.symbols, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        clock = _Clock(args.rate)
+        first_ms = int((clock.now + clock.step) * 1000)
+        recorder = TickRecorder(root / "direct", queue_size=len(messages), compress=False, clock=clock)
+        started = time.perf_counter()
+        for message in messages:
+            recorder.record(message)
+        enqueue = time.perf_counter() - started
+        started = time.perf_counter()
+        recorder.flush()
+        write = time.perf_counter() - started
+        recorder.stop()
+        print(f"{len(messages)} bookTicker messages over {args.symbols} symbols")
+        print(f"  callback (enqueue)   {enqueue / len(messages) * 1e9:7.0f} ns/msg")
+        print(f"  writer parse+append  {len(messages) / write:10,.0f} msg/s on one core ({recorder.bytes_written / 1e6:.1f} MB)")
+
+        threaded = TickRecorder(root / "threaded", queue_size=len(messages), compress=False, clock=_Clock(args.rate)).start()
+        started = time.perf_counter()
+        for message in messages:
+            threaded.record(message)
+        while threaded.written < len(messages) and time.perf_counter() - started < 120:
+            time.sleep(0.01)
+        total = time.perf_counter() - started
+        threaded.stop()
+        print(f"  end-to-end threaded  {len(messages) / total:10,.0f} msg/s  (dropped {threaded.dropped})")
+
+        raw_files = sorted((root / "direct").glob(f"*/*{RAW_SUFFIX}"))
+        raw_bytes = sum(path.stat().st_size for path in raw_files)
+        started = time.perf_counter()
+        packed = [compress_segment(path, block_records=args.block_records) for path in raw_files]
+        pack = time.perf_counter() - started
+        packed_bytes = sum(path.stat().st_size for path in packed if path)
+        print(f"  pack {len(raw_files)} segments     {raw_bytes / 1e6:.1f} MB -> {packed_bytes / 1e6:.1f} MB ({raw_bytes / packed_bytes:.1f}x) in {pack:.2f}s")
+
+        # The busiest symbol has the most blocks to skip.
+        reader = TickReader(root / "direct")
+        symbol = max(reader.symbols(), key=lambda name: sum(p.stat().st_size for p in reader.segments(name)))
+        span_ms = int(len(messages) / args.rate * 1000)
+        window = (first_ms + span_ms // 2, first_ms + span_ms // 2 + span_ms // 100)
+        started = time.perf_counter()
+        whole = reader.read(symbol)
+        full_read = time.perf_counter() - started
+        reader.blocks_read = 0
+        started = time.perf_counter()
+        part = reader.read(symbol, *window)
+        range_read = time.perf_counter() - started
+        print(
+            f"  {symbol}: whole day {len(whole)} records in {full_read * 1e3:.2f} ms; "
+            f"1% window {len(part)} records in {range_read * 1e3:.2f} ms ({reader.blocks_read} block(s) decompressed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Injectable time source, so the same code runs on the wall clock or on a replayed timeline.
+
+Components take a :class:`Clock` (``time()`` epoch seconds, ``monotonic()`` for intervals and
+``sleep()``) and default to :data:`SYSTEM_CLOCK`. Code that only needs one reading keeps the
+repo's ``clock: Callable[[], float]`` style and is given ``clock.monotonic`` or ``clock.time``.
+
+:class:`SimulatedClock` never waits: ``sleep`` advances it, and a replay driver moves it to each
+event's timestamp with :meth:`SimulatedClock.advance_to`. Both readings come from one counter, so
+intervals measured on it are exactly the replayed intervals.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class Clock:
+    def time(self) -> float:
+        raise NotImplementedError
+
+    def monotonic(self) -> float:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        raise NotImplementedError
+
+    def time_ms(self) -> int:
+        return int(self.time() * 1000)
+
+
+class SystemClock(Clock):
+    # Looked up on the module at call time so ``patch("time.sleep")`` and friends still apply.
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = float(start)
+        self._lock = threading.Lock()
+        self.slept = 0.0
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+                self.slept += seconds
+
+    def advance_to(self, timestamp: float) -> None:
+        """Move to ``timestamp`` (epoch seconds); never backwards."""
+
+        with self._lock:
+            if timestamp > self._now:
+                self._now = timestamp
+
+
+SYSTEM_CLOCK = SystemClock()
+
+__all__ = ["Clock", "SYSTEM_CLOCK", "SimulatedClock", "SystemClock"]
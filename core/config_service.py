@@ -1,5 +1,7 @@
+import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import yaml
 from pydantic import BaseModel, Field, ValidationError
@@ -27,13 +29,57 @@ class AppSettings(BaseModel):
     exchange: str = "binance"
     testnet: bool = True
     log_level: str = "INFO"
+    config_watch_interval_ms: int = 1000
+    config_save_delay_ms: int = 500
+
+
+class LoggingSettings(BaseModel):
+    json_lines: bool = False
+    max_bytes: int = 5_000_000
+    backup_count: int = 5
+    rotate_interval_hours: float = 24
+    flush_interval_ms: int = 250
+    queue_size: int = 10_000
+    sample_rates: dict[str, float] = {}
+    rate_limits: dict[str, float] = {"DEBUG": 50}
+
+
+class UiSettings(BaseModel):
+    log_max_lines: int = 2000
+    chat_max_lines: int = 500
+    log_flush_ms: int = 50
+
+
+class BacktestSettings(BaseModel):
+    days: float = 30
+    interval: str = "1m"
+    samples: int = 200
+    workers: int = 0
+    top_n: int = 5
+    screen_fraction: float = 0.25
+    drawdown_weight: float = 0.5
 
 
 class AiSettings(BaseModel):
     model: str = "gpt-4.1-mini"
+    base_url: str = ""
     temperature: float = 0.2
     max_retries: int = 2
     timeout_seconds: int = 20
+    max_concurrency: int = 2
+    deadline_seconds: int = 60
+    health_interval_seconds: int = 120
+    breaker_failure_threshold: int = 3
+    breaker_reset_seconds: int = 30
+    prompt_budget_tokens: int = 1200
+    input_usd_per_mtok: float = 0.40
+    screening_top_n: int = 24
+    screening_pairs_per_request: int = 8
+    screening_requests_per_minute: int = 20
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 900
+    cache_max_entries: int = 256
+    cache_price_tolerance_pct: float = 0.5
 
 
 class PairSettings(BaseModel):
@@ -51,47 +97,236 @@ class TradingSettings(BaseModel):
     update_interval_ms: int = 1000
 
 
+class StrategySettings(BaseModel):
+    enabled: list[str] = []
+    batch_size: int = 1024
+    batch_ms: int = 50
+    params: dict[str, dict] = {}
+
+
+class RiskSettings(BaseModel):
+    max_drawdown_pct: float = 10.0
+    max_loss_usdt: float = 0
+    max_symbol_exposure_usdt: float = 0
+    max_total_exposure_usdt: float = 0
+
+
+class RecorderSettings(BaseModel):
+    enabled: bool = False
+    streams: list[str] = ["bookTicker"]
+    symbols: list[str] = []
+    flush_interval_ms: int = 250
+    queue_size: int = 200_000
+    max_segment_mb: int = 64
+    block_records: int = 4096
+    compress: bool = True
+
+
+class ScreenerSettings(BaseModel):
+    enabled: bool = True
+    window_seconds: int = 300
+    bucket_seconds: int = 5
+    book_tickers: bool = False
+    refresh_ms: int = 2000
+
+
 class Config(BaseModel):
     app: AppSettings = AppSettings()
+    logging: LoggingSettings = LoggingSettings()
     api_keys: ApiKeys = ApiKeys()
     ai: AiSettings = AiSettings()
     pairs: PairSettings = PairSettings()
     trading: TradingSettings = TradingSettings()
+    risk: RiskSettings = RiskSettings()
+    strategies: StrategySettings = StrategySettings()
+    backtest: BacktestSettings = BacktestSettings()
+    recorder: RecorderSettings = RecorderSettings()
+    screener: ScreenerSettings = ScreenerSettings()
+    ui: UiSettings = UiSettings()
+
+
+ConfigChanges = Dict[str, Set[str]]
+
+
+def diff_sections(old: Config, new: Config) -> ConfigChanges:
+    """Changed field names per section; identical sections are left out."""
+
+    changes: ConfigChanges = {}
+    for name in Config.model_fields:
+        before, after = getattr(old, name).model_dump(), getattr(new, name).model_dump()
+        fields = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+        if fields:
+            changes[name] = fields
+    return changes
 
 
 class ConfigService:
-    def __init__(self, default_path: Path = Path("config/config.yaml")) -> None:
+    """Current config plus the YAML file behind it.
+
+    Changes go through :meth:`update` (or :meth:`poll` for edits made to the file), which swap in
+    a new :class:`Config` and tell subscribers which sections and fields changed, so they rebuild
+    only what depends on them. :meth:`schedule_save` coalesces writes: one background write per
+    ``save_delay_s`` window, atomic (temp file + ``os.replace``). The timer thread is not a daemon,
+    so a pending write still lands when the process exits.
+    """
+
+    def __init__(self, default_path: Path = Path("config/config.yaml"), *, save_delay_s: float = 0.5, logger=None) -> None:
         self.default_path = default_path
         self.config = Config()
         self.last_loaded: Optional[Path] = None
+        self.save_delay_s = save_delay_s
+        self.logger = logger
+        self.saves = 0
+        self.reloads = 0
+        self._listeners: List[Callable[[ConfigChanges, Config, Config], None]] = []
+        self._lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        # (mtime_ns, size) of the file as last read or written by us; anything else is an outside edit.
+        self._seen: Optional[Tuple[int, int]] = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
 
     def has_required_keys(self) -> bool:
         keys = self.config.api_keys
         return bool(keys.exchange_key and keys.exchange_secret and keys.openai_key)
 
-    def load(self, path: Optional[Path] = None) -> Config:
-        path = path or self.default_path
-        if not path.exists():
-            raise FileNotFoundError(f"Config not found: {path}")
-
+    def _read(self, path: Path) -> Config:
         with path.open("r", encoding="utf-8") as fh:
             data = yaml.safe_load(fh) or {}
-
         try:
-            self.config = Config(**data)
-            self.last_loaded = path
-            return self.config
+            return Config(**data)
         except ValidationError as exc:
             raise ValueError(f"Config validation error: {exc}") from exc
 
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path: Optional[Path] = None) -> Config:
+        path = path or self.default_path
+        if not path.exists():
+            raise FileNotFoundError(f"Config not found: {path}")
+
+        signature = self._signature(path)
+        self.config = self._read(path)
+        self.last_loaded = path
+        self._seen = signature
+        return self.config
+
     def save(self, path: Optional[Path] = None) -> Path:
         path = path or self.default_path
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as fh:
-            yaml.safe_dump(self.config.model_dump(), fh, allow_unicode=True)
+        with self._lock:
+            data = self.config.model_dump()
+            tmp = path.with_name(f".{path.name}.tmp")
+            with tmp.open("w", encoding="utf-8") as fh:
+                yaml.safe_dump(data, fh, allow_unicode=True)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp, path)
+            self._seen = self._signature(path)
+            self.saves += 1
         self.last_loaded = path
         return path
 
     def active_config_name(self) -> str:
         return self.last_loaded.name if self.last_loaded else self.default_path.name
 
+    # Change propagation
+    def subscribe(self, callback: Callable[[ConfigChanges, Config, Config], None]) -> None:
+        """``callback(changes, old, new)`` runs after every swap that changed something."""
+
+        self._listeners.append(callback)
+
+    def replace(self, new: Config) -> ConfigChanges:
+        with self._lock:
+            old = self.config
+            changes = diff_sections(old, new)
+            self.config = new
+        if changes:
+            for callback in list(self._listeners):
+                try:
+                    callback(changes, old, new)
+                except Exception:  # noqa: BLE001 - one bad subscriber must not block the others
+                    if self.logger:
+                        self.logger.exception("Config subscriber failed for %s", sorted(changes))
+        return changes
+
+    def update(self, section: str, values: Dict[str, Any]) -> ConfigChanges:
+        """Validated copy of ``section`` with ``values`` applied; raises ``ValueError`` and keeps the
+        current config when the result is invalid."""
+
+        current = getattr(self.config, section)
+        try:
+            updated = type(current).model_validate({**current.model_dump(), **values})
+        except ValidationError as exc:
+            raise ValueError(f"Config validation error: {exc}") from exc
+        return self.replace(self.config.model_copy(update={section: updated}))
+
+    # Background writes
+    @property
+    def save_pending(self) -> bool:
+        return self._save_timer is not None
+
+    def schedule_save(self, delay_s: Optional[float] = None) -> None:
+        """Write the config once ``delay_s`` from the first call; calls in between join that write."""
+
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay_s if delay_s is None else delay_s, self._save_scheduled)
+            self._save_timer.name = "bbot-config-save"
+            self._save_timer.start()
+
+    def _save_scheduled(self) -> None:
+        with self._lock:
+            if self._save_timer is not threading.current_thread():
+                return  # flushed (and maybe rescheduled) while this timer waited for the lock
+            try:
+                self.save()
+            except OSError as exc:
+                self._log("error", "Failed to save config: %s", exc)
+            finally:
+                self._save_timer = None
+
+    def flush(self) -> None:
+        """Write a pending scheduled save now (e.g. on exit)."""
+
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+            if timer is None:
+                return
+            timer.cancel()
+            self.save()
+
+    # Watching the file
+    def poll(self, path: Optional[Path] = None) -> ConfigChanges:
+        """Reload the file if something else changed it since we last read or wrote it.
+
+        One ``stat`` when nothing changed. An invalid edit is logged and ignored until the file
+        changes again; a valid one replaces the in-memory config (including unsaved updates).
+        """
+
+        path = path or self.last_loaded or self.default_path
+        signature = self._signature(path)
+        if signature is None or signature == self._seen:
+            return {}
+        with self._lock:
+            self._seen = signature
+            try:
+                new = self._read(path)
+            except (OSError, ValueError, yaml.YAMLError) as exc:
+                self._log("warning", "Ignoring invalid edit of %s: %s", path, exc)
+                return {}
+            self.last_loaded = path
+            self.reloads += 1
+        changes = self.replace(new)
+        if changes:
+            self._log("info", "Reloaded %s: %s", path, {name: sorted(fields) for name, fields in changes.items()})
+        return changes
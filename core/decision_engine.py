@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import List, Protocol
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Mapping, Optional, Protocol
 
-from exchanges.binance import MarketSnapshot
+from exchanges.binance.models import MarketSnapshot, PairFilters
 
 
 class Action(Protocol):
@@ -12,14 +15,244 @@ class Action(Protocol):
         ...
 
 
+@dataclass
+class OrderAction:
+    symbol: str
+    side: str
+    quantity: float
+    price: Optional[float] = None
+    order_type: str = "LIMIT"
+    client_order_id: str = ""
+    reason: str = ""
+
+    def describe(self) -> str:
+        price = f" @ {self.price}" if self.price is not None else ""
+        return f"{self.order_type} {self.side} {self.quantity} {self.symbol}{price} ({self.reason or 'n/a'})"
+
+
+@dataclass
+class CancelAction:
+    symbol: str
+    client_order_id: str
+    reason: str = ""
+
+    def describe(self) -> str:
+        return f"CANCEL {self.symbol} {self.client_order_id} ({self.reason or 'n/a'})"
+
+
+_order_ids = itertools.count(1)
+
+
 class DecisionEngine:
-    """AI-driven decision maker placeholder."""
+    """Grid decision maker.
+
+    Keeps ``max_orders`` resting buys spaced ``grid_step_pct`` below an anchor price and
+    re-anchors (cancelling the open buys) when the market trades above the anchor by more than
+    one step. A filled buy occupies its level with a take-profit sell at ``take_profit_pct``;
+    the level is re-armed once that sell fills.
+
+    ``state`` is the per-symbol dict owned by the caller: ``levels`` (level -> open buy id),
+    ``holding`` (level -> take-profit id), ``orders`` (id -> (level, side)), ``filled``
+    (id -> executed qty so far), ``cost`` (buy id -> (quote spent, gross qty)), ``anchor`` and
+    ``last_action_at``.
+
+    Cancelling a partly filled buy (re-anchor, bot stop) places a take-profit for the part
+    already bought, so the base is not stranded.
+
+    A take-profit the venue would refuse (below the lot size or min-notional once the fee is
+    netted and the quantity rounded down) is not sent: its level stays held without an order
+    and the quantity goes to ``carry`` (list of ``[level, qty, target price]``), as does the
+    rounding remainder of every take-profit. The next take-profit sells the carry along with its
+    own quantity at the quantity-weighted target price, and the carried levels are held by it.
+    """
+
+    def __init__(
+        self,
+        *,
+        filters: Optional[Mapping[str, PairFilters]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        order_ids: Optional[Iterator[int]] = None,
+    ) -> None:
+        self.filters = filters or {}
+        self.clock = clock
+        # Process-wide by default so ids stay unique across engines; a replay passes its own counter.
+        self.order_ids = order_ids if order_ids is not None else _order_ids
+
+    def _next_id(self, symbol: str) -> str:
+        return f"bbot-{symbol}-{next(self.order_ids)}"
 
     def propose_actions(self, state: dict, market_snapshot: MarketSnapshot, settings: dict) -> List[Action]:
-        """Return proposed actions from AI logic.
+        mid = self._mid(market_snapshot)
+        if mid is None:
+            return []
+        now = self.clock()
+        cooldown = float(settings.get("cooldown_seconds", 0) or 0)
+        if now - state.get("last_action_at", float("-inf")) < cooldown:
+            return []
+
+        step = float(settings.get("grid_step_pct", 0) or 0) / 100
+        max_orders = int(settings.get("max_orders", 0) or 0)
+        budget = float(settings.get("budget_usdt", 0) or 0)
+        if step <= 0 or max_orders <= 0 or budget <= 0:
+            return []
+
+        symbol = market_snapshot.symbol
+        filters = self.filters.get(symbol)
+        levels: dict = state.setdefault("levels", {})
+        holding: dict = state.setdefault("holding", {})
+        orders: dict = state.setdefault("orders", {})
+        actions: List[Action] = []
+        anchor = state.get("anchor")
+        if anchor is None or mid > anchor * (1 + step):
+            actions.extend(self.cancel_buys(state, symbol, settings, reason="re-anchor"))
+            # Take-profits of the old ladder stay on the book but no longer block new levels.
+            for order_id in holding.values():
+                if order_id:
+                    orders[order_id] = (None, "SELL")
+            holding.clear()
+            for entry in state.get("carry", ()):
+                entry[0] = None
+            anchor = state["anchor"] = mid
+
+        per_order = budget / max_orders
+        for level in range(1, max_orders + 1):
+            if level in levels or level in holding:
+                continue
+            price = anchor * (1 - step * level)
+            if price <= 0:
+                break
+            quantity = per_order / price
+            if filters:
+                price = filters.round_price(price)
+                quantity = filters.round_quantity(quantity)
+                if price <= 0 or filters.violation(price, quantity):
+                    continue
+            order_id = self._next_id(symbol)
+            levels[level] = order_id
+            orders[order_id] = (level, "BUY")
+            actions.append(
+                OrderAction(
+                    symbol=symbol,
+                    side="BUY",
+                    quantity=quantity,
+                    price=price,
+                    client_order_id=order_id,
+                    reason=f"grid level {level}",
+                )
+            )
+        if actions:
+            state["last_action_at"] = now
+        return actions
+
+    def cancel_buys(self, state: dict, symbol: str, settings: dict, *, reason: str) -> List[Action]:
+        """Cancel every open grid buy; take profit on what the partly filled ones already bought."""
+
+        orders: dict = state.setdefault("orders", {})
+        filled: dict = state.setdefault("filled", {})
+        cost: dict = state.setdefault("cost", {})
+        levels: dict = state.setdefault("levels", {})
+        actions: List[Action] = []
+        for order_id in levels.values():
+            actions.append(CancelAction(symbol, order_id, reason=reason))
+            orders.pop(order_id, None)
+            quantity = filled.pop(order_id, 0.0)
+            spent, gross = cost.pop(order_id, (0.0, 0.0))
+            if quantity > 0 and gross > 0:
+                # The ladder is gone, so this take-profit holds no level.
+                actions.extend(self._take_profit(state, symbol, None, quantity, spent / gross, settings))
+        levels.clear()
+        return actions
+
+    def on_fill(self, state: dict, fill, settings: dict) -> List[Action]:
+        orders: dict = state.setdefault("orders", {})
+        info = orders.get(fill.client_order_id)
+        if info is None:
+            return []
+        filled: dict = state.setdefault("filled", {})
+        filled[fill.client_order_id] = filled.get(fill.client_order_id, 0.0) + fill.base_quantity
+        if info[1] == "BUY":
+            cost: dict = state.setdefault("cost", {})
+            spent, gross = cost.get(fill.client_order_id, (0.0, 0.0))
+            cost[fill.client_order_id] = (spent + fill.price * fill.quantity, gross + fill.quantity)
+        if fill.remaining > 0:
+            return []
+        level, side = orders.pop(fill.client_order_id)
+        quantity = filled.pop(fill.client_order_id)
+        if side == "SELL":
+            self._release(state.setdefault("holding", {}), fill.client_order_id)
+            return []
+
+        if level is not None and state.setdefault("levels", {}).get(level) == fill.client_order_id:
+            del state["levels"][level]
+        spent, gross = state.setdefault("cost", {}).pop(fill.client_order_id, (fill.price, 1.0))
+        return self._take_profit(state, fill.symbol, level, quantity, spent / gross, settings)
+
+    def _take_profit(
+        self, state: dict, symbol: str, level: Optional[int], quantity: float, entry: float, settings: dict
+    ) -> List[Action]:
+        take_profit = float(settings.get("take_profit_pct", 0) or 0) / 100
+        target = entry * (1 + take_profit)
+        filters = self.filters.get(symbol)
+        holding: dict = state.setdefault("holding", {})
+        carried: List[int] = []
+        if not filters:
+            price = target
+        else:
+            carry: list = state.setdefault("carry", [])
+            total = quantity + sum(qty for _, qty, _ in carry)
+            target = (quantity * target + sum(qty * price for _, qty, price in carry)) / total
+            price = filters.round_price(target, up=True)
+            rounded = filters.round_quantity(total)
+            if rounded <= 0 or filters.violation(price, rounded):
+                carry.append([level, quantity, entry * (1 + take_profit)])
+                if level is not None:
+                    holding[level] = ""  # held, nothing on the book yet
+                return []
+            carried = [lv for lv, _, _ in carry if lv is not None and holding.get(lv) == ""]
+            carry.clear()
+            if total - rounded > total * 1e-9:
+                carry.append([None, total - rounded, target])
+            quantity = rounded
+        order_id = self._next_id(symbol)
+        state.setdefault("orders", {})[order_id] = (level, "SELL")
+        if level is not None:
+            holding[level] = order_id
+        for lv in carried:
+            holding[lv] = order_id
+        return [
+            OrderAction(
+                symbol=symbol,
+                side="SELL",
+                quantity=quantity,
+                price=price,
+                client_order_id=order_id,
+                reason=f"take profit level {level}",
+            )
+        ]
+
+    def on_reject(self, state: dict, action) -> List[Action]:
+        """Free the level of an order the guard or the venue refused, so a later tick retries."""
+
+        order_id = getattr(action, "client_order_id", "")
+        info = state.setdefault("orders", {}).pop(order_id, None) if isinstance(action, OrderAction) else None
+        if info is None:
+            return []
+        level, side = info
+        if side == "SELL":
+            self._release(state.setdefault("holding", {}), order_id)
+        elif level is not None and state.setdefault("levels", {}).get(level) == order_id:
+            del state["levels"][level]
+        return []
+
+    @staticmethod
+    def _release(holding: dict, order_id: str) -> None:
+        """Re-arm every level held by take-profit ``order_id`` (several when it sold a carry)."""
 
-        Concrete implementation will evaluate the state and market snapshot to suggest
-        trades or risk adjustments.
-        """
+        for level in [lv for lv, held in holding.items() if held == order_id]:
+            del holding[level]
 
-        raise NotImplementedError
+    @staticmethod
+    def _mid(snapshot: MarketSnapshot) -> Optional[float]:
+        if snapshot.bid and snapshot.ask:
+            return (snapshot.bid + snapshot.ask) / 2
+        return snapshot.last_price
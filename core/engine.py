@@ -0,0 +1,391 @@
+"""Event-driven trading engine loop.
+
+Market events flow ``inbound queue -> router -> per-symbol mailbox -> decision worker ->
+action queue -> policy guard + execution``. Every stage is bounded:
+
+* ``put`` awaits when the inbound queue is full (backpressure for async sources), while
+  ``put_nowait``/``EngineThread.publish`` drop and count instead of blocking a websocket thread;
+* a symbol mailbox holds only the newest tick (older unprocessed ticks are coalesced away) and
+  ticks older than ``stale_after_ms`` are skipped when a worker picks them up;
+* executions (fills, venue rejects) are queued per symbol and never dropped;
+* workers await on the action queue, so a slow executor throttles decisions; the executor
+  drains whatever is queued (up to ``execute_batch``) and guards it with one ``check_many``.
+
+:meth:`TradingEngine.halt` (the risk kill switch) cancels every resting grid buy at once and
+stops deciding on ticks; fills are still handled, so bought levels keep their take-profits.
+
+The engine has no UI or network dependencies; tests drive it with synthetic async sources.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from core.decision_engine import DecisionEngine
+from core.events import FillEvent, MarketEvent
+from core.execution_engine import ExecutionEngine
+from core.metrics import LatencyStats
+
+SettingsSource = Union[Dict[str, Any], Callable[[str], Dict[str, Any]]]
+MarketObserver = Callable[[MarketEvent], None]
+
+__all__ = ["EngineThread", "MarketEvent", "TradingEngine"]
+
+
+@dataclass
+class _QueuedAction:
+    action: Any
+    received_at: float
+    enqueued_at: float
+
+
+class _Mailbox:
+    """Per-symbol inbox: the newest tick only, plus every execution in arrival order."""
+
+    def __init__(self) -> None:
+        self.tick: Optional[Tuple[MarketEvent, float]] = None
+        self.executions: Deque[Any] = deque()
+        self.ready = asyncio.Event()
+        self.busy = False
+
+    def idle(self) -> bool:
+        return self.tick is None and not self.executions and not self.busy
+
+
+class TradingEngine:
+    STAGES = ("route", "queue_wait", "decide", "action_wait", "execute", "tick_to_trade")
+
+    def __init__(
+        self,
+        decision_engine: DecisionEngine,
+        execution_engine: ExecutionEngine,
+        *,
+        settings: SettingsSource,
+        inbound_size: int = 10_000,
+        action_queue_size: int = 1_000,
+        execute_batch: int = 64,
+        stale_after_ms: int = 1_500,
+        market_observers: Iterable[MarketObserver] = (),
+        on_report: Optional[Callable[[Any], None]] = None,
+        logger=None,
+    ) -> None:
+        self.decision_engine = decision_engine
+        self.execution_engine = execution_engine
+        self.settings = settings
+        self.inbound_size = inbound_size
+        self.action_queue_size = action_queue_size
+        self.execute_batch = execute_batch
+        self.stale_after_s = stale_after_ms / 1000
+        self.market_observers: List[MarketObserver] = list(market_observers)
+        self.on_report = on_report
+        self.logger = logger
+        self.symbol_state: Dict[str, dict] = {}
+        self.latency: Dict[str, LatencyStats] = {stage: LatencyStats() for stage in self.STAGES}
+        self.counters: Dict[str, int] = {
+            "received": 0,
+            "dropped_full": 0,
+            "dropped_stale": 0,
+            "coalesced": 0,
+            "decisions": 0,
+            "actions": 0,
+            "executed": 0,
+            "rejected": 0,
+            "venue_rejected": 0,
+            "fills": 0,
+            "errors": 0,
+        }
+        self.inbound: Optional[asyncio.Queue] = None
+        self.actions: Optional[asyncio.Queue] = None
+        self._mailboxes: Dict[str, _Mailbox] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.running = False
+        self.halted: Optional[str] = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    # Lifecycle
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.inbound = asyncio.Queue(self.inbound_size)
+        self.actions = asyncio.Queue(self.action_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._route(), name="engine-router"),
+            asyncio.create_task(self._execute(), name="engine-executor"),
+        ]
+        self.running = True
+
+    async def stop(self) -> None:
+        self.running = False
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._mailboxes.clear()
+
+    def halt(self, reason: str) -> List[Any]:
+        """Cancel every symbol's resting grid buys and stop deciding on ticks. Must be called on the engine loop."""
+
+        self.halted = reason
+        actions: List[Any] = []
+        for symbol, state in self.symbol_state.items():
+            settings = self.settings(symbol) if callable(self.settings) else self.settings
+            # Partly filled buys come back with a take-profit for the bought part.
+            actions.extend(self.decision_engine.cancel_buys(state, symbol, settings, reason=reason))
+            state.pop("anchor", None)
+        started = time.monotonic()
+        results = self.execution_engine.execute_many(actions)
+        for action, report in zip(actions, results):
+            self._handle_result(_QueuedAction(action, started, started), report, started)
+        return results
+
+    def _quiet(self) -> bool:
+        assert self.inbound is not None and self.actions is not None
+        return (
+            self.inbound.empty()
+            and self.actions.empty()
+            and all(box.idle() for box in self._mailboxes.values())
+        )
+
+    async def join(self) -> None:
+        """Wait until every queued event, execution and action has been processed."""
+
+        assert self.inbound is not None and self.actions is not None
+        while True:
+            await self.inbound.join()
+            while not all(box.idle() for box in self._mailboxes.values()):
+                await asyncio.sleep(0)
+            await self.actions.join()
+            if self._quiet():
+                return
+
+    async def run(self, sources: Iterable[AsyncIterable[MarketEvent]]) -> None:
+        """Headless helper: start, consume every source to exhaustion, drain and stop."""
+
+        await self.start()
+        try:
+            await asyncio.gather(*(self.feed(source) for source in sources))
+            await self.join()
+        finally:
+            await self.stop()
+
+    # Ingress
+    async def put(self, event: MarketEvent) -> None:
+        assert self.inbound is not None
+        await self.inbound.put(event)
+        self.counters["received"] += 1
+
+    def put_nowait(self, event: MarketEvent) -> bool:
+        assert self.inbound is not None
+        try:
+            self.inbound.put_nowait(event)
+        except asyncio.QueueFull:
+            self.counters["dropped_full"] += 1
+            return False
+        self.counters["received"] += 1
+        return True
+
+    async def feed(self, source: AsyncIterable[MarketEvent]) -> None:
+        async for event in source:
+            await self.put(event)
+
+    def submit_execution(self, event: Any) -> None:
+        """Queue a fill or venue reject for its symbol's worker. Must be called on the engine loop."""
+
+        box = self._mailbox(event.symbol)
+        box.executions.append(event)
+        box.ready.set()
+
+    def _mailbox(self, symbol: str) -> _Mailbox:
+        box = self._mailboxes.get(symbol)
+        if box is None:
+            box = self._mailboxes[symbol] = _Mailbox()
+            self._tasks.append(asyncio.create_task(self._symbol_worker(symbol, box), name=f"engine-{symbol}"))
+        return box
+
+    # Stages
+    async def _route(self) -> None:
+        assert self.inbound is not None
+        while True:
+            event: MarketEvent = await self.inbound.get()
+            try:
+                for observer in self.market_observers:
+                    try:
+                        observer(event)
+                    except Exception:  # noqa: BLE001
+                        self.counters["errors"] += 1
+                        self._log("exception", "Market observer failed for %s", event.symbol)
+                box = self._mailbox(event.symbol)
+                if box.tick is not None:
+                    # Only the newest book matters: replace the tick the worker has not seen yet.
+                    self.counters["coalesced"] += 1
+                box.tick = (event, time.monotonic())
+                box.ready.set()
+                self.latency["route"].record(time.monotonic() - event.received_at)
+            finally:
+                self.inbound.task_done()
+
+    async def _symbol_worker(self, symbol: str, box: _Mailbox) -> None:
+        state = self.symbol_state.setdefault(symbol, {})
+        while True:
+            await box.ready.wait()
+            box.ready.clear()
+            box.busy = True
+            try:
+                settings = self.settings(symbol) if callable(self.settings) else self.settings
+                while box.executions:
+                    await self._handle_execution(state, box.executions.popleft(), settings)
+                if box.tick is not None:
+                    (event, routed_at), box.tick = box.tick, None
+                    await self._handle_tick(symbol, state, event, routed_at, settings)
+            finally:
+                box.busy = False
+
+    async def _handle_tick(self, symbol: str, state: dict, event: MarketEvent, routed_at: float, settings: dict) -> None:
+        now = time.monotonic()
+        self.latency["queue_wait"].record(now - routed_at)
+        if now - event.received_at > self.stale_after_s:
+            self.counters["dropped_stale"] += 1
+            return
+        if self.halted:
+            return
+        started = time.monotonic()
+        try:
+            proposed = self.decision_engine.propose_actions(state, event.to_snapshot(), settings)
+        except Exception:  # noqa: BLE001 - one bad symbol must not stop the engine
+            self.counters["errors"] += 1
+            self._log("exception", "Decision failed for %s", symbol)
+            return
+        self.latency["decide"].record(time.monotonic() - started)
+        self.counters["decisions"] += 1
+        await self._enqueue(proposed, event.received_at)
+
+    async def _handle_execution(self, state: dict, event: Any, settings: dict) -> None:
+        try:
+            if isinstance(event, FillEvent):
+                self.counters["fills"] += 1
+                proposed = self.decision_engine.on_fill(state, event, settings)
+            else:
+                proposed = self.decision_engine.on_reject(state, event.action)
+        except Exception:  # noqa: BLE001
+            self.counters["errors"] += 1
+            self._log("exception", "Execution handling failed for %s", event.symbol)
+            return
+        await self._enqueue(proposed, time.monotonic())
+
+    async def _enqueue(self, proposed: List[Any], received_at: float) -> None:
+        assert self.actions is not None
+        for action in proposed:
+            await self.actions.put(_QueuedAction(action, received_at, time.monotonic()))
+            self.counters["actions"] += 1
+
+    async def _execute(self) -> None:
+        assert self.actions is not None
+        while True:
+            batch: List[_QueuedAction] = [await self.actions.get()]
+            # Guard everything already queued in one pass (rules run rule-by-rule over the batch).
+            while len(batch) < self.execute_batch and not self.actions.empty():
+                batch.append(self.actions.get_nowait())
+            try:
+                started = time.monotonic()
+                for item in batch:
+                    self.latency["action_wait"].record(started - item.enqueued_at)
+                results = self.execution_engine.execute_many([item.action for item in batch])
+                for item, report in zip(batch, results):
+                    self._handle_result(item, report, started)
+            finally:
+                for _ in batch:
+                    self.actions.task_done()
+
+    def _handle_result(self, item: _QueuedAction, report: Any, started: float) -> None:
+        if isinstance(report, PermissionError):
+            self.counters["rejected"] += 1
+            self._log("info", "Policy guard rejected %s: %s", item.action.describe(), report)
+            self.submit_execution(_GuardReject(item.action))
+            return
+        if isinstance(report, Exception):
+            self.counters["errors"] += 1
+            self._log("error", "Execution failed for %s: %r", item.action.describe(), report)
+            # Not sent: free the level like a guard rejection, so a later tick retries it.
+            self.submit_execution(_GuardReject(item.action))
+            return
+        done = time.monotonic()
+        self.latency["execute"].record(done - started)
+        self.latency["tick_to_trade"].record(done - item.received_at)
+        self.counters["executed"] += 1
+        if report.status() == "REJECTED":
+            self.counters["venue_rejected"] += 1
+            self.submit_execution(report)
+        if self.on_report:
+            self.on_report(report)
+
+    # Reporting
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        return {stage: stats.summary() for stage, stats in self.latency.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "symbols": len(self._mailboxes),
+            "inbound_depth": self.inbound.qsize() if self.inbound else 0,
+            "action_depth": self.actions.qsize() if self.actions else 0,
+            "guard": self.execution_engine.policy_guard.stats(),
+        }
+
+
+@dataclass
+class _GuardReject:
+    action: Any
+
+    @property
+    def symbol(self) -> str:
+        return self.action.symbol
+
+
+class EngineThread:
+    """Hosts a :class:`TradingEngine` on its own event loop for the Tk app."""
+
+    def __init__(self, engine: TradingEngine) -> None:
+        self.engine = engine
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="bbot-engine", daemon=True)
+        self._started = threading.Event()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.engine.start())
+        self._started.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    def start(self, timeout: float = 5.0) -> None:
+        self._thread.start()
+        self._started.wait(timeout)
+
+    def publish(self, event: Optional[MarketEvent]) -> None:
+        """Thread-safe, non-blocking ingress for websocket callbacks."""
+
+        if event is not None and self.engine.running:
+            self.loop.call_soon_threadsafe(self.engine.put_nowait, event)
+
+    def call(self, fn: Callable[[], Any], timeout: float = 2.0) -> Any:
+        """Run ``fn`` on the engine loop and return its result (e.g. to read stats consistently)."""
+
+        async def _invoke():
+            return fn()
+
+        return asyncio.run_coroutine_threadsafe(_invoke(), self.loop).result(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self._thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self.engine.stop(), self.loop).result(timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
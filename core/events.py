@@ -0,0 +1,94 @@
+"""Event records shared by the engine, the paper exchange and the strategy layer."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from exchanges.binance.models import MarketSnapshot
+
+
+@dataclass
+class MarketEvent:
+    symbol: str
+    bid: Optional[float]
+    ask: Optional[float]
+    last: Optional[float] = None
+    event_time_ms: Optional[int] = None
+    received_at: float = field(default_factory=time.monotonic)
+    bid_qty: Optional[float] = None
+    ask_qty: Optional[float] = None
+
+    @property
+    def mid(self) -> Optional[float]:
+        if self.bid and self.ask:
+            return (self.bid + self.ask) / 2
+        return self.last
+
+    @classmethod
+    def from_book_ticker(cls, payload: Dict) -> Optional["MarketEvent"]:
+        """Build from a bookTicker stream/REST payload; returns ``None`` for non-ticker messages."""
+
+        data = payload.get("data", payload)
+        symbol = data.get("s") or data.get("symbol")
+        bid = data.get("b", data.get("bidPrice"))
+        ask = data.get("a", data.get("askPrice"))
+        if not symbol or bid is None or ask is None:
+            return None
+        bid_qty = data.get("B", data.get("bidQty"))
+        ask_qty = data.get("A", data.get("askQty"))
+        return cls(
+            symbol=symbol,
+            bid=float(bid) or None,
+            ask=float(ask) or None,
+            event_time_ms=data.get("E"),
+            bid_qty=float(bid_qty) if bid_qty is not None else None,
+            ask_qty=float(ask_qty) if ask_qty is not None else None,
+        )
+
+    def to_snapshot(self) -> MarketSnapshot:
+        spread = self.ask - self.bid if self.bid is not None and self.ask is not None else None
+        return MarketSnapshot(
+            symbol=self.symbol,
+            last_price=self.last if self.last is not None else self.mid,
+            bid=self.bid,
+            ask=self.ask,
+            volume_24h=None,
+            spread=spread,
+            timestamp=self.event_time_ms,
+        )
+
+
+@dataclass
+class FillEvent:
+    symbol: str
+    client_order_id: str
+    side: str
+    price: float
+    quantity: float
+    remaining: float
+    fee: float = 0.0
+    fee_asset: str = ""
+    base_asset: str = ""
+    is_maker: bool = True
+    ts_ms: Optional[int] = None
+
+    @property
+    def status(self) -> str:
+        return "FILLED" if self.remaining <= 0 else "PARTIALLY_FILLED"
+
+    @property
+    def base_quantity(self) -> float:
+        """Base asset actually received/delivered once a base-denominated fee is taken."""
+
+        if self.fee and self.fee_asset and self.fee_asset == self.base_asset:
+            return self.quantity - self.fee
+        return self.quantity
+
+
+@dataclass
+class BalanceEvent:
+    asset: str
+    free: float
+    locked: float
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Protocol, Sequence
 
 from core.policy_guard import PolicyGuard
 
@@ -12,16 +13,68 @@ class ActionResult(Protocol):
         ...
 
 
+@dataclass
+class ExecutionReport:
+    action: Any
+    state: str
+    detail: str = ""
+
+    def status(self) -> str:
+        return self.state
+
+    @property
+    def symbol(self) -> str:
+        return getattr(self.action, "symbol", "")
+
+
+@dataclass
+class DryRunExecutor:
+    """Accepts every action without routing it anywhere; keeps them for inspection."""
+
+    accepted: List[Any] = field(default_factory=list)
+
+    def __call__(self, action) -> ExecutionReport:
+        self.accepted.append(action)
+        return ExecutionReport(action, "ACCEPTED", "dry run")
+
+
 class ExecutionEngine:
     """Executes approved actions against the exchange."""
 
-    def __init__(self, *, policy_guard: PolicyGuard | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        policy_guard: PolicyGuard | None = None,
+        executor: Callable[[Any], ActionResult] | None = None,
+    ) -> None:
         self.policy_guard = policy_guard or PolicyGuard()
+        self.executor = executor
 
     def execute(self, action) -> ActionResult:
-        if not self.policy_guard.allow(action):
-            raise PermissionError("Action denied by policy guard")
+        rule = self.policy_guard.check(action)
+        if rule is not None:
+            raise PermissionError(f"Action denied by policy guard ({rule})")
         return self._execute_action(action)
 
+    def execute_many(self, actions: Sequence[Any]) -> List[ActionResult | Exception]:
+        """Guard the batch in one pass, then execute approved actions in order.
+
+        Each slot holds the action's result, or the exception it raised (``PermissionError``
+        for guard rejections) so one failure does not abort the rest of the batch.
+        """
+
+        results: List[ActionResult | Exception] = []
+        for action, rule in zip(actions, self.policy_guard.check_many(actions)):
+            if rule is not None:
+                results.append(PermissionError(f"Action denied by policy guard ({rule})"))
+                continue
+            try:
+                results.append(self._execute_action(action))
+            except Exception as exc:  # noqa: BLE001 - handed back to the caller per action
+                results.append(exc)
+        return results
+
     def _execute_action(self, action) -> ActionResult:
-        raise NotImplementedError
+        if self.executor is None:
+            raise NotImplementedError
+        return self.executor(action)
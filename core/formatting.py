@@ -72,3 +72,11 @@ def format_volume(volume_value: Any) -> str:
     if "." in formatted:
         formatted = formatted.rstrip("0").rstrip(".")
     return formatted
+
+
+def format_metric(value: Any, decimals: int = 1, suffix: str = "", signed: bool = False) -> str:
+    """Format a screener metric; ``None`` (no data yet) shows as a dash."""
+
+    if value is None:
+        return "-"
+    return f"{value:{'+' if signed else ''},.{decimals}f}{suffix}"
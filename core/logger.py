@@ -1,25 +1,317 @@
+from __future__ import annotations
+
+import atexit
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, TextIO
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+_pipeline: Optional["LogPipeline"] = None
+
+
+class LevelSampler(logging.Filter):
+    """Drops records before they are enqueued.
+
+    ``sample_rates`` keeps roughly that fraction of records per level (``{"DEBUG": 0.1}``
+    keeps every 10th debug record). ``rate_limits`` caps records per second per level with a
+    token bucket. Both run on the caller thread, so they must stay cheap.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ) -> None:
+        super().__init__()
+        self._every: Dict[int, int] = {}
+        for name, rate in (sample_rates or {}).items():
+            if 0 < rate < 1:
+                self._every[logging.getLevelName(name.upper())] = max(1, round(1 / rate))
+            elif rate <= 0:
+                self._every[logging.getLevelName(name.upper())] = 0
+        self._limits: Dict[int, float] = {
+            logging.getLevelName(name.upper()): float(limit) for name, limit in (rate_limits or {}).items() if limit > 0
+        }
+        self._counters: Dict[int, int] = {}
+        self._tokens: Dict[int, float] = dict(self._limits)
+        self._refilled_at: Dict[int, float] = {}
+        self.dropped: Dict[int, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        level = record.levelno
+        every = self._every.get(level)
+        if every is not None:
+            count = self._counters.get(level, 0)
+            self._counters[level] = count + 1
+            if every == 0 or count % every:
+                self._drop(level)
+                return False
+        limit = self._limits.get(level)
+        if limit is not None:
+            now = record.created
+            last = self._refilled_at.get(level, now)
+            tokens = min(limit, self._tokens[level] + (now - last) * limit)
+            self._refilled_at[level] = now
+            if tokens < 1:
+                self._tokens[level] = tokens
+                self._drop(level)
+                return False
+            self._tokens[level] = tokens - 1
+        return True
+
+    def _drop(self, level: int) -> None:
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+
+
+class _EnqueueHandler(logging.Handler):
+    """Caller-side handler: interpolate the message and hand the record to the writer."""
+
+    def __init__(self, records: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__()
+        self.records = records
+        self.overflow = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Interpolate now so mutable args cannot change before the writer sees them;
+            # timestamp formatting and I/O happen on the writer thread.
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.overflow += 1
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+
+class RotatingLogFile:
+    """Append-only text sink rotated by size and by age, keeping ``backup_count`` files."""
+
+    def __init__(self, path: Path, *, max_bytes: int, backup_count: int, rotate_interval_s: float) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_interval_s = rotate_interval_s
+        self._fh: Optional[TextIO] = None
+        self._size = 0
+        self._opened_at = 0.0
+
+    def _open(self) -> TextIO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._size = self._fh.tell()
+        self._opened_at = time.time()
+        return self._fh
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return bool(self.rotate_interval_s) and time.time() - self._opened_at >= self.rotate_interval_s and self._size > 0
+
+    def _rotate(self) -> None:
+        self.close()
+        if self.backup_count > 0:
+            for idx in range(self.backup_count - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{idx}")
+                if src.exists():
+                    src.replace(self.path.with_name(f"{self.path.name}.{idx + 1}"))
+            if self.path.exists():
+                self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        elif self.path.exists():
+            self.path.unlink()
 
+    def write_batch(self, lines: List[str]) -> None:
+        if not lines:
+            return
+        fh = self._fh or self._open()
+        if self._should_rotate():
+            self._rotate()
+            fh = self._open()
+        chunk = "".join(lines)
+        fh.write(chunk)
+        fh.flush()
+        self._size += len(chunk.encode("utf-8"))
 
-def setup_logger(log_path: Path = Path("logs/app.log"), level: str = "INFO") -> logging.Logger:
+    def close(self) -> None:
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+class LogPipeline:
+    """Single background writer that drains the record queue and flushes in batches."""
+
+    def __init__(
+        self,
+        log_path: Path,
+        *,
+        json_lines: bool = False,
+        console: bool = True,
+        max_bytes: int = 5_000_000,
+        backup_count: int = 5,
+        rotate_interval_s: float = 24 * 3600,
+        flush_interval_s: float = 0.25,
+        batch_size: int = 512,
+        queue_size: int = 10_000,
+    ) -> None:
+        self.records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        self.handler = _EnqueueHandler(self.records)
+        self.formatter = logging.Formatter(LOG_FORMAT)
+        self.text_sink = RotatingLogFile(
+            log_path, max_bytes=max_bytes, backup_count=backup_count, rotate_interval_s=rotate_interval_s
+        )
+        self.json_sink = (
+            RotatingLogFile(
+                log_path.with_suffix(".jsonl"),
+                max_bytes=max_bytes,
+                backup_count=backup_count,
+                rotate_interval_s=rotate_interval_s,
+            )
+            if json_lines
+            else None
+        )
+        self.console: Optional[TextIO] = sys.stderr if console else None
+        self.flush_interval_s = flush_interval_s
+        self.batch_size = batch_size
+        self.written = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bbot-log-writer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        while not self.records.empty():
+            self._drain()
+        self.text_sink.close()
+        if self.json_sink:
+            self.json_sink.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._drain(wait=self.flush_interval_s)
+
+    def _drain(self, wait: float = 0.0) -> None:
+        batch: List[logging.LogRecord] = []
+        try:
+            batch.append(self.records.get(timeout=wait) if wait else self.records.get_nowait())
+            while len(batch) < self.batch_size:
+                batch.append(self.records.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[logging.LogRecord]) -> None:
+        lines = [self.formatter.format(record) + "\n" for record in batch]
+        try:
+            self.text_sink.write_batch(lines)
+            if self.json_sink:
+                self.json_sink.write_batch([self._json_line(record) for record in batch])
+            if self.console:
+                self.console.write("".join(lines))
+                self.console.flush()
+        except Exception as exc:  # noqa: BLE001 - logging must never take the app down
+            # The batch may be partly on disk; count it as lost so the loss shows in stats().
+            self.failed += len(batch)
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return
+        self.written += len(batch)
+
+    def stats(self) -> Dict[str, object]:
+        sampler = next((f for f in self.handler.filters if isinstance(f, LevelSampler)), None)
+        dropped = {logging.getLevelName(level): count for level, count in (sampler.dropped if sampler else {}).items()}
+        return {
+            "written": self.written,
+            "failed": self.failed,
+            "last_error": self.last_error,
+            "queued": self.records.qsize(),
+            "overflow": self.handler.overflow,
+            "dropped": dropped,
+        }
+
+    @staticmethod
+    def _json_line(record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.msg,
+        }
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
+def setup_logger(
+    log_path: Path = Path("logs/app.log"),
+    level: str = "INFO",
+    *,
+    json_lines: bool = False,
+    max_bytes: int = 5_000_000,
+    backup_count: int = 5,
+    rotate_interval_hours: float = 24,
+    flush_interval_ms: int = 250,
+    queue_size: int = 10_000,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
+) -> logging.Logger:
+    global _pipeline
     log_path.parent.mkdir(parents=True, exist_ok=True)
     logger = logging.getLogger("bbot")
     logger.setLevel(level)
+    logger.propagate = False
     if not logger.handlers:
-        formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
-        file_handler = logging.FileHandler(log_path, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        logger.addHandler(stream_handler)
+        _pipeline = LogPipeline(
+            log_path,
+            json_lines=json_lines,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            rotate_interval_s=rotate_interval_hours * 3600,
+            flush_interval_s=flush_interval_ms / 1000,
+            queue_size=queue_size,
+        )
+        if sample_rates or rate_limits:
+            _pipeline.handler.addFilter(LevelSampler(sample_rates=sample_rates, rate_limits=rate_limits))
+        _pipeline.start()
+        logger.addHandler(_pipeline.handler)
+        atexit.register(shutdown_logger)
     return logger
 
 
+def shutdown_logger() -> None:
+    """Flush pending records and stop the writer thread."""
+
+    global _pipeline
+    if _pipeline is None:
+        return
+    pipeline, _pipeline = _pipeline, None
+    logging.getLogger("bbot").removeHandler(pipeline.handler)
+    pipeline.stop()
+
+
+def logger_stats() -> Dict[str, object]:
+    return _pipeline.stats() if _pipeline else {}
+
+
 def mask_secret(value: Optional[str]) -> str:
     if not value:
         return ""
     return value[:3] + "***" + value[-2:]
-
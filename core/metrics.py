@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) with cheap O(1) recording.
+
+    Percentiles are computed over the last ``window`` samples only when a summary is requested,
+    so recording stays safe to call on hot paths.
+    """
+
+    def __init__(self, window: int = 2048) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @staticmethod
+    def _pick(ordered: list, pct: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+    def percentile(self, pct: float) -> float:
+        return self._pick(sorted(self.samples), pct) if self.samples else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": self._pick(ordered, 50) * 1000,
+            "p99_ms": self._pick(ordered, 99) * 1000,
+            "max_ms": self.max * 1000,
+        }
@@ -0,0 +1,401 @@
+"""Many per-pair grid bots in one process on a shared scheduler.
+
+The :class:`Orchestrator` replaces one-engine-per-pair with shared infrastructure:
+
+* one market-data hub: every tick updates ``latest[symbol]`` and the market observers once,
+  however many bots read it (the app feeds it from a single multiplexed bookTicker stream);
+* one execution path: all bots' actions go through the same ``ExecutionEngine`` (one policy
+  guard, one executor) in a single ``execute_many`` batch per scheduler step;
+* one scheduler: each bot is due every ``update_interval_ms`` of its settings and runs only if
+  its symbol has a fresh tick it has not seen. Due bots come off a heap of due times and run in
+  order of due time minus ``priority * priority_weight_s``: at most ``max_per_step`` decide per
+  step and the rest stay due for the next one, so under load a higher priority runs earlier but
+  a low-priority bot still runs once it is overdue by more than the priority gap.
+
+Bots are isolated: a bot whose decisions raise ``max_errors`` times in a row is parked in the
+``error`` state while the others keep running, and each bot can be started and stopped on its
+own (stopping cancels its resting grid buys). Fills and rejects are queued to their bot and
+handled at the start of the next step, so an executor that reports fills synchronously never
+re-enters a decision.
+
+``stats()`` reports per-bot and aggregate CPU time (``time.thread_time_ns``), decision rate,
+tick-to-decision lag and a capacity estimate: how many bots at the current mean cost fit in
+``cpu_budget`` of one core.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from core.decision_engine import DecisionEngine
+from core.engine import _GuardReject
+from core.events import FillEvent, MarketEvent
+from core.execution_engine import ExecutionEngine
+from core.metrics import LatencyStats
+
+SettingsSource = Union[Dict[str, Any], Callable[[str], Dict[str, Any]]]
+MarketObserver = Callable[[MarketEvent], None]
+
+RUNNING = "running"
+STOPPED = "stopped"
+ERROR = "error"
+
+_MIN_INTERVAL_S = 0.01
+
+
+class PairBot:
+    """Scheduling and accounting record of one pair; its grid state is the ``state`` dict."""
+
+    def __init__(self, symbol: str, settings: SettingsSource, *, priority: int = 0) -> None:
+        self.symbol = symbol
+        self.settings = settings
+        self.priority = priority
+        self.state: dict = {}
+        self.status = STOPPED
+        self.error: Optional[str] = None
+        self.consecutive_errors = 0
+        self.due = 0.0
+        self.generation = 0
+        self.last_tick_at: Optional[float] = None
+        self.executions: Deque[Any] = deque()
+        self.counters: Dict[str, int] = {"runs": 0, "decisions": 0, "actions": 0, "fills": 0, "stale": 0, "errors": 0}
+        self.cpu_ns = 0
+        self.lag = LatencyStats()
+
+    def current_settings(self) -> Dict[str, Any]:
+        return self.settings(self.symbol) if callable(self.settings) else self.settings
+
+    def interval_s(self, settings: Dict[str, Any]) -> float:
+        return max(_MIN_INTERVAL_S, float(settings.get("update_interval_ms", 1000) or 1000) / 1000)
+
+    def open_buy_ids(self) -> List[str]:
+        return list(self.state.get("levels", {}).values())
+
+
+class Orchestrator:
+    def __init__(
+        self,
+        decision_engine: DecisionEngine,
+        execution_engine: ExecutionEngine,
+        *,
+        stale_after_ms: int = 1_500,
+        max_errors: int = 5,
+        max_per_step: int = 256,
+        priority_weight_s: float = 0.05,
+        cpu_budget: float = 0.7,
+        market_observers: Iterable[MarketObserver] = (),
+        on_report: Optional[Callable[[Any], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        logger=None,
+    ) -> None:
+        self.decision_engine = decision_engine
+        self.execution_engine = execution_engine
+        self.stale_after_s = stale_after_ms / 1000
+        self.max_errors = max_errors
+        self.max_per_step = max_per_step
+        self.priority_weight_s = priority_weight_s
+        self.cpu_budget = cpu_budget
+        self.market_observers: List[MarketObserver] = list(market_observers)
+        self.on_report = on_report
+        self.clock = clock
+        self.logger = logger
+        self.bots: Dict[str, PairBot] = {}
+        self.latest: Dict[str, MarketEvent] = {}
+        self.counters: Dict[str, int] = {
+            "received": 0,
+            "steps": 0,
+            "executed": 0,
+            "rejected": 0,
+            "venue_rejected": 0,
+            "errors": 0,
+        }
+        self.decide = LatencyStats()
+        self.running = False
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._pending: Deque[PairBot] = deque()
+        self._started_at = clock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    # Bot lifecycle
+    def add_bot(self, symbol: str, settings: SettingsSource, *, priority: int = 0, start: bool = True) -> PairBot:
+        if symbol in self.bots:
+            raise ValueError(f"Bot for {symbol} already exists")
+        bot = self.bots[symbol] = PairBot(symbol, settings, priority=priority)
+        if start:
+            self.start_bot(symbol)
+        return bot
+
+    def start_bot(self, symbol: str) -> None:
+        bot = self.bots[symbol]
+        if bot.status == RUNNING:
+            return
+        bot.status = RUNNING
+        bot.error = None
+        bot.consecutive_errors = 0
+        self._schedule(bot, self.clock())
+
+    def stop_bot(self, symbol: str, reason: str = "bot stopped") -> List[Any]:
+        """Stop scheduling ``symbol`` and cancel its resting grid buys; returns the execution results."""
+
+        bot = self.bots[symbol]
+        bot.status = STOPPED
+        bot.generation += 1
+        if not bot.open_buy_ids():
+            return []
+        # Partly filled buys come back with a take-profit for the bought part.
+        actions = self.decision_engine.cancel_buys(bot.state, symbol, bot.current_settings(), reason=reason)
+        bot.state.pop("anchor", None)
+        return self._execute(actions)
+
+    def halt(self, reason: str) -> List[Any]:
+        """Stop every bot and cancel all resting grid buys (the risk kill switch)."""
+
+        return [result for symbol in list(self.bots) for result in self.stop_bot(symbol, reason)]
+
+    def remove_bot(self, symbol: str) -> None:
+        self.stop_bot(symbol, "bot removed")
+        del self.bots[symbol]
+
+    def _schedule(self, bot: PairBot, due: float) -> None:
+        bot.due = due
+        bot.generation += 1
+        heapq.heappush(self._heap, (due, next(self._seq), bot.symbol, bot.generation))
+        if self._wake is not None:
+            self._wake.set()
+
+    # Ingress (same surface as TradingEngine, so EngineThread can host it)
+    def put_nowait(self, event: MarketEvent) -> bool:
+        self.counters["received"] += 1
+        for observer in self.market_observers:
+            try:
+                observer(event)
+            except Exception:  # noqa: BLE001
+                self.counters["errors"] += 1
+                self._log("exception", "Market observer failed for %s", event.symbol)
+        self.latest[event.symbol] = event
+        return True
+
+    def submit_execution(self, event: Any) -> None:
+        """Queue a fill or reject for its bot; handled at the start of the next step."""
+
+        bot = self.bots.get(event.symbol)
+        if bot is None:
+            return
+        bot.executions.append(event)
+        self._pending.append(bot)
+        if self._wake is not None:
+            self._wake.set()
+
+    # Scheduling
+    def next_due(self) -> Optional[float]:
+        while self._heap:
+            due, _seq, symbol, generation = self._heap[0]
+            bot = self.bots.get(symbol)
+            if bot is not None and bot.generation == generation and bot.status == RUNNING:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def step(self, now: Optional[float] = None) -> int:
+        """Handle queued executions, then run due bots; returns how many bots decided."""
+
+        now = self.clock() if now is None else now
+        self.counters["steps"] += 1
+        actions: List[Any] = self._drain_executions()
+        due: List[PairBot] = []
+        while self._heap and self._heap[0][0] <= now:
+            _due, _seq, symbol, generation = heapq.heappop(self._heap)
+            bot = self.bots.get(symbol)
+            if bot is not None and bot.generation == generation and bot.status == RUNNING:
+                due.append(bot)
+        # Among due bots, earlier and higher-priority first; overflow waits for the next step.
+        due.sort(key=lambda bot: bot.due - bot.priority * self.priority_weight_s)
+        for bot in due[self.max_per_step :]:
+            heapq.heappush(self._heap, (bot.due, next(self._seq), bot.symbol, bot.generation))
+        ran = due[: self.max_per_step]
+        for bot in ran:
+            settings = bot.current_settings()
+            actions.extend(self._run_bot(bot, settings, now))
+            interval = bot.interval_s(settings)
+            # A bot that fell behind is rescheduled from now instead of bursting to catch up.
+            next_due = bot.due + interval
+            if bot.status == RUNNING:
+                self._schedule(bot, next_due if next_due > now else now + interval)
+        if actions:
+            self._execute(actions)
+        # Fills reported synchronously by the executor re-arm take-profits in the same step.
+        follow_up = self._drain_executions()
+        if follow_up:
+            self._execute(follow_up)
+        return len(ran)
+
+    def _run_bot(self, bot: PairBot, settings: Dict[str, Any], now: float) -> List[Any]:
+        event = self.latest.get(bot.symbol)
+        if event is None or event.received_at == bot.last_tick_at:
+            return []
+        bot.last_tick_at = event.received_at
+        bot.counters["runs"] += 1
+        lag = now - event.received_at
+        if lag > self.stale_after_s:
+            bot.counters["stale"] += 1
+            return []
+        cpu_started = time.thread_time_ns()
+        started = time.perf_counter()
+        try:
+            proposed = self.decision_engine.propose_actions(bot.state, event.to_snapshot(), settings)
+        except Exception as exc:  # noqa: BLE001 - one bad pair must not stop the others
+            self._bot_failed(bot, exc)
+            return []
+        finally:
+            bot.cpu_ns += time.thread_time_ns() - cpu_started
+        self.decide.record(time.perf_counter() - started)
+        bot.lag.record(max(0.0, lag))
+        bot.consecutive_errors = 0
+        bot.counters["decisions"] += 1
+        bot.counters["actions"] += len(proposed)
+        return proposed
+
+    def _bot_failed(self, bot: PairBot, exc: Exception) -> None:
+        bot.counters["errors"] += 1
+        bot.consecutive_errors += 1
+        self.counters["errors"] += 1
+        self._log("exception", "Bot %s failed (%s in a row)", bot.symbol, bot.consecutive_errors)
+        if bot.consecutive_errors >= self.max_errors:
+            bot.status = ERROR
+            bot.error = repr(exc)
+            bot.generation += 1
+            self._log("error", "Bot %s parked after %s consecutive errors: %r", bot.symbol, bot.consecutive_errors, exc)
+
+    def _drain_executions(self) -> List[Any]:
+        actions: List[Any] = []
+        while self._pending:
+            bot = self._pending.popleft()
+            while bot.executions:
+                event = bot.executions.popleft()
+                cpu_started = time.thread_time_ns()
+                try:
+                    if isinstance(event, FillEvent):
+                        bot.counters["fills"] += 1
+                        proposed = self.decision_engine.on_fill(bot.state, event, bot.current_settings())
+                    else:
+                        proposed = self.decision_engine.on_reject(bot.state, event.action)
+                except Exception as exc:  # noqa: BLE001
+                    self._bot_failed(bot, exc)
+                    continue
+                finally:
+                    bot.cpu_ns += time.thread_time_ns() - cpu_started
+                if bot.status == RUNNING or isinstance(event, FillEvent):
+                    # A stopped bot still places the take-profit for a buy that filled.
+                    bot.counters["actions"] += len(proposed)
+                    actions.extend(proposed)
+        return actions
+
+    def _execute(self, actions: List[Any]) -> List[Any]:
+        results = self.execution_engine.execute_many(actions)
+        for action, report in zip(actions, results):
+            if isinstance(report, PermissionError):
+                self.counters["rejected"] += 1
+                self._log("info", "Policy guard rejected %s: %s", action.describe(), report)
+                self.submit_execution(_GuardReject(action))
+            elif isinstance(report, Exception):
+                self.counters["errors"] += 1
+                self._log("error", "Execution failed for %s: %r", action.describe(), report)
+                # Not sent: free the level like a guard rejection, so the bot retries it.
+                self.submit_execution(_GuardReject(action))
+            else:
+                self.counters["executed"] += 1
+                if report.status() == "REJECTED":
+                    self.counters["venue_rejected"] += 1
+                    self.submit_execution(report)
+                if self.on_report:
+                    self.on_report(report)
+        return results
+
+    # Async hosting
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._started_at = self.clock()
+        self._task = asyncio.create_task(self._loop(), name="orchestrator")
+        self.running = True
+
+    async def stop(self) -> None:
+        self.running = False
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        for symbol, bot in self.bots.items():
+            if bot.status == RUNNING:
+                self.stop_bot(symbol, "orchestrator stopped")
+
+    async def _loop(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                self.step()
+            except Exception:  # noqa: BLE001
+                self.counters["errors"] += 1
+                self._log("exception", "Orchestrator step failed")
+            self._wake.clear()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due - self.clock())
+            if self._pending:
+                timeout = 0.0
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    # Reporting
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        return {"decide": self.decide.summary(), **{f"lag:{s}": bot.lag.summary() for s, bot in self.bots.items()}}
+
+    def bot_stats(self, bot: PairBot, elapsed: float) -> Dict[str, Any]:
+        return {
+            "status": bot.status,
+            "priority": bot.priority,
+            "error": bot.error,
+            **bot.counters,
+            "cpu_ms": round(bot.cpu_ns / 1e6, 3),
+            "cpu_pct": round(bot.cpu_ns / 1e9 / elapsed * 100, 3) if elapsed > 0 else 0.0,
+            "decisions_per_s": round(bot.counters["decisions"] / elapsed, 3) if elapsed > 0 else 0.0,
+            "lag": bot.lag.summary(),
+        }
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = self.clock() if now is None else now
+        elapsed = now - self._started_at
+        bots = {symbol: self.bot_stats(bot, elapsed) for symbol, bot in self.bots.items()}
+        running = sum(1 for bot in self.bots.values() if bot.status == RUNNING)
+        cpu_s = sum(bot.cpu_ns for bot in self.bots.values()) / 1e9
+        cpu_fraction = cpu_s / elapsed if elapsed > 0 else 0.0
+        per_bot = cpu_fraction / running if running else 0.0
+        return {
+            **self.counters,
+            "bots": len(self.bots),
+            "running": running,
+            "elapsed_s": round(elapsed, 3),
+            "cpu_pct": round(cpu_fraction * 100, 3),
+            "decisions_per_s": round(sum(b["decisions"] for b in bots.values()) / elapsed, 3) if elapsed > 0 else 0.0,
+            "decide": self.decide.summary(),
+            # Bots of the current mean cost that fit in ``cpu_budget`` of one core.
+            "capacity_estimate": int(self.cpu_budget / per_bot) if per_bot > 0 else None,
+            "guard": self.execution_engine.policy_guard.stats(),
+            "per_bot": bots,
+        }
+
+
+__all__ = ["ERROR", "Orchestrator", "PairBot", "RUNNING", "STOPPED"]
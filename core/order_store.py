@@ -0,0 +1,498 @@
+"""Canonical order and position state with a binary write-ahead journal.
+
+Every transition is validated, appended to ``journal.bin`` and only then applied in memory, so
+the journal is the source of truth. Each record is ``length | crc32 | seq | type | payload``;
+a torn tail (crash mid-write) fails the length or CRC check and is cut off on recovery.
+
+Every ``snapshot_every`` records the whole state (open orders, the most recent closed orders
+and positions, as versioned field dicts) is pickled atomically to ``snapshot.bin`` and the
+journal restarts empty. A
+restart loads the snapshot and replays only the journal tail, so recovery cost is bounded by
+the snapshot interval rather than by the day's event count. Records whose ``seq`` is already
+covered by the snapshot (crash between snapshot and journal reset) are skipped.
+
+Lookups are O(1): by clientOrderId, by exchange order id and, for open orders, by
+``(symbol, side, price)`` level.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import time
+import zlib
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from core.decision_engine import CancelAction, OrderAction
+
+PENDING_NEW = "PENDING_NEW"
+NEW = "NEW"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELED = "CANCELED"
+REJECTED = "REJECTED"
+EXPIRED = "EXPIRED"
+OPEN_STATUSES = frozenset({PENDING_NEW, NEW, PARTIALLY_FILLED})
+
+_REC_NEW, _REC_ACK, _REC_FILL, _REC_CANCEL, _REC_REJECT, _REC_EXPIRE = range(1, 7)
+_CLOSING = {_REC_CANCEL: CANCELED, _REC_REJECT: REJECTED, _REC_EXPIRE: EXPIRED}
+
+_HEADER = struct.Struct("<II")  # body length, crc32(body)
+_BODY = struct.Struct("<QB")  # seq, record type
+_STR_LEN = struct.Struct("<H")
+_NEW = struct.Struct("<Bddq")  # side, price, quantity, ts_ms
+_ACK = struct.Struct("<qq")  # exchange order id (-1 = none), ts_ms
+_FILL = struct.Struct("<dddBq")  # quantity, price, fee, fee in base, ts_ms
+_CLOSE = struct.Struct("<q")  # ts_ms
+
+# 1: orders and positions as field-name dicts (unversioned snapshots held positional tuples).
+_SNAPSHOT_VERSION = 1
+
+_SIDES = ("BUY", "SELL")
+_EPS = 1e-12
+
+LevelKey = Tuple[str, str, float]
+
+
+@dataclass
+class OrderRecord:
+    client_order_id: str
+    symbol: str
+    side: str
+    price: float
+    quantity: float
+    status: str = PENDING_NEW
+    exchange_order_id: Optional[int] = None
+    executed_qty: float = 0.0
+    cum_quote: float = 0.0
+    created_ms: int = 0
+    updated_ms: int = 0
+    reason: str = ""
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_STATUSES
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.quantity - self.executed_qty)
+
+
+@dataclass
+class Position:
+    symbol: str
+    quantity: float = 0.0
+    cost: float = 0.0
+    realized_pnl: float = 0.0
+    fees_quote: float = 0.0
+
+    @property
+    def avg_price(self) -> float:
+        return self.cost / self.quantity if self.quantity > _EPS else 0.0
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return _STR_LEN.pack(len(data)) + data
+
+
+def _unpack_str(buf: memoryview, offset: int) -> Tuple[str, int]:
+    (length,) = _STR_LEN.unpack_from(buf, offset)
+    offset += _STR_LEN.size
+    return bytes(buf[offset : offset + length]).decode("utf-8"), offset + length
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class OrderStore:
+    def __init__(
+        self,
+        directory: str | Path = Path("data") / "orders",
+        *,
+        snapshot_every: int = 10_000,
+        retain_closed: int = 10_000,
+        fsync: bool = False,
+        logger=None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.journal_path = self.directory / "journal.bin"
+        self.snapshot_path = self.directory / "snapshot.bin"
+        self.snapshot_every = snapshot_every
+        self.retain_closed = retain_closed
+        self.fsync = fsync
+        self.logger = logger
+        self.orders: Dict[str, OrderRecord] = {}
+        self.positions: Dict[str, Position] = {}
+        self._by_exchange_id: Dict[int, str] = {}
+        self._levels: Dict[LevelKey, Dict[str, None]] = {}
+        self._closed: Deque[str] = deque()
+        self.seq = 0
+        self._since_snapshot = 0
+        self._journal = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    # Lifecycle
+    @classmethod
+    def open(cls, directory: str | Path = Path("data") / "orders", **kwargs) -> "OrderStore":
+        store = cls(directory, **kwargs)
+        store.recover()
+        return store
+
+    def recover(self) -> Dict[str, Any]:
+        """Rebuild state from snapshot + journal tail and open the journal for appending."""
+
+        started = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot_seq = self._load_snapshot()
+        replayed = 0
+        good_end = 0
+        data = self.journal_path.read_bytes() if self.journal_path.exists() else b""
+        for seq, rec_type, payload, end in self._iter_records(memoryview(data)):
+            good_end = end
+            if seq <= snapshot_seq:
+                continue
+            self._apply(rec_type, self._decode(rec_type, payload))
+            self.seq = seq
+            replayed += 1
+        truncated = len(data) - good_end
+        if truncated:
+            self._log("warning", "Order journal: dropped %s bytes of torn tail", truncated)
+        self._journal = self.journal_path.open("r+b" if self.journal_path.exists() else "wb")
+        self._journal.truncate(good_end)
+        self._journal.seek(good_end)
+        self._since_snapshot = replayed
+        stats = {
+            "orders": len(self.orders),
+            "open": sum(1 for o in self.orders.values() if o.is_open),
+            "snapshot_seq": snapshot_seq,
+            "replayed": replayed,
+            "truncated_bytes": truncated,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        self._log("info", "Order store recovered: %s", stats)
+        return stats
+
+    def close(self) -> None:
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    # Transitions
+    def new_order(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        quantity: float,
+        client_order_id: str,
+        *,
+        ts_ms: Optional[int] = None,
+    ) -> OrderRecord:
+        existing = self.orders.get(client_order_id)
+        if existing is not None and existing.is_open:
+            raise ValueError(f"Order {client_order_id} is already open")
+        side = side.upper()
+        payload = _pack_str(client_order_id) + _pack_str(symbol) + _NEW.pack(
+            _SIDES.index(side), float(price), float(quantity), ts_ms if ts_ms is not None else _now_ms()
+        )
+        self._commit(_REC_NEW, payload)
+        return self.orders[client_order_id]
+
+    def ack(self, client_order_id: str, exchange_order_id: Optional[int] = None, *, ts_ms: Optional[int] = None) -> None:
+        self._require_open(client_order_id)
+        eid = -1 if exchange_order_id is None else int(exchange_order_id)
+        self._commit(_REC_ACK, _pack_str(client_order_id) + _ACK.pack(eid, ts_ms if ts_ms is not None else _now_ms()))
+
+    def fill(
+        self,
+        client_order_id: str,
+        quantity: float,
+        price: float,
+        *,
+        fee: float = 0.0,
+        fee_in_base: bool = False,
+        ts_ms: Optional[int] = None,
+    ) -> OrderRecord:
+        order = self._require_open(client_order_id)
+        if quantity <= 0 or quantity > order.remaining + 1e-9:
+            raise ValueError(f"Fill of {quantity} does not fit {client_order_id} (remaining {order.remaining})")
+        payload = _pack_str(client_order_id) + _FILL.pack(
+            float(quantity), float(price), float(fee), int(fee_in_base), ts_ms if ts_ms is not None else _now_ms()
+        )
+        self._commit(_REC_FILL, payload)
+        return order
+
+    def cancel(self, client_order_id: str, *, ts_ms: Optional[int] = None) -> None:
+        self._close(_REC_CANCEL, client_order_id, "", ts_ms)
+
+    def reject(self, client_order_id: str, reason: str = "", *, ts_ms: Optional[int] = None) -> None:
+        self._close(_REC_REJECT, client_order_id, reason, ts_ms)
+
+    def expire(self, client_order_id: str, reason: str = "", *, ts_ms: Optional[int] = None) -> None:
+        self._close(_REC_EXPIRE, client_order_id, reason, ts_ms)
+
+    def _close(self, rec_type: int, client_order_id: str, reason: str, ts_ms: Optional[int]) -> None:
+        self._require_open(client_order_id)
+        payload = _pack_str(client_order_id) + _CLOSE.pack(ts_ms if ts_ms is not None else _now_ms()) + _pack_str(reason)
+        self._commit(rec_type, payload)
+
+    def _require_open(self, client_order_id: str) -> OrderRecord:
+        order = self.orders.get(client_order_id)
+        if order is None:
+            raise KeyError(client_order_id)
+        if not order.is_open:
+            raise ValueError(f"Order {client_order_id} is already {order.status}")
+        return order
+
+    # Lookups
+    def get(self, client_order_id: str) -> Optional[OrderRecord]:
+        return self.orders.get(client_order_id)
+
+    def by_exchange_id(self, exchange_order_id: int) -> Optional[OrderRecord]:
+        cid = self._by_exchange_id.get(exchange_order_id)
+        return self.orders.get(cid) if cid is not None else None
+
+    def at_level(self, symbol: str, side: str, price: float) -> List[OrderRecord]:
+        return [self.orders[cid] for cid in self._levels.get((symbol, side.upper(), float(price)), ())]
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[OrderRecord]:
+        return [o for o in self.orders.values() if o.is_open and (symbol is None or o.symbol == symbol)]
+
+    def position(self, symbol: str) -> Position:
+        return self.positions.get(symbol) or Position(symbol)
+
+    # Journal
+    def _commit(self, rec_type: int, payload: bytes) -> None:
+        if self._journal is None:
+            raise RuntimeError("Order store is not open; call recover() first")
+        self.seq += 1
+        body = _BODY.pack(self.seq, rec_type) + payload
+        self._journal.write(_HEADER.pack(len(body), zlib.crc32(body)) + body)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._apply(rec_type, self._decode(rec_type, memoryview(payload)))
+        self._since_snapshot += 1
+        if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    @staticmethod
+    def _iter_records(buf: memoryview) -> Iterator[Tuple[int, int, memoryview, int]]:
+        offset = 0
+        size = len(buf)
+        while offset + _HEADER.size <= size:
+            length, crc = _HEADER.unpack_from(buf, offset)
+            start = offset + _HEADER.size
+            end = start + length
+            if length < _BODY.size or end > size:
+                return
+            body = buf[start:end]
+            if zlib.crc32(body) != crc:
+                return
+            seq, rec_type = _BODY.unpack_from(body)
+            yield seq, rec_type, body[_BODY.size :], end
+            offset = end
+
+    @staticmethod
+    def _decode(rec_type: int, payload: memoryview) -> tuple:
+        cid, offset = _unpack_str(payload, 0)
+        if rec_type == _REC_NEW:
+            symbol, offset = _unpack_str(payload, offset)
+            return (cid, symbol, *_NEW.unpack_from(payload, offset))
+        if rec_type == _REC_ACK:
+            return (cid, *_ACK.unpack_from(payload, offset))
+        if rec_type == _REC_FILL:
+            return (cid, *_FILL.unpack_from(payload, offset))
+        (ts_ms,) = _CLOSE.unpack_from(payload, offset)
+        reason, _ = _unpack_str(payload, offset + _CLOSE.size)
+        return cid, ts_ms, reason
+
+    def _apply(self, rec_type: int, fields: tuple) -> None:
+        if rec_type == _REC_NEW:
+            cid, symbol, side, price, quantity, ts_ms = fields
+            if cid in self.orders:
+                # Reused id of a closed order: the new order replaces it (rare, so O(n) is fine).
+                self._forget(cid)
+                self._closed.remove(cid)
+            order = OrderRecord(cid, symbol, _SIDES[side], price, quantity, created_ms=ts_ms, updated_ms=ts_ms)
+            self.orders[cid] = order
+            self._levels.setdefault(self._level_key(order), {})[cid] = None
+            return
+        order = self.orders[fields[0]]
+        if rec_type == _REC_ACK:
+            _, eid, ts_ms = fields
+            if eid >= 0:
+                order.exchange_order_id = eid
+                self._by_exchange_id[eid] = order.client_order_id
+            if order.status == PENDING_NEW:
+                order.status = NEW
+            order.updated_ms = ts_ms
+        elif rec_type == _REC_FILL:
+            _, quantity, price, fee, fee_in_base, ts_ms = fields
+            order.executed_qty += quantity
+            order.cum_quote += quantity * price
+            order.updated_ms = ts_ms
+            self._apply_position(order.symbol, order.side, quantity, price, fee, bool(fee_in_base))
+            if order.remaining <= 1e-9:
+                self._set_closed(order, FILLED)
+            else:
+                order.status = PARTIALLY_FILLED
+        else:
+            _, ts_ms, reason = fields
+            order.updated_ms = ts_ms
+            order.reason = reason
+            self._set_closed(order, _CLOSING[rec_type])
+
+    def _apply_position(self, symbol: str, side: str, qty: float, price: float, fee: float, fee_in_base: bool) -> None:
+        pos = self.positions.get(symbol)
+        if pos is None:
+            pos = self.positions[symbol] = Position(symbol)
+        fee_quote = fee * price if fee_in_base else fee
+        pos.fees_quote += fee_quote
+        if side == "BUY":
+            received = qty - fee if fee_in_base else qty
+            pos.cost += qty * price + (0.0 if fee_in_base else fee)
+            pos.quantity += received
+            return
+        sold = min(qty, pos.quantity)
+        avg = pos.avg_price
+        pos.realized_pnl += sold * (price - avg) - (0.0 if fee_in_base else fee)
+        pos.cost -= sold * avg
+        pos.quantity -= qty + (fee if fee_in_base else 0.0)
+        if abs(pos.quantity) <= _EPS:
+            pos.quantity = 0.0
+            pos.cost = 0.0
+
+    @staticmethod
+    def _level_key(order: OrderRecord) -> LevelKey:
+        return order.symbol, order.side, order.price
+
+    def _set_closed(self, order: OrderRecord, status: str) -> None:
+        order.status = status
+        level = self._levels.get(self._level_key(order))
+        if level is not None:
+            level.pop(order.client_order_id, None)
+            if not level:
+                del self._levels[self._level_key(order)]
+        self._closed.append(order.client_order_id)
+        while len(self._closed) > self.retain_closed:
+            self._forget(self._closed.popleft(), only_closed=True)
+
+    def _forget(self, cid: str, *, only_closed: bool = False) -> None:
+        order = self.orders.get(cid)
+        if order is None or (only_closed and order.is_open):
+            return
+        del self.orders[cid]
+        if order.exchange_order_id is not None and self._by_exchange_id.get(order.exchange_order_id) == cid:
+            del self._by_exchange_id[order.exchange_order_id]
+
+    # Snapshots
+    def snapshot(self) -> None:
+        state = {
+            "version": _SNAPSHOT_VERSION,
+            "seq": self.seq,
+            "orders": [asdict(order) for order in self.orders.values()],
+            "closed": list(self._closed),
+            "positions": [asdict(pos) for pos in self.positions.values()],
+        }
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with tmp.open("wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Crash before this truncate is harmless: replay skips records covered by the snapshot.
+        if self._journal is not None:
+            self._journal.seek(0)
+            self._journal.truncate()
+        self._since_snapshot = 0
+
+    def _load_snapshot(self) -> int:
+        if not self.snapshot_path.exists():
+            return 0
+        with self.snapshot_path.open("rb") as fh:
+            state = pickle.load(fh)
+        version = state.get("version", 0)
+        if version > _SNAPSHOT_VERSION:
+            raise ValueError(f"{self.snapshot_path} is snapshot version {version}, newer than {_SNAPSHOT_VERSION}")
+        for values in state["orders"]:
+            order = self._rebuild(OrderRecord, values)
+            self.orders[order.client_order_id] = order
+            if order.exchange_order_id is not None:
+                self._by_exchange_id[order.exchange_order_id] = order.client_order_id
+            if order.is_open:
+                self._levels.setdefault(self._level_key(order), {})[order.client_order_id] = None
+        self._closed = deque(cid for cid in state["closed"] if cid in self.orders)
+        positions = (self._rebuild(Position, values) for values in state["positions"])
+        self.positions = {pos.symbol: pos for pos in positions}
+        self.seq = state["seq"]
+        return self.seq
+
+    @staticmethod
+    def _rebuild(cls, values):
+        """Dataclass from a snapshot entry; fields added since take their defaults, dropped ones are ignored."""
+
+        if not isinstance(values, dict):
+            return cls(*values)  # unversioned snapshot
+        names = {f.name for f in fields(cls)}
+        return cls(**{name: value for name, value in values.items() if name in names})
+
+    # Adapters
+    def apply_report(self, report) -> None:
+        """Journal the outcome of an executor call (see :class:`JournalingExecutor`)."""
+
+        action = report.action
+        cid = getattr(action, "client_order_id", "")
+        order = self.orders.get(cid)
+        if order is None or not order.is_open:
+            return
+        state = report.status()
+        if isinstance(action, CancelAction):
+            if state == CANCELED:
+                self.cancel(cid)
+        elif state == REJECTED:
+            self.reject(cid, report.detail)
+        elif state == EXPIRED:
+            self.expire(cid, report.detail)
+        elif order.status == PENDING_NEW:
+            self.ack(cid)
+
+    def apply_fill(self, fill) -> None:
+        """Journal a :class:`core.events.FillEvent` for a known open order."""
+
+        order = self.orders.get(fill.client_order_id)
+        if order is None or not order.is_open:
+            return
+        self.fill(
+            fill.client_order_id,
+            fill.quantity,
+            fill.price,
+            fee=fill.fee,
+            fee_in_base=bool(fill.fee_asset) and fill.fee_asset == fill.base_asset,
+            ts_ms=fill.ts_ms,
+        )
+
+
+class JournalingExecutor:
+    """Executor wrapper: journals each order before it is sent and the outcome after."""
+
+    def __init__(self, store: OrderStore, executor: Callable[[Any], Any]) -> None:
+        self.store = store
+        self.executor = executor
+
+    def __call__(self, action):
+        if isinstance(action, OrderAction) and action.client_order_id:
+            price = action.price if action.price is not None else 0.0
+            self.store.new_order(action.symbol, action.side, price, action.quantity, action.client_order_id)
+        report = self.executor(action)
+        self.store.apply_report(report)
+        return report
@@ -1,6 +1,24 @@
+"""Pre-trade safety checks with per-rule accounting.
+
+Every action passes all rules (logical AND), so the order only changes how much work a rejected
+action costs. The guard keeps per-rule timing and reject counters and periodically re-sorts the
+rules by expected cost per rejection (``mean time / reject rate``): cheap, selective rules run
+first and rejected actions short-circuit before the expensive ones. Rules therefore must not
+depend on running after another rule, and must not have side effects. A rule that can say why it
+refused an action provides ``reason(action) -> Optional[str]``; it is called for rejected actions
+only and appended to the verdict (``"risk_limits: max_total_exposure"``).
+
+``allow_many`` evaluates one rule across the whole batch before moving to the next, so a rule
+can provide its own vectorized ``allow_many(actions) -> Sequence[bool]``.
+"""
+
 from __future__ import annotations
 
-from typing import Protocol
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence
+
+_MIN_REJECT_RATE = 1e-3
 
 
 class GuardRule(Protocol):
@@ -8,14 +26,178 @@ class GuardRule(Protocol):
         ...
 
 
+@dataclass
+class RuleStats:
+    name: str
+    evaluated: int = 0
+    rejected: int = 0
+    total_ns: int = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.evaluated if self.evaluated else 0.0
+
+    @property
+    def reject_rate(self) -> float:
+        return self.rejected / self.evaluated if self.evaluated else 0.0
+
+    def cost_per_reject(self) -> float:
+        """Expected time spent per rejection; unmeasured rules sort first so they get measured."""
+
+        if not self.evaluated:
+            return 0.0
+        return self.mean_ns / max(self.reject_rate, _MIN_REJECT_RATE)
+
+
+class _Entry:
+    __slots__ = ("rule", "stats", "allow_many", "reason")
+
+    def __init__(self, rule: GuardRule, name: str) -> None:
+        self.rule = rule
+        self.stats = RuleStats(name)
+        batch = getattr(rule, "allow_many", None)
+        self.allow_many: Callable[[List[Any]], Sequence[bool]] = batch or (lambda actions: [rule.allow(a) for a in actions])
+        self.reason: Optional[Callable[[Any], Optional[str]]] = getattr(rule, "reason", None)
+
+    def verdict(self, action) -> str:
+        detail = self.reason(action) if self.reason else None
+        return f"{self.stats.name}: {detail}" if detail else self.stats.name
+
+
 class PolicyGuard:
-    """Applies safety checks before actions are executed."""
+    """Applies safety checks before actions are executed.
 
-    def __init__(self, *, rules: list[GuardRule] | None = None) -> None:
+    ``reorder_every`` is the number of evaluated actions between re-sorts; ``adaptive=False``
+    keeps the rules in the given order.
+    """
+
+    def __init__(
+        self,
+        *,
+        rules: list[GuardRule] | None = None,
+        reorder_every: int = 1_000,
+        adaptive: bool = True,
+    ) -> None:
+        self.reorder_every = reorder_every
+        self.adaptive = adaptive
+        self._entries: List[_Entry] = []
+        self._since_reorder = 0
         self.rules = rules or []
 
+    @property
+    def rules(self) -> List[GuardRule]:
+        """Rules in their current evaluation order."""
+
+        return [entry.rule for entry in self._entries]
+
+    @rules.setter
+    def rules(self, rules: Iterable[GuardRule]) -> None:
+        entries: List[_Entry] = []
+        seen: Dict[str, int] = {}
+        for rule in rules:
+            name = getattr(rule, "name", None) or type(rule).__name__
+            seen[name] = seen.get(name, 0) + 1
+            entries.append(_Entry(rule, name if seen[name] == 1 else f"{name}#{seen[name]}"))
+        self._entries = entries
+        self._since_reorder = 0
+
+    # Checks
     def allow(self, action) -> bool:
-        for rule in self.rules:
-            if not rule.allow(action):
-                return False
-        return True
+        return self.check(action) is None
+
+    def check(self, action) -> Optional[str]:
+        """Name (and reason) of the first rule rejecting ``action``, or ``None`` when every rule allows it."""
+
+        rejected_by = None
+        for entry in self._entries:
+            started = time.perf_counter_ns()
+            ok = entry.rule.allow(action)
+            stats = entry.stats
+            stats.total_ns += time.perf_counter_ns() - started
+            stats.evaluated += 1
+            if not ok:
+                stats.rejected += 1
+                rejected_by = entry.verdict(action)
+                break
+        self._advance(1)
+        return rejected_by
+
+    def allow_many(self, actions: Sequence[Any]) -> List[bool]:
+        return [verdict is None for verdict in self.check_many(actions)]
+
+    def check_many(self, actions: Sequence[Any]) -> List[Optional[str]]:
+        """:meth:`check` for a batch, evaluated rule by rule over the still-allowed actions."""
+
+        verdicts: List[Optional[str]] = [None] * len(actions)
+        pending = list(range(len(actions)))
+        for entry in self._entries:
+            if not pending:
+                break
+            started = time.perf_counter_ns()
+            allowed = entry.allow_many([actions[i] for i in pending])
+            stats = entry.stats
+            stats.total_ns += time.perf_counter_ns() - started
+            stats.evaluated += len(pending)
+            survivors = []
+            for index, ok in zip(pending, allowed):
+                if ok:
+                    survivors.append(index)
+                else:
+                    verdicts[index] = entry.verdict(actions[index])
+            stats.rejected += len(pending) - len(survivors)
+            pending = survivors
+        self._advance(len(actions))
+        return verdicts
+
+    # Ordering and reporting
+    def _advance(self, count: int) -> None:
+        self._since_reorder += count
+        if self.adaptive and self._since_reorder >= self.reorder_every:
+            self.reorder()
+
+    def reorder(self) -> None:
+        self._entries.sort(key=lambda entry: entry.stats.cost_per_reject())
+        self._since_reorder = 0
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            entry.stats.name: {
+                "evaluated": entry.stats.evaluated,
+                "rejected": entry.stats.rejected,
+                "reject_rate": round(entry.stats.reject_rate, 4),
+                "mean_us": round(entry.stats.mean_ns / 1000, 3),
+            }
+            for entry in self._entries
+        }
+
+
+class AllowedSymbols:
+    """Rejects actions for symbols outside the configured set."""
+
+    name = "allowed_symbols"
+
+    def __init__(self, symbols: Iterable[str]) -> None:
+        self.symbols = frozenset(symbols)
+
+    def allow(self, action) -> bool:
+        return getattr(action, "symbol", None) in self.symbols
+
+    def allow_many(self, actions: Sequence[Any]) -> List[bool]:
+        symbols = self.symbols
+        return [getattr(action, "symbol", None) in symbols for action in actions]
+
+
+class MaxOrderNotional:
+    """Rejects priced orders worth more than ``max_quote``; cancels always pass."""
+
+    name = "max_order_notional"
+
+    def __init__(self, max_quote: float) -> None:
+        self.max_quote = float(max_quote)
+
+    def allow(self, action) -> bool:
+        price = getattr(action, "price", None)
+        return price is None or price * getattr(action, "quantity", 0.0) <= self.max_quote
+
+
+__all__ = ["AllowedSymbols", "GuardRule", "MaxOrderNotional", "PolicyGuard", "RuleStats"]
@@ -0,0 +1,179 @@
+"""Array-backed positions and PnL for many symbols.
+
+Every symbol gets an integer id on first sight; quantity, cost basis, realized PnL, fees and the
+last mark live in parallel NumPy arrays indexed by that id, grown by doubling. A fill or a price
+tick writes one slot; revaluing the whole portfolio from a price vector (for example the
+``market_overview`` map) is one vectorized assignment, and every derived column (average price,
+exposure, unrealized PnL) is computed over the arrays on read.
+
+Accounting matches :class:`core.order_store.Position`: quote fees are part of the cost basis,
+base-asset fees reduce the quantity received or delivered.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+_EPS = 1e-12
+_COLUMNS = ("quantity", "cost", "realized", "fees", "mark")
+
+
+class PositionBook:
+    def __init__(self, symbols: Iterable[str] = (), *, capacity: int = 64) -> None:
+        self.symbols: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._capacity = max(1, capacity)
+        self.quantity = np.zeros(self._capacity)
+        self.cost = np.zeros(self._capacity)
+        self.realized = np.zeros(self._capacity)
+        self.fees = np.zeros(self._capacity)
+        self.mark = np.full(self._capacity, np.nan)
+        for symbol in symbols:
+            self.symbol_id(symbol)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def symbol_id(self, symbol: str) -> int:
+        index = self.ids.get(symbol)
+        if index is None:
+            index = self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if index >= self._capacity:
+                self._grow(2 * self._capacity)
+        return index
+
+    def _grow(self, capacity: int) -> None:
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan) if name == "mark" else np.zeros(capacity)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self._capacity = capacity
+
+    # Updates (one slot each)
+    def on_fill(self, fill) -> None:
+        i = self.symbol_id(fill.symbol)
+        fee_in_base = bool(fill.fee_asset) and fill.fee_asset == fill.base_asset
+        quote_fee = 0.0 if fee_in_base else fill.fee
+        self.fees[i] += fill.fee * fill.price if fee_in_base else fill.fee
+        quantity = float(self.quantity[i])
+        if fill.side.upper() == "BUY":
+            self.quantity[i] = quantity + fill.quantity - (fill.fee if fee_in_base else 0.0)
+            self.cost[i] += fill.quantity * fill.price + quote_fee
+        else:
+            cost = float(self.cost[i])
+            sold = min(fill.quantity, quantity)
+            avg = cost / quantity if quantity > _EPS else 0.0
+            self.realized[i] += sold * (fill.price - avg) - quote_fee
+            remaining = quantity - fill.quantity - (fill.fee if fee_in_base else 0.0)
+            if abs(remaining) <= _EPS:
+                self.quantity[i] = self.cost[i] = 0.0
+            else:
+                self.quantity[i] = remaining
+                self.cost[i] = cost - sold * avg
+        if np.isnan(self.mark[i]):
+            self.mark[i] = fill.price
+
+    def on_mark(self, symbol: str, price: float) -> None:
+        self.mark[self.symbol_id(symbol)] = price
+
+    def on_market(self, event) -> None:
+        """Engine market observer: marks at the top-of-book mid."""
+
+        if event.bid and event.ask:
+            self.mark[self.symbol_id(event.symbol)] = (event.bid + event.ask) / 2
+
+    # Whole-portfolio revaluation
+    def revalue(self, prices: Sequence[float] | np.ndarray) -> None:
+        """Set every mark from ``prices`` aligned with symbol ids; ``nan`` keeps the old mark."""
+
+        prices = np.asarray(prices, dtype=np.float64)
+        n = len(self.symbols)
+        if prices.shape != (n,):
+            raise ValueError(f"Expected {n} prices aligned with symbol ids, got shape {prices.shape}")
+        known = ~np.isnan(prices)
+        self.mark[:n][known] = prices[known]
+
+    def revalue_overview(self, overview: Mapping[str, Mapping[str, Optional[float]]]) -> None:
+        """Revalue from a ``BinanceDataService.market_overview()`` map (mid, else last price)."""
+
+        def price(symbol: str) -> float:
+            row = overview.get(symbol)
+            if not row:
+                return np.nan
+            bid, ask = row.get("bid"), row.get("ask")
+            if bid and ask:
+                return (bid + ask) / 2
+            return row.get("last") or np.nan
+
+        self.revalue(np.fromiter((price(symbol) for symbol in self.symbols), dtype=np.float64, count=len(self.symbols)))
+
+    # Derived columns
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Column arrays for the first ``len(self)`` ids; unmarked symbols value at cost."""
+
+        n = len(self.symbols)
+        quantity, cost = self.quantity[:n], self.cost[:n]
+        mark = self.mark[:n]
+        exposure = np.where(np.isnan(mark), cost, quantity * mark)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_price = np.where(np.abs(quantity) > _EPS, cost / quantity, 0.0)
+        return {
+            "quantity": quantity,
+            "avg_price": avg_price,
+            "mark": mark,
+            "exposure": exposure,
+            "unrealized": exposure - cost,
+            "realized": self.realized[:n],
+            "fees": self.fees[:n],
+        }
+
+    def totals(self) -> Dict[str, float]:
+        cols = self.columns()
+        unrealized = float(cols["unrealized"].sum())
+        realized = float(cols["realized"].sum())
+        return {
+            "exposure": float(cols["exposure"].sum()),
+            "unrealized": unrealized,
+            "realized": realized,
+            "fees": float(cols["fees"].sum()),
+            "pnl": realized + unrealized,
+            "open_positions": int((np.abs(cols["quantity"]) > _EPS).sum()),
+        }
+
+    def top(self, count: int = 20, *, by: str = "exposure") -> np.ndarray:
+        """Ids of the ``count`` largest ``|by|`` rows (open positions first) for a PnL panel."""
+
+        values = np.abs(self.columns()[by])
+        order = np.argsort(-values, kind="stable")
+        return order[:count]
+
+    # Persistence
+    def save(self, path: str | Path) -> Path:
+        """Write an ``.npz`` snapshot atomically."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        n = len(self.symbols)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as fh:
+            np.savez(fh, symbols=np.array(self.symbols, dtype=str), **{name: getattr(self, name)[:n] for name in _COLUMNS})
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PositionBook":
+        with np.load(Path(path)) as data:
+            symbols = [str(symbol) for symbol in data["symbols"]]
+            book = cls(symbols, capacity=max(64, len(symbols)))
+            for name in _COLUMNS:
+                getattr(book, name)[: len(symbols)] = data[name]
+        return book
+
+
+__all__ = ["PositionBook"]
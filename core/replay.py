@@ -0,0 +1,326 @@
+"""Deterministic replay of recorded or synthetic market events at a chosen speed.
+
+Events come from the tick recorder (:func:`recorded_events`) or a seeded random walk
+(:func:`synthetic_events`). ``speed`` maps the replayed timeline onto wall time: ``1`` is real
+time, ``100`` is a hundred times faster and ``0`` means as fast as possible. Time inside the
+replay is a :class:`core.clock.SimulatedClock` moved to each event's timestamp, so cooldowns and
+other clock reads see the recorded timeline whatever the speed.
+
+Two consumers:
+
+* :class:`ReplayStream` has the :class:`exchanges.binance.ws.BookTickerStream` interface and
+  delivers bookTicker payloads to ``on_message`` from its own thread, for code that normally
+  sits behind the websocket;
+* :class:`ReplayEngine` drives a :class:`core.engine.TradingEngine` against a
+  :class:`exchanges.paper.PaperExchange` in lockstep: each event is fully processed (decisions,
+  actions, fills and their follow-ups) before the next is published. Without the lockstep the
+  engine's newest-tick coalescing would depend on thread scheduling; with it, the same events and
+  settings produce the same decisions on every run, which :attr:`ReplayReport.digest` checks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from core.clock import SimulatedClock
+from core.events import MarketEvent
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from core.tick_recorder import TickReader
+    from exchanges.binance.models import PairInfo
+
+
+def synthetic_events(
+    symbols: Sequence[str],
+    *,
+    count: int,
+    seed: int = 0,
+    start_ms: int = 1_700_000_000_000,
+    interval_ms: int = 100,
+    start_price: float = 100.0,
+    volatility_bps: float = 5.0,
+    spread_bps: float = 2.0,
+) -> List[MarketEvent]:
+    """Seeded random-walk bookTicker events, round-robin over ``symbols``, ``interval_ms`` apart."""
+
+    rng = random.Random(seed)
+    prices = {symbol: start_price for symbol in symbols}
+    events = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        mid = prices[symbol] = prices[symbol] * (1 + rng.gauss(0, volatility_bps / 10_000))
+        half = mid * spread_bps / 20_000
+        events.append(
+            MarketEvent(
+                symbol=symbol,
+                bid=round(mid - half, 8),
+                ask=round(mid + half, 8),
+                event_time_ms=start_ms + i * interval_ms,
+                bid_qty=round(rng.uniform(0.1, 5), 4),
+                ask_qty=round(rng.uniform(0.1, 5), 4),
+            )
+        )
+    return events
+
+
+def recorded_events(
+    reader: "TickReader", symbols: Iterable[str], start_ms: Optional[int] = None, end_ms: Optional[int] = None
+) -> List[MarketEvent]:
+    """Recorded bookTicker updates of ``symbols``, merged in receive-time order (ties by symbol)."""
+
+    from core.tick_recorder import BOOK_TICKER
+
+    per_symbol = []
+    for symbol in sorted({s.upper() for s in symbols}):
+        records = reader.read(symbol, start_ms, end_ms, kinds=[BOOK_TICKER])
+        per_symbol.append(
+            [
+                MarketEvent(
+                    symbol=symbol,
+                    bid=float(r["price"]) or None,
+                    ask=float(r["price2"]) or None,
+                    event_time_ms=int(r["ts_ms"]),
+                    bid_qty=float(r["qty"]),
+                    ask_qty=float(r["qty2"]),
+                )
+                for r in records
+            ]
+        )
+    return list(heapq.merge(*per_symbol, key=lambda event: event.event_time_ms))
+
+
+def book_ticker_payload(event: MarketEvent, update_id: int = 0) -> Dict[str, Any]:
+    """The multiplexed bookTicker message ``MarketEvent.from_book_ticker`` would parse into ``event``."""
+
+    return {
+        "stream": f"{event.symbol.lower()}@bookTicker",
+        "data": {
+            "u": update_id,
+            "s": event.symbol,
+            "b": repr(event.bid or 0.0),
+            "B": repr(event.bid_qty or 0.0),
+            "a": repr(event.ask or 0.0),
+            "A": repr(event.ask_qty or 0.0),
+            "E": event.event_time_ms,
+        },
+    }
+
+
+class ReplayPacer:
+    """Real seconds to wait before each event so the timeline plays at ``speed`` (0 = no waiting)."""
+
+    def __init__(self, speed: float, *, real: Callable[[], float] = time.perf_counter) -> None:
+        self.speed = speed
+        self.real = real
+        self._origin: Optional[tuple] = None
+
+    def delay(self, event_ms: int) -> float:
+        if self.speed <= 0:
+            return 0.0
+        now = self.real()
+        if self._origin is None:
+            self._origin = (event_ms, now)
+            return 0.0
+        first_ms, started = self._origin
+        return max(0.0, started + (event_ms - first_ms) / 1000 / self.speed - now)
+
+
+class ReplayStream:
+    """``BookTickerStream`` stand-in that plays ``events`` to ``on_message`` from a thread."""
+
+    def __init__(
+        self,
+        events: Sequence[MarketEvent],
+        *,
+        on_message: Callable[[dict], None],
+        on_disconnect: Optional[Callable[[], None]] = None,
+        speed: float = 1.0,
+        clock: Optional[SimulatedClock] = None,
+        logger=None,
+    ) -> None:
+        self.events = events
+        self.symbols = sorted({event.symbol for event in events})
+        self.on_message = on_message
+        self.on_disconnect = on_disconnect
+        self.speed = speed
+        self.clock = clock or SimulatedClock()
+        self.logger = logger
+        self.delivered = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bbot-replay", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        pacer = ReplayPacer(self.speed)
+        try:
+            for update_id, event in enumerate(self.events):
+                wait = pacer.delay(event.event_time_ms or 0)
+                if (wait and self._stop.wait(wait)) or self._stop.is_set():
+                    return
+                self.clock.advance_to((event.event_time_ms or 0) / 1000)
+                try:
+                    self.on_message(book_ticker_payload(event, update_id))
+                except Exception:  # noqa: BLE001
+                    if self.logger:
+                        self.logger.exception("Failed to handle replayed message")
+                self.delivered += 1
+        finally:
+            if self.on_disconnect and not self._stop.is_set():
+                self.on_disconnect()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self._thread is None or not self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(5)
+        self._thread = None
+
+
+@dataclass
+class ReplayReport:
+    events: int
+    elapsed_s: float
+    replayed_span_s: float
+    speed: float
+    decisions: int
+    actions: List[str] = field(default_factory=list)
+    fills: int = 0
+    engine: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def events_per_s(self) -> float:
+        return self.events / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def digest(self) -> str:
+        """Fingerprint of every executed action (with its simulated time) and its outcome."""
+
+        return hashlib.sha256("\n".join(self.actions).encode("utf-8")).hexdigest()[:16]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "events_per_s": round(self.events_per_s, 1),
+            "replayed_span_s": round(self.replayed_span_s, 1),
+            "speed": self.speed or "max",
+            "decisions": self.decisions,
+            "actions": len(self.actions),
+            "fills": self.fills,
+            "digest": self.digest,
+        }
+
+
+class ReplayEngine:
+    def __init__(
+        self,
+        pairs: Sequence["PairInfo"],
+        settings: Dict[str, Any],
+        *,
+        speed: float = 0.0,
+        balances: Optional[Dict[str, float]] = None,
+        logger=None,
+    ) -> None:
+        self.pairs = list(pairs)
+        self.settings = settings
+        self.speed = speed
+        self.balances = balances or {"USDT": 10_000.0}
+        self.logger = logger
+
+    async def replay(self, events: Sequence[MarketEvent]) -> ReplayReport:
+        from core.decision_engine import DecisionEngine
+        from core.engine import TradingEngine
+        from core.events import FillEvent
+        from core.execution_engine import ExecutionEngine
+        from core.policy_guard import PolicyGuard
+        from exchanges.paper import PaperExchange
+
+        first_ms = (events[0].event_time_ms or 0) if events else 0
+        clock = SimulatedClock(first_ms / 1000)
+        paper = PaperExchange(balances=self.balances, logger=self.logger)
+        for pair in self.pairs:
+            paper.add_pair(pair)
+        log: List[str] = []
+
+        def execute(action):
+            report = paper(action)
+            log.append(f"{clock.time_ms()} {action.__class__.__name__} {action.describe()} {report.status()}")
+            return report
+
+        engine = TradingEngine(
+            DecisionEngine(
+                filters={pair.symbol: pair.filters for pair in self.pairs},
+                clock=clock.monotonic,
+                order_ids=itertools.count(1),  # ids restart per replay, so the log is comparable
+            ),
+            ExecutionEngine(policy_guard=PolicyGuard(), executor=execute),
+            settings=self.settings,
+            market_observers=[paper.on_market],
+            logger=self.logger,
+        )
+
+        def on_paper_event(event) -> None:
+            if isinstance(event, FillEvent):
+                engine.submit_execution(event)
+
+        paper.on_event = on_paper_event
+        pacer = ReplayPacer(self.speed)
+        await engine.start()
+        started = time.perf_counter()
+        try:
+            for event in events:
+                wait = pacer.delay(event.event_time_ms or 0)
+                if wait:
+                    await asyncio.sleep(wait)
+                clock.advance_to((event.event_time_ms or 0) / 1000)
+                event.received_at = time.monotonic()  # fresh for the engine's staleness check
+                await engine.put(event)
+                await engine.join()
+        finally:
+            elapsed = time.perf_counter() - started
+            await engine.stop()
+        report = ReplayReport(
+            events=len(events),
+            elapsed_s=elapsed,
+            replayed_span_s=((events[-1].event_time_ms or 0) - first_ms) / 1000 if events else 0.0,
+            speed=self.speed,
+            decisions=engine.counters["decisions"],
+            actions=log,
+            fills=engine.counters["fills"],
+            engine=engine.stats(),
+        )
+        if self.logger:
+            self.logger.info("Replay done: %s", report.summary())
+        return report
+
+    def run(self, events: Sequence[MarketEvent]) -> ReplayReport:
+        return asyncio.run(self.replay(events))
+
+
+__all__ = [
+    "ReplayEngine",
+    "ReplayPacer",
+    "ReplayReport",
+    "ReplayStream",
+    "book_ticker_payload",
+    "recorded_events",
+    "synthetic_events",
+]
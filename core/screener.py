@@ -0,0 +1,345 @@
+"""Rolling per-symbol market metrics over the whole exchange, with top-K queries.
+
+:class:`RollingScreener` consumes the all-market ``!ticker@arr`` stream (one 24h ticker per
+changed symbol per second), optionally per-symbol bookTicker and trade streams, and keeps for
+every symbol, over the last ``window_seconds``:
+
+* ``spread_bps`` - mean quoted spread, in basis points of the mid;
+* ``volatility_bps`` - realized volatility, the root of summed squared log mid returns, in bp;
+* ``volume_trend_pct`` - quote volume of the newer half of the window against the older half;
+* ``trades_per_min`` / ``updates_per_min`` - trade and quote-update activity.
+
+Each symbol owns a ring of ``window_seconds / bucket_seconds`` time buckets plus running totals,
+all in flat ``array('d')`` buffers (numpy views of them do the vectorised recompute). A tick
+adds to the current bucket and the totals; crossing into a new bucket subtracts and clears the
+bucket that falls out. Both are O(1) per tick whatever the window, and the metrics are ratios
+of the totals.
+
+Queries recompute metrics only for rows touched since the last query (or whose window moved on
+without ticks). Top-K answers come from one lazily-invalidated heap per metric and direction: a
+recomputed row pushes a new entry and its older entries are skipped when popped.
+
+The 24h ticker carries best bid/ask and the last trade id, so trades in an interval are exact;
+their quote volume is estimated as trades times the symbol's 24h average trade size. Symbols with
+a trade stream use the traded volume instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+METRICS = ("spread_bps", "volatility_bps", "volume_trend_pct", "trades_per_min", "updates_per_min")
+
+# Fields of a bucket / of the running totals.
+QUOTES, SPREAD, RET2, VOLUME, TRADES = range(5)
+_FIELDS = 5
+
+
+class RollingScreener:
+    def __init__(
+        self,
+        *,
+        window_seconds: float = 300,
+        bucket_seconds: float = 5,
+        capacity: int = 4096,
+        clock: Callable[[], float] = time.time,
+        logger=None,
+    ) -> None:
+        if bucket_seconds <= 0 or window_seconds < 2 * bucket_seconds:
+            raise ValueError("window_seconds must cover at least two buckets")
+        self.window_seconds = float(window_seconds)
+        self.bucket_seconds = float(bucket_seconds)
+        self.buckets = int(round(window_seconds / bucket_seconds))
+        self.recent_buckets = self.buckets // 2
+        self.clock = clock
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        # Per-row scalars stay in lists: read and written on every tick.
+        self._bucket: List[int] = []
+        self._first: List[int] = []
+        self._mid: List[float] = []
+        self._trade_id: List[int] = []
+        self._has_trades: List[bool] = []
+        self._slots = array("d")  # row-major [row][bucket][field]
+        self._totals = array("d")  # [row][field]
+        self._recent = array("d")  # quote volume of the newer half, per row
+        self._values = np.empty((0, len(METRICS)))
+        self._versions = np.empty(0, dtype=np.int64)
+        self._allocate(capacity)
+        self._dirty: set = set()
+        self._heaps: Dict[Tuple[str, bool], list] = {}
+        self.messages = 0
+        self.ticks = 0
+        self.recomputed = 0
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    def _allocate(self, capacity: int) -> None:
+        grow = capacity - len(self._bucket)
+        # Scalar reads and writes on array('d') are several times cheaper than on numpy arrays.
+        self._slots += array("d", bytes(8 * grow * self.buckets * _FIELDS))
+        self._totals += array("d", bytes(8 * grow * _FIELDS))
+        self._recent += array("d", bytes(8 * grow))
+        self._values = np.concatenate((self._values, np.full((grow, len(METRICS)), np.nan)))
+        self._versions = np.concatenate((self._versions, np.zeros(grow, dtype=np.int64)))
+        self._bucket += [-1] * grow
+        self._first += [-1] * grow
+        self._mid += [0.0] * grow
+        self._trade_id += [-1] * grow
+        self._has_trades += [False] * grow
+
+    def _row(self, symbol: str) -> int:
+        row = self._rows.get(symbol)
+        if row is None:
+            row = self._rows[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            if row >= len(self._bucket):
+                self._allocate(2 * len(self._bucket))
+        return row
+
+    # Window
+    def _advance(self, row: int, bucket: int) -> bool:
+        """Move ``row``'s window forward to ``bucket``, evicting the buckets that fall out.
+
+        Returns whether the row's metrics can have changed: data left the window or its newer
+        half, or the window is still filling (rates are per covered minute).
+        """
+
+        current = self._bucket[row]
+        if current < 0:
+            self._bucket[row] = self._first[row] = bucket
+            return True
+        slots, totals, n = self._slots, self._totals, self.buckets
+        base, t = row * n * _FIELDS, row * _FIELDS
+        changed = current - self._first[row] + 1 < n
+        if bucket - current >= n:
+            changed = changed or any(totals[t : t + _FIELDS])
+            slots[base : base + n * _FIELDS] = array("d", bytes(8 * n * _FIELDS))
+            totals[t : t + _FIELDS] = array("d", bytes(8 * _FIELDS))
+            self._recent[row] = 0.0
+        else:
+            for b in range(current + 1, bucket + 1):
+                # Bucket b - recent_buckets leaves the newer half; bucket b - buckets leaves the window.
+                leaving = slots[base + (b - self.recent_buckets) % n * _FIELDS + VOLUME]
+                if leaving:
+                    self._recent[row] -= leaving
+                    changed = True
+                i = base + b % n * _FIELDS
+                for f in range(_FIELDS):
+                    if slots[i + f]:
+                        totals[t + f] -= slots[i + f]
+                        slots[i + f] = 0.0
+                        changed = True
+        self._bucket[row] = bucket
+        return changed
+
+    def _tick(self, row: int, ts: float, bid: float, ask: float, volume: float, trades: float) -> None:
+        bucket = int(ts // self.bucket_seconds)
+        if bucket > self._bucket[row]:
+            self._advance(row, bucket)
+        # Late messages count towards the current bucket.
+        slots, totals = self._slots, self._totals
+        i = (row * self.buckets + self._bucket[row] % self.buckets) * _FIELDS
+        t = row * _FIELDS
+        if bid > 0 and ask >= bid:
+            mid = (bid + ask) / 2
+            spread = (ask - bid) / mid * 10_000
+            slots[i + QUOTES] += 1
+            slots[i + SPREAD] += spread
+            totals[t + QUOTES] += 1
+            totals[t + SPREAD] += spread
+            last = self._mid[row]
+            if last > 0 and mid != last:
+                r2 = math.log(mid / last) ** 2
+                slots[i + RET2] += r2
+                totals[t + RET2] += r2
+            self._mid[row] = mid
+        if trades:
+            slots[i + VOLUME] += volume
+            slots[i + TRADES] += trades
+            totals[t + VOLUME] += volume
+            totals[t + TRADES] += trades
+            self._recent[row] += volume
+        self._dirty.add(row)
+        self.ticks += 1
+
+    # Input
+    def update(
+        self,
+        symbol: str,
+        *,
+        bid: float = 0.0,
+        ask: float = 0.0,
+        volume: float = 0.0,
+        trades: float = 0.0,
+        ts: Optional[float] = None,
+    ) -> None:
+        """Add one observation: a quote (``bid``/``ask``) and/or ``trades`` worth ``volume`` quote."""
+
+        with self._lock:
+            self._tick(self._row(symbol), self.clock() if ts is None else ts, bid, ask, volume, trades)
+
+    def on_message(self, payload) -> None:
+        """Stream callback for ``!ticker@arr``, bookTicker, trade and aggTrade messages."""
+
+        self.messages += 1
+        if isinstance(payload, dict) and "data" in payload:
+            payload = payload["data"]
+        try:
+            with self._lock:
+                if isinstance(payload, list):
+                    for item in payload:
+                        self._on_item(item)
+                elif isinstance(payload, dict):
+                    self._on_item(payload)
+        except (KeyError, TypeError, ValueError):
+            self._log("debug", "Screener skipped malformed message: %s", str(payload)[:200])
+
+    def _on_item(self, item: dict) -> None:
+        kind = item.get("e")
+        if kind == "24hrTicker":
+            row = self._row(item["s"])
+            last_id = int(item.get("L", -1))
+            previous, self._trade_id[row] = self._trade_id[row], last_id
+            trades = last_id - previous if previous >= 0 and last_id > previous else 0
+            volume = 0.0
+            if trades and not self._has_trades[row]:
+                count = int(item.get("n") or 0)
+                volume = trades * float(item.get("q") or 0) / count if count else 0.0
+            elif self._has_trades[row]:
+                trades = 0
+            self._tick(row, int(item["E"]) / 1000, float(item.get("b") or 0), float(item.get("a") or 0), volume, trades)
+        elif kind in ("trade", "aggTrade"):
+            row = self._row(item["s"])
+            self._has_trades[row] = True
+            trades = int(item["l"]) - int(item["f"]) + 1 if kind == "aggTrade" else 1
+            self._tick(row, int(item.get("T") or item["E"]) / 1000, 0.0, 0.0, float(item["p"]) * float(item["q"]), trades)
+        elif kind is None and "u" in item and "b" in item:
+            self._tick(self._row(item["s"]), self.clock(), float(item["b"]), float(item["a"]), 0.0, 0)
+
+    # Queries
+    def _refresh(self) -> None:
+        """Recompute metrics of the rows that changed; push them into the live heaps."""
+
+        now = int(self.clock() // self.bucket_seconds)
+        for row, bucket in enumerate(self._bucket[: len(self._symbols)]):
+            if 0 <= bucket < now and self._advance(row, now):
+                self._dirty.add(row)
+        if not self._dirty:
+            return
+        rows = np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty))
+        self._dirty.clear()
+        totals = np.frombuffer(self._totals).reshape(-1, _FIELDS)[rows]
+        quotes, volume = totals[:, QUOTES], totals[:, VOLUME]
+        recent = np.clip(np.frombuffer(self._recent)[rows], 0, None)
+        older = volume - recent
+        buckets = np.array([self._bucket[r] - self._first[r] + 1 for r in rows], dtype=float)
+        minutes = np.minimum(buckets, self.buckets) * self.bucket_seconds / 60
+        # Scale the older half when the window is still filling, so a young symbol is not "trending".
+        older_buckets = np.clip(np.minimum(buckets, self.buckets) - self.recent_buckets, 0, None)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.column_stack(
+                (
+                    np.where(quotes > 0, totals[:, SPREAD] / quotes, np.nan),
+                    np.where(quotes > 1, np.sqrt(np.clip(totals[:, RET2], 0, None)) * 10_000, np.nan),
+                    np.where(
+                        (older > 0) & (older_buckets > 0),
+                        (recent / self.recent_buckets) / (older / older_buckets) * 100 - 100,
+                        np.nan,
+                    ),
+                    totals[:, TRADES] / minutes,
+                    quotes / minutes,
+                )
+            )
+        self._values[rows] = values
+        self._versions[rows] += 1
+        self.recomputed += len(rows)
+        for (metric, ascending), heap in self._heaps.items():
+            column = METRICS.index(metric)
+            if len(heap) > 4 * len(self._symbols) + 1024:
+                self._heaps[(metric, ascending)] = self._build_heap(column, ascending)
+                continue
+            for row, value in zip(rows.tolist(), values[:, column].tolist()):
+                if value == value:  # not NaN
+                    heapq.heappush(heap, (value if ascending else -value, self._symbols[row], row, int(self._versions[row])))
+
+    def _build_heap(self, column: int, ascending: bool) -> list:
+        heap = [
+            (value if ascending else -value, symbol, row, int(self._versions[row]))
+            for row, (symbol, value) in enumerate(zip(self._symbols, self._values[: len(self._symbols), column].tolist()))
+            if value == value
+        ]
+        heapq.heapify(heap)
+        return heap
+
+    def top(
+        self, metric: str, k: int, *, ascending: bool = False, symbols: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """The ``k`` symbols with the highest (or lowest) ``metric``, optionally among ``symbols``."""
+
+        column = METRICS.index(metric)
+        with self._lock:
+            self._refresh()
+            if symbols is not None:
+                rows = [self._rows[s] for s in symbols if s in self._rows]
+                if len(rows) < len(self._symbols) // 2:
+                    # A narrow selection: a bounded heap over just those rows beats draining the big one.
+                    values = self._values[:, column]
+                    picked = (heapq.nsmallest if ascending else heapq.nlargest)(
+                        k, (r for r in rows if values[r] == values[r]), key=lambda r: values[r]
+                    )
+                    return [(self._symbols[r], float(values[r])) for r in picked]
+                allowed = set(rows)
+            key = (metric, ascending)
+            heap = self._heaps.get(key)
+            if heap is None:
+                heap = self._heaps[key] = self._build_heap(column, ascending)
+            result: List[Tuple[str, float]] = []
+            popped = []
+            while heap and len(result) < k:
+                entry = heapq.heappop(heap)
+                value, symbol, row, version = entry
+                if version != self._versions[row]:
+                    continue  # superseded by a newer entry of the same row
+                popped.append(entry)
+                if symbols is None or row in allowed:
+                    result.append((symbol, value if ascending else -value))
+            for entry in popped:
+                heapq.heappush(heap, entry)
+            return result
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """Current metrics per symbol (``None`` where a metric has no data yet)."""
+
+        with self._lock:
+            self._refresh()
+            names = self._symbols if symbols is None else [s for s in symbols if s in self._rows]
+            out = {}
+            for symbol in names:
+                row = self._values[self._rows[symbol]].tolist()
+                out[symbol] = {metric: (value if value == value else None) for metric, value in zip(METRICS, row)}
+            return out
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "symbols": len(self._symbols),
+            "messages": self.messages,
+            "ticks": self.ticks,
+            "recomputed": self.recomputed,
+            "pending": len(self._dirty),
+            "heap_entries": sum(len(heap) for heap in self._heaps.values()),
+        }
+
+
+__all__ = ["METRICS", "RollingScreener"]
@@ -0,0 +1,142 @@
+"""Opt-in cold-start profiler: import times and startup phase timings.
+
+Enabled with ``python main.py --profile-startup`` (or ``BBOT_PROFILE_STARTUP=1``). Only the
+standard library is imported here so the profiler can be installed before anything heavy.
+"""
+
+from __future__ import annotations
+
+import importlib.abc
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "BBOT_PROFILE_STARTUP"
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, name: str, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler._enter_import(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(self._name)
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Wraps the loaders found by the rest of ``sys.meta_path`` with timing."""
+
+    def __init__(self, profiler: "StartupProfiler") -> None:
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, fullname, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """Collects ``-X importtime``-style self/cumulative import times and named phases."""
+
+    def __init__(self, *, enabled: bool = True, report_path: Path = Path("logs/startup_profile.txt")) -> None:
+        self.enabled = enabled
+        self.report_path = report_path
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []
+        self.marks: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        self._stack: List[List[float]] = []
+        self._finder: Optional[_TimingFinder] = None
+        self.finished = False
+
+    @classmethod
+    def from_args(cls, argv: Sequence[str]) -> "StartupProfiler":
+        enabled = PROFILE_FLAG in argv or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+        profiler = cls(enabled=enabled)
+        if enabled:
+            profiler.install_import_hook()
+        return profiler
+
+    def install_import_hook(self) -> None:
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self) -> None:
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def _enter_import(self, name: str) -> None:
+        # [start, time spent in nested imports]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit_import(self, name: str) -> None:
+        start, nested = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        self.imports[name] = (cumulative - nested, cumulative)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started, time.perf_counter() - start))
+
+    def mark(self, name: str) -> None:
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self, top: int = 30) -> str:
+        lines = ["BBOT startup profile", ""]
+        lines.append(f"{'phase':<32}{'start ms':>10}{'took ms':>10}")
+        for name, offset, took in self.phases:
+            lines.append(f"{name:<32}{offset * 1000:>10.1f}{took * 1000:>10.1f}")
+        for name, offset in self.marks:
+            lines.append(f"{'@ ' + name:<32}{offset * 1000:>10.1f}")
+        total_import = sum(self_time for self_time, _ in self.imports.values())
+        lines += ["", f"imports: {len(self.imports)} modules, {total_import * 1000:.1f}ms self time", ""]
+        lines.append(f"{'module':<48}{'self ms':>10}{'cum ms':>10}")
+        ranked = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        for name, (self_time, cumulative) in ranked:
+            lines.append(f"{name:<48}{self_time * 1000:>10.1f}{cumulative * 1000:>10.1f}")
+        return "\n".join(lines) + "\n"
+
+    def finish(self) -> Optional[Path]:
+        """Stop collecting and write the report once; returns its path when enabled."""
+
+        if not self.enabled or self.finished:
+            return None
+        self.finished = True
+        self.remove_import_hook()
+        self.mark("report written")
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(self.report(), encoding="utf-8")
+        return self.report_path
@@ -0,0 +1,464 @@
+"""Append-only recorder of market streams (bookTicker, trades, depth) into per-symbol day segments.
+
+Stream callbacks only enqueue the raw message with its receive time (:meth:`TickRecorder.record`);
+one writer thread parses each batch into fixed-width 64-byte records (:data:`RECORD_DTYPE`) and
+appends them to ``data/ticks/<SYMBOL>/<YYYYMMDD>.<part>.ticks``. A segment rotates at the UTC day
+boundary or at ``max_segment_bytes``; rotated segments are packed on a second thread into
+``.tickz`` files: blocks of ``block_records`` records, byte-shuffled and zlib-compressed, followed
+by a time index (min/max receive time, offset, length per block) and a footer.
+
+:class:`TickReader` memory-maps segments: an open ``.ticks`` file is filtered in place, and for a
+``.tickz`` file only the blocks whose index range overlaps the query are decompressed.
+
+Record fields by kind:
+
+* ``BOOK_TICKER``: ``price``/``qty`` = best bid, ``price2``/``qty2`` = best ask, ``seq`` = update id
+* ``TRADE``: ``price``/``qty``, ``seq`` = trade id, ``flags`` has ``FLAG_BUYER_MAKER``
+* ``DEPTH``: one record per price level, ``FLAG_ASK`` for the ask side, ``FLAG_SNAPSHOT`` for
+  partial-book snapshots (``@depth5``...), else a diff (``@depth``); ``seq`` = final update id
+"""
+
+from __future__ import annotations
+
+import calendar
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TICKS_DIR = Path("data") / "ticks"
+RAW_SUFFIX = ".ticks"
+PACKED_SUFFIX = ".tickz"
+
+BOOK_TICKER, TRADE, DEPTH = 1, 2, 3
+KINDS = {"bookTicker": BOOK_TICKER, "trade": TRADE, "depth": DEPTH}
+FLAG_ASK = 1
+FLAG_BUYER_MAKER = 1
+FLAG_SNAPSHOT = 2
+
+RECORD_DTYPE = np.dtype(
+    {
+        "names": ["ts_ms", "event_ms", "seq", "kind", "flags", "price", "qty", "price2", "qty2"],
+        "formats": ["<i8", "<i8", "<i8", "u1", "u1", "<f8", "<f8", "<f8", "<f8"],
+        "offsets": [0, 8, 16, 24, 25, 32, 40, 48, 56],
+        "itemsize": 64,
+    }
+)
+INDEX_DTYPE = np.dtype(
+    [("min_ts", "<i8"), ("max_ts", "<i8"), ("offset", "<u8"), ("length", "<u4"), ("count", "<u4")]
+)
+_HEAD = struct.Struct("<4sHHI")  # magic, version, record size, records per block
+_FOOT = struct.Struct("<QI4s")  # index offset, block count, magic
+_MAGIC, _INDEX_MAGIC, _VERSION = b"BBTZ", b"BBTI", 1
+_DAY_MS = 86_400_000
+
+Row = Tuple[int, int, int, int, int, float, float, float, float]
+
+
+def _levels(levels, received_ms: int, event_ms: int, seq: int, flags: int) -> List[Row]:
+    return [(received_ms, event_ms, seq, DEPTH, flags, float(p), float(q), 0.0, 0.0) for p, q in levels]
+
+
+def parse_message(payload: Dict, received_ms: int) -> Tuple[Optional[str], List[Row]]:
+    """Symbol and record rows for one stream message (raw or multiplexed); ``(None, [])`` if unknown."""
+
+    data = payload.get("data", payload)
+    if not isinstance(data, dict):
+        return None, []
+    event = data.get("e")
+    if event == "trade":
+        flags = FLAG_BUYER_MAKER if data.get("m") else 0
+        row = (received_ms, data.get("T") or data.get("E") or 0, data.get("t", 0), TRADE, flags, float(data["p"]), float(data["q"]), 0.0, 0.0)
+        return data["s"], [row]
+    if event == "depthUpdate":
+        event_ms, seq = data.get("E", 0), data.get("u", 0)
+        rows = _levels(data.get("b", ()), received_ms, event_ms, seq, 0)
+        return data["s"], rows + _levels(data.get("a", ()), received_ms, event_ms, seq, FLAG_ASK)
+    if "lastUpdateId" in data:
+        # Partial book depth carries no symbol; the multiplexed stream name does.
+        symbol = payload.get("stream", "").split("@", 1)[0].upper() or None
+        seq = data["lastUpdateId"]
+        rows = _levels(data.get("bids", ()), received_ms, 0, seq, FLAG_SNAPSHOT)
+        return symbol, rows + _levels(data.get("asks", ()), received_ms, 0, seq, FLAG_SNAPSHOT | FLAG_ASK)
+    if "b" in data and "a" in data and data.get("s"):
+        row = (received_ms, data.get("E", 0), data.get("u", 0), BOOK_TICKER, 0, float(data["b"]), float(data.get("B") or 0), float(data["a"]), float(data.get("A") or 0))
+        return data["s"], [row]
+    return None, []
+
+
+def _day(ts_ms: int) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(ts_ms // 1000))
+
+
+def _day_start_ms(day: str) -> int:
+    return calendar.timegm(time.strptime(day, "%Y%m%d")) * 1000
+
+
+def _shuffle(block: np.ndarray) -> bytes:
+    # Byte-plane order: the slowly changing high bytes of prices and timestamps end up in long runs.
+    return block.view(np.uint8).reshape(-1, RECORD_DTYPE.itemsize).T.tobytes()
+
+
+def _unshuffle(raw: bytes, count: int) -> np.ndarray:
+    planes = np.frombuffer(raw, np.uint8).reshape(RECORD_DTYPE.itemsize, count)
+    return planes.T.copy().view(RECORD_DTYPE).reshape(count)
+
+
+def _concat(parts: List[np.ndarray]) -> np.ndarray:
+    # np.concatenate would promote to a packed dtype and drop the 64-byte layout.
+    out = np.empty(sum(len(part) for part in parts), RECORD_DTYPE)
+    at = 0
+    for part in parts:
+        out[at : at + len(part)] = part
+        at += len(part)
+    return out
+
+
+def compress_segment(path: Path, *, block_records: int = 4096, level: int = 6) -> Optional[Path]:
+    """Pack a rotated ``.ticks`` segment into an indexed ``.tickz`` file (atomically) and delete it."""
+
+    count = path.stat().st_size // RECORD_DTYPE.itemsize
+    if count == 0:
+        path.unlink()
+        return None
+    records = np.fromfile(path, dtype=RECORD_DTYPE, count=count)
+    out = path.with_suffix(PACKED_SUFFIX)
+    tmp = out.with_name(out.name + ".tmp")
+    starts = range(0, count, block_records)
+    index = np.zeros(len(starts), INDEX_DTYPE)
+    with tmp.open("wb") as fh:
+        fh.write(_HEAD.pack(_MAGIC, _VERSION, RECORD_DTYPE.itemsize, block_records))
+        for i, start in enumerate(starts):
+            block = records[start : start + block_records]
+            packed = zlib.compress(_shuffle(block), level)
+            ts = block["ts_ms"]
+            index[i] = (ts.min(), ts.max(), fh.tell(), len(packed), len(block))
+            fh.write(packed)
+        index_offset = fh.tell()
+        fh.write(index.tobytes())
+        fh.write(_FOOT.pack(index_offset, len(index), _INDEX_MAGIC))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, out)
+    path.unlink()
+    return out
+
+
+@dataclass
+class _Segment:
+    path: Path
+    day: str
+    part: int
+    size: int
+
+
+class TickRecorder:
+    def __init__(
+        self,
+        root: Path = TICKS_DIR,
+        *,
+        flush_interval_ms: int = 250,
+        queue_size: int = 200_000,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        block_records: int = 4096,
+        compress: bool = True,
+        max_open_files: int = 128,
+        clock: Callable[[], float] = time.time,
+        logger=None,
+    ) -> None:
+        self.root = Path(root)
+        self.flush_interval_s = flush_interval_ms / 1000
+        self.queue_size = queue_size
+        self.max_segment_bytes = max_segment_bytes
+        self.block_records = block_records
+        self.compress = compress
+        self.max_open_files = max_open_files
+        self.clock = clock
+        self.logger = logger
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.malformed = 0
+        self.bytes_written = 0
+        self.rotated = 0
+        self.compressed = 0
+        self._pending: Deque[Tuple[Dict, float]] = deque()
+        self._segments: Dict[str, _Segment] = {}
+        self._handles: "OrderedDict[str, IO[bytes]]" = OrderedDict()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._packer: Optional[ThreadPoolExecutor] = None
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    # Hot path
+    def record(self, payload: Dict) -> None:
+        """Stream callback: enqueue only; parsing and I/O happen on the writer thread."""
+
+        self.received += 1
+        if len(self._pending) >= self.queue_size:
+            self.dropped += 1
+            return
+        self._pending.append((payload, self.clock()))
+
+    # Writer
+    def start(self) -> "TickRecorder":
+        if self._thread is not None:
+            return self
+        self.root.mkdir(parents=True, exist_ok=True)
+        if self.compress:
+            self._packer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bbot-tick-pack")
+            # Segments left raw by an earlier run (crash, or stopped before midnight).
+            today = _day(int(self.clock() * 1000))
+            for path in sorted(self.root.glob(f"*/*{RAW_SUFFIX}")):
+                if path.name[:8] < today:
+                    self._pack(path)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bbot-tick-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            for fh in self._handles.values():
+                fh.close()
+            self._handles.clear()
+        if self._packer is not None:
+            self._packer.shutdown(wait=True)
+            self._packer = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001 - keep recording; the next batch may succeed
+                if self.logger:
+                    self.logger.exception("Tick recorder write failed")
+
+    def flush(self) -> int:
+        """Parse and write everything queued so far; returns the number of records written."""
+
+        with self._write_lock:
+            pending = self._pending
+            batch = [pending.popleft() for _ in range(len(pending))]
+            if not batch:
+                return 0
+            rows: Dict[str, List[Row]] = {}
+            for payload, received in batch:
+                try:
+                    symbol, parsed = parse_message(payload, int(received * 1000))
+                except (KeyError, TypeError, ValueError):
+                    self.malformed += 1
+                    continue
+                if not symbol:
+                    self.malformed += 1
+                    continue
+                rows.setdefault(symbol.upper(), []).extend(parsed)
+            written = 0
+            for symbol, symbol_rows in rows.items():
+                records = np.array(symbol_rows, dtype=RECORD_DTYPE)
+                days = records["ts_ms"] // _DAY_MS
+                if days[0] == days[-1] and (days == days[0]).all():
+                    self._append(symbol, records)
+                else:
+                    for day in np.unique(days):
+                        self._append(symbol, records[days == day])
+                written += len(records)
+            self.written += written
+            return written
+
+    def _append(self, symbol: str, records: np.ndarray) -> None:
+        day = _day(int(records["ts_ms"][0]))
+        segment = self._segments.get(symbol) or self._resume(symbol, day)
+        if segment.day != day or segment.size >= self.max_segment_bytes:
+            self._rotate(symbol, segment)
+            part = segment.part + 1 if segment.day == day else self._next_part(symbol, day)
+            segment = self._segments[symbol] = _Segment(self.root / symbol / f"{day}.{part:03d}{RAW_SUFFIX}", day, part, 0)
+        data = records.tobytes()
+        fh = self._handle(symbol, segment)
+        fh.write(data)
+        fh.flush()  # one write per symbol per batch; readers see whole batches
+        segment.size += len(data)
+        self.bytes_written += len(data)
+
+    def _next_part(self, symbol: str, day: str) -> int:
+        parts = [int(path.name.split(".")[1]) for path in (self.root / symbol).glob(f"{day}.*.tick*")]
+        return max(parts) + 1 if parts else 0
+
+    def _resume(self, symbol: str, day: str) -> _Segment:
+        """First write for ``symbol`` in this run: continue today's last part if it is still raw."""
+
+        folder = self.root / symbol
+        folder.mkdir(parents=True, exist_ok=True)
+        part = self._next_part(symbol, day)
+        last = folder / f"{day}.{part - 1:03d}{RAW_SUFFIX}"
+        if part and last.exists():
+            size = last.stat().st_size
+            if size % RECORD_DTYPE.itemsize:
+                # Torn trailing record from a crash mid-write.
+                size -= size % RECORD_DTYPE.itemsize
+                os.truncate(last, size)
+            segment = _Segment(last, day, part - 1, size)
+        else:
+            segment = _Segment(folder / f"{day}.{part:03d}{RAW_SUFFIX}", day, part, 0)
+        self._segments[symbol] = segment
+        return segment
+
+    def _handle(self, symbol: str, segment: _Segment) -> IO[bytes]:
+        fh = self._handles.get(symbol)
+        if fh is not None and fh.name == str(segment.path):
+            self._handles.move_to_end(symbol)
+            return fh
+        if fh is not None:
+            fh.close()
+        elif len(self._handles) >= self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        fh = self._handles[symbol] = segment.path.open("ab")
+        return fh
+
+    def _rotate(self, symbol: str, segment: _Segment) -> None:
+        fh = self._handles.pop(symbol, None)
+        if fh is not None:
+            fh.close()
+        self.rotated += 1
+        if self.compress and segment.path.exists():
+            self._pack(segment.path)
+
+    def _pack(self, path: Path) -> None:
+        if self._packer is None:
+            return
+
+        def job() -> None:
+            try:
+                compress_segment(path, block_records=self.block_records)
+                self.compressed += 1
+            except Exception:  # noqa: BLE001 - the raw segment stays readable
+                if self.logger:
+                    self.logger.exception("Failed to compress tick segment %s", path)
+
+        self._packer.submit(job)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "queued": len(self._pending),
+            "dropped": self.dropped,
+            "malformed": self.malformed,
+            "bytes_written": self.bytes_written,
+            "rotated": self.rotated,
+            "compressed": self.compressed,
+            "open_files": len(self._handles),
+        }
+
+
+class TickReader:
+    """Time-range reads over recorded segments; ``start_ms``/``end_ms`` bound the receive time."""
+
+    def __init__(self, root: Path = TICKS_DIR) -> None:
+        self.root = Path(root)
+        self.blocks_read = 0
+
+    def symbols(self) -> List[str]:
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir()) if self.root.exists() else []
+
+    def segments(self, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Path]:
+        folder = self.root / symbol.upper()
+        if not folder.exists():
+            return []
+        found: Dict[Tuple[str, int], Path] = {}
+        for path in folder.iterdir():
+            if path.suffix not in (RAW_SUFFIX, PACKED_SUFFIX):
+                continue
+            day, part = path.name.split(".")[:2]
+            day_start = _day_start_ms(day)
+            if (end_ms is not None and day_start >= end_ms) or (start_ms is not None and day_start + _DAY_MS <= start_ms):
+                continue
+            # A packed file wins over a raw one of the same part (packing finished, unlink pending).
+            if path.suffix == PACKED_SUFFIX or (day, int(part)) not in found:
+                found[(day, int(part))] = path
+        return [found[key] for key in sorted(found)]
+
+    def read(
+        self,
+        symbol: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        *,
+        kinds: Optional[Iterable[int]] = None,
+    ) -> np.ndarray:
+        lo = -(2**63) if start_ms is None else start_ms
+        hi = 2**63 - 1 if end_ms is None else end_ms
+        parts = []
+        for path in self.segments(symbol, start_ms, end_ms):
+            records = self._read_packed(path, lo, hi) if path.suffix == PACKED_SUFFIX else self._read_raw(path, lo, hi)
+            if kinds is not None and len(records):
+                records = records[np.isin(records["kind"], list(kinds))]
+            parts.append(records)
+        return _concat(parts)
+
+    @staticmethod
+    def _select(records: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        ts = records["ts_ms"]
+        return records[(ts >= lo) & (ts < hi)]
+
+    def _read_raw(self, path: Path, lo: int, hi: int) -> np.ndarray:
+        count = path.stat().st_size // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, RECORD_DTYPE)
+        with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            records = np.frombuffer(mm, RECORD_DTYPE, count=count)
+            selected = self._select(records, lo, hi)  # boolean indexing copies out of the map
+            del records
+        return selected
+
+    def _read_packed(self, path: Path, lo: int, hi: int) -> np.ndarray:
+        with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, _version, record_size, _block = _HEAD.unpack_from(mm, 0)
+            index_offset, blocks, index_magic = _FOOT.unpack_from(mm, len(mm) - _FOOT.size)
+            if magic != _MAGIC or index_magic != _INDEX_MAGIC or record_size != RECORD_DTYPE.itemsize:
+                raise ValueError(f"Not a tick segment: {path}")
+            index = np.frombuffer(mm, INDEX_DTYPE, count=blocks, offset=index_offset).copy()
+            wanted = np.flatnonzero((index["max_ts"] >= lo) & (index["min_ts"] < hi))
+            parts = []
+            for i in wanted:
+                entry = index[i]
+                start = int(entry["offset"])
+                block = _unshuffle(zlib.decompress(mm[start : start + int(entry["length"])]), int(entry["count"]))
+                parts.append(self._select(block, lo, hi))
+            self.blocks_read += len(wanted)
+        return _concat(parts)
+
+
+__all__ = [
+    "BOOK_TICKER",
+    "DEPTH",
+    "FLAG_ASK",
+    "FLAG_BUYER_MAKER",
+    "FLAG_SNAPSHOT",
+    "KINDS",
+    "RECORD_DTYPE",
+    "TRADE",
+    "TickReader",
+    "TickRecorder",
+    "compress_segment",
+    "parse_message",
+]
@@ -1,9 +1,32 @@
-"""Binance exchange integration with strict API-backed data."""
+"""Binance exchange integration with strict API-backed data.
 
-from .http_client import BinanceHttpClient
-from .models import FeeFreeFlag, MarketSnapshot, PairFilters, PairInfo
-from .service import BinanceDataService
-from .ws import BookTickerStream
+Submodules are imported on first attribute access so that importing the lightweight
+models does not pull in ``requests`` or ``python-binance``.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from .http_client import BinanceHttpClient
+    from .models import FeeFreeFlag, MarketSnapshot, PairFilters, PairInfo
+    from .quantizer import Quantizer
+    from .service import BinanceDataService
+    from .ws import BookTickerStream, MultiBookTickerStream
+
+_LAZY_EXPORTS = {
+    "BinanceHttpClient": ".http_client",
+    "FeeFreeFlag": ".models",
+    "MarketSnapshot": ".models",
+    "PairFilters": ".models",
+    "PairInfo": ".models",
+    "Quantizer": ".quantizer",
+    "BinanceDataService": ".service",
+    "BookTickerStream": ".ws",
+    "MultiBookTickerStream": ".ws",
+}
 
 __all__ = [
     "BinanceHttpClient",
@@ -11,6 +34,17 @@ __all__ = [
     "MarketSnapshot",
     "PairFilters",
     "PairInfo",
+    "Quantizer",
     "BinanceDataService",
     "BookTickerStream",
+    "MultiBookTickerStream",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,11 +1,84 @@
 from __future__ import annotations
 
-import time
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Callable, Dict, Optional
 
 import requests
 
+from core.clock import SYSTEM_CLOCK, Clock
+
 DEFAULT_TIMEOUT = 10
+# Spot REST request weights (per minute, per IP) for the endpoints used here; unknown paths weigh 1.
+ENDPOINT_WEIGHTS = {
+    "/api/v3/exchangeInfo": 20,
+    "/api/v3/klines": 2,
+    "/sapi/v1/asset/tradeFee": 1,
+}
+# (one symbol, whole market) weights of endpoints whose ``symbol`` parameter is optional.
+SYMBOL_OPTIONAL_WEIGHTS = {
+    "/api/v3/ticker/24hr": (2, 80),
+    "/api/v3/ticker/bookTicker": (2, 4),
+}
+
+
+def request_weight(path: str, params: Optional[Dict[str, Any]] = None) -> int:
+    if path in SYMBOL_OPTIONAL_WEIGHTS:
+        single, market = SYMBOL_OPTIONAL_WEIGHTS[path]
+        return single if params and params.get("symbol") else market
+    return ENDPOINT_WEIGHTS.get(path, 1)
+
+
+class WeightBudget:
+    """Thread-safe token bucket over the per-minute REST request weight.
+
+    Shared by every caller of one :class:`BinanceHttpClient` (all pair bots of a process), so
+    they draw from one budget instead of each assuming the full limit. ``limit`` is kept below
+    the exchange's 6000/min by default; the ``X-MBX-USED-WEIGHT-1M`` response header re-syncs
+    the bucket with what the exchange has counted.
+    """
+
+    def __init__(
+        self,
+        limit: int = 4800,
+        *,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = SYSTEM_CLOCK.monotonic,
+        sleep: Callable[[float], None] = SYSTEM_CLOCK.sleep,
+    ) -> None:
+        self.limit = limit
+        self.rate = limit / window_seconds
+        self.clock = clock
+        self.sleep = sleep
+        self.available = float(limit)
+        self.waited_seconds = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.available = min(float(self.limit), self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, weight: int) -> float:
+        """Take ``weight`` and return how long the caller must wait before sending (0 if none)."""
+
+        with self._lock:
+            self._refill(self.clock())
+            self.available -= weight
+            wait = -self.available / self.rate if self.available < 0 else 0.0
+            self.waited_seconds += wait
+            return wait
+
+    def acquire(self, weight: int) -> None:
+        wait = self.reserve(weight)
+        if wait > 0:
+            self.sleep(wait)
+
+    def sync_used(self, used: int) -> None:
+        """Adopt the exchange's count of weight used in the current minute when it is higher."""
+
+        with self._lock:
+            self._refill(self.clock())
+            self.available = min(self.available, float(self.limit - used))
 
 
 class BinanceHttpClient:
@@ -15,12 +88,16 @@ class BinanceHttpClient:
         base_url: str = "https://api.binance.com",
         timeout: int = DEFAULT_TIMEOUT,
         max_retries: int = 3,
+        budget: Optional[WeightBudget] = None,
+        clock: Clock = SYSTEM_CLOCK,
         logger=None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
+        self.clock = clock
         self.session = requests.Session()
         self.timeout = timeout
         self.max_retries = max_retries
+        self.budget = budget
         self.logger = logger
         self.cooldown_until = 0
         self.last_latency_ms: float | None = None
@@ -29,26 +106,32 @@ class BinanceHttpClient:
         if self.logger:
             getattr(self.logger, level)(message, *args)
 
-    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict:
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, *, weight: Optional[int] = None) -> Dict:
         url = f"{self.base_url}{path}"
+        weight = request_weight(path, params) if weight is None else weight
         attempt = 0
         backoff = 1
         while True:
             attempt += 1
-            now = time.time()
+            now = self.clock.time()
             if now < self.cooldown_until:
-                time.sleep(self.cooldown_until - now)
+                self.clock.sleep(self.cooldown_until - now)
+            if self.budget is not None:
+                self.budget.acquire(weight)
             try:
-                start = time.time()
+                start = self.clock.monotonic()
                 response = self.session.get(url, params=params, timeout=self.timeout)
-                self.last_latency_ms = (time.time() - start) * 1000
+                self.last_latency_ms = (self.clock.monotonic() - start) * 1000
+                used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+                if self.budget is not None and used is not None and str(used).isdigit():
+                    self.budget.sync_used(int(used))
                 if response.status_code in (418, 429):
                     wait_for = int(response.headers.get("Retry-After", backoff))
-                    self.cooldown_until = time.time() + wait_for
+                    self.cooldown_until = self.clock.time() + wait_for
                     self._log("warning", "Binance rate limit hit (%s), cooling down %ss", response.status_code, wait_for)
                     if attempt > self.max_retries:
                         response.raise_for_status()
-                    time.sleep(wait_for)
+                    self.clock.sleep(wait_for)
                     backoff *= 2
                     continue
                 response.raise_for_status()
@@ -57,7 +140,7 @@ class BinanceHttpClient:
                 self._log("warning", "Binance request failed (attempt %s/%s): %s", attempt, self.max_retries, exc)
                 if attempt >= self.max_retries:
                     raise
-                time.sleep(backoff)
+                self.clock.sleep(backoff)
                 backoff *= 2
 
     def fetch_exchange_info(self) -> Dict:
@@ -73,13 +156,29 @@ class BinanceHttpClient:
     def fetch_all_book_ticker(self) -> list:
         return self.get_json("/api/v3/ticker/bookTicker")
 
+    def fetch_klines(
+        self,
+        symbol: str,
+        interval: str = "1m",
+        *,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        limit: int = 1000,
+    ) -> list:
+        params: Dict[str, Any] = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        if end_time is not None:
+            params["endTime"] = end_time
+        return self.get_json("/api/v3/klines", params=params)
+
     def fetch_time(self) -> Dict:
         return self.get_json("/api/v3/time")
 
     def measure_time_offset(self) -> int:
-        start = int(time.time() * 1000)
+        start = int(self.clock.time() * 1000)
         server_time = self.fetch_time().get("serverTime")
-        end = int(time.time() * 1000)
+        end = int(self.clock.time() * 1000)
         if server_time is None:
             return 0
         round_trip = (end - start) // 2
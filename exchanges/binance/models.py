@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from .quantizer import Quantizer
 
 
 @dataclass
@@ -18,6 +21,31 @@ class PairFilters:
     min_notional: Optional[float] = None
     raw_filters: List[Dict] = field(default_factory=list)
 
+    @property
+    def quantizer(self) -> "Quantizer":
+        """Integer fixed-point rules for these filters, rebuilt only when a filter changes."""
+
+        key = (self.tick_size, self.step_size, self.min_notional)
+        cached = self.__dict__.get("_quantizer")
+        if cached is None or cached[0] != key:
+            from .quantizer import Quantizer
+
+            cached = self.__dict__["_quantizer"] = (key, Quantizer(*key))
+        return cached[1]
+
+    def round_price(self, price: float, *, up: bool = False) -> float:
+        """Snap to ``tick_size`` (down for bids, ``up=True`` for asks)."""
+
+        return self.quantizer.round_price(price, up=up)
+
+    def round_quantity(self, quantity: float) -> float:
+        return self.quantizer.round_quantity(quantity)
+
+    def violation(self, price: Optional[float], quantity: float) -> Optional[str]:
+        """Return the Binance filter an order would fail, or ``None`` when it passes."""
+
+        return self.quantizer.violation(price, quantity)
+
 
 @dataclass
 class PairInfo:
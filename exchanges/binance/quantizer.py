@@ -0,0 +1,244 @@
+"""Integer fixed-point rounding and validation against a pair's Binance filters.
+
+Prices and quantities are handled as integers scaled by ``10**decimals`` of the tick and step
+sizes, so snapping and the min-notional comparison are integer arithmetic and floats only appear
+at the edges. A float counts as on the grid exactly when it *is* the double nearest to a grid
+value, i.e. when ``str(value)`` spells a multiple of the increment: Binance checks the filters
+on that decimal string (``tests/test_quantizer.py`` fuzzes this against a ``Decimal`` reference).
+This is exact for values with up to 15 significant digits, far beyond any listed price or lot.
+
+Each operation has a scalar form (plain ``math``, for the live decision path) and a batch form
+over NumPy arrays (whole grids of levels in simulation and backtests).
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import ROUND_CEILING, Decimal
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from .models import PairFilters
+
+OK, PRICE_FILTER, LOT_SIZE, MIN_NOTIONAL = range(4)
+VIOLATIONS = (None, "PRICE_FILTER", "LOT_SIZE", "MIN_NOTIONAL")
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _fixed(value: float | str) -> Tuple[int, int]:
+    """``(units, decimals)`` such that the decimal spelling of ``value`` is ``units / 10**decimals``."""
+
+    exponent = Decimal(str(value)).normalize().as_tuple().exponent
+    decimals = max(0, -int(exponent))
+    return int(Decimal(str(value)).scaleb(decimals)), decimals
+
+
+class _Axis:
+    """One filtered dimension: integer units of ``1 / scale``, valid at multiples of ``step``."""
+
+    __slots__ = ("decimals", "scale", "step")
+
+    def __init__(self, increment: float | str) -> None:
+        self.step, self.decimals = _fixed(increment)
+        if self.step <= 0:
+            raise ValueError(f"Filter increment must be positive, got {increment!r}")
+        self.scale = 10**self.decimals
+
+    # Scalars
+    def snap(self, value: float, up: bool) -> int:
+        """Units of the nearest multiple of ``step`` at or below (``up``: above) ``value``."""
+
+        ratio = value * self.scale / self.step
+        k = round(ratio)
+        if k * self.step / self.scale == value:
+            return k * self.step
+        k = math.ceil(ratio) if up else math.floor(ratio)
+        # ``ratio`` carries float error; settle the boundary by comparing the result itself.
+        snapped = k * self.step / self.scale
+        if up and snapped < value:
+            k += 1
+        elif not up and snapped > value:
+            k -= 1
+        return k * self.step
+
+    def units(self, value: float) -> Optional[int]:
+        """Exact units of ``value`` when it lies on the grid, otherwise ``None``."""
+
+        if not math.isfinite(value):
+            return None
+        units = round(value * self.scale)
+        if units / self.scale != value or units % self.step:
+            return None
+        return units
+
+    def to_float(self, units: int) -> float:
+        return units / self.scale
+
+    def format(self, units: int) -> str:
+        sign = "-" if units < 0 else ""
+        whole, frac = divmod(abs(units), self.scale)
+        return f"{sign}{whole}.{frac:0{self.decimals}d}" if self.decimals else f"{sign}{whole}"
+
+    # Batches
+    def snap_many(self, values: np.ndarray, up: bool) -> np.ndarray:
+        """Float multiples of ``step`` (see :meth:`snap`); non-finite values pass through."""
+
+        ratio = values * (self.scale / self.step)
+        k = np.rint(ratio)
+        exact = k * self.step / self.scale == values
+        k = np.where(exact, k, np.ceil(ratio) if up else np.floor(ratio))
+        snapped = k * self.step / self.scale
+        k = np.where(exact, k, k + (snapped < values) if up else k - (snapped > values))
+        return k * self.step / self.scale
+
+    def units_many(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(units, on_grid)``; units are ``0`` where ``on_grid`` is false."""
+
+        scaled = np.rint(values * self.scale)
+        with np.errstate(invalid="ignore"):
+            on_grid = np.isfinite(values) & (scaled / self.scale == values) & (np.abs(scaled) < 2**53)
+        units = np.where(on_grid, scaled, 0).astype(np.int64)
+        on_grid &= units % self.step == 0
+        return np.where(on_grid, units, 0), on_grid
+
+
+class Quantizer:
+    """Precompiled tick/step/min-notional rules of one symbol.
+
+    Missing filters are not enforced: rounding passes values through and the min-notional check
+    falls back to ``Decimal`` (scalars) or float (batches) when a tick or step size is unknown
+    (or the scaled threshold would not fit in 64 bits).
+    """
+
+    def __init__(
+        self,
+        tick_size: Optional[float | str] = None,
+        step_size: Optional[float | str] = None,
+        min_notional: Optional[float | str] = None,
+    ) -> None:
+        self.price = _Axis(tick_size) if tick_size else None
+        self.quantity = _Axis(step_size) if step_size else None
+        self.min_notional = float(min_notional) if min_notional else 0.0
+        self._notional_units: Optional[int] = None
+        if self.min_notional and self.price and self.quantity:
+            # price_units * quantity_units >= ceil(min_notional * P * Q) is exact in integers.
+            threshold = Decimal(str(min_notional)).scaleb(self.price.decimals + self.quantity.decimals)
+            threshold = int(threshold.to_integral_value(rounding=ROUND_CEILING))
+            if threshold <= _INT64_MAX:
+                self._notional_units = threshold
+
+    @classmethod
+    def from_filters(cls, filters: "PairFilters") -> "Quantizer":
+        return cls(filters.tick_size, filters.step_size, filters.min_notional)
+
+    # Scalars
+    def round_price(self, price: float, *, up: bool = False) -> float:
+        """Snap to ``tick_size`` (down for bids, ``up=True`` for asks)."""
+
+        if self.price is None or not math.isfinite(price):
+            return price
+        return self.price.to_float(self.price.snap(price, up))
+
+    def round_quantity(self, quantity: float) -> float:
+        if self.quantity is None or not math.isfinite(quantity):
+            return quantity
+        return self.quantity.to_float(self.quantity.snap(quantity, False))
+
+    def violation(self, price: Optional[float], quantity: float) -> Optional[str]:
+        """Return the Binance filter an order would fail, or ``None`` when it passes."""
+
+        price_units = None
+        if price is not None and self.price:
+            price_units = self.price.units(price)
+            if price_units is None:
+                return "PRICE_FILTER"
+        quantity_units = None
+        if not quantity > 0:
+            return "LOT_SIZE"
+        if self.quantity:
+            quantity_units = self.quantity.units(quantity)
+            if quantity_units is None:
+                return "LOT_SIZE"
+        if price is not None and self.min_notional:
+            if price_units is not None and quantity_units is not None and self._notional_units is not None:
+                below = price_units * quantity_units < self._notional_units
+            else:
+                below = Decimal(str(price)) * Decimal(str(quantity)) < Decimal(str(self.min_notional))
+            if below:
+                return "MIN_NOTIONAL"
+        return None
+
+    def format_price(self, price: float) -> str:
+        """Exact decimal string of an on-tick ``price`` for an order request."""
+
+        units = self.price.units(price) if self.price else None
+        return self.price.format(units) if units is not None else repr(float(price))
+
+    def format_quantity(self, quantity: float) -> str:
+        units = self.quantity.units(quantity) if self.quantity else None
+        return self.quantity.format(units) if units is not None else repr(float(quantity))
+
+    # Batches
+    def round_prices(self, prices, *, up: bool = False) -> np.ndarray:
+        prices = np.asarray(prices, dtype=np.float64)
+        return self.price.snap_many(prices, up) if self.price else prices.copy()
+
+    def round_quantities(self, quantities) -> np.ndarray:
+        quantities = np.asarray(quantities, dtype=np.float64)
+        return self.quantity.snap_many(quantities, False) if self.quantity else quantities.copy()
+
+    def violations(self, prices, quantities) -> np.ndarray:
+        """Per-order codes (``OK``, ``PRICE_FILTER``, ``LOT_SIZE``, ``MIN_NOTIONAL``).
+
+        ``VIOLATIONS[code]`` is the name :meth:`violation` returns for the same order.
+        """
+
+        prices, quantities = np.broadcast_arrays(
+            np.asarray(prices, dtype=np.float64), np.asarray(quantities, dtype=np.float64)
+        )
+        codes = np.zeros(prices.shape, dtype=np.int8)
+        price_units = quantity_units = None
+        if self.price:
+            price_units, on_tick = self.price.units_many(prices)
+            codes[~on_tick] = PRICE_FILTER
+        bad_lot = ~(quantities > 0)
+        if self.quantity:
+            quantity_units, on_step = self.quantity.units_many(quantities)
+            bad_lot |= ~on_step
+        codes[(codes == OK) & bad_lot] = LOT_SIZE
+        if self.min_notional:
+            below = self._below_notional(prices, quantities, price_units, quantity_units)
+            codes[(codes == OK) & below] = MIN_NOTIONAL
+        return codes
+
+    def grid_orders(self, prices, quote_per_order: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bid levels for ``quote_per_order`` each: ``(prices, quantities, valid)``.
+
+        Prices snap down to the tick, quantities down to the step; ``valid`` is false where the
+        result is non-positive or under min-notional.
+        """
+
+        prices = self.round_prices(prices)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quantities = self.round_quantities(quote_per_order / prices)
+        valid = (prices > 0) & (quantities > 0) & np.isfinite(quantities)
+        if self.min_notional:
+            price_units = self.price.units_many(prices)[0] if self.price else None
+            quantity_units = self.quantity.units_many(quantities)[0] if self.quantity else None
+            valid &= ~self._below_notional(prices, quantities, price_units, quantity_units)
+        return prices, quantities, valid
+
+    def _below_notional(self, prices, quantities, price_units, quantity_units) -> np.ndarray:
+        if price_units is None or quantity_units is None or self._notional_units is None:
+            with np.errstate(invalid="ignore"):
+                return ~(prices * quantities >= self.min_notional)
+        positive = price_units > 0
+        # quantity_units >= ceil(N / price_units) avoids the int64 overflow of the product.
+        needed = -(-self._notional_units // np.where(positive, price_units, 1))
+        return ~positive | (quantity_units < needed)
+
+
+__all__ = ["LOT_SIZE", "MIN_NOTIONAL", "OK", "PRICE_FILTER", "Quantizer", "VIOLATIONS"]
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import time
 from typing import Dict, Iterable, List, Optional
 
+from core.clock import SYSTEM_CLOCK, Clock
+
 from .http_client import BinanceHttpClient
 from .models import FeeFreeFlag, MarketSnapshot, PairInfo
 
@@ -15,9 +16,11 @@ class BinanceDataService:
         cache_ttl_seconds: int = 900,
         manual_fee_free: Iterable[str] | None = None,
         heuristic_quotes: Iterable[str] | None = None,
+        clock: Clock = SYSTEM_CLOCK,
         logger=None,
     ) -> None:
         self.http_client = http_client
+        self.clock = clock
         self.cache_ttl_seconds = cache_ttl_seconds
         self.manual_fee_free = {s.upper() for s in (manual_fee_free or [])}
         self.heuristic_quotes = {q.upper() for q in (heuristic_quotes or [])}
@@ -31,8 +34,14 @@ class BinanceDataService:
         if self.logger:
             getattr(self.logger, level)(msg, *args)
 
+    def set_fee_rules(self, manual_fee_free: Iterable[str], heuristic_quotes: Iterable[str]) -> None:
+        """Swap the fee-free whitelists; the exchange-info cache stays valid."""
+
+        self.manual_fee_free = {s.upper() for s in manual_fee_free}
+        self.heuristic_quotes = {q.upper() for q in heuristic_quotes}
+
     def refresh_exchange_info(self, *, force: bool = False) -> Dict:
-        now = time.time()
+        now = self.clock.time()
         if not force and self.exchange_info_cache and now - self.exchange_info_fetched_at < self.cache_ttl_seconds:
             return self.exchange_info_cache
         info = self.http_client.fetch_exchange_info()
@@ -105,6 +114,23 @@ class BinanceDataService:
         book = self.http_client.fetch_book_ticker(symbol)
         return MarketSnapshot.from_payload(symbol=symbol, book=book, stats=stats)
 
+    def fetch_klines(self, symbol: str, *, interval: str = "1m", days: float = 30, limit: int = 1000) -> List[list]:
+        """Kline rows for the last ``days``, paged forward ``limit`` bars per request."""
+
+        end = int(self.clock.time() * 1000)
+        cursor = end - int(days * 86_400_000)
+        rows: List[list] = []
+        while cursor < end:
+            page = self.http_client.fetch_klines(symbol, interval, start_time=cursor, end_time=end, limit=limit)
+            if not page:
+                break
+            rows.extend(page)
+            cursor = int(page[-1][0]) + 1
+            if len(page) < limit:
+                break
+        self._log("info", "Fetched %s %s klines for %s", len(rows), interval, symbol)
+        return rows
+
     def time_sync_status(self) -> Dict[str, int | bool]:
         offset = self.http_client.measure_time_offset()
         self.last_time_offset_ms = offset
@@ -114,5 +140,5 @@ class BinanceDataService:
         return {
             "rest_ok": not self.offline_mode,
             "time_offset_ms": self.last_time_offset_ms,
-            "cache_age": time.time() - self.exchange_info_fetched_at if self.exchange_info_fetched_at else None,
+            "cache_age": self.clock.time() - self.exchange_info_fetched_at if self.exchange_info_fetched_at else None,
         }
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import threading
-import time
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
 from binance import ThreadedWebsocketManager
 
+from core.clock import SYSTEM_CLOCK, Clock
+
 
 class BookTickerStream:
     def __init__(
@@ -16,9 +17,11 @@ class BookTickerStream:
         on_disconnect: Optional[Callable[[], None]] = None,
         api_key: str | None = None,
         api_secret: str | None = None,
+        clock: Clock = SYSTEM_CLOCK,
         logger=None,
     ) -> None:
         self.symbol = symbol.upper()
+        self.clock = clock
         self.on_message = on_message
         self.on_disconnect = on_disconnect
         self.logger = logger
@@ -32,6 +35,9 @@ class BookTickerStream:
                 return
             self._running = True
         self._twm.start()
+        self._open()
+
+    def _open(self) -> None:
         self._twm.start_book_ticker_socket(callback=self._handle, symbol=self.symbol)
 
     def _handle(self, message: dict) -> None:
@@ -54,5 +60,53 @@ class BookTickerStream:
 
     def reconnect(self, delay_seconds: int = 2) -> None:
         self.stop()
-        time.sleep(delay_seconds)
+        self.clock.sleep(delay_seconds)
         self.start()
+
+
+class MultiBookTickerStream(BookTickerStream):
+    """bookTicker for many symbols over one multiplexed connection.
+
+    Messages arrive wrapped as ``{"stream": ..., "data": {...}}``, which
+    ``MarketEvent.from_book_ticker`` unwraps.
+    """
+
+    def __init__(self, symbols: Iterable[str], **kwargs) -> None:
+        self.symbols = sorted({symbol.upper() for symbol in symbols})
+        super().__init__(",".join(self.symbols), **kwargs)
+
+    def _open(self) -> None:
+        streams = [f"{symbol.lower()}@bookTicker" for symbol in self.symbols]
+        self._twm.start_multiplex_socket(callback=self._handle, streams=streams)
+
+
+class MarketStream(BookTickerStream):
+    """Any mix of bookTicker, trade and depth streams for many symbols, multiplexed.
+
+    Binance allows 1024 streams per connection, so larger subscriptions open several sockets.
+    """
+
+    STREAMS = {"bookTicker": "@bookTicker", "trade": "@trade", "depth": "@depth@100ms"}
+    MAX_STREAMS = 1024
+
+    def __init__(self, symbols: Iterable[str], *, kinds: Iterable[str] = ("bookTicker",), **kwargs) -> None:
+        self.symbols = sorted({symbol.upper() for symbol in symbols})
+        unknown = set(kinds) - self.STREAMS.keys()
+        if unknown:
+            raise ValueError(f"Unknown stream kinds: {', '.join(sorted(unknown))}")
+        self.streams = [f"{symbol.lower()}{self.STREAMS[kind]}" for symbol in self.symbols for kind in kinds]
+        super().__init__(",".join(self.symbols), **kwargs)
+
+    def _open(self) -> None:
+        for start in range(0, len(self.streams), self.MAX_STREAMS):
+            self._twm.start_multiplex_socket(callback=self._handle, streams=self.streams[start : start + self.MAX_STREAMS])
+
+
+class AllMarketTickerStream(BookTickerStream):
+    """The all-market 24h ticker ``!ticker@arr``: each second, an array of the symbols that changed."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__("!ticker@arr", **kwargs)
+
+    def _open(self) -> None:
+        self._twm.start_ticker_socket(callback=self._handle)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List
 
-from exchanges.binance import BinanceDataService
+from exchanges.binance.service import BinanceDataService
 
 FEE_METHOD_STANDARD = "Standard"
 FEE_METHOD_API = "API"
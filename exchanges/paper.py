@@ -0,0 +1,352 @@
+"""Simulated exchange for paper trading.
+
+Orders from :class:`core.execution_engine.ExecutionEngine` are matched against top-of-book
+updates (live or replayed :class:`core.events.MarketEvent`). Resting orders are kept per symbol
+in price-indexed FIFO levels (integer tick keys plus a sorted key list), so a book update only
+visits the levels at or through the touch instead of scanning every open order.
+
+Fill model:
+
+* a marketable order (limit through the spread, or market) takes the displayed opposite size
+  at the touch as taker; the rest of a limit order rests;
+* a resting order at the touch sits behind the size displayed when it reached the touch; each
+  decrease of that size advances the queue, and size beyond the queue fills it (partial fills);
+* if the opposite touch crosses a resting price, crossing orders fill against its displayed size;
+* if the touch moves through a price level that was at or behind the touch, the level is
+  considered traded through and fills completely.
+
+Filters and fees come from :class:`PairInfo`: orders failing tick/step/min-notional are rejected
+the way Binance does, and fee-free pairs pay no commission.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from core.decision_engine import CancelAction, OrderAction
+from core.events import BalanceEvent, FillEvent, MarketEvent
+from core.execution_engine import ExecutionReport
+from exchanges.binance.models import PairInfo
+
+DEFAULT_MAKER_FEE = 0.001
+DEFAULT_TAKER_FEE = 0.001
+_EPS = 1e-12
+
+PriceKey = Union[int, float]
+PaperEvent = Union[FillEvent, BalanceEvent]
+
+
+@dataclass
+class PaperOrder:
+    client_order_id: str
+    symbol: str
+    side: str
+    price: float
+    quantity: float
+    filled: float = 0.0
+    queue_ahead: Optional[float] = None
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+
+class _Book:
+    """Resting paper orders of one symbol and the last seen top of book."""
+
+    def __init__(self, pair: PairInfo) -> None:
+        self.pair = pair
+        self.tick = pair.filters.tick_size
+        self.levels: Dict[str, Dict[PriceKey, Deque[PaperOrder]]] = {"BUY": {}, "SELL": {}}
+        self.keys: Dict[str, List[PriceKey]] = {"BUY": [], "SELL": []}
+        self.bid: Optional[float] = None
+        self.ask: Optional[float] = None
+        self.bid_qty: Optional[float] = None
+        self.ask_qty: Optional[float] = None
+
+    def key(self, price: float) -> PriceKey:
+        return round(price / self.tick) if self.tick else price
+
+    def add(self, order: PaperOrder) -> None:
+        key = self.key(order.price)
+        level = self.levels[order.side].get(key)
+        if level is None:
+            level = self.levels[order.side][key] = deque()
+            bisect.insort(self.keys[order.side], key)
+        level.append(order)
+
+    def remove(self, order: PaperOrder) -> None:
+        key = self.key(order.price)
+        level = self.levels[order.side].get(key)
+        if level is None:
+            return
+        try:
+            level.remove(order)
+        except ValueError:
+            return
+        if not level:
+            del self.levels[order.side][key]
+            keys = self.keys[order.side]
+            del keys[bisect.bisect_left(keys, key)]
+
+
+class PaperExchange:
+    """In-process matching simulator usable as an ``ExecutionEngine`` executor."""
+
+    def __init__(
+        self,
+        *,
+        balances: Optional[Dict[str, float]] = None,
+        maker_fee: float = DEFAULT_MAKER_FEE,
+        taker_fee: float = DEFAULT_TAKER_FEE,
+        on_event: Optional[Callable[[PaperEvent], None]] = None,
+        logger=None,
+    ) -> None:
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.on_event = on_event
+        self.logger = logger
+        self.books: Dict[str, _Book] = {}
+        self.orders: Dict[str, PaperOrder] = {}
+        self.balances: Dict[str, List[float]] = {asset: [float(amount), 0.0] for asset, amount in (balances or {}).items()}
+        self.counters: Dict[str, int] = {"orders": 0, "fills": 0, "rejects": 0, "cancels": 0, "book_updates": 0}
+
+    # Setup / queries
+    def add_pair(self, pair: PairInfo) -> None:
+        if pair.symbol not in self.books:
+            self.books[pair.symbol] = _Book(pair)
+
+    def balance(self, asset: str) -> Tuple[float, float]:
+        free, locked = self.balances.get(asset, (0.0, 0.0))
+        return free, locked
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[PaperOrder]:
+        return [o for o in self.orders.values() if symbol is None or o.symbol == symbol]
+
+    # Executor interface
+    def __call__(self, action) -> ExecutionReport:
+        if isinstance(action, CancelAction):
+            return self.cancel(action)
+        if isinstance(action, OrderAction):
+            return self.place(action)
+        return self._reject(action, "UNSUPPORTED_ACTION")
+
+    def place(self, action: OrderAction) -> ExecutionReport:
+        book = self.books.get(action.symbol)
+        if book is None:
+            return self._reject(action, "UNKNOWN_SYMBOL")
+        if action.client_order_id and action.client_order_id in self.orders:
+            return self._reject(action, "DUPLICATE_ORDER")
+        side = action.side.upper()
+        market = action.order_type.upper() == "MARKET"
+        if market:
+            touch = book.ask if side == "BUY" else book.bid
+            if touch is None:
+                return self._reject(action, "NO_MARKET_DATA")
+            price = touch
+            violation = book.pair.filters.violation(None, action.quantity)
+            if violation is None and book.pair.filters.min_notional and price * action.quantity < book.pair.filters.min_notional:
+                violation = "MIN_NOTIONAL"
+        else:
+            if action.price is None:
+                return self._reject(action, "PRICE_REQUIRED")
+            price = action.price
+            violation = book.pair.filters.violation(price, action.quantity)
+        if violation:
+            return self._reject(action, f"FILTER_FAILURE {violation}")
+
+        lock_asset, lock_amount = (book.pair.quote, price * action.quantity) if side == "BUY" else (book.pair.base, action.quantity)
+        free, locked = self.balance(lock_asset)
+        if free + _EPS < lock_amount:
+            return self._reject(action, "INSUFFICIENT_BALANCE")
+        self.balances[lock_asset] = [free - lock_amount, locked + lock_amount]
+        self.counters["orders"] += 1
+
+        order = PaperOrder(
+            client_order_id=action.client_order_id or f"paper-{self.counters['orders']}",
+            symbol=action.symbol,
+            side=side,
+            price=price,
+            quantity=action.quantity,
+        )
+        self._match_on_entry(book, order, market)
+        if order.remaining > _EPS and not market:
+            self._set_initial_queue(book, order)
+            book.add(order)
+            self.orders[order.client_order_id] = order
+        elif order.remaining > _EPS:
+            self._release(book, order, order.remaining)
+        state = "FILLED" if order.remaining <= _EPS else "PARTIALLY_FILLED" if order.filled > 0 else "NEW"
+        if market and order.remaining > _EPS:
+            state = "EXPIRED" if order.filled <= 0 else "PARTIALLY_FILLED"
+        return ExecutionReport(action, state, order.client_order_id)
+
+    def cancel(self, action: CancelAction) -> ExecutionReport:
+        order = self.orders.pop(action.client_order_id, None)
+        if order is None:
+            return self._reject(action, "UNKNOWN_ORDER")
+        book = self.books[order.symbol]
+        book.remove(order)
+        self._release(book, order, order.remaining)
+        self.counters["cancels"] += 1
+        return ExecutionReport(action, "CANCELED", order.client_order_id)
+
+    # Market data
+    def on_market(self, event: MarketEvent) -> None:
+        book = self.books.get(event.symbol)
+        if book is None or event.bid is None or event.ask is None:
+            return
+        self.counters["book_updates"] += 1
+        prev_bid, prev_ask, prev_bid_qty, prev_ask_qty = book.bid, book.ask, book.bid_qty, book.ask_qty
+        kb, ka = book.key(event.bid), book.key(event.ask)
+        if book.keys["BUY"]:
+            prev_kb = book.key(prev_bid) if prev_bid is not None else None
+            start = bisect.bisect_left(book.keys["BUY"], kb)
+            touched = book.keys["BUY"][start:]
+            cross_pool = [event.ask_qty]
+            for key in reversed(touched):
+                if key >= ka:
+                    self._fill_crossing(book, book.levels["BUY"].get(key), cross_pool)
+                elif key == kb:
+                    consumed = prev_bid_qty - event.bid_qty if prev_kb == kb and prev_bid_qty is not None and event.bid_qty is not None else 0.0
+                    self._advance_queue(book, book.levels["BUY"].get(key), event.bid_qty, consumed)
+                elif prev_kb is not None and key <= prev_kb:
+                    self._fill_level(book, book.levels["BUY"].get(key))
+        if book.keys["SELL"]:
+            prev_ka = book.key(prev_ask) if prev_ask is not None else None
+            end = bisect.bisect_right(book.keys["SELL"], ka)
+            touched = book.keys["SELL"][:end]
+            cross_pool = [event.bid_qty]
+            for key in touched:
+                if key <= kb:
+                    self._fill_crossing(book, book.levels["SELL"].get(key), cross_pool)
+                elif key == ka:
+                    consumed = prev_ask_qty - event.ask_qty if prev_ka == ka and prev_ask_qty is not None and event.ask_qty is not None else 0.0
+                    self._advance_queue(book, book.levels["SELL"].get(key), event.ask_qty, consumed)
+                elif prev_ka is not None and key >= prev_ka:
+                    self._fill_level(book, book.levels["SELL"].get(key))
+        book.bid, book.ask, book.bid_qty, book.ask_qty = event.bid, event.ask, event.bid_qty, event.ask_qty
+
+    # Matching helpers
+    def _match_on_entry(self, book: _Book, order: PaperOrder, market: bool) -> None:
+        if order.side == "BUY":
+            touch, size = book.ask, book.ask_qty
+            crosses = touch is not None and (market or order.price >= touch)
+        else:
+            touch, size = book.bid, book.bid_qty
+            crosses = touch is not None and (market or order.price <= touch)
+        if not crosses:
+            return
+        qty = order.remaining if size is None else min(order.remaining, size)
+        if qty > _EPS:
+            self._fill(book, order, qty, touch, is_maker=False)
+
+    @staticmethod
+    def _set_initial_queue(book: _Book, order: PaperOrder) -> None:
+        touch, size = (book.bid, book.bid_qty) if order.side == "BUY" else (book.ask, book.ask_qty)
+        if touch is None:
+            return
+        key, touch_key = book.key(order.price), book.key(touch)
+        if key == touch_key:
+            order.queue_ahead = size or 0.0
+        elif (order.side == "BUY" and key > touch_key) or (order.side == "SELL" and key < touch_key):
+            order.queue_ahead = 0.0
+
+    def _live(self, level: Optional[Deque[PaperOrder]]) -> Iterator[PaperOrder]:
+        """Orders of ``level`` in queue order, skipping any a fill callback canceled meanwhile."""
+
+        for order in list(level or ()):
+            if self.orders.get(order.client_order_id) is order:
+                yield order
+
+    def _fill_crossing(self, book: _Book, level: Optional[Deque[PaperOrder]], pool: List[Optional[float]]) -> None:
+        for order in self._live(level):
+            qty = order.remaining if pool[0] is None else min(order.remaining, pool[0])
+            if qty <= _EPS:
+                return
+            if pool[0] is not None:
+                pool[0] -= qty
+            self._fill(book, order, qty, order.price, is_maker=True)
+
+    def _fill_level(self, book: _Book, level: Optional[Deque[PaperOrder]]) -> None:
+        for order in self._live(level):
+            self._fill(book, order, order.remaining, order.price, is_maker=True)
+
+    def _advance_queue(
+        self, book: _Book, level: Optional[Deque[PaperOrder]], displayed: Optional[float], consumed: float
+    ) -> None:
+        pool: Optional[float] = None
+        for order in self._live(level):
+            if order.queue_ahead is None:
+                # The level just reached the touch: assume we are behind everything displayed.
+                order.queue_ahead = displayed or 0.0
+                continue
+            if consumed <= 0:
+                continue
+            if order.queue_ahead > consumed:
+                order.queue_ahead -= consumed
+                continue
+            beyond = consumed - order.queue_ahead
+            order.queue_ahead = 0.0
+            pool = beyond if pool is None else pool
+            qty = min(order.remaining, pool)
+            if qty > _EPS:
+                pool -= qty
+                self._fill(book, order, qty, order.price, is_maker=True)
+
+    def _fill(self, book: _Book, order: PaperOrder, qty: float, price: float, *, is_maker: bool) -> None:
+        pair = book.pair
+        rate = 0.0 if pair.fee.fee_free else (self.maker_fee if is_maker else self.taker_fee)
+        base_free, base_locked = self.balance(pair.base)
+        quote_free, quote_locked = self.balance(pair.quote)
+        if order.side == "BUY":
+            fee, fee_asset = qty * rate, pair.base
+            locked_release = order.price * qty
+            self.balances[pair.quote] = [quote_free + locked_release - price * qty, quote_locked - locked_release]
+            self.balances[pair.base] = [base_free + qty - fee, base_locked]
+        else:
+            fee, fee_asset = price * qty * rate, pair.quote
+            self.balances[pair.base] = [base_free, base_locked - qty]
+            self.balances[pair.quote] = [quote_free + price * qty - fee, quote_locked]
+        order.filled += qty
+        if order.remaining <= _EPS:
+            order.filled = order.quantity
+            if self.orders.pop(order.client_order_id, None) is not None:
+                book.remove(order)
+        self.counters["fills"] += 1
+        self._emit(
+            FillEvent(
+                symbol=order.symbol,
+                client_order_id=order.client_order_id,
+                side=order.side,
+                price=price,
+                quantity=qty,
+                remaining=order.remaining,
+                fee=fee,
+                fee_asset=fee_asset if fee else "",
+                base_asset=pair.base,
+                is_maker=is_maker,
+            )
+        )
+        for asset in (pair.base, pair.quote):
+            free, locked = self.balances[asset]
+            self._emit(BalanceEvent(asset, free, locked))
+
+    def _release(self, book: _Book, order: PaperOrder, qty: float) -> None:
+        asset, amount = (book.pair.quote, order.price * qty) if order.side == "BUY" else (book.pair.base, qty)
+        free, locked = self.balance(asset)
+        self.balances[asset] = [free + amount, locked - amount]
+        self._emit(BalanceEvent(asset, free + amount, locked - amount))
+
+    def _reject(self, action, reason: str) -> ExecutionReport:
+        self.counters["rejects"] += 1
+        if self.logger:
+            self.logger.info("Paper reject %s: %s", reason, action.describe())
+        return ExecutionReport(action, "REJECTED", reason)
+
+    def _emit(self, event: PaperEvent) -> None:
+        if self.on_event:
+            self.on_event(event)
@@ -1,6 +1,14 @@
-from ui.app import run
+import sys
 
+from core.startup_profile import StartupProfiler
 
-if __name__ == "__main__":
-    run()
 
+def main() -> None:
+    profiler = StartupProfiler.from_args(sys.argv[1:])
+    with profiler.phase("import ui.app"):
+        from ui.app import run
+    run(profiler=profiler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Live risk state: exposure, PnL, drawdown, pre-trade limits and a kill switch.
+
+Fills, execution reports and mark prices update one symbol's book and the running totals by
+deltas, so every update and every :meth:`RiskEngine.would_breach` call is O(1) however many
+symbols are tracked. Exposure is ``quantity * mark`` plus the notional of resting buy orders
+(reserved from the execution report, released by fills and cancels), grouped per symbol and per
+quote asset.
+
+After every update the loss and drawdown limits are re-checked; crossing one trips the kill
+switch on that same update, so on a mark-price tick the switch is set before the tick reaches
+the decision stage. Once tripped, ``would_breach`` rejects every new buy until :meth:`reset`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+_EPS = 1e-12
+_OPEN_STATES = {"NEW", "ACCEPTED", "PARTIALLY_FILLED"}
+
+
+@dataclass
+class RiskLimits:
+    """``0`` disables a limit. Amounts are in quote currency."""
+
+    max_drawdown_pct: float = 0.0
+    max_loss: float = 0.0
+    max_symbol_exposure: float = 0.0
+    max_total_exposure: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "RiskLimits":
+        return cls(
+            max_drawdown_pct=settings.max_drawdown_pct,
+            max_loss=settings.max_loss_usdt,
+            max_symbol_exposure=settings.max_symbol_exposure_usdt,
+            max_total_exposure=settings.max_total_exposure_usdt,
+        )
+
+
+class _Book:
+    __slots__ = ("symbol", "quote", "quantity", "cost", "mark", "realized", "fees", "reserved")
+
+    def __init__(self, symbol: str, quote: str) -> None:
+        self.symbol = symbol
+        self.quote = quote
+        self.quantity = 0.0
+        self.cost = 0.0
+        self.mark: Optional[float] = None
+        self.realized = 0.0
+        self.fees = 0.0
+        self.reserved = 0.0
+
+    @property
+    def exposure(self) -> float:
+        return self.quantity * self.mark if self.mark is not None else self.cost
+
+    @property
+    def unrealized(self) -> float:
+        return self.exposure - self.cost
+
+
+class RiskEngine:
+    def __init__(
+        self,
+        limits: Optional[RiskLimits] = None,
+        *,
+        starting_equity: float = 0.0,
+        on_trip: Optional[Callable[[str], None]] = None,
+        logger=None,
+    ) -> None:
+        self.limits = limits or RiskLimits()
+        self.starting_equity = float(starting_equity)
+        self.on_trip = on_trip
+        self.logger = logger
+        self.books: Dict[str, _Book] = {}
+        self.quote_exposure: Dict[str, float] = {}
+        self.total_exposure = 0.0
+        self.realized = 0.0
+        self.unrealized = 0.0
+        self.fees = 0.0
+        self.peak_equity = self.starting_equity
+        self.max_drawdown_pct = 0.0
+        self.tripped: Optional[str] = None
+        # cid -> [book, limit price, remaining quantity] of resting buys
+        self._resting: Dict[str, list] = {}
+        self._prefilled: Dict[str, float] = {}
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    # Setup
+    def add_pair(self, pair) -> None:
+        self.add_symbol(pair.symbol, pair.quote)
+
+    def add_symbol(self, symbol: str, quote: str = "") -> _Book:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = _Book(symbol, quote)
+            self.quote_exposure.setdefault(quote, 0.0)
+        return book
+
+    # Derived state
+    @property
+    def equity(self) -> float:
+        return self.starting_equity + self.realized + self.unrealized
+
+    @property
+    def drawdown_pct(self) -> float:
+        return (self.peak_equity - self.equity) / self.peak_equity * 100 if self.peak_equity > 0 else 0.0
+
+    @property
+    def loss(self) -> float:
+        return -(self.realized + self.unrealized)
+
+    # Updates
+    def _revalue(self, book: _Book, exposure_before: float, unrealized_before: float) -> None:
+        delta = book.exposure + book.reserved - exposure_before
+        self.total_exposure += delta
+        self.quote_exposure[book.quote] += delta
+        self.unrealized += book.unrealized - unrealized_before
+        self._check()
+
+    def on_mark(self, symbol: str, price: float) -> None:
+        book = self.books.get(symbol) or self.add_symbol(symbol)
+        before = book.exposure + book.reserved, book.unrealized
+        book.mark = price
+        self._revalue(book, *before)
+
+    def on_market(self, event) -> None:
+        """Engine market observer: marks the symbol at the mid of its top of book."""
+
+        if event.bid and event.ask:
+            self.on_mark(event.symbol, (event.bid + event.ask) / 2)
+
+    def on_fill(self, fill) -> None:
+        book = self.books.get(fill.symbol) or self.add_symbol(fill.symbol)
+        before = book.exposure + book.reserved, book.unrealized
+        fee_in_base = bool(fill.fee_asset) and fill.fee_asset == fill.base_asset
+        quote_fee = 0.0 if fee_in_base else fill.fee
+        fee_value = fill.fee * fill.price if fee_in_base else fill.fee
+        book.fees += fee_value
+        self.fees += fee_value
+        if fill.side.upper() == "BUY":
+            book.quantity += fill.quantity - (fill.fee if fee_in_base else 0.0)
+            book.cost += fill.quantity * fill.price + quote_fee
+            self._consume_reservation(book, fill)
+        else:
+            sold = min(fill.quantity, book.quantity)
+            avg = book.cost / book.quantity if book.quantity > _EPS else 0.0
+            pnl = sold * (fill.price - avg) - quote_fee
+            book.realized += pnl
+            self.realized += pnl
+            book.cost -= sold * avg
+            book.quantity -= fill.quantity + (fill.fee if fee_in_base else 0.0)
+            if abs(book.quantity) <= _EPS:
+                book.quantity = book.cost = 0.0
+        if book.mark is None:
+            book.mark = fill.price
+        self._revalue(book, *before)
+
+    def on_report(self, report) -> None:
+        """Reserve the notional of buy orders left resting; release it when they are canceled."""
+
+        action = report.action
+        cid = getattr(action, "client_order_id", "")
+        if not cid:
+            return
+        state = report.status()
+        side = getattr(action, "side", None)
+        if side is None:
+            if state == "CANCELED":
+                self._release(cid)
+            return
+        prefilled = self._prefilled.pop(cid, 0.0)
+        if side.upper() != "BUY" or action.price is None or state not in _OPEN_STATES:
+            return
+        remaining = action.quantity - prefilled
+        if remaining <= _EPS:
+            return
+        book = self.books.get(action.symbol) or self.add_symbol(action.symbol)
+        before = book.exposure + book.reserved, book.unrealized
+        book.reserved += remaining * action.price
+        self._resting[cid] = [book, action.price, remaining]
+        self._revalue(book, *before)
+
+    def _consume_reservation(self, book: _Book, fill) -> None:
+        resting = self._resting.get(fill.client_order_id)
+        if resting is None:
+            # Fills of an order that crosses on entry arrive before its execution report.
+            if fill.remaining > _EPS:
+                self._prefilled[fill.client_order_id] = self._prefilled.get(fill.client_order_id, 0.0) + fill.quantity
+            return
+        used = min(fill.quantity, resting[2])
+        resting[2] -= used
+        book.reserved = max(0.0, book.reserved - used * resting[1])
+        if fill.remaining <= _EPS or resting[2] <= _EPS:
+            book.reserved = max(0.0, book.reserved - resting[2] * resting[1])
+            del self._resting[fill.client_order_id]
+
+    def _release(self, cid: str) -> None:
+        resting = self._resting.pop(cid, None)
+        if resting is None:
+            return
+        book, price, remaining = resting
+        before = book.exposure + book.reserved, book.unrealized
+        book.reserved = max(0.0, book.reserved - remaining * price)
+        self._revalue(book, *before)
+
+    # Limits
+    def _check(self) -> None:
+        equity = self.equity
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+        drawdown = self.drawdown_pct
+        if drawdown > self.max_drawdown_pct:
+            self.max_drawdown_pct = drawdown
+        if self.tripped:
+            return
+        limits = self.limits
+        if limits.max_drawdown_pct and drawdown >= limits.max_drawdown_pct:
+            self.trip(f"drawdown {drawdown:.2f}% >= {limits.max_drawdown_pct}%")
+        elif limits.max_loss and self.loss >= limits.max_loss:
+            self.trip(f"loss {self.loss:.2f} >= {limits.max_loss}")
+
+    def trip(self, reason: str) -> None:
+        if self.tripped:
+            return
+        self.tripped = reason
+        self._log("error", "Risk kill switch tripped: %s", reason)
+        if self.on_trip:
+            self.on_trip(reason)
+
+    def reset(self) -> None:
+        """Re-arm the kill switch; drawdown is measured from the current equity again."""
+
+        self.tripped = None
+        self.peak_equity = self.equity
+
+    def would_breach(self, action) -> Optional[str]:
+        """Name of the limit ``action`` would break, or ``None``. Sells and cancels only reduce risk."""
+
+        if str(getattr(action, "side", "")).upper() != "BUY":
+            return None
+        if self.tripped:
+            return f"kill_switch: {self.tripped}"
+        book = self.books.get(action.symbol)
+        price = action.price if action.price is not None else (book.mark if book else None)
+        if price is None:
+            return None
+        notional = price * action.quantity
+        limits = self.limits
+        if limits.max_symbol_exposure:
+            held = book.exposure + book.reserved if book is not None else 0.0
+            if held + notional > limits.max_symbol_exposure + _EPS:
+                return "max_symbol_exposure"
+        if limits.max_total_exposure and self.total_exposure + notional > limits.max_total_exposure + _EPS:
+            return "max_total_exposure"
+        return None
+
+    # Reporting
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "equity": round(self.equity, 8),
+            "realized": round(self.realized, 8),
+            "unrealized": round(self.unrealized, 8),
+            "fees": round(self.fees, 8),
+            "peak_equity": round(self.peak_equity, 8),
+            "drawdown_pct": round(self.drawdown_pct, 4),
+            "max_drawdown_pct": round(self.max_drawdown_pct, 4),
+            "total_exposure": round(self.total_exposure, 8),
+            "quote_exposure": {quote: round(value, 8) for quote, value in self.quote_exposure.items()},
+            "tripped": self.tripped,
+        }
+
+    def positions(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "symbol": b.symbol,
+                "quantity": b.quantity,
+                "avg_price": b.cost / b.quantity if b.quantity > _EPS else 0.0,
+                "mark": b.mark,
+                "exposure": b.exposure,
+                "reserved": b.reserved,
+                "realized": b.realized,
+                "unrealized": b.unrealized,
+            }
+            for b in self.books.values()
+        ]
+
+
+__all__ = ["RiskEngine", "RiskLimits"]
@@ -0,0 +1,157 @@
+"""Strategy interface: micro-batches of price updates in, signal arrays out.
+
+A strategy sees ticks (or bar closes) as parallel arrays ``symbol_ids``, ``prices`` and ``ts``
+(epoch seconds) and returns a :class:`SignalBatch`, so one Python call covers every update in
+the batch. Symbol ids are small integers assigned by the host (:class:`strategies.host.StrategyHost`)
+and stable for its lifetime, so a strategy keeps per-symbol state in arrays indexed by id
+(see :class:`SymbolArrays`).
+
+A batch is in arrival order and may hold several updates of one symbol. Strategies whose state
+update depends on order can use :func:`unique_passes` to process the batch in a few vectorized
+passes with at most one update per symbol each. Strategies that are simpler to write one tick
+at a time subclass :class:`TickStrategy` and implement ``on_tick``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+BUY = 1
+SELL = -1
+
+
+@dataclass
+class Signal:
+    symbol_id: int
+    side: int
+    price: float
+    ts: float
+    reason: str = ""
+
+    @property
+    def side_name(self) -> str:
+        return "BUY" if self.side == BUY else "SELL"
+
+
+@dataclass
+class SignalBatch:
+    """Signals as parallel arrays; ``side`` is :data:`BUY` or :data:`SELL`."""
+
+    symbol_ids: np.ndarray
+    sides: np.ndarray
+    prices: np.ndarray
+    ts: np.ndarray
+    reason: str = ""
+
+    @classmethod
+    def empty(cls) -> "SignalBatch":
+        return cls(np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, side: int | np.ndarray, symbol_ids, prices, ts, reason: str = "") -> "SignalBatch":
+        sides = np.broadcast_to(np.asarray(side, dtype=np.int8), mask.shape)
+        return cls(symbol_ids[mask], sides[mask].copy(), prices[mask], ts[mask], reason)
+
+    @classmethod
+    def concat(cls, batches: List["SignalBatch"]) -> "SignalBatch":
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        reasons = {batch.reason for batch in batches}
+        return cls(
+            np.concatenate([b.symbol_ids for b in batches]),
+            np.concatenate([b.sides for b in batches]),
+            np.concatenate([b.prices for b in batches]),
+            np.concatenate([b.ts for b in batches]),
+            reasons.pop() if len(reasons) == 1 else "",
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+    def __iter__(self) -> Iterator[Signal]:
+        for i in range(len(self.symbol_ids)):
+            yield Signal(int(self.symbol_ids[i]), int(self.sides[i]), float(self.prices[i]), float(self.ts[i]), self.reason)
+
+
+class Strategy:
+    """Base class. ``params`` come from the ``strategies.params.<name>`` config mapping."""
+
+    name = "strategy"
+
+    def __init__(self, **params: Any) -> None:
+        self.params: Dict[str, Any] = params
+
+    def on_batch(self, symbol_ids: np.ndarray, prices: np.ndarray, ts: np.ndarray) -> SignalBatch:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Drop all per-symbol state."""
+
+
+class TickStrategy(Strategy):
+    """Adapter for strategies written one update at a time; ``on_tick`` returns a side or ``None``."""
+
+    def on_tick(self, symbol_id: int, price: float, ts: float) -> Optional[int]:
+        raise NotImplementedError
+
+    def on_batch(self, symbol_ids: np.ndarray, prices: np.ndarray, ts: np.ndarray) -> SignalBatch:
+        hits: List[int] = []
+        sides: List[int] = []
+        on_tick = self.on_tick
+        for i, (symbol_id, price, t) in enumerate(zip(symbol_ids.tolist(), prices.tolist(), ts.tolist())):
+            side = on_tick(symbol_id, price, t)
+            if side:
+                hits.append(i)
+                sides.append(side)
+        if not hits:
+            return SignalBatch.empty()
+        index = np.asarray(hits)
+        return SignalBatch(symbol_ids[index], np.asarray(sides, np.int8), prices[index], ts[index], self.name)
+
+
+class SymbolArrays:
+    """Named per-symbol float columns indexed by symbol id, grown by doubling."""
+
+    def __init__(self, fill: Dict[str, float], capacity: int = 64) -> None:
+        self._fill = dict(fill)
+        self.capacity = 0
+        for name in self._fill:
+            setattr(self, name, np.empty(0))
+        self.ensure(capacity - 1)
+
+    def ensure(self, max_id: int) -> None:
+        if max_id < self.capacity:
+            return
+        capacity = max(2 * self.capacity, max_id + 1, 16)
+        for name, value in self._fill.items():
+            old = getattr(self, name)
+            new = np.full(capacity, value)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+
+def unique_passes(symbol_ids: np.ndarray) -> List[np.ndarray]:
+    """Split batch positions into passes that hold each symbol at most once, in arrival order."""
+
+    n = len(symbol_ids)
+    if n == 0:
+        return []
+    order = np.argsort(symbol_ids, kind="stable")
+    ordered = symbol_ids[order]
+    starts = np.r_[0, np.flatnonzero(ordered[1:] != ordered[:-1]) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - group_start
+    if rank.max() == 0:
+        return [np.arange(n)]
+    return [np.flatnonzero(rank == r) for r in range(int(rank.max()) + 1)]
+
+
+__all__ = ["BUY", "SELL", "Signal", "SignalBatch", "Strategy", "SymbolArrays", "TickStrategy", "unique_passes"]
@@ -0,0 +1,40 @@
+"""Dollar-cost averaging: periodic buys plus extra buys on dips."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from strategies.base import BUY, TickStrategy
+
+
+class DcaStrategy(TickStrategy):
+    """BUY every ``interval_seconds`` per symbol, and early when the price is ``dip_pct`` below the last buy.
+
+    Written per tick through the :class:`TickStrategy` adapter: the state is two small dicts
+    and a signal is rare, so vectorizing buys nothing.
+    """
+
+    name = "dca"
+
+    def __init__(self, interval_seconds: float = 3600, dip_pct: float = 0.0, **params: Any) -> None:
+        super().__init__(interval_seconds=interval_seconds, dip_pct=dip_pct, **params)
+        self.interval_seconds = float(interval_seconds)
+        self.dip = float(dip_pct) / 100
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_buy_ts: Dict[int, float] = {}
+        self.last_buy_price: Dict[int, float] = {}
+
+    def on_tick(self, symbol_id: int, price: float, ts: float) -> Optional[int]:
+        last_ts = self.last_buy_ts.get(symbol_id)
+        due = last_ts is None or ts - last_ts >= self.interval_seconds
+        dipped = self.dip > 0 and last_ts is not None and price <= self.last_buy_price[symbol_id] * (1 - self.dip)
+        if not (due or dipped):
+            return None
+        self.last_buy_ts[symbol_id] = ts
+        self.last_buy_price[symbol_id] = price
+        return BUY
+
+
+__all__ = ["DcaStrategy"]
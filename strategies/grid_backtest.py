@@ -0,0 +1,514 @@
+"""Vectorized backtest of the grid strategy over historical klines.
+
+The simulation follows :class:`core.decision_engine.DecisionEngine` at bar granularity:
+
+* the anchor is the close that (re-)anchors the grid; because the engine only re-anchors when
+  the price exceeds the anchor by one step, the anchor is always the running maximum of the
+  closes, so every re-anchor is found with one ``searchsorted`` over that running maximum;
+* each of the ``max_orders`` levels rests a buy at ``anchor * (1 - grid_step_pct * level)``
+  (tick/step/min-notional applied) until it fills or the grid re-anchors;
+* a filled level holds until its take-profit (maker) or stop-loss (taker) is hit, then re-arms
+  after ``cooldown_seconds``. When both are touched inside one bar the stop wins.
+
+Levels are independent, so the loop runs over *trade rounds* instead of over bars: every
+round answers "first bar after ``t`` where the low/high crosses ``x``" with
+:class:`_FirstPassage`. Rounds are sequential per level, so the bars are also cut into segments
+of ``segment_bars`` that are walked at the same time, each starting idle at its first bar. A
+level's real walk then rejoins the speculative walk of the next segment within a round or two
+(both wait for the same fill), and only that prefix is walked again.
+
+Each level owns ``budget_usdt / max_orders`` and reinvests it: an order is sized from the
+level's slice compounded by the returns of its earlier trades, so a level can lose at most its
+slice, and it stops trading once the slice no longer makes a valid order. Whether a level rests
+at all is decided with the initial slice. Unlike the live engine, a level that is still holding
+when the grid re-anchors is not re-armed until its position closes.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from exchanges.binance.models import PairFilters
+
+EXIT_TAKE_PROFIT = 1
+EXIT_STOP_LOSS = 2
+
+_LOW, _HIGH = 0, 1
+_EXIT_SERIES = np.array([_HIGH, _LOW])
+
+_TRADE_DTYPE = np.dtype(
+    [
+        ("level", np.int32),
+        ("entry_bar", np.int64),
+        ("entry_price", np.float64),
+        ("order_price", np.float64),
+        ("quantity", np.float64),
+        ("entry_taker", np.bool_),
+        ("exit_bar", np.int64),
+        ("exit_price", np.float64),
+        ("exit_kind", np.int8),
+    ]
+)
+
+
+@dataclass
+class Klines:
+    """OHLCV columns as NumPy arrays; ``open_time`` is in epoch milliseconds."""
+
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def interval_ms(self) -> int:
+        if len(self.open_time) < 2:
+            return 60_000
+        return int(np.median(np.diff(self.open_time[: min(len(self.open_time), 1000)])))
+
+    @classmethod
+    def from_array(cls, data: np.ndarray) -> "Klines":
+        data = np.asarray(data, dtype=np.float64)
+        open_time = data[:, 0].astype(np.int64)
+        if len(open_time) and open_time[0] > 10**14:
+            # data.binance.vision switched spot dumps to microseconds in 2025.
+            open_time //= 1000
+        columns = [np.ascontiguousarray(data[:, i]) for i in range(1, 6)]
+        return cls(open_time, *columns)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "Klines":
+        """Build from ``/api/v3/klines`` rows (strings are accepted for the price columns)."""
+
+        return cls.from_array(np.array([row[:6] for row in rows], dtype=np.float64))
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "Klines":
+        """Load a Binance kline CSV dump (no header; the first six columns are used)."""
+
+        return cls.from_array(np.loadtxt(path, delimiter=",", usecols=range(6), ndmin=2))
+
+
+class _FirstPassage:
+    """Batched "first ``t >= start`` with ``series[t] >= x``" queries over equal-length series.
+
+    Each series is split into blocks and followed by one ``+inf`` sentinel block, so every
+    search stops at the end of its own series. A query scans its starting block, then the next
+    ``window`` block maxima in one gather, and only falls back to binary lifting over a sparse
+    table of block maxima for far crossings; everything is vectorized over the queries, which
+    may target different series. "Not found" is ``n``; an ``inf`` threshold never matches.
+    Search lows with ``-low`` and ``-x``.
+    """
+
+    def __init__(self, series: Sequence[np.ndarray], *, block: int = 64, window: int = 256) -> None:
+        self.n = len(series[0])
+        self.block = block
+        per_series = -(-self.n // block) + 1
+        self.stride = per_series * block
+        padded = np.full((len(series), self.stride), np.inf)
+        for i, values in enumerate(series):
+            padded[i, : self.n] = values
+            padded[i, self.n : (per_series - 1) * block] = -np.inf
+        self.blocks = padded.reshape(-1, block)
+        self._last = len(self.blocks) - 1
+        self._offsets = np.arange(block)
+        self._window = np.arange(window)
+        level = self.blocks.max(axis=1)
+        self._maxima = level
+        # Row k of the sparse table holds the maximum of blocks [i, i + 2**k).
+        levels = [level]
+        width = 1
+        while width * 2 <= len(level):
+            nxt = level.copy()
+            np.maximum(level[:-width], level[width:], out=nxt[:-width])
+            levels.append(nxt)
+            level = nxt
+            width *= 2
+        self.table = np.vstack(levels)
+
+    def query(self, series: np.ndarray | int, start: np.ndarray, x: np.ndarray) -> np.ndarray:
+        offset = np.asarray(series, dtype=np.int64) * self.stride
+        origin = offset + np.minimum(np.asarray(start, dtype=np.int64), self.n)
+        x = np.asarray(x, dtype=np.float64)
+        block = origin // self.block
+        hit = (self.blocks[block] >= x[:, None]) & (self._offsets >= (origin % self.block)[:, None])
+        found = hit.any(axis=1)
+        result = block * self.block + hit.argmax(axis=1)
+        todo = np.flatnonzero(~found)
+        if todo.size:
+            target = x[todo]
+            first = block[todo] + 1
+            # Most crossings are close by: scan the next ``window`` block maxima in one gather.
+            near = self._maxima[np.minimum(first[:, None] + self._window, self._last)] >= target[:, None]
+            got = near.any(axis=1)
+            pos = np.where(got, first + near.argmax(axis=1), first + len(self._window))
+            far = np.flatnonzero(~got)
+            if far.size:
+                pos[far] = self._lift(pos[far], target[far])
+            rows = self.blocks[pos] >= target[:, None]
+            result[todo] = pos * self.block + rows.argmax(axis=1)
+        return np.minimum(result - offset, self.n)
+
+    def _lift(self, pos: np.ndarray, target: np.ndarray) -> np.ndarray:
+        for k in range(len(self.table) - 1, -1, -1):
+            below = self.table[k, np.minimum(pos, self._last)] < target
+            pos = pos + (below << k)
+        return pos
+
+
+@dataclass
+class BacktestResult:
+    budget: float
+    net_pnl: float
+    fees: float
+    max_drawdown: float
+    max_drawdown_pct: float
+    buys: int
+    sells: int
+    take_profits: int
+    stop_losses: int
+    open_positions: int
+    bars: int
+    trades: np.ndarray = field(repr=False)
+    equity: np.ndarray = field(repr=False)
+
+    @property
+    def fills(self) -> int:
+        return self.buys + self.sells
+
+    @property
+    def gross_pnl(self) -> float:
+        return self.net_pnl + self.fees
+
+    @property
+    def return_pct(self) -> float:
+        return self.net_pnl / self.budget * 100 if self.budget else 0.0
+
+    @property
+    def fee_impact_pct(self) -> float:
+        """Return points lost to fees (``gross - net`` as a percentage of the budget)."""
+
+        return self.fees / self.budget * 100 if self.budget else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        closed = self.take_profits + self.stop_losses
+        return self.take_profits / closed * 100 if closed else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "net_pnl": round(self.net_pnl, 4),
+            "return_pct": round(self.return_pct, 3),
+            "gross_pnl": round(self.gross_pnl, 4),
+            "fees": round(self.fees, 4),
+            "fee_impact_pct": round(self.fee_impact_pct, 3),
+            "max_drawdown": round(self.max_drawdown, 4),
+            "max_drawdown_pct": round(self.max_drawdown_pct, 3),
+            "fills": self.fills,
+            "take_profits": self.take_profits,
+            "stop_losses": self.stop_losses,
+            "win_rate": round(self.win_rate, 2),
+            "open_positions": self.open_positions,
+        }
+
+
+@dataclass
+class _Walk:
+    step_lane: np.ndarray
+    step_cursor: np.ndarray
+    trades: np.ndarray
+    trade_lane: np.ndarray
+    trade_cursor: np.ndarray
+    final: np.ndarray
+    joined: np.ndarray
+
+
+class _Walker:
+    """Trade rounds of one settings run; a lane is one level walked over a range of bars."""
+
+    def __init__(self, tester: "GridBacktester", starts, ends, prices, take_profit, stop_loss, cooldown_bars) -> None:
+        self.tester = tester
+        self.starts, self.ends, self.prices = starts, ends, prices
+        self.take_profit, self.stop_loss, self.cooldown_bars = take_profit, stop_loss, cooldown_bars
+
+    def step(self, level: np.ndarray, cursor: np.ndarray):
+        """One round of each armed ``(level, cursor)``: the trade it makes, if any, and the next cursor."""
+
+        k, n, quantizer, passage = self.tester.klines, len(self.tester.klines), self.tester.quantizer, self.tester._passage
+        epoch = np.searchsorted(self.starts, cursor, side="left") - 1
+        price = self.prices[epoch, level]
+        hit = passage.query(_LOW, cursor, -price)
+        after = self.ends[epoch] + 1
+        got = np.flatnonzero(hit <= self.ends[epoch])
+        bars, price = hit[got], price[got]
+        trades = np.zeros(got.size, dtype=_TRADE_DTYPE)
+        trades["level"] = level[got] + 1
+        trades["entry_bar"] = bars
+        trades["order_price"] = price
+        # A level still above the market when (re-)armed is marketable: it takes at the open.
+        entry = trades["entry_price"] = np.minimum(price, k.open[bars])
+        trades["entry_taker"] = entry < price
+        tp_price = quantizer.round_prices(entry * (1 + self.take_profit), up=True)
+        sl_price = np.full(got.size, -np.inf)
+        if self.stop_loss > 0:
+            sl_price = quantizer.round_prices(entry * (1 - self.stop_loss))
+        # Take-profit (highs) and stop (lows) in one batched query.
+        hits = passage.query(
+            np.repeat(_EXIT_SERIES, got.size), np.concatenate([bars, bars]) + 1, np.concatenate([tp_price, -sl_price])
+        )
+        hit_tp, hit_sl = hits[: got.size], hits[got.size :]
+        stopped = hit_sl <= hit_tp
+        exit_bar = np.where(stopped, hit_sl, hit_tp)
+        closed = exit_bar < n
+        # A stop is a market order: it fills at the open if the bar gapped through it.
+        exit_price = np.where(stopped, np.minimum(sl_price, k.open[np.minimum(exit_bar, n - 1)]), tp_price)
+        trades["exit_bar"] = np.where(closed, exit_bar, -1)
+        trades["exit_price"] = np.where(closed, exit_price, 0.0)
+        trades["exit_kind"] = np.where(closed, np.where(stopped, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT), 0)
+        after[got] = np.where(closed, exit_bar + 1 + self.cooldown_bars, n)
+        return got, trades, after
+
+    def walk(self, lanes, level, cursor, stop, *, joins=None) -> _Walk:
+        """Run rounds until every lane's cursor reaches its ``stop``, vectorized over the lanes.
+
+        ``joins(lane, cursor)`` returns, per lane, the speculative step it rejoins (or -1); such a
+        lane stops there and its ``joined`` entry is that step.
+        """
+
+        joined = np.full(len(lanes), -1, dtype=np.int64)
+        steps, cursors, chunks, owners, origins = [], [], [], [], []
+        live = np.flatnonzero(cursor < stop)
+        while live.size:
+            if joins is not None:
+                pos = joins(lanes[live], cursor[live])
+                back = pos >= 0
+                joined[live[back]] = pos[back]
+                live = live[~back]
+                if not live.size:
+                    break
+            got, trades, after = self.step(level[live], cursor[live])
+            steps.append(lanes[live])
+            cursors.append(cursor[live])
+            chunks.append(trades)
+            owners.append(lanes[live[got]])
+            origins.append(cursor[live[got]])
+            cursor[live] = after
+            live = live[cursor[live] < stop[live]]
+        empty = np.empty(0, dtype=np.int64)
+        return _Walk(
+            np.concatenate(steps or [empty]),
+            np.concatenate(cursors or [empty]),
+            np.concatenate(chunks or [np.empty(0, dtype=_TRADE_DTYPE)]),
+            np.concatenate(owners or [empty]),
+            np.concatenate(origins or [empty]),
+            cursor,
+            joined,
+        )
+
+
+class GridBacktester:
+    """Runs grid settings against one pair's klines; the search indexes are built once.
+
+    ``filters`` are the pair's exchange filters; fee-free pairs pass ``fee_free=True``.
+    ``segment_bars`` is the length of the segments walked side by side (see the module docstring).
+    """
+
+    def __init__(
+        self,
+        klines: Klines,
+        *,
+        filters: Optional[PairFilters] = None,
+        maker_fee: float = 0.001,
+        taker_fee: float = 0.001,
+        fee_free: bool = False,
+        segment_bars: int = 2048,
+    ) -> None:
+        if len(klines) < 2:
+            raise ValueError("Backtest needs at least two bars")
+        self.klines = klines
+        self.filters = filters or PairFilters()
+        self.quantizer = self.filters.quantizer
+        self.maker_fee = 0.0 if fee_free else maker_fee
+        self.taker_fee = 0.0 if fee_free else taker_fee
+        self.segment_bars = segment_bars
+        self.running_max = np.maximum.accumulate(klines.close)
+        self._passage = _FirstPassage([-klines.low, klines.high])
+
+    def _anchors(self, step: float) -> np.ndarray:
+        close, running_max, n = self.klines.close, self.running_max, len(self.klines)
+        starts = [0]
+        while True:
+            nxt = int(np.searchsorted(running_max, close[starts[-1]] * (1 + step), side="right"))
+            if nxt >= n:
+                return np.array(starts, dtype=np.int64)
+            starts.append(nxt)
+
+    def _levels(self, anchors: np.ndarray, step: float, max_orders: int, per_order: float):
+        raw = anchors[:, None] * (1 - step * np.arange(1, max_orders + 1))
+        prices, quantities, valid = self.quantizer.grid_orders(raw, per_order)
+        prices[~valid] = -np.inf
+        return prices, quantities
+
+    def run(self, settings: Mapping[str, Any] | Any) -> BacktestResult:
+        if hasattr(settings, "model_dump"):
+            settings = settings.model_dump()
+        budget = float(settings.get("budget_usdt", 0) or 0)
+        max_orders = int(settings.get("max_orders", 0) or 0)
+        step = float(settings.get("grid_step_pct", 0) or 0) / 100
+        take_profit = float(settings.get("take_profit_pct", 0) or 0) / 100
+        stop_loss = float(settings.get("stop_loss_pct", 0) or 0) / 100
+        cooldown_bars = math.ceil(float(settings.get("cooldown_seconds", 0) or 0) * 1000 / self.klines.interval_ms)
+
+        n = len(self.klines)
+        if budget <= 0 or max_orders <= 0 or step <= 0:
+            return self._result(budget, np.empty(0, dtype=_TRADE_DTYPE))
+
+        starts = self._anchors(step)
+        ends = np.append(starts[1:], n - 1)
+        prices, _ = self._levels(self.klines.close[starts], step, max_orders, budget / max_orders)
+        walker = _Walker(self, starts, ends, prices, take_profit, stop_loss, cooldown_bars)
+
+        # Lane = (segment, level); lane ``i`` continues lane ``i - max_orders`` of the previous segment.
+        segments = max(1, (n - 1) // self.segment_bars)
+        bounds = np.linspace(1, n, segments + 1).round().astype(np.int64)
+        lanes = np.arange(segments * max_orders)
+        level = lanes % max_orders
+        start, stop = bounds[:-1][lanes // max_orders], bounds[1:][lanes // max_orders]
+
+        spec = walker.walk(lanes, level, start.copy(), stop)
+        # Every step's starting state, sorted by lane and then cursor (a lane's cursor only grows).
+        keys = np.sort(spec.step_lane * (n + 1) + spec.step_cursor)
+        bounds_of = np.searchsorted(keys, np.stack([lanes, lanes + 1]) * (n + 1))
+        first, past = bounds_of[0], bounds_of[1]
+
+        def joins(lane: np.ndarray, cursor: np.ndarray) -> np.ndarray:
+            key = lane * (n + 1) + cursor
+            if not len(keys):
+                return np.full(len(key), -1)
+            pos = np.minimum(np.searchsorted(keys, key), len(keys) - 1)
+            return np.where(keys[pos] == key, pos, -1)
+
+        # Replay each lane from the cursor its predecessor really ended on until it reaches a
+        # state of its own speculative walk; only lanes whose inputs changed are walked again.
+        keep_from, final = first.copy(), spec.final.copy()
+        walked_from, generation = start.copy(), np.zeros(len(lanes), dtype=np.int64)
+        fixes = []
+        while True:
+            incoming = start.copy()
+            incoming[max_orders:] = final[:-max_orders]
+            dirty = np.flatnonzero(incoming != walked_from)
+            if not dirty.size:
+                break
+            walked_from[dirty] = incoming[dirty]
+            generation[dirty] += 1
+            fix = walker.walk(dirty, level[dirty], incoming[dirty].copy(), stop[dirty], joins=joins)
+            joined = fix.joined >= 0
+            keep_from[dirty] = np.where(joined, fix.joined, past[dirty])
+            final[dirty] = np.where(joined, spec.final[dirty], fix.final)
+            fixes.append((fix, generation[fix.trade_lane]))
+
+        position = np.searchsorted(keys, spec.trade_lane * (n + 1) + spec.trade_cursor)
+        parts = [spec.trades[position >= keep_from[spec.trade_lane]]]
+        parts += [fix.trades[gen == generation[fix.trade_lane]] for fix, gen in fixes]
+        trades = np.concatenate(parts)
+        return self._result(budget, self._size(trades, budget / max_orders, max_orders))
+
+    def _size(self, trades: np.ndarray, per_order: float, max_orders: int) -> np.ndarray:
+        """Size every order from its level's slice, compounded by the level's earlier trades.
+
+        A level that can no longer place a valid order from its slice stops trading.
+        """
+
+        trades = trades[np.lexsort((trades["entry_bar"], trades["level"]))]
+        entry_fee = np.where(trades["entry_taker"], self.taker_fee, self.maker_fee)
+        exit_fee = np.where(trades["exit_kind"] == EXIT_STOP_LOSS, self.taker_fee, self.maker_fee)
+        growth = 1 + (trades["exit_price"] * (1 - exit_fee) - trades["entry_price"] * (1 + entry_fee)) / trades["order_price"]
+        growth = np.where(trades["exit_bar"] >= 0, np.maximum(growth, 0.0), 1.0)
+        edges = np.searchsorted(trades["level"], np.arange(1, max_orders + 2))
+        slices = np.empty(len(trades))
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            if hi > lo:
+                slices[lo:hi] = np.cumprod(np.r_[per_order, growth[lo : hi - 1]])
+        quantity = self.quantizer.round_quantities(slices / trades["order_price"])
+        broke = np.cumsum(self.quantizer.violations(trades["order_price"], quantity) != 0)
+        kept = broke == np.repeat(np.r_[0, broke][edges[:-1]], np.diff(edges))
+        trades["quantity"] = quantity
+        trades = trades[kept]
+        return trades[np.lexsort((trades["level"], trades["entry_bar"]))]
+
+    def _result(self, budget: float, trades: np.ndarray) -> BacktestResult:
+        k, n = self.klines, len(self.klines)
+        closed = trades["exit_bar"] >= 0
+        exits = trades[closed]
+        entry_value = trades["entry_price"] * trades["quantity"]
+        exit_value = exits["exit_price"] * exits["quantity"]
+        entry_fee = entry_value * np.where(trades["entry_taker"], self.taker_fee, self.maker_fee)
+        exit_fee = exit_value * np.where(exits["exit_kind"] == EXIT_STOP_LOSS, self.taker_fee, self.maker_fee)
+
+        cash = np.zeros(n)
+        position = np.zeros(n)
+        np.add.at(cash, trades["entry_bar"], -(entry_value + entry_fee))
+        np.add.at(position, trades["entry_bar"], trades["quantity"])
+        np.add.at(cash, exits["exit_bar"], exit_value - exit_fee)
+        np.add.at(position, exits["exit_bar"], -exits["quantity"])
+        equity = budget + np.cumsum(cash) + np.cumsum(position) * k.close
+        peak = np.maximum.accumulate(equity)
+        drawdown = peak - equity
+        worst = int(drawdown.argmax()) if n else 0
+        return BacktestResult(
+            budget=budget,
+            net_pnl=float(equity[-1] - budget) if n else 0.0,
+            fees=float(entry_fee.sum() + exit_fee.sum()),
+            max_drawdown=float(drawdown[worst]) if n else 0.0,
+            max_drawdown_pct=float(drawdown[worst] / peak[worst] * 100) if n and peak[worst] > 0 else 0.0,
+            buys=len(trades),
+            sells=len(exits),
+            take_profits=int((exits["exit_kind"] == EXIT_TAKE_PROFIT).sum()),
+            stop_losses=int((exits["exit_kind"] == EXIT_STOP_LOSS).sum()),
+            open_positions=int((~closed).sum()),
+            bars=n,
+            trades=trades,
+            equity=equity,
+        )
+
+
+def run_grid_backtest(
+    klines: Klines,
+    settings: Mapping[str, Any] | Any,
+    *,
+    filters: Optional[PairFilters] = None,
+    fee_free: bool = False,
+    maker_fee: float = 0.001,
+    taker_fee: float = 0.001,
+) -> BacktestResult:
+    return GridBacktester(
+        klines, filters=filters, fee_free=fee_free, maker_fee=maker_fee, taker_fee=taker_fee
+    ).run(settings)
+
+
+def compare_presets(
+    klines: Klines, presets: Mapping[str, Mapping[str, Any]], **kwargs
+) -> Dict[str, Dict[str, float]]:
+    """Summaries for several named settings (e.g. the trade screen presets) on the same data."""
+
+    tester = GridBacktester(klines, **kwargs)
+    return {name: tester.run(settings).summary() for name, settings in presets.items()}
+
+
+__all__ = [
+    "BacktestResult",
+    "GridBacktester",
+    "Klines",
+    "compare_presets",
+    "run_grid_backtest",
+]
@@ -0,0 +1,166 @@
+"""Batches price updates and delivers them to strategies, timing each strategy separately.
+
+Updates are appended to preallocated arrays and handed to every strategy as one
+``on_batch`` call when ``batch_size`` updates are buffered or the oldest buffered update is
+``batch_ms`` old (checked on each push; :meth:`StrategyHost.flush` delivers a partial batch,
+e.g. on stop). Recorded data such as bar closes goes through :meth:`StrategyHost.feed`, which
+chunks whole arrays without copying them into the buffer.
+
+A strategy that raises is counted and logged; the others still receive the batch.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.metrics import LatencyStats
+from strategies.base import SignalBatch, Strategy
+
+SignalHandler = Callable[[str, SignalBatch, List[str]], None]
+
+
+@dataclass
+class StrategyStats:
+    calls: int = 0
+    updates: int = 0
+    signals: int = 0
+    errors: int = 0
+    total_ns: int = 0
+    batch: LatencyStats = field(default_factory=LatencyStats)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "updates": self.updates,
+            "signals": self.signals,
+            "errors": self.errors,
+            "ns_per_update": round(self.total_ns / self.updates, 1) if self.updates else 0.0,
+            "batch": self.batch.summary(),
+        }
+
+
+class StrategyHost:
+    def __init__(
+        self,
+        strategies: Iterable[Strategy],
+        *,
+        batch_size: int = 1_024,
+        batch_ms: int = 50,
+        on_signals: Optional[SignalHandler] = None,
+        clock: Callable[[], float] = time.monotonic,
+        logger=None,
+    ) -> None:
+        self.strategies: List[Strategy] = list(strategies)
+        self.batch_size = max(1, batch_size)
+        self.batch_s = batch_ms / 1000
+        self.on_signals = on_signals
+        self.clock = clock
+        self.logger = logger
+        self.symbols: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.stats_by_strategy: Dict[str, StrategyStats] = {s.name: StrategyStats() for s in self.strategies}
+        self._ids = np.empty(self.batch_size, dtype=np.int64)
+        self._prices = np.empty(self.batch_size)
+        self._ts = np.empty(self.batch_size)
+        self._count = 0
+        self._first_at = 0.0
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    def add(self, strategy: Strategy) -> None:
+        self.strategies.append(strategy)
+        self.stats_by_strategy.setdefault(strategy.name, StrategyStats())
+
+    def symbol_id(self, symbol: str) -> int:
+        index = self.ids.get(symbol)
+        if index is None:
+            index = self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return index
+
+    # Ingress
+    def push(self, symbol: str, price: float, ts: float) -> List[Tuple[str, SignalBatch]]:
+        if self._count == 0:
+            self._first_at = self.clock()
+        i = self._count
+        self._ids[i] = self.symbol_id(symbol)
+        self._prices[i] = price
+        self._ts[i] = ts
+        self._count = i + 1
+        if self._count >= self.batch_size or self.clock() - self._first_at >= self.batch_s:
+            return self.flush()
+        return []
+
+    def on_market(self, event) -> None:
+        """Engine market observer: the mid (else last) price, stamped with the exchange event time."""
+
+        price = event.mid
+        if price is not None:
+            ts = event.event_time_ms / 1000 if event.event_time_ms else time.time()
+            self.push(event.symbol, price, ts)
+
+    def flush(self) -> List[Tuple[str, SignalBatch]]:
+        if not self._count:
+            return []
+        n, self._count = self._count, 0
+        # Copies: strategies may keep references, and the buffer is reused for the next batch.
+        return self._deliver(self._ids[:n].copy(), self._prices[:n].copy(), self._ts[:n].copy())
+
+    def feed(self, symbol_ids: np.ndarray, prices: np.ndarray, ts: np.ndarray) -> List[Tuple[str, SignalBatch]]:
+        """Deliver recorded updates (ids from :meth:`symbol_id`) in ``batch_size`` chunks."""
+
+        self.flush()
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        ts = np.asarray(ts, dtype=np.float64)
+        results: List[Tuple[str, SignalBatch]] = []
+        for start in range(0, len(symbol_ids), self.batch_size):
+            end = start + self.batch_size
+            results.extend(self._deliver(symbol_ids[start:end], prices[start:end], ts[start:end]))
+        return results
+
+    def _deliver(self, symbol_ids: np.ndarray, prices: np.ndarray, ts: np.ndarray) -> List[Tuple[str, SignalBatch]]:
+        results: List[Tuple[str, SignalBatch]] = []
+        for strategy in self.strategies:
+            stats = self.stats_by_strategy[strategy.name]
+            started = time.perf_counter_ns()
+            try:
+                signals = strategy.on_batch(symbol_ids, prices, ts)
+            except Exception:  # noqa: BLE001 - one strategy must not starve the others
+                stats.errors += 1
+                self._log("exception", "Strategy %s failed on a batch of %s", strategy.name, len(symbol_ids))
+                continue
+            finally:
+                elapsed = time.perf_counter_ns() - started
+                stats.total_ns += elapsed
+                stats.batch.record(elapsed / 1e9)
+                stats.calls += 1
+                stats.updates += len(symbol_ids)
+            if len(signals):
+                stats.signals += len(signals)
+                results.append((strategy.name, signals))
+                if self.on_signals:
+                    self.on_signals(strategy.name, signals, self.symbols)
+        return results
+
+    # Reporting
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.summary() for name, stats in self.stats_by_strategy.items()}
+
+
+def build_host(settings, **kwargs) -> StrategyHost:
+    """Host for the ``strategies`` config section; strategy modules load here, by name."""
+
+    from strategies.registry import load_strategy
+
+    strategies = [load_strategy(name, **settings.params.get(name, {})) for name in settings.enabled]
+    return StrategyHost(strategies, batch_size=settings.batch_size, batch_ms=settings.batch_ms, **kwargs)
+
+
+__all__ = ["StrategyHost", "StrategyStats", "build_host"]
@@ -0,0 +1,41 @@
+"""Strategy lookup by config name; modules are imported only when a strategy is loaded."""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict, List
+
+from strategies.base import Strategy
+
+# name -> "module:Class"; a config may also name any "module:Class" directly.
+_REGISTRY: Dict[str, str] = {
+    "trend": "strategies.trend:TrendFollowing",
+    "dca": "strategies.dca:DcaStrategy",
+}
+
+
+def register(name: str, target: str) -> None:
+    if ":" not in target:
+        raise ValueError(f"Strategy target must be 'module:Class', got {target!r}")
+    _REGISTRY[name] = target
+
+
+def available() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def load_strategy(name: str, **params: Any) -> Strategy:
+    target = _REGISTRY.get(name, name)
+    if ":" not in target:
+        raise ValueError(f"Unknown strategy {name!r}; available: {', '.join(available())}")
+    module_name, class_name = target.split(":", 1)
+    cls = getattr(importlib.import_module(module_name), class_name)
+    strategy = cls(**params)
+    if not isinstance(strategy, Strategy):
+        raise TypeError(f"{target} is not a Strategy")
+    if name in _REGISTRY:
+        strategy.name = name
+    return strategy
+
+
+__all__ = ["available", "load_strategy", "register"]
@@ -0,0 +1,299 @@
+"""Parallel parameter sweep of :class:`GridBacktester` over ``TradingSettings`` candidates.
+
+Klines are written once to a ``.npy`` file and memory-mapped by every worker process, so the
+price arrays are shared through the page cache instead of being pickled per task. Each worker
+builds its backtesters once in the pool initializer and then only receives small settings
+batches.
+
+The sweep runs in two stages. Every candidate is first screened on the leading
+``screen_fraction`` of the history; candidates that are clearly dominated there (at least
+``prune_dominators`` others have both a better return and a lower drawdown by ``prune_margin``
+percentage points) stop early and never run on the full history. Every candidate is appended
+to a JSON-lines file once, with its final stage (``full``, or ``pruned`` with its screening
+summary), as soon as that is known, so a long sweep can be followed (or salvaged) while it runs.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from exchanges.binance.models import PairFilters
+from strategies.grid_backtest import GridBacktester, Klines
+
+SWEEP_DIR = Path("data") / "sweeps"
+
+DEFAULT_SPACE: Dict[str, Sequence[Any]] = {
+    "max_orders": (3, 5, 8),
+    "grid_step_pct": (0.2, 0.35, 0.5, 0.75, 1.0),
+    "take_profit_pct": (0.4, 0.6, 0.9, 1.2, 1.5, 2.0),
+    "stop_loss_pct": (0.0, 1.0, 1.5, 2.0, 3.0),
+    "cooldown_seconds": (10, 30, 60),
+}
+
+
+@dataclass
+class SweepSpace:
+    """Candidate values per setting; ``base`` supplies every setting that is not swept."""
+
+    params: Dict[str, Sequence[Any]]
+    base: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # Repeated values would repeat grid points and leave ``sample`` short of distinct combos.
+        self.params = {key: tuple(dict.fromkeys(values)) for key, values in self.params.items()}
+
+    def __len__(self) -> int:
+        size = 1
+        for values in self.params.values():
+            size *= len(values)
+        return size
+
+    def grid(self) -> Iterator[Dict[str, Any]]:
+        keys = list(self.params)
+        for combo in itertools.product(*(self.params[key] for key in keys)):
+            yield {**self.base, **dict(zip(keys, combo))}
+
+    def sample(self, count: int, *, seed: int | None = None) -> List[Dict[str, Any]]:
+        """``count`` distinct random combinations (the whole grid when it is smaller)."""
+
+        if count >= len(self):
+            return list(self.grid())
+        rng = random.Random(seed)
+        keys = list(self.params)
+        picked: Dict[tuple, Dict[str, Any]] = {}
+        while len(picked) < count:
+            combo = tuple(rng.choice(self.params[key]) for key in keys)
+            picked.setdefault(combo, {**self.base, **dict(zip(keys, combo))})
+        return list(picked.values())
+
+
+@dataclass
+class SweepCandidate:
+    settings: Dict[str, Any]
+    summary: Dict[str, float]
+    score: float
+    stage: str = "full"
+
+
+@dataclass
+class SweepReport:
+    ranked: List[SweepCandidate]
+    evaluated: int
+    pruned: int
+    elapsed_s: float
+    results_path: Optional[Path]
+
+    def top(self, count: int = 5) -> List[SweepCandidate]:
+        return self.ranked[:count]
+
+
+def score_summary(summary: Mapping[str, float], *, drawdown_weight: float = 0.5) -> float:
+    """Return in percent, penalised by the max drawdown percentage."""
+
+    return float(summary["return_pct"]) - drawdown_weight * float(summary["max_drawdown_pct"])
+
+
+# Worker-process state, set once per process by ``_install_testers``.
+_WORKER: Dict[str, GridBacktester] = {}
+
+
+def _columns(klines: Klines) -> tuple:
+    return klines.open_time, klines.open, klines.high, klines.low, klines.close, klines.volume
+
+
+def _install_testers(klines: Klines, screen_bars: int, tester_kwargs: Dict[str, Any]) -> None:
+    _WORKER["full"] = GridBacktester(klines, **tester_kwargs)
+    if 1 < screen_bars < len(klines):
+        screen = Klines(*(column[:screen_bars] for column in _columns(klines)))
+        _WORKER["screen"] = GridBacktester(screen, **tester_kwargs)
+    else:
+        _WORKER["screen"] = _WORKER["full"]
+
+
+def _init_worker(path: str, screen_bars: int, tester_kwargs: Dict[str, Any]) -> None:
+    # Stored column-major, so every price column is a zero-copy view of the shared mapping.
+    _install_testers(Klines.from_array(np.load(path, mmap_mode="r").T), screen_bars, tester_kwargs)
+
+
+def _evaluate(stage: str, batch: List[tuple]) -> List[tuple]:
+    tester = _WORKER[stage]
+    return [(index, settings, tester.run(settings).summary()) for index, settings in batch]
+
+
+class ParameterSweep:
+    """Evaluates many settings on one pair's klines across a process pool.
+
+    ``workers=0`` uses every CPU core; ``workers=1`` runs in-process (no pool), which is also
+    what tests use.
+    """
+
+    def __init__(
+        self,
+        klines: Klines,
+        *,
+        filters: Optional[PairFilters] = None,
+        fee_free: bool = False,
+        maker_fee: float = 0.001,
+        taker_fee: float = 0.001,
+        workers: int = 0,
+        batch_size: int = 8,
+        screen_fraction: float = 0.25,
+        prune_margin: float = 1.0,
+        prune_dominators: int = 3,
+        drawdown_weight: float = 0.5,
+        results_path: str | Path | None = None,
+        logger=None,
+    ) -> None:
+        self.klines = klines
+        self.tester_kwargs = {
+            "filters": filters,
+            "fee_free": fee_free,
+            "maker_fee": maker_fee,
+            "taker_fee": taker_fee,
+        }
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.screen_bars = int(len(klines) * screen_fraction) if 0 < screen_fraction < 1 else 0
+        self.prune_margin = prune_margin
+        self.prune_dominators = prune_dominators
+        self.drawdown_weight = drawdown_weight
+        self.results_path = Path(results_path) if results_path else None
+        self.logger = logger
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
+
+    def run(
+        self,
+        candidates: Iterable[Mapping[str, Any]],
+        *,
+        on_result: Optional[Callable[[SweepCandidate], None]] = None,
+    ) -> SweepReport:
+        started = time.perf_counter()
+        indexed = [(index, dict(settings)) for index, settings in enumerate(candidates)]
+        if self.results_path:
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        sink = self.results_path.open("a", encoding="utf-8") if self.results_path else None
+
+        def emit(candidate: SweepCandidate) -> None:
+            if sink:
+                sink.write(json.dumps(asdict(candidate)) + "\n")
+                sink.flush()
+            if on_result:
+                on_result(candidate)
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="bbot-sweep-") as tmp:
+                pool = self._start_pool(tmp)
+                try:
+                    survivors = indexed
+                    pruned = 0
+                    if self.screen_bars:
+                        screened = self._stage(pool, "screen", indexed, None)
+                        keep = self._undominated(screened)
+                        survivors = [item for item in indexed if item[0] in keep]
+                        pruned = len(indexed) - len(survivors)
+                        for index, settings in indexed:
+                            if index not in keep:
+                                emit(SweepCandidate(settings, screened[index], self._score(screened[index]), "pruned"))
+                    results = self._stage(pool, "full", survivors, emit)
+                finally:
+                    # The pool holds the memory map open; it must go before the temp dir does.
+                    if pool:
+                        pool.shutdown(cancel_futures=True)
+        finally:
+            if sink:
+                sink.close()
+
+        settings_by_index = dict(indexed)
+        ranked = sorted(
+            (SweepCandidate(settings_by_index[i], s, self._score(s)) for i, s in sorted(results.items())),
+            key=lambda candidate: candidate.score,
+            reverse=True,
+        )
+        elapsed = time.perf_counter() - started
+        self._log("info", "Sweep: %s candidates, %s pruned early, %.1fs", len(indexed), pruned, elapsed)
+        return SweepReport(ranked, len(indexed), pruned, elapsed, self.results_path)
+
+    def _score(self, summary: Mapping[str, float]) -> float:
+        return score_summary(summary, drawdown_weight=self.drawdown_weight)
+
+    def _undominated(self, screened: Dict[int, Dict[str, float]]) -> set:
+        indices = list(screened)
+        returns = np.array([screened[i]["return_pct"] for i in indices])
+        drawdowns = np.array([screened[i]["max_drawdown_pct"] for i in indices])
+        # dominated[i, j]: candidate j beats candidate i on both axes by the margin.
+        dominated = (returns[None, :] >= returns[:, None] + self.prune_margin) & (
+            drawdowns[None, :] <= drawdowns[:, None] - self.prune_margin
+        )
+        keep = dominated.sum(axis=1) < self.prune_dominators
+        return {index for index, ok in zip(indices, keep) if ok}
+
+    def _start_pool(self, tmp: str) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            _install_testers(self.klines, self.screen_bars, self.tester_kwargs)
+            return None
+        path = os.path.join(tmp, "klines.npy")
+        np.save(path, np.vstack(_columns(self.klines)).astype(np.float64))
+        # Spawned, not forked: the sweep is started from a UI thread and forking a threaded
+        # process can deadlock the children.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(path, self.screen_bars, self.tester_kwargs),
+        )
+
+    def _stage(
+        self,
+        pool: Optional[ProcessPoolExecutor],
+        stage: str,
+        items: List[tuple],
+        emit: Optional[Callable[[SweepCandidate], None]],
+    ) -> Dict[int, Dict[str, float]]:
+        batches = list(_batches(items, self.batch_size))
+        if pool is None:
+            completed: Iterable[List[tuple]] = (_evaluate(stage, batch) for batch in batches)
+        else:
+            futures = [pool.submit(_evaluate, stage, batch) for batch in batches]
+            completed = (future.result() for future in as_completed(futures))
+        out: Dict[int, Dict[str, float]] = {}
+        for results in completed:
+            for index, settings, summary in results:
+                out[index] = summary
+                if emit:
+                    emit(SweepCandidate(settings, summary, self._score(summary), stage))
+        return out
+
+
+def _batches(items: List[tuple], size: int) -> Iterator[List[tuple]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def default_results_path(symbol: str) -> Path:
+    return SWEEP_DIR / f"{symbol}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+
+__all__ = [
+    "DEFAULT_SPACE",
+    "ParameterSweep",
+    "SweepCandidate",
+    "SweepReport",
+    "SweepSpace",
+    "default_results_path",
+    "score_summary",
+]
@@ -0,0 +1,59 @@
+"""EMA crossover trend following, vectorized over symbols."""
+
+from __future__ import annotations
+
+from typing import Any, List
+
+import numpy as np
+
+from strategies.base import BUY, SELL, SignalBatch, Strategy, SymbolArrays, unique_passes
+
+
+class TrendFollowing(Strategy):
+    """BUY when the fast EMA crosses above the slow one, SELL when it crosses below.
+
+    EMAs advance once per update (tick or bar close). A symbol signals only after
+    ``slow_period`` updates, so the first cross is not an artifact of the seed price.
+    """
+
+    name = "trend"
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, **params: Any) -> None:
+        super().__init__(fast_period=fast_period, slow_period=slow_period, **params)
+        if not 0 < fast_period < slow_period:
+            raise ValueError("TrendFollowing needs 0 < fast_period < slow_period")
+        self.fast_alpha = 2 / (fast_period + 1)
+        self.slow_alpha = 2 / (slow_period + 1)
+        self.warmup = slow_period
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = SymbolArrays({"fast": np.nan, "slow": np.nan, "count": 0.0, "trend": 0.0})
+
+    def on_batch(self, symbol_ids: np.ndarray, prices: np.ndarray, ts: np.ndarray) -> SignalBatch:
+        if not len(symbol_ids):
+            return SignalBatch.empty()
+        state = self.state
+        state.ensure(int(symbol_ids.max()))
+        out: List[SignalBatch] = []
+        for index in unique_passes(symbol_ids):
+            ids, price = symbol_ids[index], prices[index]
+            fast, slow = state.fast[ids], state.slow[ids]
+            seed = np.isnan(fast)
+            fast = np.where(seed, price, fast + self.fast_alpha * (price - fast))
+            slow = np.where(seed, price, slow + self.slow_alpha * (price - slow))
+            state.fast[ids], state.slow[ids] = fast, slow
+            count = state.count[ids] + 1
+            state.count[ids] = count
+            trend = np.sign(fast - slow)
+            previous = state.trend[ids]
+            state.trend[ids] = np.where(trend != 0, trend, previous)
+            ready = count > self.warmup
+            crossed = ready & (trend != 0) & (trend != previous) & (previous != 0)
+            if crossed.any():
+                sides = np.where(trend > 0, BUY, SELL)
+                out.append(SignalBatch.from_mask(crossed, sides, ids, price, ts[index], self.name))
+        return SignalBatch.concat(out)
+
+
+__all__ = ["TrendFollowing"]
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import random
+import threading
+import unittest
+
+from ai.async_client import AiRequestCancelled, AsyncAiClient
+from ai.client import MOCK_SETTINGS, AiClient
+from core.state import AppState, StateMachine
+
+
+def make_client(**kwargs) -> AiClient:
+    return AiClient(StateMachine(), logging.getLogger("test"), **kwargs)
+
+
+class ScriptedAio(AsyncAiClient):
+    """Answers from ``script``: an exception instance is raised, ``"block"`` waits for ``gate``."""
+
+    def __init__(self, client, script=(), **kwargs) -> None:
+        kwargs.setdefault("rng", random.Random(3))
+        kwargs.setdefault("backoff_base_s", 0.001)
+        super().__init__(client, **kwargs)
+        self.script = list(script)
+        self.calls = 0
+        self.gate = None
+
+    async def _request(self, prompt, user_message, timeout, **kwargs):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else None
+        if isinstance(step, BaseException):
+            raise step
+        if step == "block":
+            await self.gate.wait()
+        return {"explanation": user_message, "settings": dict(MOCK_SETTINGS)}
+
+
+class BlockingClient(AiClient):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def _run(self, prompt, user_message):
+        if user_message == "slow":
+            self.entered.set()
+            self.release.wait(5)
+        return {"explanation": user_message, "settings": dict(MOCK_SETTINGS)}
+
+
+class AsyncAiClientTests(unittest.TestCase):
+    def test_semaphore_bounds_in_flight_and_reports_queue_depth(self) -> None:
+        aio = ScriptedAio(make_client(), ["block"] * 5, max_concurrency=2)
+
+        async def scenario():
+            aio.gate = asyncio.Event()
+            tasks = [asyncio.create_task(aio.chat("p", f"q{i}")) for i in range(5)]
+            await asyncio.sleep(0.01)
+            busy = aio.stats()
+            aio.gate.set()
+            return busy, await asyncio.gather(*tasks)
+
+        busy, results = asyncio.run(scenario())
+        self.assertEqual((busy["in_flight"], busy["queued"]), (2, 3))
+        self.assertGreater(busy["oldest_in_flight_ms"], 0)
+        self.assertEqual([r["explanation"] for r in results], [f"q{i}" for i in range(5)])
+        stats = aio.stats()
+        self.assertEqual((stats["in_flight"], stats["queued"], stats["completed"]), (0, 0, 5))
+        self.assertEqual(stats["latency"]["count"], 5)
+        self.assertEqual(stats["queue_wait"]["count"], 5)
+
+    def test_only_retryable_errors_are_retried_with_jittered_backoff(self) -> None:
+        client = make_client(max_retries=3)
+        aio = ScriptedAio(client, [ConnectionError("reset"), ValueError("no SETTINGS_JSON")])
+        result = asyncio.run(aio.chat("p", "ok"))
+        self.assertEqual(result["explanation"], "ok")
+        self.assertEqual((aio.calls, aio.counters["retries"]), (3, 2))
+        self.assertEqual(client.state.state, AppState.AI_READY)
+
+        fatal = ScriptedAio(make_client(max_retries=3), [PermissionError("invalid api key")])
+        with self.assertRaises(PermissionError):
+            asyncio.run(fatal.chat("p", "q"))
+        self.assertEqual((fatal.calls, fatal.counters["failed"]), (1, 1))
+
+        exhausted = ScriptedAio(make_client(max_retries=1), [ValueError("bad"), ValueError("bad")])
+        with self.assertRaisesRegex(ValueError, "after retries"):
+            asyncio.run(exhausted.chat("p", "q"))
+        self.assertEqual(exhausted.calls, 2)
+
+        jitter = AsyncAiClient(client, backoff_base_s=0.5, backoff_max_s=4.0, rng=random.Random(1))
+        delays = [jitter.backoff_delay(n) for n in range(6) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 4.0 for d in delays))
+        self.assertGreater(len(set(delays)), 250)
+        self.assertTrue(all(d <= 0.5 for d in delays[:50]))
+
+    def test_deadline_bounds_the_whole_request(self) -> None:
+        client = make_client(max_retries=5)
+        aio = ScriptedAio(client, ["block"], deadline_seconds=0.05)
+
+        async def scenario():
+            aio.gate = asyncio.Event()
+            await aio.chat("p", "q")
+
+        with self.assertRaisesRegex(TimeoutError, "deadline"):
+            asyncio.run(scenario())
+        self.assertEqual(aio.counters["deadline_exceeded"], 1)
+        self.assertEqual(client.state.state, AppState.ERROR)
+
+    def test_newer_message_cancels_the_older_one_through_the_sync_facade(self) -> None:
+        client = BlockingClient(StateMachine(), logging.getLogger("test"))
+        outcome = []
+
+        def older() -> None:
+            try:
+                outcome.append(client.run_chat("p", "slow", channel="chat"))
+            except AiRequestCancelled as exc:
+                outcome.append(exc)
+
+        thread = threading.Thread(target=older)
+        thread.start()
+        self.assertTrue(client.entered.wait(2))
+        newer = client.run_chat("p", "fast", channel="chat")
+        thread.join(2)
+        client.release.set()
+        self.assertEqual(newer["explanation"], "fast")
+        self.assertIsInstance(outcome[0], AiRequestCancelled)
+        # Other channels are independent.
+        self.assertEqual(client.run_chat("p", "other", channel="screening")["explanation"], "other")
+        stats = client.aio.stats()
+        self.assertEqual((stats["cancelled"], stats["completed"]), (1, 2))
+        client.close()
+
+    def test_reconfigure_keeps_the_loop_and_only_resets_the_endpoint(self) -> None:
+        client = make_client(api_key="sk-old", deadline_seconds=60)
+        aio, openai = client.aio, client.aio.openai
+        aio.breaker.record_failure()
+        client.reconfigure(model="gpt-x", deadline_seconds=5, breaker_reset_seconds=10)
+        self.assertIs(client.aio.openai, openai)
+        self.assertEqual((client.model, aio.deadline_seconds, aio.breaker.reset_timeout_s), ("gpt-x", 5, 10))
+        self.assertEqual(aio.breaker.failures, 1)
+
+        client.reconfigure(api_key="", base_url="")
+        self.assertIs(client.aio, aio)
+        self.assertIsNone(aio.openai)  # no key: mock mode from the next request on
+        self.assertEqual((aio.breaker.failures, client.base_url), (0, None))
+        with self.assertRaisesRegex(ValueError, "max_concurrency"):
+            client.reconfigure(max_concurrency=4)
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
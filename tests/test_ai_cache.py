@@ -0,0 +1,104 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai.cache import AiResponseCache, cache_key, market_buckets
+from ai.client import AiChatResult, AiClient
+from core.state import AppState, StateMachine
+from exchanges.binance.models import MarketSnapshot
+
+
+def snapshot(bid: float, ask: float, volume: float = 1_000_000.0) -> MarketSnapshot:
+    return MarketSnapshot(symbol="BTCUSDT", last_price=bid, bid=bid, ask=ask, volume_24h=volume, spread=ask - bid, timestamp=1)
+
+
+class CountingClient(AiClient):
+    calls = 0
+
+    def _run(self, prompt, user_message):
+        self.calls += 1
+        return self._mock_response(user_message)
+
+
+def reject_all(payload):
+    raise ValueError("schema changed")
+
+
+class AiCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "ai_cache.json"
+        self.now = [1_000.0]
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _cache(self, **kwargs) -> AiResponseCache:
+        kwargs.setdefault("validate", lambda payload: AiChatResult(**payload).model_dump())
+        return AiResponseCache(self.path, clock=lambda: self.now[0], **kwargs)
+
+    def test_buckets_absorb_small_moves_only(self) -> None:
+        base = market_buckets(snapshot(100.0, 100.02), 0.5)
+        self.assertEqual(base, market_buckets(snapshot(100.05, 100.07, 1_001_000), 0.5))
+        self.assertNotEqual(base["mid"], market_buckets(snapshot(101.0, 101.02), 0.5)["mid"])
+        self.assertNotEqual(base["spread_bps"], market_buckets(snapshot(100.0, 100.1), 0.5)["spread_bps"])
+        self.assertEqual(market_buckets(None, 0.5), {})
+
+    def test_client_hits_cache_and_reports_hit_rate(self) -> None:
+        state = StateMachine()
+        client = CountingClient(state, logging.getLogger("test"), cache=self._cache())
+        key = cache_key("prompt", "tighter grid?", market_buckets(snapshot(100.0, 100.02), 0.5), model="m")
+        first = client.run_chat("prompt + live market", "tighter grid?", cache_key=key)
+        state.set_state(AppState.IDLE)
+        second = client.run_chat("prompt + moved market", "tighter grid?", cache_key=key)
+        self.assertEqual(first, second)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(state.state, AppState.AI_READY)
+        client.run_chat("prompt", "other question", cache_key=cache_key("prompt", "other question", {}, model="m"))
+        self.assertEqual(client.calls, 2)
+        stats = client.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3, places=3)
+        # Without a key the cache is bypassed.
+        client.run_chat("prompt", "tighter grid?")
+        self.assertEqual(client.calls, 3)
+
+    def test_ttl_lru_and_persistence(self) -> None:
+        payload = AiChatResult(
+            explanation="ok",
+            settings={
+                "budget_usdt": 100,
+                "max_orders": 3,
+                "grid_step_pct": 0.5,
+                "take_profit_pct": 1.0,
+                "stop_loss_pct": 1.0,
+                "cooldown_seconds": 10,
+                "update_interval_ms": 1000,
+            },
+        ).model_dump()
+        cache = self._cache(max_entries=2, ttl_seconds=60)
+        cache.put("a", payload, latency_ms=2_500)
+        cache.put("b", payload)
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", payload)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evicted"], 1)
+        self.assertEqual(cache.stats()["saved_ms"], 2_500)
+
+        restored = self._cache(max_entries=2, ttl_seconds=60)
+        self.assertEqual(len(restored), 2)
+        self.assertEqual(restored.get("a"), payload)
+        self.now[0] += 61
+        self.assertIsNone(restored.get("c"))
+        self.assertEqual(restored.stats()["expired"], 1)
+        self.assertEqual(len(self._cache(ttl_seconds=60)), 0)
+
+        # Entries that no longer validate are dropped on load.
+        self.now[0] -= 61
+        strict = self._cache(validate=reject_all)
+        self.assertEqual(len(strict), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import logging
+import time
+import unittest
+
+from ai.client import AiClient
+from ai.health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from ai.stub_server import StubConfig, StubServer
+from core.state import StateMachine
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_closes_after_half_open_success(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=10, clock=lambda: now[0])
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        now[0] = 10.0
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # one trial at a time
+        breaker.record_failure()
+        self.assertEqual((breaker.state, breaker.retry_in()), (OPEN, 10.0))
+        now[0] = 20.0
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.snapshot(), {"state": CLOSED, "failures": 0, "opened": 1, "retry_in_s": 0.0})
+
+
+class HealthMonitorTests(unittest.TestCase):
+    def test_calls_fail_fast_while_open_and_probe_recovers(self) -> None:
+        config = StubConfig(latency_ms=1, jitter_ms=0, tokens_per_s=0, error_rate=1.0, seed=1)
+        with StubServer(config) as server:
+            client = AiClient(
+                StateMachine(),
+                logging.getLogger("test"),
+                api_key="stub",
+                base_url=server.base_url,
+                max_retries=0,
+                breaker_failure_threshold=2,
+                breaker_reset_seconds=0.2,
+            )
+            try:
+                for _ in range(2):
+                    with self.assertRaises(Exception):
+                        client.run_chat("system", "q")
+                self.assertEqual(client.aio.breaker.state, OPEN)
+                started = time.monotonic()
+                with self.assertRaises(CircuitOpenError):
+                    client.run_chat("system", "q")
+                self.assertLess(time.monotonic() - started, 0.1)
+                self.assertEqual(server.counters["requests"], 2)
+                self.assertEqual(client.aio.stats()["short_circuited"], 1)
+                self.assertTrue(client.health.status_text().startswith("Down"))
+
+                # The endpoint comes back; the half-open probe (GET /models) closes the circuit.
+                config.error_rate = 0.0
+                self.assertGreaterEqual(client.health.next_delay(), 0.1)
+                time.sleep(0.25)
+                self.assertTrue(client.healthcheck())
+                self.assertEqual(server.counters["models"], 1)
+                self.assertEqual(client.aio.breaker.state, CLOSED)
+                self.assertTrue(client.health.status_text().startswith("OK"))
+                self.assertEqual(client.health.next_delay(), client.health_interval_seconds)
+                self.assertIn("settings", client.run_chat("system", "q"))
+
+                # Background probing runs on the AI loop and only updates the cached snapshot.
+                client.health.interval_s = 0.05
+                client.health.start()
+                time.sleep(0.3)
+                self.assertGreater(server.counters["models"], 2)
+                self.assertEqual(client.health.snapshot()["status"], "ok")
+            finally:
+                client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+import unittest
+
+from ai.client import MOCK_SETTINGS, AiClient
+from ai.screening import PairScreener, RequestPacer, features_table, validate_screening
+from core.config_service import Config
+from core.state import StateMachine
+
+
+def pair(symbol: str, last: float, spread: float, volume: float) -> dict:
+    return {"symbol": symbol, "last": last, "spread": spread, "volume": volume, "tick_size": 0.01, "min_notional": 5.0}
+
+
+PAIRS = [pair(f"P{i:02d}USDT", 10.0 + i, 0.001 * (i + 1), 1_000_000.0 / (i + 1)) for i in range(20)]
+
+
+class ScreeningTests(unittest.TestCase):
+    def test_features_table_is_compact(self) -> None:
+        line = features_table([pair("BTCUSDT", 50_000.0, 0.5, 1_200.0)])
+        self.assertEqual(line, "BTCUSDT,50000,0.1,60,0.01,5")
+
+    def test_validation_checks_the_whole_list_in_one_pass(self) -> None:
+        row = {"symbol": "btcusdt", "score": 80, "reason": "ok", "settings": MOCK_SETTINGS}
+        result = validate_screening(
+            {"explanation": "x", "settings": {"pairs": [row, {**row, "score": 10}, {**row, "symbol": "XYZUSDT"}]}},
+            ["BTCUSDT", "ETHUSDT"],
+        )
+        self.assertEqual([(r["symbol"], r["score"]) for r in result["pairs"]], [("BTCUSDT", 80)])
+        with self.assertRaises(ValueError):
+            validate_screening({"explanation": "", "settings": {"pairs": [{**row, "score": 120}]}}, ["BTCUSDT"])
+        with self.assertRaises(ValueError):
+            validate_screening({"explanation": "", "settings": {"pairs": [{**row, "settings": {"budget_usdt": 1}}]}}, ["BTCUSDT"])
+        with self.assertRaisesRegex(ValueError, "none of the requested"):
+            validate_screening({"explanation": "", "settings": {"pairs": [{**row, "symbol": "XYZUSDT"}]}}, ["BTCUSDT"])
+
+    def test_batches_fan_out_concurrently_and_rank_results(self) -> None:
+        client = AiClient(StateMachine(), logging.getLogger("test"), max_concurrency=3, max_retries=0)
+        screener = PairScreener(client, Config(), pairs_per_request=4, requests_per_minute=0)
+        batches = screener.batches(PAIRS + [{"symbol": None}], top_n=18)
+        self.assertEqual([len(b) for b in batches], [4, 4, 4, 4, 2])
+
+        seen_in_flight = []
+        original = client.aio._request
+
+        async def slow_request(prompt, user_message, timeout, **kwargs):
+            seen_in_flight.append(client.aio.stats()["in_flight"])
+            await asyncio.sleep(0.02)
+            payload = await original(prompt, user_message, timeout, **kwargs)
+            if "P05USDT" in user_message:
+                # Second batch: one pair missing from the answer.
+                payload["settings"]["pairs"] = [p for p in payload["settings"]["pairs"] if p["symbol"] != "P05USDT"]
+            if "P16USDT" in user_message:
+                raise PermissionError("quota")
+            return payload
+
+        client.aio._request = slow_request
+        report = screener.run(PAIRS, top_n=18)
+        client.close()
+        self.assertEqual(max(seen_in_flight), 3)
+        self.assertEqual(report.requests, 5)
+        self.assertEqual(report.missing, ["P05USDT"])
+        self.assertEqual(report.failed, [(["P16USDT", "P17USDT"], "quota")])
+        self.assertEqual(len(report.rows), 15)
+        scores = [row.score for row in report.rows]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(report.rows[0].symbol, "P00USDT")
+        self.assertGreaterEqual(report.rows[-1].settings["grid_step_pct"], MOCK_SETTINGS["grid_step_pct"])
+        self.assertGreater(report.prompt_tokens, 0)
+
+    def test_pacer_spaces_request_starts(self) -> None:
+        async def starts():
+            pacer = RequestPacer(60 / 0.02)
+            stamps = []
+
+            async def one():
+                await pacer.wait()
+                stamps.append(time.monotonic())
+
+            await asyncio.gather(*(one() for _ in range(4)))
+            return stamps
+
+        stamps = asyncio.run(starts())
+        gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+        self.assertTrue(all(gap >= 0.015 for gap in gaps), gaps)
+
+
+if __name__ == "__main__":
+    unittest.main()
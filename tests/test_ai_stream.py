@@ -0,0 +1,77 @@
+import json
+import logging
+import unittest
+
+from ai.client import MOCK_EXPLANATION, MOCK_SETTINGS, AiClient, TradeSettingsSchema
+from ai.stream import SectionStreamParser
+from core.state import AppState, StateMachine
+
+RESPONSE = (
+    "Sure.\n### Explanation\nVolatility is low, so tighten the grid. Use #hashtags freely.\n"
+    "### SETTINGS_JSON\n```json\n" + json.dumps({**MOCK_SETTINGS, "note": "a } in a string"}) + "\n```\n"
+)
+
+
+def validate(data):
+    return TradeSettingsSchema(**data).model_dump()
+
+
+def chunks(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class SectionStreamParserTests(unittest.TestCase):
+    def test_any_chunking_yields_the_same_sections(self) -> None:
+        for size in range(1, 40):
+            shown = []
+            parser = SectionStreamParser(on_explanation=shown.append, validate=validate)
+            for chunk in chunks(RESPONSE, size):
+                parser.feed(chunk)
+            result = parser.finish()
+            self.assertEqual(result["explanation"], "Volatility is low, so tighten the grid. Use #hashtags freely.")
+            self.assertEqual("".join(shown).strip(), result["explanation"])
+            self.assertNotIn("#", "".join(shown).replace("#hashtags", ""))
+            self.assertEqual(result["settings"], MOCK_SETTINGS)
+
+    def test_settings_validated_on_the_closing_brace(self) -> None:
+        events = []
+        parser = SectionStreamParser(
+            on_explanation=lambda text: events.append("text"),
+            on_settings=lambda settings: events.append("settings"),
+            validate=validate,
+        )
+        # The first "}" sits inside a JSON string and must not close the object.
+        closing = RESPONSE.rindex("}")
+        parser.feed(RESPONSE[:closing])
+        self.assertNotIn("settings", events)
+        parser.feed("}")
+        self.assertEqual(events[-1], "settings")
+        parser.feed("trailing chatter ### EXPLANATION ignored")
+        self.assertEqual(events.count("settings"), 1)
+
+        bad = SectionStreamParser(validate=validate)
+        bad.feed("### SETTINGS_JSON\n{\"budget_usdt\": 1")
+        with self.assertRaises(ValueError):
+            bad.feed("}")
+        with self.assertRaises(ValueError):
+            SectionStreamParser().finish()
+        truncated = SectionStreamParser()
+        truncated.feed("### SETTINGS_JSON\n{\"a\": {")
+        with self.assertRaisesRegex(ValueError, "Incomplete"):
+            truncated.finish()
+
+    def test_mock_client_streams_and_measures_time_to_first_token(self) -> None:
+        state = StateMachine()
+        client = AiClient(state, logging.getLogger("test"), mock_chunk_delay_s=0.002)
+        shown, settings = [], []
+        result = client.stream_chat("prompt", "hi", on_text=shown.append, on_settings=settings.append)
+        self.assertEqual(result["explanation"], MOCK_EXPLANATION)
+        self.assertGreater(len(shown), 1)
+        self.assertEqual("".join(shown).strip(), MOCK_EXPLANATION)
+        self.assertEqual(settings, [MOCK_SETTINGS])
+        self.assertIsNotNone(client.last_ttft_ms)
+        self.assertEqual(state.state, AppState.AI_READY)
+
+
+if __name__ == "__main__":
+    unittest.main()
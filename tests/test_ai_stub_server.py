@@ -0,0 +1,66 @@
+import json
+import logging
+import unittest
+import urllib.request
+
+import openai
+
+from ai.client import MOCK_SETTINGS, AiClient
+from ai.stub_server import StubConfig, StubServer
+from core.state import AppState, StateMachine
+
+FAST = dict(latency_ms=1, jitter_ms=0, tokens_per_s=0, seed=1)
+
+
+def client_for(server: StubServer, **kwargs) -> AiClient:
+    kwargs.setdefault("max_retries", 1)
+    client = AiClient(StateMachine(), logging.getLogger("test"), api_key="stub", base_url=server.base_url, **kwargs)
+    client.aio.backoff_base_s = 0.001
+    return client
+
+
+class StubServerTests(unittest.TestCase):
+    def test_plain_and_streamed_completions_go_through_the_real_client(self) -> None:
+        with StubServer(StubConfig(**FAST)) as server:
+            client = client_for(server)
+            try:
+                result = client.run_chat("system", "plain")
+                self.assertEqual(result["settings"], MOCK_SETTINGS)
+                chunks = []
+                streamed = client.stream_chat("system", "streamed", on_text=chunks.append)
+                self.assertEqual(streamed["settings"], MOCK_SETTINGS)
+                self.assertGreater(len(chunks), 3)
+                self.assertEqual("".join(chunks).strip(), streamed["explanation"])
+                self.assertGreater(client.aio.stats()["prompt_tokens"], 0)
+            finally:
+                client.close()
+            with urllib.request.urlopen(server.base_url + "/models", timeout=5) as response:
+                self.assertEqual(json.load(response)["data"][0]["id"], "stub")
+            self.assertEqual((server.counters["requests"], server.counters["streamed"]), (2, 1))
+
+    def test_malformed_answers_and_http_errors_are_retried_by_the_client_only(self) -> None:
+        with StubServer(StubConfig(malformed_rate=1.0, **FAST)) as server:
+            client = client_for(server, max_retries=2)
+            try:
+                with self.assertRaisesRegex(ValueError, "after retries"):
+                    client.run_chat("system", "bad")
+            finally:
+                client.close()
+            self.assertEqual(server.attempts_by_message["bad"], 3)
+            self.assertEqual(client.aio.stats()["invalid_answers"], 3)
+            self.assertEqual(client.state.state, AppState.ERROR)
+
+        with StubServer(StubConfig(error_rate=1.0, **FAST)) as server:
+            client = client_for(server, max_retries=1)
+            try:
+                with self.assertRaises(openai.InternalServerError):
+                    client.run_chat("system", "down")
+            finally:
+                client.close()
+            # SDK retries are off: exactly our own attempts reach the server.
+            self.assertEqual(server.attempts_by_message["down"], 2)
+            self.assertEqual(client.aio.stats()["retries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import logging
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import yaml
+
+from core.config_service import Config, ConfigService, diff_sections
+
+
+class ConfigServiceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "config.yaml"
+        self.service = ConfigService(self.path, save_delay_s=0.05, logger=logging.getLogger("test"))
+        self.events = []
+        self.service.subscribe(lambda changes, old, new: self.events.append(changes))
+
+    def tearDown(self) -> None:
+        self.service.flush()
+        self.tmp.cleanup()
+
+    def test_update_reports_only_the_changed_fields_and_validates(self) -> None:
+        before = self.service.config
+        self.assertEqual(self.service.update("trading", {"grid_step_pct": 0.7, "max_orders": 5}), {"trading": {"grid_step_pct"}})
+        self.assertEqual(self.service.config.trading.grid_step_pct, 0.7)
+        self.assertIs(self.service.config.ai, before.ai)  # untouched sections are shared, not copied
+        self.assertEqual(self.service.update("trading", {"grid_step_pct": 0.7}), {})
+        self.assertEqual(len(self.events), 1)
+
+        with self.assertRaises(ValueError):
+            self.service.update("trading", {"max_orders": "many"})
+        self.assertEqual(self.service.config.trading.max_orders, 5)
+
+        other = Config(ai={"model": "other"}, pairs={"manual_fee_free": ["BTCUSDT"]})
+        self.assertEqual(diff_sections(Config(), other), {"ai": {"model"}, "pairs": {"manual_fee_free"}})
+
+    def test_scheduled_saves_coalesce_into_one_atomic_write(self) -> None:
+        for step in (0.6, 0.7, 0.8):
+            self.service.update("trading", {"grid_step_pct": step})
+            self.service.schedule_save()
+        self.assertTrue(self.service.save_pending)
+        deadline = time.monotonic() + 2
+        while self.service.save_pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.service.saves, 1)
+        self.assertEqual(yaml.safe_load(self.path.read_text())["trading"]["grid_step_pct"], 0.8)
+        self.assertEqual(os.listdir(self.tmp.name), ["config.yaml"])
+
+        self.service.update("trading", {"max_orders": 9})
+        self.service.schedule_save(delay_s=60)
+        self.service.flush()
+        self.assertFalse(self.service.save_pending)
+        self.assertEqual((self.service.saves, ConfigService(self.path).load().trading.max_orders), (2, 9))
+
+    def test_poll_applies_outside_edits_and_ignores_own_writes(self) -> None:
+        self.service.save()
+        self.assertEqual(self.service.poll(), {})
+
+        data = Config().model_dump()
+        data["ai"]["temperature"] = 0.5
+        data["pairs"]["heuristic_quote_whitelist"] = ["FDUSD", "USDC"]
+        self.path.write_text(yaml.safe_dump(data) + "\n")
+        changes = self.service.poll()
+        self.assertEqual(changes, {"ai": {"temperature"}, "pairs": {"heuristic_quote_whitelist"}})
+        self.assertEqual(self.events, [changes])
+        self.assertEqual(self.service.poll(), {})
+
+        with self.assertLogs("test", "WARNING"):
+            self.path.write_text("trading:\n  max_orders: lots\n")
+            self.assertEqual(self.service.poll(), {})
+        self.assertEqual(self.service.config.ai.temperature, 0.5)
+        self.assertEqual(self.service.reloads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
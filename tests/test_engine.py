@@ -0,0 +1,165 @@
+import asyncio
+import time
+import unittest
+
+from core.decision_engine import CancelAction, DecisionEngine, OrderAction
+from core.engine import MarketEvent, TradingEngine, _QueuedAction
+from core.events import FillEvent
+from core.execution_engine import DryRunExecutor, ExecutionEngine
+from core.policy_guard import PolicyGuard
+from exchanges.binance.models import PairFilters
+
+SETTINGS = {
+    "budget_usdt": 100,
+    "max_orders": 4,
+    "grid_step_pct": 0.5,
+    "take_profit_pct": 1.0,
+    "stop_loss_pct": 1.0,
+    "cooldown_seconds": 0,
+    "update_interval_ms": 1000,
+}
+
+
+async def synthetic_ticks(symbol: str, prices, *, age_s: float = 0.0):
+    for price in prices:
+        yield MarketEvent(symbol=symbol, bid=price - 0.5, ask=price + 0.5, received_at=time.monotonic() - age_s)
+        await asyncio.sleep(0)
+
+
+class RejectSells:
+    def allow(self, action) -> bool:
+        return getattr(action, "side", "") != "SELL"
+
+
+class FailingExecutor(DryRunExecutor):
+    """Raises for the first ``failures`` actions (a dropped connection), then accepts."""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def __call__(self, action):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return super().__call__(action)
+
+
+class TradingEngineTests(unittest.TestCase):
+    def _engine(self, **kwargs):
+        executor = DryRunExecutor()
+        guard = kwargs.pop("guard", PolicyGuard())
+        engine = TradingEngine(
+            DecisionEngine(),
+            ExecutionEngine(policy_guard=guard, executor=executor),
+            settings=SETTINGS,
+            **kwargs,
+        )
+        return engine, executor
+
+    def test_routes_ticks_per_symbol_and_executes_grid(self) -> None:
+        engine, executor = self._engine()
+        asyncio.run(engine.run([synthetic_ticks("BTCUSDT", [100.0, 100.1]), synthetic_ticks("ETHUSDT", [50.0])]))
+        symbols = {action.symbol for action in executor.accepted}
+        self.assertEqual(symbols, {"BTCUSDT", "ETHUSDT"})
+        buys = [a for a in executor.accepted if isinstance(a, OrderAction) and a.symbol == "BTCUSDT"]
+        self.assertEqual(len(buys), 4)
+        self.assertAlmostEqual(buys[0].price, 100.0 * (1 - 0.005))
+        self.assertEqual(engine.counters["executed"], len(executor.accepted))
+        self.assertGreater(engine.latency_report()["tick_to_trade"]["count"], 0)
+
+    def test_reanchor_cancels_previous_ladder(self) -> None:
+        engine, executor = self._engine()
+        asyncio.run(engine.run([synthetic_ticks("BTCUSDT", [100.0, 101.0])]))
+        cancels = [a for a in executor.accepted if isinstance(a, CancelAction)]
+        self.assertEqual(len(cancels), 4)
+
+    def test_reanchor_takes_profit_on_partly_filled_buys(self) -> None:
+        decisions, state = DecisionEngine(), {}
+        buys = decisions.propose_actions(state, MarketEvent("XUSDT", 99.5, 100.5).to_snapshot(), SETTINGS)
+        first = buys[0]
+        fill = FillEvent("XUSDT", first.client_order_id, "BUY", first.price, 0.2, first.quantity - 0.2)
+        self.assertEqual(decisions.on_fill(state, fill, SETTINGS), [])
+        actions = decisions.propose_actions(state, MarketEvent("XUSDT", 100.5, 101.5).to_snapshot(), SETTINGS)
+        sells = [a for a in actions if isinstance(a, OrderAction) and a.side == "SELL"]
+        self.assertEqual(len([a for a in actions if isinstance(a, CancelAction)]), 4)
+        self.assertEqual(len(sells), 1)
+        self.assertAlmostEqual(sells[0].quantity, 0.2)
+        self.assertAlmostEqual(sells[0].price, first.price * 1.01)
+        self.assertEqual((state["filled"], state["cost"]), ({}, {}))
+        self.assertEqual(state["orders"][sells[0].client_order_id], (None, "SELL"))
+
+    def test_take_profit_below_venue_filters_is_carried_not_sent(self) -> None:
+        settings = {**SETTINGS, "budget_usdt": 22}  # 5.5 USDT per level, min-notional 5
+        decisions, state = DecisionEngine(filters={"XUSDT": PairFilters(0.01, 0.001, 5.0)}), {}
+        first, second = decisions.propose_actions(state, MarketEvent("XUSDT", 99.5, 100.5).to_snapshot(), settings)[:2]
+        # A base-asset fee leaves 0.049 to sell: ~4.9 USDT at the target, under min-notional.
+        dust = FillEvent(
+            "XUSDT", first.client_order_id, "BUY", first.price, first.quantity, 0.0, fee=0.006, fee_asset="X", base_asset="X"
+        )
+        self.assertEqual(decisions.on_fill(state, dust, settings), [])
+        self.assertEqual(state["holding"], {1: ""})
+        self.assertEqual(decisions.propose_actions(state, MarketEvent("XUSDT", 99.5, 100.5).to_snapshot(), settings), [])
+
+        fill = FillEvent("XUSDT", second.client_order_id, "BUY", second.price, second.quantity, 0.0)
+        (sell,) = decisions.on_fill(state, fill, settings)
+        self.assertAlmostEqual(sell.quantity, 0.049 + second.quantity)
+        self.assertIsNone(PairFilters(0.01, 0.001, 5.0).violation(sell.price, sell.quantity))
+        self.assertEqual(state["holding"], {1: sell.client_order_id, 2: sell.client_order_id})
+        decisions.on_fill(state, FillEvent("XUSDT", sell.client_order_id, "SELL", sell.price, sell.quantity, 0.0), settings)
+        self.assertEqual((state["holding"], state["carry"]), ({}, []))
+
+    def test_stale_ticks_are_dropped(self) -> None:
+        engine, executor = self._engine(stale_after_ms=100)
+        asyncio.run(engine.run([synthetic_ticks("BTCUSDT", [100.0, 100.0], age_s=1.0)]))
+        self.assertEqual(engine.counters["dropped_stale"], 2)
+        self.assertEqual(executor.accepted, [])
+
+    def test_put_nowait_reports_backpressure(self) -> None:
+        async def scenario():
+            engine, _ = self._engine(inbound_size=2)
+            await engine.start()
+            engine._tasks[0].cancel()  # freeze the router so the inbound queue fills up
+            accepted = [engine.put_nowait(MarketEvent("BTCUSDT", 1.0, 1.1)) for _ in range(3)]
+            await engine.stop()
+            return accepted, engine.counters["dropped_full"]
+
+        accepted, dropped = asyncio.run(scenario())
+        self.assertEqual(accepted, [True, True, False])
+        self.assertEqual(dropped, 1)
+
+    def test_guard_rejections_are_counted(self) -> None:
+        guard = PolicyGuard(rules=[RejectSells()])
+        engine, _ = self._engine(guard=guard)
+
+        async def scenario():
+            await engine.start()
+            sell = OrderAction("BTCUSDT", "SELL", 1.0, 100.0)
+            await engine.actions.put(_QueuedAction(sell, time.monotonic(), time.monotonic()))
+            await engine.join()
+            await engine.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(engine.counters["rejected"], 1)
+
+    def test_failed_sends_free_their_levels(self) -> None:
+        executor = FailingExecutor(failures=4)
+        engine = TradingEngine(DecisionEngine(), ExecutionEngine(executor=executor), settings=SETTINGS)
+
+        async def scenario():
+            await engine.start()
+            for price in (100.0, 100.0, 100.0):
+                engine.put_nowait(MarketEvent("BTCUSDT", price - 0.5, price + 0.5))
+                await engine.join()
+            await engine.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(engine.counters["errors"], 4)
+        # The whole first ladder failed; the next tick placed it again.
+        buys = [a for a in executor.accepted if isinstance(a, OrderAction)]
+        self.assertEqual(len(buys), 4)
+        self.assertEqual(set(engine.symbol_state["BTCUSDT"]["levels"].values()), {b.client_order_id for b in buys})
+
+
+if __name__ == "__main__":
+    unittest.main()
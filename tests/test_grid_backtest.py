@@ -0,0 +1,159 @@
+import time
+import unittest
+
+import numpy as np
+
+from exchanges.binance.models import PairFilters
+from strategies.grid_backtest import (
+    EXIT_STOP_LOSS,
+    EXIT_TAKE_PROFIT,
+    GridBacktester,
+    Klines,
+    _FirstPassage,
+    run_grid_backtest,
+)
+
+SETTINGS = {
+    "budget_usdt": 100,
+    "max_orders": 4,
+    "grid_step_pct": 0.5,
+    "take_profit_pct": 0.8,
+    "stop_loss_pct": 1.5,
+    "cooldown_seconds": 120,
+}
+FILTERS = PairFilters(tick_size=0.01, step_size=0.0001, min_notional=5)
+
+
+def random_klines(n: int, seed: int = 7, vol: float = 0.002) -> Klines:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    return Klines(np.arange(n, dtype=np.int64) * 60_000, open_, high, low, close, np.ones(n))
+
+
+def reference_trades(k: Klines, settings: dict, filters: PairFilters):
+    """Straightforward bar-by-bar simulation of the same model (fees of 0.1%)."""
+
+    step = settings["grid_step_pct"] / 100
+    tp, sl = settings["take_profit_pct"] / 100, settings["stop_loss_pct"] / 100
+    cooldown = settings["cooldown_seconds"] // 60
+    per_order = settings["budget_usdt"] / settings["max_orders"]
+    trades = []
+    state = [{"cursor": 1, "entry": None, "slice": per_order} for _ in range(settings["max_orders"])]
+    anchor = k.close[0]
+    for t in range(1, len(k)):
+        for j, level in enumerate(state):
+            if t < level["cursor"]:
+                continue
+            if level["entry"] is None:
+                price = filters.round_price(anchor * (1 - step * (j + 1)))
+                qty = filters.round_quantity(per_order / price)
+                if filters.violation(price, qty) is None and k.low[t] <= price:
+                    qty = filters.round_quantity(level["slice"] / price)
+                    if filters.violation(price, qty) is not None:
+                        level["cursor"] = len(k)  # the level's slice is spent
+                        continue
+                    entry = min(price, k.open[t])
+                    level["entry"] = (t, entry, qty)
+                    level["price"] = price
+                    level["tp"] = filters.round_price(entry * (1 + tp), up=True)
+                    level["sl"] = filters.round_price(entry * (1 - sl))
+                    level["cursor"] = t + 1
+                continue
+            if k.low[t] <= level["sl"]:
+                trades.append((j + 1, *level["entry"], t, min(level["sl"], k.open[t]), EXIT_STOP_LOSS))
+            elif k.high[t] >= level["tp"]:
+                trades.append((j + 1, *level["entry"], t, level["tp"], EXIT_TAKE_PROFIT))
+            else:
+                continue
+            exit_price = trades[-1][5]
+            level["slice"] *= 1 + (exit_price * (1 - 0.001) - level["entry"][1] * (1 + 0.001)) / level["price"]
+            level["entry"] = None
+            level["cursor"] = t + 1 + cooldown
+        if k.close[t] > anchor * (1 + step):
+            anchor = k.close[t]
+    return sorted(trades)
+
+
+class FirstPassageTests(unittest.TestCase):
+    def test_matches_linear_scan(self) -> None:
+        rng = np.random.default_rng(3)
+        low = rng.normal(0, 1, 5_000).cumsum()
+        high = low + rng.random(5_000)
+        passage = _FirstPassage([-low, high], block=16, window=4)
+        starts = rng.integers(0, 5_000, 300)
+        thresholds = np.r_[low[starts[:150]] - rng.random(150) * 20, high[starts[150:]] + rng.random(150) * 20]
+        series = np.r_[np.zeros(150, dtype=int), np.ones(150, dtype=int)]
+        got = passage.query(series, starts, np.where(series == 0, -thresholds, thresholds))
+        for s, start, x, result in zip(series, starts, thresholds, got):
+            match = np.flatnonzero(low[start:] <= x) if s == 0 else np.flatnonzero(high[start:] >= x)
+            self.assertEqual(result, start + match[0] if match.size else 5_000)
+
+
+class GridBacktestTests(unittest.TestCase):
+    def test_matches_bar_by_bar_reference(self) -> None:
+        fields = ("level", "entry_bar", "entry_price", "quantity", "exit_bar", "exit_price", "exit_kind")
+        for seed, settings in ((7, SETTINGS), (5, dict(SETTINGS, stop_loss_pct=0.6, take_profit_pct=1.5))):
+            k = random_klines(4_000, seed=seed)
+            expected = reference_trades(k, settings, FILTERS)
+            self.assertGreater(len(expected), 20)
+            # Tiny segments make the walks rejoin (or not) at nearly every boundary.
+            for segment_bars in (4096, 97, 7):
+                result = GridBacktester(k, filters=FILTERS, segment_bars=segment_bars).run(settings)
+                closed = result.trades[result.trades["exit_bar"] >= 0]
+                got = sorted(tuple(t[name].item() for name in fields) for t in closed)
+                self.assertEqual(len(got), len(expected), (seed, segment_bars))
+                for a, b in zip(got, expected):
+                    self.assertEqual(a[:2] + a[4:5] + a[6:], b[:2] + b[4:5] + b[6:])
+                    np.testing.assert_allclose([a[2], a[3], a[5]], [b[2], b[3], b[5]])
+
+    def test_losing_levels_cannot_lose_more_than_the_budget(self) -> None:
+        # Tight take-profits under 0.2% round-trip fees bleed every level to min-notional.
+        k = random_klines(40_000, seed=1, vol=0.001)
+        settings = dict(SETTINGS, grid_step_pct=0.1, take_profit_pct=0.2, stop_loss_pct=1.0)
+        result = GridBacktester(k, filters=FILTERS).run(settings)
+        self.assertGreater(result.stop_losses, 0)
+        self.assertGreater(result.return_pct, -100)
+        self.assertLess(result.max_drawdown_pct, 100)
+        self.assertGreaterEqual(result.equity.min(), 0)
+        last = result.trades[-4:]
+        self.assertFalse(FILTERS.quantizer.violations(last["order_price"], last["quantity"]).any())
+
+    def test_a_year_of_minute_bars_with_a_tight_grid(self) -> None:
+        k = random_klines(525_600, seed=1, vol=0.001)
+        tester = GridBacktester(k, filters=FILTERS, fee_free=True)
+        settings = dict(SETTINGS, grid_step_pct=0.1, take_profit_pct=0.2, stop_loss_pct=1.0)
+        start = time.perf_counter()
+        result = tester.run(settings)
+        elapsed = time.perf_counter() - start
+        self.assertGreater(result.fills, 150_000)
+        # One round per trade took ~5 s here; the segmented walk takes under half a second.
+        self.assertLess(elapsed, 2.0)
+
+    def test_respects_filters_and_reports_fees(self) -> None:
+        k = random_klines(3_000, seed=11)
+        result = GridBacktester(k, filters=FILTERS).run(SETTINGS)
+        trades = result.trades
+        self.assertGreater(result.fills, 0)
+        resting = trades[~trades["entry_taker"]]
+        self.assertFalse(FILTERS.quantizer.violations(resting["entry_price"], resting["quantity"]).any())
+        self.assertGreater(result.fees, 0)
+        self.assertAlmostEqual(result.gross_pnl - result.net_pnl, result.fees)
+        self.assertGreaterEqual(result.max_drawdown, 0)
+
+        free = GridBacktester(k, filters=FILTERS, fee_free=True).run(SETTINGS)
+        self.assertEqual(free.fees, 0)
+        self.assertEqual(free.fills, result.fills)
+
+    def test_rising_market_never_fills(self) -> None:
+        close = np.linspace(100, 200, 500)
+        k = Klines(np.arange(500) * 60_000, close, close, close, close, np.ones(500))
+        result = run_grid_backtest(k, SETTINGS)
+        self.assertEqual(result.fills, 0)
+        self.assertEqual(result.net_pnl, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from ui.widgets.log_view import LogBuffer
+
+
+class LogBufferTests(unittest.TestCase):
+    def test_drain_coalesces_pending_entries(self) -> None:
+        buffer = LogBuffer(max_lines=100)
+        buffer.push("one")
+        buffer.push("two\nlines", level="warning", source="ai")
+        batch, trimmed = buffer.drain()
+        self.assertEqual([entry.text for entry in batch], ["one", "two\nlines"])
+        self.assertEqual(batch[1].level, "WARNING")
+        self.assertEqual(buffer.total_lines, 3)
+        self.assertEqual(trimmed, 0)
+        self.assertFalse(buffer.has_pending())
+
+    def test_trims_in_bulk_once_slack_exceeded(self) -> None:
+        buffer = LogBuffer(max_lines=10, trim_slack=5)
+        for idx in range(15):
+            buffer.push(f"line {idx}")
+        _, trimmed = buffer.drain()
+        self.assertEqual(trimmed, 0)
+        buffer.push("line 15")
+        _, trimmed = buffer.drain()
+        self.assertEqual(trimmed, 6)
+        self.assertEqual(buffer.total_lines, 10)
+        self.assertEqual(buffer.entries[0].text, "line 6")
+
+    def test_append_extends_the_last_line(self) -> None:
+        buffer = LogBuffer(max_lines=100)
+        buffer.push("AI:")
+        buffer.drain()
+        buffer.push("Vol", append=True)
+        buffer.push("atility\nis low", append=True)
+        buffer.push("next entry")
+        batch, _ = buffer.drain()
+        self.assertTrue(batch[0].continues)
+        self.assertEqual(batch[0].text, "Volatility\nis low")
+        self.assertEqual(batch[1].text, "next entry")
+        self.assertEqual([entry.text for entry in buffer.entries], ["AI:Volatility\nis low", "next entry"])
+        self.assertEqual(buffer.total_lines, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.logger import LevelSampler, LogPipeline
+
+
+class LogPipelineTests(unittest.TestCase):
+    def _record(self, level: int, msg: str, *args) -> logging.LogRecord:
+        return logging.LogRecord("bbot", level, __file__, 1, msg, args, None)
+
+    def test_sampler_keeps_every_nth_and_rate_limits(self) -> None:
+        sampler = LevelSampler(sample_rates={"DEBUG": 0.25}, rate_limits={"INFO": 2})
+        kept_debug = sum(sampler.filter(self._record(logging.DEBUG, "tick")) for _ in range(100))
+        self.assertEqual(kept_debug, 25)
+        kept_info = sum(sampler.filter(self._record(logging.INFO, "burst")) for _ in range(10))
+        self.assertEqual(kept_info, 2)
+        self.assertEqual(sampler.dropped[logging.INFO], 8)
+
+    def test_pipeline_writes_text_and_json_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "app.log"
+            pipeline = LogPipeline(path, json_lines=True, console=False, flush_interval_s=0.01)
+            pipeline.start()
+            payload = {"grid_step_pct": 0.5}
+            pipeline.handler.handle(self._record(logging.INFO, "settings %s", payload))
+            payload["grid_step_pct"] = 9.9
+            pipeline.stop()
+            self.assertIn("settings {'grid_step_pct': 0.5}", path.read_text(encoding="utf-8"))
+            line = json.loads(path.with_suffix(".jsonl").read_text(encoding="utf-8").splitlines()[0])
+            self.assertEqual(line["level"], "INFO")
+            self.assertEqual(pipeline.stats()["written"], 1)
+
+    def test_sink_errors_are_counted_not_written(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = LogPipeline(Path(tmp) / "app.log", console=False)
+
+            def broken(lines):
+                raise OSError("disk full")
+
+            pipeline.text_sink.write_batch = broken
+            pipeline._write([self._record(logging.INFO, "lost"), self._record(logging.INFO, "lost too")])
+            pipeline.stop()
+            stats = pipeline.stats()
+            self.assertEqual((stats["written"], stats["failed"]), (0, 2))
+            self.assertEqual(stats["last_error"], "OSError: disk full")
+
+    def test_size_rotation_keeps_backups(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "app.log"
+            pipeline = LogPipeline(path, console=False, max_bytes=200, backup_count=2, batch_size=1)
+            for idx in range(20):
+                pipeline.handler.handle(self._record(logging.INFO, "line %s %s", idx, "x" * 40))
+            pipeline.stop()
+            self.assertTrue(path.with_name("app.log.1").exists())
+            self.assertTrue(path.with_name("app.log.2").exists())
+            self.assertFalse(path.with_name("app.log.3").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+
+from core.decision_engine import CancelAction, DecisionEngine, OrderAction
+from core.events import FillEvent, MarketEvent
+from core.execution_engine import DryRunExecutor, ExecutionEngine
+from core.orchestrator import ERROR, RUNNING, STOPPED, Orchestrator
+from exchanges.binance.http_client import WeightBudget, request_weight
+from exchanges.paper import PaperExchange
+from tests.test_engine import SETTINGS, FailingExecutor
+from tests.test_paper_exchange import make_pair
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingFor(DecisionEngine):
+    def __init__(self, symbol: str) -> None:
+        super().__init__()
+        self.symbol = symbol
+
+    def propose_actions(self, state, market_snapshot, settings):
+        if market_snapshot.symbol == self.symbol:
+            raise RuntimeError("bad pair")
+        return super().propose_actions(state, market_snapshot, settings)
+
+
+class OrchestratorTests(unittest.TestCase):
+    def _orchestrator(self, decision_engine=None, **kwargs):
+        self.clock = FakeClock()
+        self.executor = DryRunExecutor()
+        return Orchestrator(
+            decision_engine or DecisionEngine(),
+            ExecutionEngine(executor=self.executor),
+            clock=self.clock,
+            **kwargs,
+        )
+
+    def _tick(self, orchestrator, symbol, price=100.0) -> None:
+        orchestrator.put_nowait(MarketEvent(symbol, price - 0.5, price + 0.5, received_at=self.clock.now))
+
+    def _run(self, orchestrator, symbols, seconds, step_s=0.05) -> None:
+        for _ in range(int(seconds / step_s)):
+            self.clock.now += step_s
+            for symbol in symbols:
+                self._tick(orchestrator, symbol)
+            orchestrator.step()
+
+    def test_bots_run_at_their_own_interval_on_fresh_ticks_only(self) -> None:
+        orchestrator = self._orchestrator()
+        orchestrator.add_bot("SLOWUSDT", {**SETTINGS, "update_interval_ms": 1000})
+        orchestrator.add_bot("FASTUSDT", {**SETTINGS, "update_interval_ms": 250})
+        orchestrator.add_bot("IDLEUSDT", SETTINGS)
+        self._run(orchestrator, ["SLOWUSDT", "FASTUSDT"], 2.0)
+        decisions = {symbol: bot.counters["decisions"] for symbol, bot in orchestrator.bots.items()}
+        self.assertIn(decisions["SLOWUSDT"], (2, 3))
+        self.assertIn(decisions["FASTUSDT"], (8, 9))
+        self.assertEqual(decisions["IDLEUSDT"], 0)
+        # One shared execution path: both grids went through the same executor.
+        self.assertEqual({a.symbol for a in self.executor.accepted}, {"SLOWUSDT", "FASTUSDT"})
+
+    def test_priority_orders_due_bots_when_the_step_is_full(self) -> None:
+        orchestrator = self._orchestrator(max_per_step=1)
+        orchestrator.add_bot("LOWUSDT", SETTINGS, priority=0)
+        orchestrator.add_bot("HIGHUSDT", SETTINGS, priority=5)
+        self._tick(orchestrator, "LOWUSDT")
+        self._tick(orchestrator, "HIGHUSDT")
+        self.assertEqual(orchestrator.step(), 1)
+        self.assertEqual(orchestrator.bots["HIGHUSDT"].counters["decisions"], 1)
+        self.assertEqual(orchestrator.bots["LOWUSDT"].counters["decisions"], 0)
+        self.assertEqual(orchestrator.step(), 1)
+        self.assertEqual(orchestrator.bots["LOWUSDT"].counters["decisions"], 1)
+
+    def test_failing_bot_is_parked_without_stopping_the_others(self) -> None:
+        orchestrator = self._orchestrator(FailingFor("BADUSDT"), max_errors=3)
+        orchestrator.add_bot("BADUSDT", {**SETTINGS, "update_interval_ms": 100})
+        orchestrator.add_bot("GOODUSDT", {**SETTINGS, "update_interval_ms": 100})
+        self._run(orchestrator, ["BADUSDT", "GOODUSDT"], 1.0)
+        bad, good = orchestrator.bots["BADUSDT"], orchestrator.bots["GOODUSDT"]
+        self.assertEqual(bad.status, ERROR)
+        self.assertEqual(bad.counters["errors"], 3)
+        self.assertIn("bad pair", bad.error)
+        self.assertEqual(good.status, RUNNING)
+        self.assertGreaterEqual(good.counters["decisions"], 9)
+        orchestrator.start_bot("BADUSDT")
+        self.assertEqual(bad.status, RUNNING)
+
+    def test_stop_bot_cancels_its_resting_buys_only(self) -> None:
+        orchestrator = self._orchestrator()
+        orchestrator.add_bot("AUSDT", SETTINGS)
+        orchestrator.add_bot("BUSDT", SETTINGS)
+        self._tick(orchestrator, "AUSDT")
+        self._tick(orchestrator, "BUSDT")
+        orchestrator.step()
+        buys = [a for a in self.executor.accepted if isinstance(a, OrderAction) and a.symbol == "AUSDT"]
+        self.assertEqual(len(buys), SETTINGS["max_orders"])
+        orchestrator.stop_bot("AUSDT")
+        cancels = [a for a in self.executor.accepted if isinstance(a, CancelAction)]
+        self.assertEqual({c.client_order_id for c in cancels}, {b.client_order_id for b in buys})
+        self.assertEqual(orchestrator.bots["AUSDT"].status, STOPPED)
+        self.clock.now += 5
+        self._tick(orchestrator, "AUSDT", 200.0)
+        self._tick(orchestrator, "BUSDT", 200.0)
+        orchestrator.step()
+        self.assertEqual(orchestrator.bots["AUSDT"].counters["decisions"], 1)
+        self.assertEqual(orchestrator.bots["BUSDT"].counters["decisions"], 2)
+
+    def test_stop_bot_takes_profit_on_a_partly_filled_buy(self) -> None:
+        orchestrator = self._orchestrator()
+        orchestrator.add_bot("AUSDT", SETTINGS)
+        self._tick(orchestrator, "AUSDT")
+        orchestrator.step()
+        buy = next(a for a in self.executor.accepted if isinstance(a, OrderAction))
+        orchestrator.submit_execution(FillEvent("AUSDT", buy.client_order_id, "BUY", buy.price, 0.05, buy.quantity - 0.05))
+        orchestrator.step()
+        orchestrator.stop_bot("AUSDT")
+        sells = [a for a in self.executor.accepted if isinstance(a, OrderAction) and a.side == "SELL"]
+        self.assertEqual([(s.quantity, s.reason) for s in sells], [(0.05, "take profit level None")])
+        self.assertEqual(orchestrator.bots["AUSDT"].state["filled"], {})
+
+    def test_failed_sends_free_the_bots_levels(self) -> None:
+        orchestrator = self._orchestrator()
+        self.executor = orchestrator.execution_engine.executor = FailingExecutor(failures=4)
+        orchestrator.add_bot("AUSDT", SETTINGS)
+        self._tick(orchestrator, "AUSDT")
+        orchestrator.step()
+        self.assertEqual(orchestrator.counters["errors"], 4)
+        self.assertEqual(self.executor.accepted, [])
+        self.clock.now += 1
+        self._tick(orchestrator, "AUSDT")
+        orchestrator.step()
+        buys = [a for a in self.executor.accepted if isinstance(a, OrderAction)]
+        self.assertEqual(len(buys), SETTINGS["max_orders"])
+        self.assertEqual(set(orchestrator.bots["AUSDT"].state["levels"].values()), {b.client_order_id for b in buys})
+
+    def test_paper_fill_places_take_profit_and_stats_estimate_capacity(self) -> None:
+        pair = make_pair(fee_free=True)
+        self.clock = FakeClock()
+        exchange = PaperExchange(balances={"USDT": 100.0})
+        exchange.add_pair(pair)
+        orchestrator = Orchestrator(
+            DecisionEngine(filters={pair.symbol: pair.filters}),
+            ExecutionEngine(executor=exchange),
+            market_observers=[exchange.on_market],
+            clock=self.clock,
+        )
+        exchange.on_event = lambda event: orchestrator.submit_execution(event) if isinstance(event, FillEvent) else None
+        orchestrator.add_bot(pair.symbol, {**SETTINGS, "max_orders": 2, "grid_step_pct": 1.0, "update_interval_ms": 100})
+        for bid, ask in [(100.0, 100.02), (98.9, 99.0), (99.5, 99.6)]:
+            self.clock.now += 0.2
+            orchestrator.put_nowait(MarketEvent(pair.symbol, bid, ask, bid_qty=5.0, ask_qty=5.0, received_at=self.clock.now))
+            orchestrator.step()
+        sells = [o for o in exchange.open_orders() if o.side == "SELL"]
+        self.assertEqual(len(sells), 1)
+        self.assertAlmostEqual(sells[0].price, 99.99)
+        stats = orchestrator.stats()
+        self.assertEqual(stats["per_bot"][pair.symbol]["fills"], 1)
+        self.assertEqual(stats["running"], 1)
+        self.assertIsNotNone(stats["capacity_estimate"])
+        self.assertGreater(stats["capacity_estimate"], 0)
+
+
+class WeightBudgetTests(unittest.TestCase):
+    def test_bucket_waits_refills_and_syncs_with_exchange(self) -> None:
+        clock = FakeClock()
+        budget = WeightBudget(60, window_seconds=60, clock=clock)
+        self.assertEqual(budget.reserve(50), 0.0)
+        self.assertAlmostEqual(budget.reserve(20), 10.0)
+        clock.now += 30
+        self.assertEqual(budget.reserve(10), 0.0)
+        budget.sync_used(55)
+        self.assertAlmostEqual(budget.available, 5.0)
+        self.assertEqual(request_weight("/api/v3/ticker/24hr"), 80)
+        self.assertEqual(request_weight("/api/v3/ticker/24hr", {"symbol": "BTCUSDT"}), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.decision_engine import CancelAction, OrderAction
+from core.events import FillEvent
+from core.order_store import (
+    CANCELED,
+    EXPIRED,
+    FILLED,
+    NEW,
+    PARTIALLY_FILLED,
+    JournalingExecutor,
+    OrderStore,
+)
+from exchanges.paper import PaperExchange
+from tests.test_paper_exchange import make_pair, tick
+
+
+def state(store: OrderStore) -> tuple:
+    orders = {cid: vars(order) for cid, order in store.orders.items()}
+    positions = {symbol: vars(pos) for symbol, pos in store.positions.items()}
+    return orders, positions, store.seq
+
+
+class OrderStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name)
+
+    def open(self, **kwargs) -> OrderStore:
+        store = OrderStore.open(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def populate(self, store: OrderStore) -> None:
+        for i in range(20):
+            cid = f"o{i}"
+            store.new_order("BTCUSDT", "BUY", 100.0 - i, 0.1, cid, ts_ms=i)
+            store.ack(cid, 1000 + i, ts_ms=i)
+            if i % 3 == 0:
+                store.fill(cid, 0.1, 100.0 - i, fee=0.0001, fee_in_base=True, ts_ms=i)
+            elif i % 3 == 1:
+                store.cancel(cid, ts_ms=i)
+
+    def test_transitions_and_indexes(self) -> None:
+        store = self.open()
+        store.new_order("BTCUSDT", "buy", 100.0, 1.0, "a")
+        self.assertEqual([o.client_order_id for o in store.at_level("BTCUSDT", "BUY", 100.0)], ["a"])
+        store.ack("a", 42)
+        self.assertEqual(store.get("a").status, NEW)
+        self.assertIs(store.by_exchange_id(42), store.get("a"))
+        store.fill("a", 0.4, 100.0, fee=0.04)
+        self.assertEqual(store.get("a").status, PARTIALLY_FILLED)
+        store.fill("a", 0.6, 99.0)
+        self.assertEqual(store.get("a").status, FILLED)
+        self.assertEqual(store.at_level("BTCUSDT", "BUY", 100.0), [])
+        self.assertEqual(store.open_orders(), [])
+        position = store.position("BTCUSDT")
+        self.assertAlmostEqual(position.quantity, 1.0)
+        self.assertAlmostEqual(position.avg_price, 99.44)  # quote fee is part of the cost
+
+        with self.assertRaises(ValueError):
+            store.cancel("a")
+        with self.assertRaises(KeyError):
+            store.ack("missing")
+        store.new_order("BTCUSDT", "SELL", 101.0, 0.5, "b")
+        with self.assertRaises(ValueError):
+            store.fill("b", 0.6, 101.0)
+        with self.assertRaises(ValueError):
+            store.new_order("BTCUSDT", "SELL", 101.0, 0.5, "b")
+
+    def test_recovers_from_journal_and_drops_torn_tail(self) -> None:
+        store = self.open(snapshot_every=0)
+        self.populate(store)
+        expected = state(store)
+        store.close()
+        with (self.path / "journal.bin").open("ab") as fh:
+            fh.write(b"\x40\x00\x00\x00garbage")
+
+        recovered = self.open(snapshot_every=0)
+        self.assertEqual(state(recovered), expected)
+        self.assertEqual(len(recovered.open_orders()), 6)
+        recovered.new_order("BTCUSDT", "SELL", 110.0, 0.1, "after")
+        recovered.close()
+        self.assertIn("after", self.open(snapshot_every=0).orders)
+
+    def test_snapshot_plus_tail_matches_full_replay(self) -> None:
+        store = self.open(snapshot_every=25)
+        self.populate(store)
+        self.assertTrue((self.path / "snapshot.bin").exists())
+        expected = state(store)
+        store.close()
+        recovered = OrderStore(self.path)
+        self.addCleanup(recovered.close)
+        stats = recovered.recover()
+        self.assertEqual(state(recovered), expected)
+        self.assertGreater(stats["snapshot_seq"], 0)
+        self.assertLess(stats["replayed"], 25)
+
+    def test_crash_between_snapshot_and_journal_reset(self) -> None:
+        store = self.open(snapshot_every=0)
+        self.populate(store)
+        journal = (self.path / "journal.bin").read_bytes()
+        store.snapshot()
+        expected = state(store)
+        store.close()
+        (self.path / "journal.bin").write_bytes(journal)  # the truncate never happened
+
+        recovered = OrderStore(self.path)
+        self.addCleanup(recovered.close)
+        stats = recovered.recover()
+        self.assertEqual(stats["replayed"], 0)
+        self.assertEqual(state(recovered), expected)
+
+    def test_snapshot_is_keyed_by_field_name(self) -> None:
+        store = self.open(snapshot_every=0)
+        self.populate(store)
+        store.snapshot()
+        expected = state(store)
+        store.close()
+        path = self.path / "snapshot.bin"
+        snap = pickle.loads(path.read_bytes())
+        self.assertEqual(snap["version"], 1)
+        # A field dropped in a later version is ignored; one added since falls back to its default.
+        for order in snap["orders"]:
+            order["retired_field"] = 1
+            del order["reason"]
+        path.write_bytes(pickle.dumps(snap))
+        recovered = self.open(snapshot_every=0)
+        for order in expected[0].values():
+            order["reason"] = ""
+        self.assertEqual(state(recovered), expected)
+
+        snap["version"] = 2
+        path.write_bytes(pickle.dumps(snap))
+        with self.assertRaises(ValueError):
+            OrderStore(self.path).recover()
+
+    def test_closed_orders_are_bounded(self) -> None:
+        store = self.open(retain_closed=5)
+        self.populate(store)
+        closed = [o for o in store.orders.values() if not o.is_open]
+        self.assertEqual(len(closed), 5)
+        self.assertEqual(len(store.open_orders()), 6)
+
+
+class JournalingExecutorTests(unittest.TestCase):
+    def test_journals_paper_orders_and_fills(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = OrderStore.open(tmp.name)
+        self.addCleanup(store.close)
+        paper = PaperExchange(balances={"USDT": 1000.0})
+        paper.add_pair(make_pair())
+        paper.on_event = lambda event: store.apply_fill(event) if isinstance(event, FillEvent) else None
+        execute = JournalingExecutor(store, paper)
+
+        paper.on_market(tick(100.0, 100.01, bid_qty=0.0))
+        execute(OrderAction("BTCUSDT", "BUY", 0.1, 100.0, client_order_id="buy"))
+        execute(OrderAction("BTCUSDT", "BUY", 0.1, 99.0, client_order_id="low"))
+        self.assertEqual(store.get("buy").status, NEW)
+        paper.on_market(tick(99.99, 100.0))
+        self.assertEqual(store.get("buy").status, FILLED)
+        self.assertAlmostEqual(store.position("BTCUSDT").quantity, 0.0999)  # base fee withheld
+
+        execute(CancelAction("BTCUSDT", "low"))
+        self.assertEqual(store.get("low").status, CANCELED)
+        execute(OrderAction("BTCUSDT", "BUY", 0.1, 100.005, client_order_id="bad"))
+        self.assertEqual(store.get("bad").status, "REJECTED")
+        self.assertEqual(store.open_orders(), [])
+
+    def test_stale_orders_can_be_expired_after_restart(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = OrderStore.open(tmp.name)
+        store.new_order("BTCUSDT", "BUY", 100.0, 0.1, "x")
+        store.close()
+        store = OrderStore.open(tmp.name)
+        self.addCleanup(store.close)
+        for order in store.open_orders():
+            store.expire(order.client_order_id, "paper session ended")
+        self.assertEqual(store.get("x").status, EXPIRED)
+        self.assertEqual(store.get("x").reason, "paper session ended")
+
+
+if __name__ == "__main__":
+    unittest.main()
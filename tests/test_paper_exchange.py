@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+
+from core.decision_engine import CancelAction, DecisionEngine, OrderAction
+from core.engine import TradingEngine
+from core.events import FillEvent, MarketEvent
+from core.execution_engine import ExecutionEngine
+from exchanges.binance.models import FeeFreeFlag, PairFilters, PairInfo
+from exchanges.paper import PaperExchange
+
+
+def make_pair(fee_free: bool = False) -> PairInfo:
+    return PairInfo(
+        symbol="BTCUSDT",
+        base="BTC",
+        quote="USDT",
+        status="TRADING",
+        filters=PairFilters(tick_size=0.01, step_size=0.001, min_notional=5),
+        fee=FeeFreeFlag(fee_free, "TEST"),
+    )
+
+
+def tick(bid, ask, bid_qty=1.0, ask_qty=1.0) -> MarketEvent:
+    return MarketEvent("BTCUSDT", bid, ask, bid_qty=bid_qty, ask_qty=ask_qty)
+
+
+class PaperExchangeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.events = []
+        self.exchange = PaperExchange(balances={"USDT": 1000.0}, on_event=self.events.append)
+        self.exchange.add_pair(make_pair())
+
+    def fills(self):
+        return [e for e in self.events if isinstance(e, FillEvent)]
+
+    def test_rejects_orders_breaking_filters(self) -> None:
+        report = self.exchange(OrderAction("BTCUSDT", "BUY", 0.1, 100.005, client_order_id="a"))
+        self.assertEqual(report.status(), "REJECTED")
+        self.assertIn("PRICE_FILTER", report.detail)
+        report = self.exchange(OrderAction("BTCUSDT", "BUY", 0.01, 100.0, client_order_id="b"))
+        self.assertIn("MIN_NOTIONAL", report.detail)
+
+    def test_queue_position_gives_partial_then_full_fill(self) -> None:
+        self.exchange.on_market(tick(100.0, 100.01, bid_qty=2.0))
+        self.exchange(OrderAction("BTCUSDT", "BUY", 1.0, 100.0, client_order_id="q"))
+        self.exchange.on_market(tick(100.0, 100.01, bid_qty=0.5))
+        self.assertEqual(self.fills(), [])
+        self.exchange.on_market(tick(100.0, 100.01, bid_qty=3.0))  # new size joins behind us
+        self.exchange.on_market(tick(100.0, 100.01, bid_qty=2.0))
+        fills = self.fills()
+        self.assertEqual(len(fills), 1)
+        self.assertAlmostEqual(fills[0].quantity, 0.5)
+        self.assertEqual(fills[0].status, "PARTIALLY_FILLED")
+        self.exchange.on_market(tick(99.99, 100.0, bid_qty=3.0))
+        self.assertEqual(self.fills()[-1].status, "FILLED")
+        self.assertEqual(self.exchange.open_orders(), [])
+
+    def test_crossing_ask_fills_against_displayed_size(self) -> None:
+        self.exchange.on_market(tick(100.5, 100.6))
+        self.exchange(OrderAction("BTCUSDT", "BUY", 1.0, 100.0, client_order_id="x"))
+        self.exchange.on_market(tick(99.9, 100.0, ask_qty=0.4))
+        fill = self.fills()[-1]
+        self.assertAlmostEqual(fill.quantity, 0.4)
+        self.assertTrue(fill.is_maker)
+        self.assertAlmostEqual(fill.fee, 0.4 * 0.001)
+
+    def test_marketable_limit_takes_and_rests_remainder(self) -> None:
+        self.exchange.on_market(tick(99.0, 100.0, ask_qty=0.25))
+        report = self.exchange(OrderAction("BTCUSDT", "BUY", 1.0, 101.0, client_order_id="m"))
+        self.assertEqual(report.status(), "PARTIALLY_FILLED")
+        self.assertFalse(self.fills()[0].is_maker)
+        free, locked = self.exchange.balance("USDT")
+        self.assertAlmostEqual(locked, 0.75 * 101.0)
+        self.assertAlmostEqual(free, 1000.0 - 25.0 - 0.75 * 101.0)
+
+    def test_fee_free_pair_and_cancel_release(self) -> None:
+        exchange = PaperExchange(balances={"USDT": 100.0})
+        exchange.add_pair(make_pair(fee_free=True))
+        exchange.on_market(tick(100.0, 100.01))
+        exchange(OrderAction("BTCUSDT", "BUY", 0.5, 99.0, client_order_id="c"))
+        self.assertAlmostEqual(exchange.balance("USDT")[1], 49.5)
+        exchange(CancelAction("BTCUSDT", "c"))
+        self.assertEqual(exchange.balance("USDT"), (100.0, 0.0))
+        exchange.on_market(tick(100.0, 100.01, ask_qty=5))
+        exchange(OrderAction("BTCUSDT", "BUY", 0.1, 0.0, order_type="MARKET", client_order_id="mk"))
+        self.assertAlmostEqual(exchange.balance("BTC")[0], 0.1)
+
+    def test_order_canceled_by_a_fill_callback_does_not_fill(self) -> None:
+        self.exchange.on_market(tick(100.5, 100.6))
+        for cid in ("a", "b"):
+            self.exchange(OrderAction("BTCUSDT", "BUY", 1.0, 100.0, client_order_id=cid))
+        # A kill switch tripped by the first fill cancels the rest of the level mid-match.
+        self.exchange.on_event = lambda event: isinstance(event, FillEvent) and self.exchange(CancelAction("BTCUSDT", "b"))
+        self.exchange.on_market(tick(99.8, 99.9, ask_qty=5.0))
+        self.assertEqual(self.exchange.counters["fills"], 1)
+        self.assertEqual(self.exchange.open_orders(), [])
+        self.assertAlmostEqual(self.exchange.balance("USDT")[0], 900.0)
+        self.assertAlmostEqual(self.exchange.balance("USDT")[1], 0.0)
+
+    def test_engine_places_take_profit_after_fill(self) -> None:
+        settings = {"budget_usdt": 100, "max_orders": 2, "grid_step_pct": 1.0, "take_profit_pct": 1.0, "cooldown_seconds": 0}
+        pair = make_pair(fee_free=True)
+        exchange = PaperExchange(balances={"USDT": 100.0})
+        exchange.add_pair(pair)
+        engine = TradingEngine(
+            DecisionEngine(filters={pair.symbol: pair.filters}),
+            ExecutionEngine(executor=exchange),
+            settings=settings,
+            market_observers=[exchange.on_market],
+        )
+        exchange.on_event = lambda event: engine.submit_execution(event) if isinstance(event, FillEvent) else None
+
+        async def source():
+            for bid, ask in [(100.0, 100.02), (98.9, 99.0), (99.5, 99.6)]:
+                yield tick(bid, ask, 5.0, 5.0)
+                await asyncio.sleep(0.01)
+
+        asyncio.run(engine.run([source()]))
+        sells = [o for o in exchange.open_orders() if o.side == "SELL"]
+        self.assertEqual(len(sells), 1)
+        self.assertAlmostEqual(sells[0].price, 99.99)
+        self.assertAlmostEqual(sells[0].quantity, 0.505)
+        self.assertEqual(engine.counters["fills"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
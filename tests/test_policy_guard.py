@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from core.decision_engine import CancelAction, OrderAction
+from core.execution_engine import DryRunExecutor, ExecutionEngine
+from core.policy_guard import AllowedSymbols, MaxOrderNotional, PolicyGuard
+
+
+class SlowNeverRejects:
+    name = "slow"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def allow(self, action) -> bool:
+        self.calls += 1
+        time.sleep(0.0002)
+        return True
+
+
+def orders(count: int):
+    symbols = ("BTCUSDT", "ETHUSDT", "DOGEUSDT")
+    return [
+        OrderAction(symbols[i % 3], "BUY", 0.1 * (i % 7 + 1), 100.0, client_order_id=f"o{i}") for i in range(count)
+    ]
+
+
+class PolicyGuardTests(unittest.TestCase):
+    def test_batch_matches_single_checks(self) -> None:
+        rules = [MaxOrderNotional(40), AllowedSymbols({"BTCUSDT", "ETHUSDT"})]
+        actions = orders(60) + [CancelAction("BTCUSDT", "o1")]
+        single = [PolicyGuard(rules=rules, adaptive=False).check(a) for a in actions]
+        batch = PolicyGuard(rules=rules, adaptive=False).check_many(actions)
+        self.assertEqual(batch, single)
+        self.assertEqual(set(single), {None, "max_order_notional", "allowed_symbols"})
+        self.assertEqual(PolicyGuard(rules=rules).allow_many(actions), [v is None for v in single])
+
+    def test_counters_and_reordering(self) -> None:
+        slow = SlowNeverRejects()
+        guard = PolicyGuard(rules=[slow, AllowedSymbols({"BTCUSDT"})], reorder_every=30)
+        guard.check_many(orders(30))
+        self.assertEqual([type(r).__name__ for r in guard.rules], ["AllowedSymbols", "SlowNeverRejects"])
+        stats = guard.stats()
+        self.assertEqual(stats["slow"], {**stats["slow"], "evaluated": 30, "rejected": 0})
+        self.assertEqual(stats["allowed_symbols"]["rejected"], 20)
+        self.assertGreater(stats["slow"]["mean_us"], stats["allowed_symbols"]["mean_us"])
+
+        calls = slow.calls
+        verdicts = guard.check_many(orders(30))
+        self.assertEqual(slow.calls - calls, 10)  # rejected actions never reach the slow rule
+        self.assertEqual(verdicts.count("allowed_symbols"), 20)
+
+        fixed = PolicyGuard(rules=[SlowNeverRejects(), AllowedSymbols({"BTCUSDT"})], reorder_every=1, adaptive=False)
+        fixed.check(orders(1)[0])
+        self.assertEqual(fixed.rules[0].name, "slow")
+
+    def test_execute_many_isolates_rejections_and_errors(self) -> None:
+        executor = DryRunExecutor()
+
+        def flaky(action):
+            if action.client_order_id == "o4":
+                raise RuntimeError("boom")
+            return executor(action)
+
+        engine = ExecutionEngine(policy_guard=PolicyGuard(rules=[AllowedSymbols({"BTCUSDT", "ETHUSDT"})]), executor=flaky)
+        results = engine.execute_many(orders(6))
+        kinds = [type(r).__name__ for r in results]
+        self.assertEqual(kinds, ["ExecutionReport", "ExecutionReport", "PermissionError", "ExecutionReport", "RuntimeError", "PermissionError"])
+        self.assertIn("allowed_symbols", str(results[2]))
+        self.assertEqual(len(executor.accepted), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
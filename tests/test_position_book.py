@@ -0,0 +1,71 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from core.events import FillEvent
+from core.order_store import OrderStore
+from core.position_book import PositionBook
+
+
+class PositionBookTests(unittest.TestCase):
+    def test_matches_order_store_positions(self) -> None:
+        rng = random.Random(8)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = OrderStore.open(tmp.name, snapshot_every=0)
+        self.addCleanup(store.close)
+        book = PositionBook(capacity=2)
+        symbols = [f"C{i}USDT" for i in range(10)]
+        for n in range(1_500):
+            symbol = rng.choice(symbols)
+            held = store.position(symbol).quantity
+            side = "SELL" if held > 0 and rng.random() < 0.4 else "BUY"
+            qty = round(held * rng.random(), 6) if side == "SELL" else round(rng.random(), 6)
+            if qty <= 0:
+                continue
+            price = round(rng.uniform(90, 110), 2)
+            base_fee = rng.random() < 0.5
+            fee = qty * 0.001 if base_fee else qty * price * 0.001
+            cid = f"o{n}"
+            store.new_order(symbol, side, price, qty, cid)
+            store.fill(cid, qty, price, fee=fee, fee_in_base=base_fee)
+            base = symbol[:-4]
+            book.on_fill(FillEvent(symbol, cid, side, price, qty, 0.0, fee=fee, fee_asset=base if base_fee else "USDT", base_asset=base))
+        self.assertEqual(len(book), 10)
+        cols = book.columns()
+        for symbol, i in book.ids.items():
+            pos = store.position(symbol)
+            self.assertAlmostEqual(cols["quantity"][i], pos.quantity, places=9)
+            self.assertAlmostEqual(cols["avg_price"][i], pos.avg_price, places=6)
+            self.assertAlmostEqual(cols["realized"][i], pos.realized_pnl, places=6)
+            self.assertAlmostEqual(cols["fees"][i], pos.fees_quote, places=6)
+
+    def test_marks_revaluation_and_snapshot(self) -> None:
+        book = PositionBook(["BTCUSDT", "ETHUSDT", "XRPUSDT"])
+        book.on_fill(FillEvent("BTCUSDT", "a", "BUY", 100.0, 2.0, 0.0))
+        book.on_fill(FillEvent("ETHUSDT", "b", "BUY", 10.0, 3.0, 0.0))
+        book.on_mark("BTCUSDT", 110.0)
+        self.assertAlmostEqual(book.totals()["unrealized"], 20.0)
+        book.revalue([105.0, np.nan, 1.0])
+        self.assertEqual(book.mark[:3].tolist(), [105.0, 10.0, 1.0])
+        book.revalue_overview({"ETHUSDT": {"bid": 11.0, "ask": 13.0, "last": 12.5}, "BTCUSDT": {"bid": None, "ask": None, "last": 99.0}})
+        totals = book.totals()
+        self.assertAlmostEqual(totals["unrealized"], -2.0 + 6.0)
+        self.assertEqual(totals["open_positions"], 2)
+        self.assertEqual([book.symbols[i] for i in book.top(2)], ["BTCUSDT", "ETHUSDT"])
+        with self.assertRaises(ValueError):
+            book.revalue([1.0])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = book.save(Path(tmp) / "positions" / "book.npz")
+            loaded = PositionBook.load(path)
+        self.assertEqual(loaded.symbols, book.symbols)
+        for key, column in book.columns().items():
+            np.testing.assert_array_equal(loaded.columns()[key], column)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from ai.prompt_builder import STATIC_PREFIX, PromptAssembler, PromptSection, assemble_prompt, prompt_sections
+from core.config_service import Config
+from exchanges.binance.models import MarketSnapshot, PairFilters
+
+
+def snapshot(price: float, ts: int) -> MarketSnapshot:
+    return MarketSnapshot(symbol="BTCUSDT", last_price=price, bid=price - 0.01, ask=price + 0.01, volume_24h=12345.678, spread=0.02, timestamp=ts)
+
+
+def words(text: str) -> int:
+    return len(text.split())
+
+
+class PromptBuilderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config()
+        self.config.app.active_pair = "BTCUSDT"
+        self.config.ai.prompt_budget_tokens = 0
+
+    def test_prefix_is_byte_stable_and_market_is_last(self) -> None:
+        first = assemble_prompt(config=self.config, snapshot=snapshot(100.0, 1), filters=None)
+        self.config.trading.budget_usdt = 250
+        second = assemble_prompt(
+            config=self.config, snapshot=snapshot(101.5, 2), filters=PairFilters(tick_size=0.01), constraints={"mode": "paper"}
+        )
+        self.assertTrue(first.text.startswith(STATIC_PREFIX + "\n"))
+        self.assertTrue(second.text.startswith(STATIC_PREFIX + "\n"))
+        self.assertEqual([name for name, _ in second.sections][-1], "market")
+        self.assertIn("101.5", second.sections[-1][1])
+        self.assertNotIn("101.5", second.text_without("market"))
+        # Nothing but the market block differs when only the market moves.
+        self.assertEqual(
+            first.text_without("market"),
+            assemble_prompt(config=Config(app={"active_pair": "BTCUSDT"}, ai={"prompt_budget_tokens": 0}), snapshot=None, filters=None).text_without("market"),
+        )
+        self.assertGreater(first.tokens, first.prefix_tokens)
+        self.assertFalse(first.over_budget)
+
+    def test_budget_compacts_then_drops_lowest_value_sections(self) -> None:
+        sections = prompt_sections(
+            config=self.config, snapshot=snapshot(100.0, 1), filters=PairFilters(0.01, 0.0001, 5.0), constraints={"mode": "paper"}
+        )
+        full = PromptAssembler(count=words).assemble(sections)
+        self.assertEqual((full.compacted, full.dropped), ([], []))
+
+        tight = PromptAssembler(budget_tokens=full.tokens - 3, count=words).assemble(sections)
+        self.assertEqual(tight.compacted, ["settings"])
+        self.assertEqual(tight.dropped, [])
+        self.assertLessEqual(tight.tokens, tight.budget_tokens)
+
+        tighter = PromptAssembler(budget_tokens=words(STATIC_PREFIX) + 12, count=words, input_usd_per_mtok=0.4).assemble(sections)
+        self.assertEqual(tighter.compacted, ["settings", "market"])
+        self.assertEqual(tighter.dropped[:2], ["constraints", "filters"])
+        names = [name for name, _ in tighter.sections]
+        self.assertIn("pair", names)
+        self.assertEqual(names[-1], "market")
+        self.assertIn("spread_bps=2.0", tighter.sections[-1][1])
+        self.assertAlmostEqual(tighter.report()["est_cost_usd"], tighter.tokens * 0.4 / 1e6, places=9)
+
+        # Required sections stay even when the budget cannot be met.
+        floor = PromptAssembler(budget_tokens=1, count=words).assemble([PromptSection("pair", "Pair", "X", droppable=False)])
+        self.assertTrue(floor.over_budget)
+        self.assertEqual([name for name, _ in floor.sections], ["pair"])
+
+
+if __name__ == "__main__":
+    unittest.main()
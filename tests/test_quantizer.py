@@ -0,0 +1,100 @@
+import unittest
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+
+import numpy as np
+
+from exchanges.binance.models import PairFilters
+from exchanges.binance.quantizer import LOT_SIZE, MIN_NOTIONAL, OK, PRICE_FILTER, VIOLATIONS, Quantizer
+
+
+def decimal_snap(value: float, increment, rounding: str) -> float:
+    step = Decimal(str(increment))
+    return float((Decimal(str(value)) / step).to_integral_value(rounding=rounding) * step)
+
+
+def decimal_violation(price, quantity, tick, step, min_notional):
+    """The string-level checks Binance applies to what we send (``str(float)``)."""
+
+    if Decimal(str(price)) % Decimal(str(tick)):
+        return "PRICE_FILTER"
+    if quantity <= 0 or Decimal(str(quantity)) % Decimal(str(step)):
+        return "LOT_SIZE"
+    if Decimal(str(price)) * Decimal(str(quantity)) < Decimal(str(min_notional)):
+        return "MIN_NOTIONAL"
+    return None
+
+
+CASES = [
+    (0.01, 0.00001, 5.0),
+    (0.00000001, 1.0, 0.0001),
+    (0.1, 0.001, 10.0),
+    (10.0, 0.5, 1.0),
+    ("0.00010000", "0.00100000", "5.00000000"),
+]
+
+
+class QuantizerTests(unittest.TestCase):
+    def test_rounding_matches_decimal_reference(self) -> None:
+        rng = np.random.default_rng(1)
+        for tick, step, min_notional in CASES:
+            q = Quantizer(tick, step, min_notional)
+            raw = np.exp(rng.uniform(-6, 11, 2_000))
+            # Values built by float arithmetic that are meant to sit exactly on the grid.
+            noisy = np.r_[raw, np.arange(1, 500) * float(tick) * 3, np.arange(1, 500) * 0.1 * float(step) * 10]
+            for up in (False, True):
+                expected = [decimal_snap(v, tick, ROUND_CEILING if up else ROUND_FLOOR) for v in noisy]
+                self.assertEqual([q.round_price(v, up=up) for v in noisy], expected)
+                self.assertEqual(q.round_prices(noisy, up=up).tolist(), expected)
+            expected = [decimal_snap(v, step, ROUND_FLOOR) for v in noisy]
+            self.assertEqual(q.round_quantities(noisy).tolist(), expected)
+
+    def test_violations_match_string_level_checks(self) -> None:
+        rng = np.random.default_rng(2)
+        for tick, step, min_notional in CASES:
+            q = Quantizer(tick, step, min_notional)
+            prices = np.r_[q.round_prices(np.exp(rng.uniform(-6, 8, 1_500))), rng.uniform(0, 100, 500)]
+            quantities = np.r_[q.round_quantities(np.exp(rng.uniform(-6, 6, 1_500))), rng.uniform(-1, 10, 500)]
+            expected = [decimal_violation(p, v, tick, step, min_notional) for p, v in zip(prices, quantities)]
+            self.assertEqual([q.violation(p, v) for p, v in zip(prices, quantities)], expected)
+            self.assertEqual([VIOLATIONS[c] for c in q.violations(prices, quantities)], expected)
+            self.assertGreater(expected.count(None), 100)
+
+    def test_edges(self) -> None:
+        q = Quantizer(0.01, 0.001, 5)
+        self.assertEqual(q.round_price(0.1 + 0.2), 0.3)
+        self.assertEqual(q.round_price(0.30000000000000004 - 1e-12), 0.29)
+        self.assertEqual(q.round_price(100.001, up=True), 100.01)
+        self.assertEqual(q.violation(0.1 + 0.2, 16.667), "PRICE_FILTER")  # sent as "0.30000000000000004"
+        self.assertIsNone(q.violation(q.round_price(0.1 + 0.2), 16.667))
+        self.assertEqual(q.violation(100.0, 0.049), "MIN_NOTIONAL")
+        self.assertIsNone(q.violation(100.0, 0.05))
+        self.assertEqual(q.violation(100.0, 0.0), "LOT_SIZE")
+        self.assertEqual(q.violations([100.005, 100.0, 100.0, 100.0], [1, 0.0005, 0.01, 1]).tolist(), [PRICE_FILTER, LOT_SIZE, MIN_NOTIONAL, OK])
+        self.assertEqual(q.format_price(q.round_price(0.1 + 0.2)), "0.30")
+        self.assertEqual(q.format_quantity(16.667), "16.667")
+        self.assertEqual(q.round_prices([np.inf, -np.inf]).tolist(), [np.inf, -np.inf])
+
+        loose = Quantizer()
+        self.assertEqual(loose.round_price(1.23456789), 1.23456789)
+        self.assertIsNone(loose.violation(1.23456789, 0.5))
+
+    def test_grid_orders(self) -> None:
+        q = Quantizer(0.01, 0.0001, 5)
+        prices, quantities, valid = q.grid_orders(np.array([[100.456, 50.0, 0.004]]), 6.0)
+        self.assertEqual(prices.tolist(), [[100.45, 50.0, 0.0]])
+        self.assertEqual(quantities[0, :2].tolist(), [0.0597, 0.12])
+        self.assertEqual(valid.tolist(), [[True, True, False]])
+        _, _, valid = q.grid_orders([100.0], 4.99)
+        self.assertFalse(valid[0])
+        self.assertEqual(q.violations(prices[valid], quantities[valid]).tolist(), [])
+
+    def test_pair_filters_delegate_and_follow_changes(self) -> None:
+        filters = PairFilters(tick_size=0.01, step_size=0.001, min_notional=5)
+        self.assertEqual(filters.violation(100.005, 1), "PRICE_FILTER")
+        filters.tick_size = 0.001
+        self.assertIsNone(filters.violation(100.005, 1))
+        self.assertEqual(filters.round_quantity(1.23456), 1.234)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import random
+import unittest
+
+from core.decision_engine import CancelAction, DecisionEngine, OrderAction
+from core.engine import TradingEngine
+from core.events import FillEvent
+from core.execution_engine import DryRunExecutor, ExecutionEngine, ExecutionReport
+from core.policy_guard import PolicyGuard
+from exchanges.paper import PaperExchange
+from risk.engine import RiskEngine, RiskLimits
+from risk.rules import RiskLimitRule
+from tests.test_engine import SETTINGS, synthetic_ticks
+from tests.test_paper_exchange import make_pair, tick
+
+
+def fill(symbol, side, qty, price, *, cid="f", remaining=0.0, fee=0.0, fee_asset="") -> FillEvent:
+    return FillEvent(symbol, cid, side, price, qty, remaining, fee=fee, fee_asset=fee_asset, base_asset=symbol[:3])
+
+
+class RiskEngineTests(unittest.TestCase):
+    def test_incremental_totals_match_recomputation(self) -> None:
+        rng = random.Random(4)
+        risk = RiskEngine(starting_equity=1_000)
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLBTC"):
+            risk.add_symbol(symbol, symbol[3:])
+        prices = {"BTCUSDT": 100.0, "ETHUSDT": 50.0, "SOLBTC": 0.01}
+        for _ in range(2_000):
+            symbol = rng.choice(list(prices))
+            prices[symbol] *= 1 + rng.gauss(0, 0.01)
+            if rng.random() < 0.5:
+                risk.on_mark(symbol, prices[symbol])
+                continue
+            held = risk.books[symbol].quantity
+            side = "SELL" if held > 0 and rng.random() < 0.4 else "BUY"
+            qty = held * rng.random() if side == "SELL" else rng.random()
+            fee_asset = rng.choice(["", symbol[:3]])
+            risk.on_fill(fill(symbol, side, qty, prices[symbol], fee=qty * 0.001 if fee_asset else 0.01, fee_asset=fee_asset))
+        books = risk.books.values()
+        self.assertAlmostEqual(risk.unrealized, sum(b.unrealized for b in books), places=6)
+        self.assertAlmostEqual(risk.realized, sum(b.realized for b in books), places=6)
+        self.assertAlmostEqual(risk.total_exposure, sum(b.exposure for b in books), places=6)
+        self.assertAlmostEqual(risk.quote_exposure["BTC"], risk.books["SOLBTC"].exposure, places=9)
+        self.assertGreaterEqual(risk.peak_equity, risk.equity)
+
+    def test_kill_switch_trips_on_the_crossing_tick(self) -> None:
+        trips = []
+        risk = RiskEngine(RiskLimits(max_drawdown_pct=5), starting_equity=100, on_trip=trips.append)
+        risk.on_fill(fill("BTCUSDT", "BUY", 1.0, 100.0))
+        risk.on_mark("BTCUSDT", 110.0)
+        self.assertEqual(risk.peak_equity, 110.0)
+        risk.on_mark("BTCUSDT", 105.0)
+        self.assertIsNone(risk.tripped)
+        risk.on_mark("BTCUSDT", 104.4)
+        self.assertEqual(len(trips), 1)
+        self.assertIn("drawdown", risk.tripped)
+        buy = OrderAction("BTCUSDT", "BUY", 0.01, 100.0, client_order_id="b")
+        self.assertTrue(risk.would_breach(buy).startswith("kill_switch"))
+        self.assertIsNone(risk.would_breach(OrderAction("BTCUSDT", "SELL", 1.0, 104.0)))
+        self.assertIsNone(risk.would_breach(CancelAction("BTCUSDT", "b")))
+        risk.on_mark("BTCUSDT", 90.0)
+        self.assertEqual(len(trips), 1)
+        risk.reset()
+        self.assertIsNone(risk.would_breach(buy))
+
+        loss = RiskEngine(RiskLimits(max_loss=3), starting_equity=100)
+        loss.on_fill(fill("BTCUSDT", "BUY", 1.0, 100.0))
+        loss.on_fill(fill("BTCUSDT", "SELL", 0.5, 98.0))
+        loss.on_mark("BTCUSDT", 97.9)
+        self.assertIsNone(loss.tripped)
+        loss.on_mark("BTCUSDT", 96.0)  # -1 realized, -2 unrealized
+        self.assertIn("loss", loss.tripped)
+
+    def test_resting_buys_count_towards_exposure_limits(self) -> None:
+        risk = RiskEngine(RiskLimits(max_symbol_exposure=100, max_total_exposure=150))
+        risk.add_symbol("BTCUSDT", "USDT")
+        order = OrderAction("BTCUSDT", "BUY", 0.6, 100.0, client_order_id="r1")
+        risk.on_report(ExecutionReport(order, "NEW"))
+        self.assertAlmostEqual(risk.total_exposure, 60.0)
+        self.assertEqual(risk.would_breach(OrderAction("BTCUSDT", "BUY", 0.5, 100.0)), "max_symbol_exposure")
+        self.assertIsNone(risk.would_breach(OrderAction("BTCUSDT", "BUY", 0.4, 100.0)))
+        self.assertEqual(risk.would_breach(OrderAction("ETHUSDT", "BUY", 1.0, 95.0)), "max_total_exposure")
+
+        risk.on_fill(fill("BTCUSDT", "BUY", 0.2, 100.0, cid="r1", remaining=0.4))
+        self.assertAlmostEqual(risk.books["BTCUSDT"].reserved, 40.0)
+        self.assertAlmostEqual(risk.total_exposure, 60.0)
+        risk.on_report(ExecutionReport(CancelAction("BTCUSDT", "r1"), "CANCELED"))
+        self.assertAlmostEqual(risk.total_exposure, 20.0)
+
+        # An order crossing on entry is partly filled before its report arrives.
+        crossing = OrderAction("BTCUSDT", "BUY", 0.5, 100.0, client_order_id="r2")
+        risk.on_fill(fill("BTCUSDT", "BUY", 0.3, 100.0, cid="r2", remaining=0.2))
+        risk.on_report(ExecutionReport(crossing, "PARTIALLY_FILLED"))
+        self.assertAlmostEqual(risk.books["BTCUSDT"].reserved, 20.0)
+        risk.on_fill(fill("BTCUSDT", "BUY", 0.2, 100.0, cid="r2"))
+        self.assertAlmostEqual(risk.books["BTCUSDT"].reserved, 0.0)
+        self.assertAlmostEqual(risk.total_exposure, 70.0)
+
+    def test_guard_rejects_engine_orders_once_tripped(self) -> None:
+        risk = RiskEngine(RiskLimits(max_drawdown_pct=1), starting_equity=100)
+        risk.on_fill(fill("BTCUSDT", "BUY", 1.0, 100.0))
+        executor = DryRunExecutor()
+        engine = TradingEngine(
+            DecisionEngine(),
+            ExecutionEngine(policy_guard=PolicyGuard(rules=[RiskLimitRule(risk)]), executor=executor),
+            settings=SETTINGS,
+            market_observers=[risk.on_market],
+        )
+        # The second tick is a 5% drop: it trips the switch and its re-anchored grid is refused.
+        asyncio.run(engine.run([synthetic_ticks("BTCUSDT", [100.0, 95.0, 94.0])]))
+        self.assertIsNotNone(risk.tripped)
+        self.assertGreater(engine.counters["rejected"], 0)
+        self.assertEqual(engine.execution_engine.policy_guard.stats()["risk_limits"]["rejected"], engine.counters["rejected"])
+        self.assertTrue(all(a.price > 99 for a in executor.accepted if isinstance(a, OrderAction)))
+        verdict = engine.execution_engine.policy_guard.check(OrderAction("BTCUSDT", "BUY", 0.01, 90.0))
+        self.assertEqual(verdict, f"risk_limits: kill_switch: {risk.tripped}")
+
+
+    def test_trip_cancels_resting_buys_and_halts_the_engine(self) -> None:
+        pair = make_pair(fee_free=True)
+        paper = PaperExchange(balances={"USDT": 100.0})
+        paper.add_pair(pair)
+        risk = RiskEngine(RiskLimits(max_loss=0.1), starting_equity=100)
+        risk.add_pair(pair)
+        engine = TradingEngine(
+            DecisionEngine(filters={pair.symbol: pair.filters}),
+            ExecutionEngine(policy_guard=PolicyGuard(rules=[RiskLimitRule(risk)]), executor=paper),
+            settings=SETTINGS,
+            market_observers=[risk.on_market, paper.on_market],
+            on_report=risk.on_report,
+        )
+        risk.on_trip = engine.halt
+        fills = []
+
+        def on_event(event) -> None:
+            if isinstance(event, FillEvent):
+                fills.append(event)
+                risk.on_fill(event)
+                engine.submit_execution(event)
+
+        paper.on_event = on_event
+
+        async def scenario():
+            await engine.start()
+            # Ladder at 99.5/99/98.5/98; the second tick fills 99.5, the third trips on its mark.
+            for bid, ask in [(100.0, 100.02), (99.3, 99.4), (98.8, 98.9), (96.0, 96.1)]:
+                engine.put_nowait(tick(bid, ask))
+                await engine.join()
+            await engine.stop()
+
+        asyncio.run(scenario())
+        self.assertIn("loss", engine.halted)
+        self.assertEqual([(f.side, f.price) for f in fills], [("BUY", 99.5)])
+        self.assertEqual([o.side for o in paper.open_orders()], ["SELL"])
+        self.assertEqual(paper.counters["cancels"], SETTINGS["max_orders"] - 1)
+        self.assertAlmostEqual(risk.books[pair.symbol].reserved, 0.0)
+        self.assertEqual(engine.symbol_state[pair.symbol]["levels"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import math
+import random
+import unittest
+
+from core.screener import RollingScreener
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def brute_force(ticks, now, window=60, bucket=5):
+    """Metrics straight from the raw ticks of the window ending in ``now``'s bucket."""
+
+    n, half = window // bucket, window // bucket // 2
+    now_b = int(now // bucket)
+    first_b = int(ticks[0][0] // bucket)
+    spreads, r2, recent, older, trades = [], 0.0, 0.0, 0.0, 0
+    last = 0.0
+    for ts, bid, ask, volume, count in ticks:
+        b = int(ts // bucket)
+        inside = now_b - n < b <= now_b
+        if bid:
+            mid = (bid + ask) / 2
+            if inside:
+                spreads.append((ask - bid) / mid * 10_000)
+                if last and mid != last:
+                    r2 += math.log(mid / last) ** 2
+            last = mid
+        if inside and count:
+            trades += count
+            if b > now_b - half:
+                recent += volume
+            else:
+                older += volume
+    seen = min(now_b - first_b + 1, n)
+    older_buckets = seen - half
+    return {
+        "spread_bps": sum(spreads) / len(spreads) if spreads else None,
+        "volatility_bps": math.sqrt(r2) * 10_000 if len(spreads) > 1 else None,
+        "volume_trend_pct": (recent / half) / (older / older_buckets) * 100 - 100 if older and older_buckets > 0 else None,
+        "trades_per_min": trades / (seen * bucket / 60),
+    }
+
+
+class RollingScreenerTests(unittest.TestCase):
+    def test_incremental_windows_match_a_full_recount(self) -> None:
+        rng = random.Random(3)
+        clock = FakeClock(10_000.0)
+        screener = RollingScreener(window_seconds=60, bucket_seconds=5, capacity=2, clock=clock)
+        ticks = {symbol: [] for symbol in ("AAA", "BBB", "CCC")}
+        mids = {symbol: 100.0 for symbol in ticks}
+        for step in range(3000):
+            # Irregular arrivals, including quiet gaps longer than the window.
+            clock.now += rng.expovariate(20) + (90 if step == 1500 else 0)
+            symbol = rng.choice(list(ticks))
+            if rng.random() < 0.6:
+                mids[symbol] *= 1 + rng.gauss(0, 1e-3)
+                tick = (clock.now, mids[symbol] * 0.9995, mids[symbol] * 1.0005, 0.0, 0)
+            else:
+                tick = (clock.now, 0.0, 0.0, rng.uniform(10, 1000), rng.randint(1, 5))
+            ticks[symbol].append(tick)
+            screener.update(symbol, bid=tick[1], ask=tick[2], volume=tick[3], trades=tick[4])
+            if step % 500 == 499:
+                clock.now += 7  # queries also roll quiet symbols forward
+                snapshot = screener.snapshot()
+                for name, rows in ticks.items():
+                    expected = brute_force(rows, clock.now)
+                    for metric, value in expected.items():
+                        got = snapshot[name][metric]
+                        if value is None:
+                            self.assertIsNone(got, (name, metric, step))
+                        else:
+                            self.assertAlmostEqual(got, value, places=6, msg=(name, metric, step))
+
+    def test_top_k_recomputes_only_changed_symbols(self) -> None:
+        clock = FakeClock(1_000.0)
+        screener = RollingScreener(window_seconds=60, bucket_seconds=5, clock=clock)
+        for i in range(200):
+            screener.update(f"S{i:03d}", bid=100.0, ask=100.0 + 0.01 * (i + 1))
+        top = screener.top("spread_bps", 3)
+        self.assertEqual([symbol for symbol, _ in top], ["S199", "S198", "S197"])
+        self.assertEqual(screener.recomputed, 200)
+
+        screener.update("S005", bid=100.0, ask=110.0)  # now the widest by far (mean ~500 bp)
+        self.assertEqual(screener.top("spread_bps", 1)[0][0], "S005")
+        self.assertEqual(screener.top("spread_bps", 2, ascending=True)[0][0], "S000")
+        self.assertEqual(screener.recomputed, 201)
+        among = screener.top("spread_bps", 2, symbols=["S001", "S002", "S003", "NOPE"])
+        self.assertEqual([symbol for symbol, _ in among], ["S003", "S002"])
+        wide = screener.top("spread_bps", 2, symbols=[f"S{i:03d}" for i in range(150)])
+        self.assertEqual([symbol for symbol, _ in wide], ["S005", "S149"])
+        self.assertLessEqual(screener.stats()["heap_entries"], 2 * 201)
+
+    def test_all_market_ticker_and_trade_streams(self) -> None:
+        clock = FakeClock(1_000.0)
+        screener = RollingScreener(window_seconds=60, bucket_seconds=5, clock=clock)
+
+        def ticker(symbol, second, last_id, bid="10", ask="10.01"):
+            return {"e": "24hrTicker", "E": second * 1000, "s": symbol, "b": bid, "a": ask, "L": last_id, "n": 1000, "q": "50000"}
+
+        screener.on_message([ticker("AAAUSDT", 1000, 500), ticker("BBBUSDT", 1000, 70)])
+        screener.on_message({"stream": "!ticker@arr", "data": [ticker("AAAUSDT", 1001, 530, bid="10.01", ask="10.02")]})
+        screener.on_message({"stream": "bbbusdt@bookTicker", "data": {"u": 1, "s": "BBBUSDT", "b": "5", "B": "1", "a": "5.01", "A": "1"}})
+        screener.on_message({"e": "trade", "E": 1001000, "s": "BBBUSDT", "p": "5", "q": "3", "T": 1001000})
+        screener.on_message({"e": "aggTrade", "E": 1001000, "s": "BBBUSDT", "p": "5", "q": "1", "f": 10, "l": 13, "T": 1001000})
+        screener.on_message(ticker("BBBUSDT", 1001, 90))  # trades of BBB come from its trade stream now
+        screener.on_message({"result": None, "id": 1})
+        clock.now = 1_001.0
+        metrics = screener.snapshot()
+        # 30 new trades (last trade id 500 -> 530) within one 5 s bucket.
+        self.assertAlmostEqual(metrics["AAAUSDT"]["trades_per_min"], 30 * 12)
+        self.assertEqual(metrics["BBBUSDT"]["trades_per_min"], 5 * 12)
+        self.assertAlmostEqual(metrics["BBBUSDT"]["updates_per_min"], 3 * 12)
+        self.assertGreater(metrics["AAAUSDT"]["volatility_bps"], 0)
+        self.assertEqual(screener.stats()["messages"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+import unittest
+
+import numpy as np
+
+from core.config_service import StrategySettings
+from strategies.base import BUY, SELL, Strategy, unique_passes
+from strategies.host import StrategyHost, build_host
+from strategies.registry import available, load_strategy
+from strategies.trend import TrendFollowing
+
+
+def reference_trend(prices, fast_period, slow_period):
+    """Per-tick EMA crossover for one symbol: list of (index, side)."""
+
+    fa, sa = 2 / (fast_period + 1), 2 / (slow_period + 1)
+    fast = slow = None
+    trend, out = 0.0, []
+    for i, price in enumerate(prices):
+        fast = price if fast is None else fast + fa * (price - fast)
+        slow = price if slow is None else slow + sa * (price - slow)
+        now = float(np.sign(fast - slow))
+        if i + 1 > slow_period and now != 0 and trend != 0 and now != trend:
+            out.append((i, BUY if now > 0 else SELL))
+        if now != 0:
+            trend = now
+    return out
+
+
+class Exploding(Strategy):
+    name = "exploding"
+
+    def on_batch(self, symbol_ids, prices, ts):
+        raise RuntimeError("boom")
+
+
+class StrategyTests(unittest.TestCase):
+    def test_unique_passes_keep_arrival_order_per_symbol(self) -> None:
+        ids = np.array([3, 1, 3, 3, 2, 1])
+        passes = unique_passes(ids)
+        self.assertEqual([p.tolist() for p in passes], [[0, 1, 4], [2, 5], [3]])
+
+    def test_vectorized_trend_matches_per_tick_reference(self) -> None:
+        rng = np.random.default_rng(7)
+        n_symbols, n = 5, 3_000
+        paths = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, size=(n_symbols, n)), axis=1))
+        # Interleave symbols randomly so batches hold several updates of one symbol.
+        ids = np.repeat(np.arange(n_symbols), n)
+        rng.shuffle(ids)
+        seen = np.zeros(n_symbols, dtype=int)
+        prices = np.empty(len(ids))
+        positions = np.empty(len(ids), dtype=int)
+        for k, symbol in enumerate(ids):
+            positions[k] = seen[symbol]
+            prices[k] = paths[symbol, seen[symbol]]
+            seen[symbol] += 1
+        host = StrategyHost([TrendFollowing(fast_period=5, slow_period=20)], batch_size=257)
+        for symbol in range(n_symbols):
+            host.symbol_id(f"S{symbol}")
+        results = host.feed(ids, prices, np.arange(len(ids), dtype=float))
+        got = {s: [] for s in range(n_symbols)}
+        for _name, batch in results:
+            for signal in batch:
+                got[signal.symbol_id].append((int(positions[int(signal.ts)]), signal.side))
+        for symbol in range(n_symbols):
+            expected = reference_trend(paths[symbol], 5, 20)
+            self.assertTrue(expected)
+            self.assertEqual(got[symbol], expected)
+        stats = host.stats()["trend"]
+        self.assertEqual(stats["updates"], len(ids))
+        self.assertEqual(stats["calls"], -(-len(ids) // 257))
+
+    def test_registry_loads_modules_lazily_and_validates_names(self) -> None:
+        self.assertIn("dca", available())
+        sys.modules.pop("strategies.dca", None)
+        dca = load_strategy("dca", interval_seconds=60, dip_pct=1)
+        self.assertIn("strategies.dca", sys.modules)
+        self.assertEqual(dca.name, "dca")
+        with self.assertRaises(ValueError):
+            load_strategy("martingale")
+        direct = load_strategy("strategies.trend:TrendFollowing", fast_period=3, slow_period=6)
+        self.assertIsInstance(direct, TrendFollowing)
+
+    def test_host_batches_by_size_and_age_and_isolates_failures(self) -> None:
+        now = [0.0]
+        received = []
+        settings = StrategySettings(enabled=["dca"], batch_size=4, batch_ms=100, params={"dca": {"interval_seconds": 10}})
+        host = build_host(settings, clock=lambda: now[0], on_signals=lambda name, batch, symbols: received.append(
+            [(symbols[s.symbol_id], s.side) for s in batch]
+        ))
+        host.add(Exploding())
+        for symbol in ("AUSDT", "BUSDT", "AUSDT"):
+            self.assertEqual(host.push(symbol, 1.0, 0.0), [])
+        # Fourth update fills the batch: per-tick adapter buys each symbol once per interval.
+        results = host.push("CUSDT", 1.0, 0.0)
+        self.assertEqual(received, [[("AUSDT", BUY), ("BUSDT", BUY), ("CUSDT", BUY)]])
+        self.assertEqual([name for name, _ in results], ["dca"])
+        self.assertEqual(host.stats()["exploding"]["errors"], 1)
+        host.push("AUSDT", 1.0, 11.0)
+        now[0] = 0.2
+        host.push("BUSDT", 1.0, 5.0)
+        self.assertEqual(received[-1], [("AUSDT", BUY)])
+        self.assertEqual(host.stats()["dca"]["updates"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
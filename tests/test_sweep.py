@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from exchanges.binance.models import PairFilters
+from strategies.sweep import ParameterSweep, SweepSpace, score_summary
+from tests.test_grid_backtest import random_klines
+
+SPACE = SweepSpace(
+    {"grid_step_pct": (0.3, 0.5, 1.0), "take_profit_pct": (0.5, 1.0), "stop_loss_pct": (0.0, 2.0)},
+    base={"budget_usdt": 100, "max_orders": 4, "cooldown_seconds": 60},
+)
+
+
+class SweepSpaceTests(unittest.TestCase):
+    def test_grid_and_sample(self) -> None:
+        grid = list(SPACE.grid())
+        self.assertEqual(len(grid), len(SPACE))
+        self.assertEqual(len(grid), 12)
+        self.assertTrue(all(c["max_orders"] == 4 for c in grid))
+        sample = SPACE.sample(5, seed=1)
+        self.assertEqual(len({tuple(sorted(c.items())) for c in sample}), 5)
+        self.assertEqual(len(SPACE.sample(50)), 12)
+
+    def test_repeated_values_are_counted_once(self) -> None:
+        space = SweepSpace({"max_orders": [5, 5, 5], "grid_step_pct": [0.5, 0.5, 1.0]})
+        self.assertEqual(len(space), 2)
+        self.assertEqual(len(list(space.grid())), 2)
+        self.assertEqual(len(space.sample(3, seed=1)), 2)
+        self.assertEqual(len(SweepSpace({"max_orders": [3, 5, 3, 8]}).sample(2, seed=1)), 2)
+
+
+class ParameterSweepTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.klines = random_klines(6_000, seed=5)
+        self.filters = PairFilters(tick_size=0.01, step_size=0.0001, min_notional=5)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_ranks_and_streams_results(self) -> None:
+        path = Path(self.tmp.name) / "sweep.jsonl"
+        seen = []
+        report = ParameterSweep(
+            self.klines, filters=self.filters, workers=1, screen_fraction=0, results_path=path
+        ).run(SPACE.grid(), on_result=seen.append)
+        self.assertEqual(report.evaluated, 12)
+        self.assertEqual(report.pruned, 0)
+        scores = [c.score for c in report.ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertAlmostEqual(report.ranked[0].score, score_summary(report.ranked[0].summary))
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(len(seen), 12)
+        self.assertEqual({line["stage"] for line in lines}, {"full"})
+
+    def test_dominated_candidates_stop_after_screening(self) -> None:
+        path = Path(self.tmp.name) / "sweep.jsonl"
+        sweep = ParameterSweep(
+            self.klines, filters=self.filters, workers=1, prune_margin=0.0, prune_dominators=1, results_path=path
+        )
+        report = sweep.run(SPACE.grid())
+        self.assertGreater(report.pruned, 0)
+        self.assertEqual(len(report.ranked), 12 - report.pruned)
+        # One line per candidate, with its final stage.
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(len({json.dumps(line["settings"], sort_keys=True) for line in lines}), 12)
+        self.assertEqual(sum(line["stage"] == "pruned" for line in lines), report.pruned)
+        self.assertEqual(sum(line["stage"] == "full" for line in lines), 12 - report.pruned)
+
+    def test_process_pool_matches_in_process(self) -> None:
+        kwargs = {"filters": self.filters, "screen_fraction": 0}
+        local = ParameterSweep(self.klines, workers=1, **kwargs).run(SPACE.grid())
+        pooled = ParameterSweep(self.klines, workers=2, batch_size=3, **kwargs).run(SPACE.grid())
+        self.assertEqual([c.settings for c in local.ranked], [c.settings for c in pooled.ranked])
+        self.assertEqual([c.summary for c in local.ranked], [c.summary for c in pooled.ranked])
+
+
+if __name__ == "__main__":
+    unittest.main()
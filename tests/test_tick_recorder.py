@@ -0,0 +1,113 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from core.tick_recorder import (
+    BOOK_TICKER,
+    DEPTH,
+    FLAG_ASK,
+    FLAG_BUYER_MAKER,
+    FLAG_SNAPSHOT,
+    PACKED_SUFFIX,
+    RAW_SUFFIX,
+    RECORD_DTYPE,
+    TRADE,
+    TickReader,
+    TickRecorder,
+)
+
+DAY_MS = 86_400_000
+T0 = 1_760_000_000_000 - 1_760_000_000_000 % DAY_MS  # a UTC midnight
+
+
+class FakeClock:
+    def __init__(self, ms: int) -> None:
+        self.ms = ms
+
+    def __call__(self) -> float:
+        return self.ms / 1000
+
+
+def book(symbol: str, bid: float, update_id: int = 1) -> dict:
+    return {"u": update_id, "s": symbol, "b": str(bid), "B": "1.5", "a": str(bid + 0.5), "A": "2"}
+
+
+class TickRecorderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.clock = FakeClock(T0 + 1000)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_streams_round_trip_as_fixed_width_records(self) -> None:
+        recorder = TickRecorder(self.root, clock=self.clock, compress=False)
+        recorder.record({"stream": "btcusdt@bookTicker", "data": book("BTCUSDT", 100.0, 7)})
+        recorder.record({"e": "trade", "E": 5, "s": "BTCUSDT", "t": 42, "p": "100.25", "q": "0.3", "T": 4, "m": True})
+        recorder.record({"e": "depthUpdate", "E": 6, "s": "BTCUSDT", "U": 1, "u": 9, "b": [["99.5", "1"]], "a": [["100.5", "0"]]})
+        recorder.record({"stream": "ethusdt@depth5@100ms", "data": {"lastUpdateId": 11, "bids": [["9", "1"]], "asks": [["10", "2"]]}})
+        recorder.record({"result": None, "id": 1})
+        self.assertEqual(recorder.flush(), 6)
+        self.assertEqual(recorder.stats()["malformed"], 1)
+
+        records = TickReader(self.root).read("BTCUSDT")
+        self.assertEqual(records.dtype.itemsize, 64)
+        self.assertEqual(list(records["kind"]), [BOOK_TICKER, TRADE, DEPTH, DEPTH])
+        ticker, trade, bid, ask = records
+        self.assertEqual((ticker["price"], ticker["qty"], ticker["price2"], ticker["qty2"], ticker["seq"]), (100.0, 1.5, 100.5, 2.0, 7))
+        self.assertEqual((trade["price"], trade["seq"], trade["event_ms"], trade["flags"]), (100.25, 42, 4, FLAG_BUYER_MAKER))
+        self.assertEqual((bid["flags"], ask["flags"], ask["qty"]), (0, FLAG_ASK, 0.0))
+        self.assertTrue((records["ts_ms"] == T0 + 1000).all())
+        eth = TickReader(self.root).read("ETHUSDT")
+        self.assertEqual(list(eth["flags"]), [FLAG_SNAPSHOT, FLAG_SNAPSHOT | FLAG_ASK])
+
+        small = TickRecorder(self.root, queue_size=2, clock=self.clock)
+        for i in range(5):
+            small.record(book("BTCUSDT", 100.0 + i))
+        self.assertEqual((small.stats()["queued"], small.stats()["dropped"]), (2, 3))
+        recorder.stop()
+
+    def test_rotation_packs_segments_and_range_reads_touch_only_matching_blocks(self) -> None:
+        recorder = TickRecorder(self.root, clock=self.clock, block_records=100, max_segment_bytes=64 * 1000).start()
+        for i in range(2500):
+            self.clock.ms = T0 + 1000 + i * 10
+            recorder.record(book("BTCUSDT", 100.0 + i * 0.01, i))
+            if i % 500 == 499:
+                recorder.flush()
+        self.clock.ms = T0 + DAY_MS + 5  # next UTC day
+        recorder.record(book("BTCUSDT", 200.0, 9999))
+        recorder.stop()
+
+        folder = self.root / "BTCUSDT"
+        packed = sorted(p.name for p in folder.glob(f"*{PACKED_SUFFIX}"))
+        raw = sorted(p.name for p in folder.glob(f"*{RAW_SUFFIX}"))
+        self.assertEqual(len(packed), 3)  # 2500 records = 1000 + 1000 + 500, the last closed by midnight
+        self.assertEqual(len(raw), 1)
+        self.assertTrue(raw[0].endswith(f".000{RAW_SUFFIX}"))
+
+        reader = TickReader(self.root)
+        everything = reader.read("BTCUSDT")
+        self.assertEqual(len(everything), 2501)
+        self.assertTrue((np.diff(everything["seq"][:2500]) == 1).all())
+        reader.blocks_read = 0
+        window = reader.read("BTCUSDT", T0 + 1000 + 1200 * 10, T0 + 1000 + 1300 * 10)
+        self.assertEqual(list(window["seq"][[0, -1]]), [1200, 1299])
+        self.assertEqual(reader.blocks_read, 1)
+        self.assertEqual(len(reader.read("BTCUSDT", T0 + DAY_MS)), 1)
+
+        # A torn trailing record (crash mid-write) is cut off when recording resumes.
+        tail = folder / raw[0]
+        with tail.open("ab") as fh:
+            fh.write(b"\x01" * 10)
+        resumed = TickRecorder(self.root, clock=self.clock, compress=False)
+        resumed.record(book("BTCUSDT", 201.0, 10000))
+        resumed.flush()
+        resumed.stop()
+        self.assertEqual(tail.stat().st_size, 2 * RECORD_DTYPE.itemsize)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,53 +3,170 @@ from __future__ import annotations
 import tkinter as tk
 from pathlib import Path
 from tkinter import messagebox, ttk
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 
-from ai.client import AiClient
-from ai.prompt_builder import build_prompt
 from core.config_service import ConfigService
 from core.logger import setup_logger
-from core.state import StateMachine
-from exchanges.binance.http_client import BinanceHttpClient
-from exchanges.binance.service import BinanceDataService
-from exchanges.pairs_loader import PairLoader
-from ui.screens.pair_select_screen import PairSelectScreen
-from ui.screens.setup_screen import SetupScreen
-from ui.screens.trade_screen import TradeScreen
+from core.startup_profile import StartupProfiler
+from core.state import AppState, StateMachine
+
+if TYPE_CHECKING:  # pragma: no cover - import-time only
+    from ai.client import AiClient
+    from core.engine import EngineThread
+    from core.screener import RollingScreener
+    from core.tick_recorder import TickRecorder
+    from exchanges.binance.ws import BookTickerStream, MarketStream
+    from exchanges.binance.http_client import BinanceHttpClient
+    from exchanges.binance.service import BinanceDataService
 
 
 class BBOTApp:
-    def __init__(self, root: tk.Tk) -> None:
+    """Root controller. Network clients are built on first use so the window paints first."""
+
+    def __init__(self, root: tk.Tk, *, profiler: StartupProfiler | None = None) -> None:
         self.root = root
+        self.profiler = profiler or StartupProfiler(enabled=False)
         self.root.title("BBOT Terminal Copilot")
         self.state = StateMachine()
         self.config_service = ConfigService()
-        self._load_config_if_exists()
-        self.logger = setup_logger(level=self.config_service.config.app.log_level)
-        self.http_client = BinanceHttpClient(logger=self.logger)
-        self.binance_service = BinanceDataService(
-            self.http_client,
-            manual_fee_free=self.config_service.config.pairs.manual_fee_free,
-            heuristic_quotes=self.config_service.config.pairs.heuristic_quote_whitelist,
-            logger=self.logger,
-        )
-        self.ai_client = AiClient(
-            self.state,
-            self.logger,
-            api_key=self.config_service.config.api_keys.openai_key,
-            model=self.config_service.config.ai.model,
-            temperature=self.config_service.config.ai.temperature,
-            timeout_seconds=self.config_service.config.ai.timeout_seconds,
-            max_retries=self.config_service.config.ai.max_retries,
-        )
+        with self.profiler.phase("load config"):
+            self._load_config_if_exists()
+        with self.profiler.phase("setup logger"):
+            log_cfg = self.config_service.config.logging
+            self.logger = setup_logger(
+                level=self.config_service.config.app.log_level,
+                json_lines=log_cfg.json_lines,
+                max_bytes=log_cfg.max_bytes,
+                backup_count=log_cfg.backup_count,
+                rotate_interval_hours=log_cfg.rotate_interval_hours,
+                flush_interval_ms=log_cfg.flush_interval_ms,
+                queue_size=log_cfg.queue_size,
+                sample_rates=log_cfg.sample_rates,
+                rate_limits=log_cfg.rate_limits,
+            )
+        self.config_service.logger = self.logger
+        self.config_service.save_delay_s = self.config_service.config.app.config_save_delay_ms / 1000
+        self.config_service.subscribe(self._on_config_changed)
+        self._http_client: BinanceHttpClient | None = None
+        self._binance_service: BinanceDataService | None = None
+        self._ai_client: AiClient | None = None
+        self.engine_thread: EngineThread | None = None
+        self.market_stream: BookTickerStream | None = None
+        self.tick_recorder: TickRecorder | None = None
+        self.recorder_stream: MarketStream | None = None
+        self.screener: RollingScreener | None = None
+        self.screener_streams: List[BookTickerStream] = []
+        self.paper_exchange = None
+        self.order_store = None
+        self.risk_engine = None
+        self.position_book = None
+        self.strategy_host = None
         self.pairs: List[Dict] = []
         self.active_screen: tk.Frame | None = None
         self.market_snapshot = None
 
         self.banner_var = tk.StringVar()
         self.status_var = tk.StringVar()
-        self._build_shell()
-        self.route_on_start()
+        with self.profiler.phase("build shell"):
+            self._build_shell()
+        with self.profiler.phase("route on start"):
+            self.route_on_start()
+        if self.profiler.enabled:
+            self.root.bind("<Map>", self._on_first_map, add="+")
+        # After the first paint: AI health probing and a status bar that follows it.
+        self.root.after(1500, self._start_ai_health)
+        self.root.after(5000, self._poll_status_bar)
+        if self.config_service.config.app.config_watch_interval_ms > 0:
+            self.root.after(self.config_service.config.app.config_watch_interval_ms, self._poll_config)
+
+    # Services (built lazily)
+    @property
+    def http_client(self) -> BinanceHttpClient:
+        if self._http_client is None:
+            from exchanges.binance.http_client import BinanceHttpClient, WeightBudget
+
+            # One request-weight budget for everything in this process (all pair bots included).
+            self._http_client = BinanceHttpClient(budget=WeightBudget(), logger=self.logger)
+        return self._http_client
+
+    @property
+    def binance_service(self) -> BinanceDataService:
+        if self._binance_service is None:
+            from exchanges.binance.service import BinanceDataService
+
+            cfg = self.config_service.config
+            self._binance_service = BinanceDataService(
+                self.http_client,
+                manual_fee_free=cfg.pairs.manual_fee_free,
+                heuristic_quotes=cfg.pairs.heuristic_quote_whitelist,
+                logger=self.logger,
+            )
+        return self._binance_service
+
+    @property
+    def ai_client(self) -> AiClient:
+        if self._ai_client is None:
+            from ai.client import AiClient
+
+            cfg = self.config_service.config
+            self._ai_client = AiClient(
+                self.state,
+                self.logger,
+                api_key=cfg.api_keys.openai_key,
+                base_url=cfg.ai.base_url,
+                model=cfg.ai.model,
+                temperature=cfg.ai.temperature,
+                timeout_seconds=cfg.ai.timeout_seconds,
+                max_retries=cfg.ai.max_retries,
+                max_concurrency=cfg.ai.max_concurrency,
+                deadline_seconds=cfg.ai.deadline_seconds,
+                health_interval_seconds=cfg.ai.health_interval_seconds,
+                breaker_failure_threshold=cfg.ai.breaker_failure_threshold,
+                breaker_reset_seconds=cfg.ai.breaker_reset_seconds,
+                cache=self._build_ai_cache(),
+            )
+        return self._ai_client
+
+    def _build_ai_cache(self):
+        cfg = self.config_service.config
+        if not cfg.ai.cache_enabled:
+            return None
+        from ai.cache import AiResponseCache
+        from ai.client import AiChatResult
+
+        return AiResponseCache(
+            max_entries=cfg.ai.cache_max_entries,
+            ttl_seconds=cfg.ai.cache_ttl_seconds,
+            validate=lambda payload: AiChatResult(**payload).model_dump(),
+            logger=self.logger,
+        )
+
+    def _start_ai_health(self) -> None:
+        if self.config_service.config.api_keys.openai_key:
+            self.ai_client.health.start()
+
+    def _poll_status_bar(self) -> None:
+        if self.risk_engine is not None and self.risk_engine.tripped and self.engine_thread is not None:
+            self.logger.error("Kill switch tripped (%s): stopping the paper engine", self.risk_engine.tripped)
+            self.stop_engine()
+        self.refresh_status_bar()
+        self.root.after(5000, self._poll_status_bar)
+
+    def _poll_config(self) -> None:
+        # Edits to config.yaml made outside the app; subscribers run here, on the Tk thread.
+        self.config_service.poll()
+        self.root.after(self.config_service.config.app.config_watch_interval_ms or 1000, self._poll_config)
+
+    def _on_first_map(self, event) -> None:
+        if event.widget is not self.root or self.profiler.finished:
+            return
+        self.profiler.mark("window mapped")
+        self.root.after_idle(self._finish_profile)
+
+    def _finish_profile(self) -> None:
+        report = self.profiler.finish()
+        if report:
+            self.logger.info("Startup profile written to %s", report)
 
     def _load_config_if_exists(self) -> None:
         try:
@@ -92,17 +209,24 @@ class BBOTApp:
             self.show_pair_select()
 
     def show_setup(self) -> None:
+        from ui.screens.setup_screen import SetupScreen
+
         screen = SetupScreen(self.content_frame, app=self)
         self._set_screen(screen)
         self.banner_var.set("Setup: add Binance and OpenAI keys")
 
     def show_pair_select(self) -> None:
+        from ui.screens.pair_select_screen import PairSelectScreen
+
         screen = PairSelectScreen(self.content_frame, app=self)
         self._set_screen(screen)
         self.banner_var.set("Select a pair from Binance")
-        screen.load_pairs()
+        # Let the window paint before the blocking REST fetch.
+        self.root.after_idle(screen.load_pairs)
 
     def show_trade(self, symbol: str) -> None:
+        from ui.screens.trade_screen import TradeScreen
+
         self.config_service.config.app.active_pair = symbol
         screen = TradeScreen(self.content_frame, app=self, symbol=symbol)
         self._set_screen(screen)
@@ -111,13 +235,12 @@ class BBOTApp:
 
     # Callbacks for screens
     def save_keys(self, binance_key: str, binance_secret: str, openai_key: str, testnet: bool) -> None:
-        cfg = self.config_service.config
-        cfg.api_keys.exchange_key = binance_key
-        cfg.api_keys.exchange_secret = binance_secret
-        cfg.api_keys.openai_key = openai_key
-        cfg.app.testnet = testnet
-        self.config_service.save()
-        self._rebuild_services()
+        service = self.config_service
+        service.update(
+            "api_keys", {"exchange_key": binance_key, "exchange_secret": binance_secret, "openai_key": openai_key}
+        )
+        service.update("app", {"testnet": testnet})
+        service.schedule_save()
         self.banner_var.set("Saved keys locally. Ready to continue.")
         self.show_pair_select()
 
@@ -138,6 +261,8 @@ class BBOTApp:
         return ok
 
     def fetch_pairs(self) -> List[Dict]:
+        from exchanges.pairs_loader import PairLoader
+
         loader = PairLoader(self.binance_service, logger=self.logger)
         pairs = loader.load()
         overview = self.binance_service.market_overview()
@@ -155,6 +280,7 @@ class BBOTApp:
                 }
             )
         self.pairs = merged
+        self.start_screener()
         self.refresh_status_bar()
         return merged
 
@@ -174,56 +300,436 @@ class BBOTApp:
             return None
 
     def apply_settings(self, settings: Dict[str, float | int]) -> None:
-        cfg = self.config_service.config
-        cfg.trading = cfg.trading.copy(update=settings)
-        self.config_service.save()
+        self.config_service.update("trading", settings)
+        self.config_service.schedule_save()
         self.refresh_status_bar()
 
+    def _paper_stack(self, symbols: List[str]) -> Dict:
+        """Order store, paper exchange, risk engine, position book and guarded execution for ``symbols``."""
+
+        from core.execution_engine import ExecutionEngine
+        from core.order_store import JournalingExecutor, OrderStore
+        from core.policy_guard import AllowedSymbols, MaxOrderNotional, PolicyGuard
+        from core.position_book import PositionBook
+        from exchanges.paper import PaperExchange
+        from risk.engine import RiskEngine, RiskLimits
+        from risk.rules import RiskLimitRule
+
+        self.stop_engine()
+        cfg = self.config_service.config
+        pairs = [self.pair_info(symbol) for symbol in symbols]
+        budget = cfg.trading.budget_usdt * len(pairs)
+        store = OrderStore(Path("data") / "orders" / "paper", logger=self.logger)
+        store.recover()
+        for order in store.open_orders():
+            # The simulated book of a previous run is gone; its open orders cannot fill anymore.
+            store.expire(order.client_order_id, "paper session ended")
+        balances: Dict[str, float] = {}
+        for pair in pairs:
+            balances[pair.quote] = balances.get(pair.quote, 0.0) + cfg.trading.budget_usdt
+        paper = PaperExchange(balances=balances, logger=self.logger)
+        risk = RiskEngine(
+            RiskLimits.from_settings(cfg.risk), starting_equity=budget, on_trip=self._on_risk_trip, logger=self.logger
+        )
+        for pair in pairs:
+            paper.add_pair(pair)
+            risk.add_pair(pair)
+        positions = PositionBook(symbols)
+        rules = [AllowedSymbols(symbols), MaxOrderNotional(cfg.trading.budget_usdt), RiskLimitRule(risk)]
+        observers = [risk.on_market, positions.on_market, paper.on_market]
+        if cfg.strategies.enabled:
+            from strategies.host import build_host
+
+            self.strategy_host = build_host(cfg.strategies, on_signals=self._on_strategy_signals, logger=self.logger)
+            observers.append(self.strategy_host.on_market)
+        self.paper_exchange = paper
+        self.order_store = store
+        self.risk_engine = risk
+        self.position_book = positions
+        return {
+            "pairs": pairs,
+            "paper": paper,
+            "store": store,
+            "risk": risk,
+            "positions": positions,
+            "execution": ExecutionEngine(policy_guard=PolicyGuard(rules=rules), executor=JournalingExecutor(store, paper)),
+            # Risk marks first, so a tick that crosses a limit trips the switch before it is traded.
+            "market_observers": observers,
+        }
+
+    def _on_risk_trip(self, reason: str) -> None:
+        # Runs on the engine thread, mid-update: pull every resting buy now; the Tk side stops the engine.
+        if self.engine_thread is not None:
+            self.engine_thread.engine.halt(f"kill switch: {reason}")
+
+    def _on_strategy_signals(self, name: str, signals, symbols: List[str]) -> None:
+        # Signal-only for now: strategies advise, the grid engine trades.
+        for signal in signals:
+            self.logger.info("Strategy %s: %s %s @ %s", name, signal.side_name, symbols[signal.symbol_id], signal.price)
+
+    def _run_paper(self, engine, stack: Dict, stream_cls, target) -> None:
+        """Route paper fills to the books and ``engine``, host it on a thread, feed it from ``stream_cls``."""
+
+        from core.engine import EngineThread
+        from core.events import FillEvent, MarketEvent
+
+        cfg = self.config_service.config
+        store, risk, positions = stack["store"], stack["risk"], stack["positions"]
+
+        def on_paper_event(event) -> None:
+            if isinstance(event, FillEvent):
+                store.apply_fill(event)
+                risk.on_fill(event)
+                positions.on_fill(event)
+                engine.submit_execution(event)
+
+        stack["paper"].on_event = on_paper_event
+        engine_thread = self.engine_thread = EngineThread(engine)
+        engine_thread.start()
+        self.market_stream = stream_cls(
+            target,
+            on_message=lambda message: engine_thread.publish(MarketEvent.from_book_ticker(message)),
+            api_key=cfg.api_keys.exchange_key,
+            api_secret=cfg.api_keys.exchange_secret,
+            logger=self.logger,
+        )
+        self.market_stream.start()
+        self._start_recorder([target] if isinstance(target, str) else target)
+        self.state.set_state(AppState.RUNNING)
+
+    def _start_recorder(self, symbols: List[str]) -> None:
+        """Record the traded pairs (plus ``recorder.symbols``) on a connection of its own."""
+
+        cfg = self.config_service.config
+        if not cfg.recorder.enabled:
+            return
+        from core.tick_recorder import TickRecorder
+        from exchanges.binance.ws import MarketStream
+
+        rec = cfg.recorder
+        self.tick_recorder = TickRecorder(
+            flush_interval_ms=rec.flush_interval_ms,
+            queue_size=rec.queue_size,
+            max_segment_bytes=rec.max_segment_mb * 1024 * 1024,
+            block_records=rec.block_records,
+            compress=rec.compress,
+            logger=self.logger,
+        ).start()
+        self.recorder_stream = MarketStream(
+            [*symbols, *rec.symbols],
+            kinds=rec.streams,
+            on_message=self.tick_recorder.record,
+            api_key=cfg.api_keys.exchange_key,
+            api_secret=cfg.api_keys.exchange_secret,
+            logger=self.logger,
+        )
+        self.recorder_stream.start()
+        self.logger.info("Recording %s for %s symbols", ", ".join(rec.streams), len(self.recorder_stream.symbols))
+
+    def start_screener(self) -> None:
+        """Rolling metrics for the whole market, fed by the all-market ticker (and bookTicker) streams."""
+
+        cfg = self.config_service.config.screener
+        if not cfg.enabled or self.screener is not None:
+            return
+        from core.screener import RollingScreener
+        from exchanges.binance.ws import AllMarketTickerStream, MarketStream
+
+        keys = self.config_service.config.api_keys
+        self.screener = RollingScreener(window_seconds=cfg.window_seconds, bucket_seconds=cfg.bucket_seconds, logger=self.logger)
+        common = dict(
+            on_message=self.screener.on_message,
+            api_key=keys.exchange_key,
+            api_secret=keys.exchange_secret,
+            logger=self.logger,
+        )
+        self.screener_streams = [AllMarketTickerStream(**common)]
+        if cfg.book_tickers:
+            trading = [pair["symbol"] for pair in self.pairs if pair.get("status") == "TRADING"]
+            self.screener_streams.append(MarketStream(trading, kinds=("bookTicker",), **common))
+        for stream in self.screener_streams:
+            stream.start()
+        self.logger.info("Screener started (%ss window)", cfg.window_seconds)
+
+    def stop_screener(self) -> None:
+        for stream in self.screener_streams:
+            stream.stop()
+        self.screener_streams = []
+        if self.screener is not None:
+            self.logger.info("Screener stopped: %s", self.screener.stats())
+            self.screener = None
+
+    def screener_metrics(self, symbols: List[str]) -> Dict[str, Dict]:
+        return self.screener.snapshot(symbols) if self.screener is not None else {}
+
+    def screener_top(self, metric: str, k: int, *, ascending: bool, symbols: List[str]) -> List[tuple]:
+        if self.screener is None:
+            return []
+        return self.screener.top(metric, k, ascending=ascending, symbols=symbols)
+
+    def _stop_recorder(self) -> None:
+        if self.recorder_stream is not None:
+            self.recorder_stream.stop()
+            self.recorder_stream = None
+        if self.tick_recorder is not None:
+            self.tick_recorder.stop()
+            self.logger.info("Tick recorder stopped: %s", self.tick_recorder.stats())
+            self.tick_recorder = None
+
+    def start_paper_engine(self, symbol: str, *, on_report=None) -> None:
+        """Run the trading engine for ``symbol`` fed by the bookTicker stream, filled by the paper exchange."""
+
+        from core.decision_engine import DecisionEngine
+        from core.engine import TradingEngine
+        from exchanges.binance.ws import BookTickerStream
+
+        stack = self._paper_stack([symbol])
+        risk = stack["risk"]
+
+        def on_engine_report(report) -> None:
+            risk.on_report(report)
+            if on_report:
+                on_report(report)
+
+        engine = TradingEngine(
+            DecisionEngine(filters={pair.symbol: pair.filters for pair in stack["pairs"]}),
+            stack["execution"],
+            settings=lambda _symbol: self.config_service.config.trading.model_dump(),
+            market_observers=stack["market_observers"],
+            on_report=on_engine_report,
+            logger=self.logger,
+        )
+        self._run_paper(engine, stack, BookTickerStream, symbol)
+        self.logger.info("Paper engine started for %s", symbol)
+
+    def start_paper_bots(self, symbols: List[str], *, on_report=None) -> None:
+        """Run one grid bot per symbol in a shared :class:`Orchestrator` over one multiplexed stream.
+
+        Every bot trades the current ``trading`` settings with its own ``budget_usdt``.
+        """
+
+        from core.decision_engine import DecisionEngine
+        from core.orchestrator import Orchestrator
+        from exchanges.binance.ws import MultiBookTickerStream
+
+        stack = self._paper_stack(symbols)
+        risk = stack["risk"]
+
+        def on_engine_report(report) -> None:
+            risk.on_report(report)
+            if on_report:
+                on_report(report)
+
+        orchestrator = Orchestrator(
+            DecisionEngine(filters={pair.symbol: pair.filters for pair in stack["pairs"]}),
+            stack["execution"],
+            market_observers=stack["market_observers"],
+            on_report=on_engine_report,
+            logger=self.logger,
+        )
+        for symbol in symbols:
+            orchestrator.add_bot(symbol, lambda _symbol: self.config_service.config.trading.model_dump())
+        self._run_paper(orchestrator, stack, MultiBookTickerStream, symbols)
+        self.logger.info("Paper bots started for %s pairs: %s", len(symbols), ", ".join(symbols))
+
+    def pair_info(self, symbol: str):
+        """``PairInfo`` for a loaded pair row (filters and fee flag), with empty filters if unknown."""
+
+        from exchanges.binance.models import FeeFreeFlag, PairFilters, PairInfo
+
+        row = next((p for p in self.pairs if p.get("symbol") == symbol), {})
+        return PairInfo(
+            symbol=symbol,
+            base=row.get("base", ""),
+            quote=row.get("quote", "USDT"),
+            status=row.get("status", ""),
+            filters=PairFilters(
+                tick_size=row.get("tick_size"),
+                step_size=row.get("step_size"),
+                min_notional=row.get("min_notional"),
+            ),
+            fee=FeeFreeFlag(bool(row.get("fee_free")), row.get("fee_method", "STANDARD")),
+        )
+
+    def stop_engine(self) -> None:
+        if self.market_stream:
+            self.market_stream.stop()
+            self.market_stream = None
+        self._stop_recorder()
+        if self.engine_thread:
+            engine = self.engine_thread.engine
+            self.engine_thread.stop()
+            self.engine_thread = None
+            self.logger.info("Paper engine stopped: %s", engine.stats())
+            self.logger.info("Engine latency: %s", engine.latency_report())
+        if self.strategy_host is not None:
+            self.strategy_host.flush()
+            self.logger.info("Strategy timing: %s", self.strategy_host.stats())
+            self.strategy_host = None
+        if self.risk_engine:
+            self.logger.info("Risk at stop: %s", self.risk_engine.snapshot())
+            self.risk_engine = None
+        if self.position_book is not None:
+            # Kept after stop so the PnL panel still shows the session's final state.
+            self.position_book.save(Path("data") / "positions" / "paper.npz")
+        if self.order_store:
+            self.order_store.close()
+            self.order_store = None
+        if self.state.is_running():
+            self.state.set_state(AppState.STOPPED)
+
+    def run_sweep(self, symbol: str, named: Dict[str, Dict]) -> List[tuple]:
+        """Backtest ``named`` settings and the best sweep candidates around ``named["Current"]``.
+
+        Blocking (REST history fetch plus a process-pool sweep): call it from a worker thread.
+        Returns ``(label, settings, summary)`` rows, named ones first.
+        """
+
+        from strategies.grid_backtest import GridBacktester, Klines
+        from strategies.sweep import DEFAULT_SPACE, ParameterSweep, SweepSpace, default_results_path
+
+        cfg = self.config_service.config.backtest
+        pair = self.pair_info(symbol)
+        rows = self.binance_service.fetch_klines(symbol, interval=cfg.interval, days=cfg.days)
+        klines = Klines.from_rows(rows)
+        tester = GridBacktester(klines, filters=pair.filters, fee_free=pair.fee.fee_free)
+        table = [(label, settings, tester.run(settings).summary()) for label, settings in named.items()]
+        space = SweepSpace(DEFAULT_SPACE, base=dict(named.get("Current", {})))
+        report = ParameterSweep(
+            klines,
+            filters=pair.filters,
+            fee_free=pair.fee.fee_free,
+            workers=cfg.workers,
+            screen_fraction=cfg.screen_fraction,
+            drawdown_weight=cfg.drawdown_weight,
+            results_path=default_results_path(symbol),
+            logger=self.logger,
+        ).run(space.sample(cfg.samples))
+        table += [(f"#{rank}", c.settings, c.summary) for rank, c in enumerate(report.top(cfg.top_n), 1)]
+        return table
+
+    def _ai_request(self, user_message: str) -> tuple:
+        """System prompt for the current market, plus the response-cache key for ``user_message``."""
+
+        from ai.cache import cache_key, market_buckets
+        from ai.prompt_builder import assemble_prompt
+
+        cfg = self.config_service.config
+        prompt = assemble_prompt(
+            config=cfg, snapshot=self.market_snapshot, filters=None, constraints={"mode": "Paper trading only"}
+        )
+        self.logger.info("AI prompt: %s", prompt.report())
+        # The live market enters the key only through its buckets, so small moves still hit.
+        key = cache_key(
+            prompt.text_without("market"),
+            user_message,
+            market_buckets(self.market_snapshot, cfg.ai.cache_price_tolerance_pct),
+            model=cfg.ai.model,
+            temperature=cfg.ai.temperature,
+        )
+        return prompt.text, key
+
     def run_ai(self, user_message: str) -> Dict:
-        prompt = build_prompt(
-            config=self.config_service.config,
-            snapshot=self.market_snapshot,
-            filters=None,
-            constraints={"mode": "Paper trading only"},
+        """Answer for the trade chat; a newer chat message cancels this one (``AiRequestCancelled``)."""
+
+        prompt, key = self._ai_request(user_message)
+        return self.ai_client.run_chat(prompt, user_message, cache_key=key, channel="chat")
+
+    def stream_ai(self, user_message: str, *, on_text=None, on_settings=None) -> Dict:
+        """Streaming :meth:`run_ai`; blocking, so call it from a worker thread."""
+
+        prompt, key = self._ai_request(user_message)
+        return self.ai_client.stream_chat(
+            prompt, user_message, on_text=on_text, on_settings=on_settings, cache_key=key, channel="chat"
+        )
+
+    def screen_pairs(self, pairs: List[Dict]):
+        """AI-rank the top ``ai.screening_top_n`` of ``pairs``; blocking, so call it from a worker thread."""
+
+        from ai.screening import PairScreener
+
+        cfg = self.config_service.config
+        screener = PairScreener(
+            self.ai_client,
+            cfg,
+            pairs_per_request=cfg.ai.screening_pairs_per_request,
+            requests_per_minute=cfg.ai.screening_requests_per_minute,
+            logger=self.logger,
         )
-        return self.ai_client.run_chat(prompt, user_message)
+        return screener.run(pairs, top_n=cfg.ai.screening_top_n)
 
     # Utilities
     def refresh_status_bar(self) -> None:
         cfg = self.config_service.config
-        binance_status = "Connected" if self.http_client.last_latency_ms else "Error" if self.banner_var.get().startswith("Binance") else "Idle"
-        openai_status = "Ready" if self.ai_client.can_run_live() else "Not configured"
+        last_latency_ms = self._http_client.last_latency_ms if self._http_client else None
+        binance_status = "Connected" if last_latency_ms else "Error" if self.banner_var.get().startswith("Binance") else "Idle"
+        if not cfg.api_keys.openai_key:
+            openai_status = "Not configured"
+        elif self._ai_client is None:
+            openai_status = "Ready"
+        else:
+            # Cached by the background monitor; never a network call from here.
+            openai_status = self._ai_client.health.status_text()
         active_pair = cfg.app.active_pair or "-"
         state = self.state.state
-        latency = f"{self.http_client.last_latency_ms:.0f}ms" if self.http_client.last_latency_ms else "-"
+        latency = f"{last_latency_ms:.0f}ms" if last_latency_ms else "-"
         self.status_var.set(
             f"Binance: {binance_status} ({latency})  |  OpenAI: {openai_status}  |  Pair: {active_pair}  |  State: {state}"
         )
 
-    def _rebuild_services(self) -> None:
-        cfg = self.config_service.config
-        self.http_client = BinanceHttpClient(logger=self.logger)
-        self.binance_service = BinanceDataService(
-            self.http_client,
-            manual_fee_free=cfg.pairs.manual_fee_free,
-            heuristic_quotes=cfg.pairs.heuristic_quote_whitelist,
-            logger=self.logger,
-        )
-        self.ai_client = AiClient(
-            self.state,
-            self.logger,
-            api_key=cfg.api_keys.openai_key,
-            model=cfg.ai.model,
-            temperature=cfg.ai.temperature,
-            timeout_seconds=cfg.ai.timeout_seconds,
-            max_retries=cfg.ai.max_retries,
-        )
+    def _on_config_changed(self, changes: Dict[str, set], old, new) -> None:
+        """Rebuild only what the changed fields feed; warm caches and pooled sessions survive.
+
+        The HTTP client uses no config (public endpoints, one weight budget), so it is never
+        rebuilt. Trading, risk, strategy and backtest settings are read on every use.
+        """
+
+        if "pairs" in changes and self._binance_service is not None:
+            self._binance_service.set_fee_rules(new.pairs.manual_fee_free, new.pairs.heuristic_quote_whitelist)
+        ai_fields = set(changes.get("ai", ()))
+        if "openai_key" in changes.get("api_keys", ()):
+            ai_fields.add("api_key")
+        if ai_fields and self._ai_client is not None:
+            self._reconfigure_ai(ai_fields, new)
+        if ai_fields:
+            self._start_ai_health()
+        if "log_level" in changes.get("app", ()):
+            self.logger.setLevel(new.app.log_level)
+        if "screener" in changes and (self.screener is not None or self.pairs):
+            self.stop_screener()
+            self.start_screener()
+        restart = {"logging", "ui"} & changes.keys()
+        if restart:
+            self.logger.info("Config sections %s changed; they apply after a restart", sorted(restart))
+        self.refresh_status_bar()
+
+    def _reconfigure_ai(self, fields: set, cfg) -> None:
+        from ai.client import AiClient
+
+        client = self._ai_client
+        if "max_concurrency" in fields:
+            client.close()
+            self._ai_client = None
+        else:
+            if fields & {"cache_enabled", "cache_ttl_seconds", "cache_max_entries"}:
+                client.cache = self._build_ai_cache()
+            values = {"api_key": cfg.api_keys.openai_key, **cfg.ai.model_dump()}
+            client.reconfigure(**{name: values[name] for name in fields & AiClient.RECONFIGURABLE})
 
 
-def run() -> None:
-    root = tk.Tk()
-    app = BBOTApp(root)
+def run(profiler: StartupProfiler | None = None) -> None:
+    profiler = profiler or StartupProfiler(enabled=False)
+    with profiler.phase("create Tk root"):
+        root = tk.Tk()
+    with profiler.phase("construct app"):
+        app = BBOTApp(root, profiler=profiler)
     root.mainloop()
+    # Engine first: it flushes the order journal, positions and the recorder it fed.
+    app.stop_engine()
+    app.stop_screener()
+    if app._ai_client is not None:
+        app._ai_client.close()
+    app.config_service.flush()
 
 
 if __name__ == "__main__":
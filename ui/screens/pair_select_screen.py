@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import threading
 import tkinter as tk
-from tkinter import ttk
+from tkinter import messagebox, ttk
 from typing import Dict, List
 
-from core.formatting import format_price, format_spread, format_volume
+from core.formatting import format_metric, format_price, format_spread, format_volume
+
+# Screener columns: column id (= RollingScreener metric) -> heading, format.
+METRIC_COLUMNS = {
+    "spread_bps": ("Spread bp", lambda v: format_metric(v, 2)),
+    "volatility_bps": ("Vol bp", lambda v: format_metric(v, 1)),
+    "volume_trend_pct": ("Vol trend", lambda v: format_metric(v, 0, "%", signed=True)),
+    "trades_per_min": ("Trades/min", lambda v: format_metric(v, 0)),
+}
 
 
 class PairSelectScreen(ttk.Frame):
@@ -13,8 +22,10 @@ class PairSelectScreen(ttk.Frame):
         self.app = app
         self.pairs: List[Dict] = []
         self.filtered: List[Dict] = []
+        self.visible: List[Dict] = []
         self.sort_column = "symbol"
         self.sort_desc = False
+        self._metrics_polling = False
         self._build()
 
     def _build(self) -> None:
@@ -52,12 +63,18 @@ class PairSelectScreen(ttk.Frame):
             side="left", padx=(10, 0)
         )
 
-        columns = ("symbol", "last", "spread", "volume", "status", "fee_free", "fee_method")
+        ttk.Label(filters, text="Top").pack(side="left", padx=(10, 2))
+        self.top_var = tk.StringVar(value="0")
+        self.top_var.trace_add("write", lambda *_: self._render_rows())
+        ttk.Spinbox(filters, from_=0, to=5000, increment=10, textvariable=self.top_var, width=6).pack(side="left")
+
+        columns = ("symbol", "last", "spread", *METRIC_COLUMNS, "volume", "status", "fee_free", "fee_method")
         self.tree = ttk.Treeview(self, columns=columns, show="headings")
         headings = {
             "symbol": "Symbol",
             "last": "Last",
             "spread": "Spread",
+            **{col: label for col, (label, _) in METRIC_COLUMNS.items()},
             "volume": "24h Vol",
             "status": "Status",
             "fee_free": "FeeFree",
@@ -65,7 +82,7 @@ class PairSelectScreen(ttk.Frame):
         }
         for col, label in headings.items():
             self.tree.heading(col, text=label, command=lambda c=col: self._sort_by(c))
-            self.tree.column(col, width=120, anchor="center")
+            self.tree.column(col, width=90 if col in METRIC_COLUMNS else 120, anchor="center")
         self.tree.pack(fill="both", expand=True, padx=12, pady=8)
         self.tree.bind("<<TreeviewSelect>>", lambda *_: self._update_action_state())
         self.tree.bind("<Double-1>", lambda *_: self._on_select())
@@ -74,6 +91,12 @@ class PairSelectScreen(ttk.Frame):
         action.pack(fill="x", padx=12, pady=6)
         self.select_btn = ttk.Button(action, text="Select Pair", command=self._on_select, state="disabled")
         self.select_btn.pack(side="right")
+        self.bots_btn = ttk.Button(action, text="Run selected (paper)", command=self._on_run_bots, state="disabled")
+        self.bots_btn.pack(side="right", padx=(0, 6))
+        self.stop_bots_btn = ttk.Button(action, text="Stop bots", command=self._on_stop_bots, state="disabled")
+        self.stop_bots_btn.pack(side="right", padx=(0, 6))
+        self.screen_btn = ttk.Button(action, text="AI screen top N", command=self._on_screen)
+        self.screen_btn.pack(side="right", padx=(0, 6))
         self.status = tk.StringVar()
         ttk.Label(action, textvariable=self.status).pack(side="left")
 
@@ -84,6 +107,25 @@ class PairSelectScreen(ttk.Frame):
             self._apply_filters()
         except Exception as exc:  # noqa: BLE001
             self.status.set(f"Binance error: {exc}")
+            return
+        if self.app.screener is not None and not self._metrics_polling:
+            self._metrics_polling = True
+            self.after(self.app.config_service.config.screener.refresh_ms, self._poll_metrics)
+
+    def _poll_metrics(self) -> None:
+        if not self.winfo_exists() or self.app.screener is None:
+            self._metrics_polling = False
+            return
+        metrics = self.app.screener_metrics([pair["symbol"] for pair in self.pairs])
+        for pair in self.pairs:
+            pair.update(metrics.get(pair["symbol"], {}))
+        if self.sort_column in METRIC_COLUMNS:
+            self._render_rows()
+        else:
+            # Order does not depend on the metrics: refresh the cells in place.
+            for pair in self.visible:
+                self.tree.item(pair["symbol"], values=self._row_values(pair))
+        self.after(self.app.config_service.config.screener.refresh_ms, self._poll_metrics)
 
     def _apply_filters(self) -> None:
         term = self.search_var.get().lower()
@@ -103,28 +145,58 @@ class PairSelectScreen(ttk.Frame):
             self.filtered.append(pair)
         self._render_rows()
 
+    def _top_k(self) -> int:
+        try:
+            return max(0, int(self.top_var.get()))
+        except ValueError:
+            return 0
+
+    def _ordered(self) -> List[Dict]:
+        column, top_k = self.sort_column, self._top_k()
+        if column in METRIC_COLUMNS:
+            if top_k and self.app.screener is not None:
+                # Top-K straight from the screener's heaps instead of sorting the whole market.
+                by_symbol = {pair["symbol"]: pair for pair in self.filtered}
+                ranked = self.app.screener_top(column, top_k, ascending=not self.sort_desc, symbols=list(by_symbol))
+                return [by_symbol[symbol] for symbol, _ in ranked]
+            # Symbols without data yet go last in either direction.
+            known = [pair for pair in self.filtered if pair.get(column) is not None]
+            unknown = [pair for pair in self.filtered if pair.get(column) is None]
+            ordered = sorted(known, key=lambda p: p[column], reverse=self.sort_desc) + unknown
+        else:
+            ordered = sorted(
+                self.filtered,
+                key=lambda p: self._sort_key(p, column),
+                reverse=self.sort_desc,
+            )
+        return ordered[:top_k] if top_k else ordered
+
+    def _row_values(self, pair: Dict) -> tuple:
+        return (
+            pair.get("symbol"),
+            format_price(pair.get("last"), pair.get("tick_size")),
+            format_spread(pair.get("spread")),
+            *(fmt(pair.get(col)) for col, (_, fmt) in METRIC_COLUMNS.items()),
+            format_volume(pair.get("volume")),
+            pair.get("status", "-"),
+            pair.get("fee_free") or "-",
+            pair.get("fee_method", "N/A"),
+        )
+
     def _render_rows(self) -> None:
+        # Also redrawn on metric refreshes while sorted by a metric: keep selection and scroll.
+        selected = [self.tree.item(item, "values")[0] for item in self.tree.selection()]
+        scroll = self.tree.yview()[0]
         for item in self.tree.get_children():
             self.tree.delete(item)
-        sorted_pairs = sorted(
-            self.filtered,
-            key=lambda p: self._sort_key(p, self.sort_column),
-            reverse=self.sort_desc,
-        )
+        sorted_pairs = self._ordered()
+        self.visible = sorted_pairs
         for pair in sorted_pairs:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    pair.get("symbol"),
-                    format_price(pair.get("last"), pair.get("tick_size")),
-                    format_spread(pair.get("spread")),
-                    format_volume(pair.get("volume")),
-                    pair.get("status", "-"),
-                    pair.get("fee_free") or "-",
-                    pair.get("fee_method", "N/A"),
-                ),
-            )
+            self.tree.insert("", "end", iid=pair.get("symbol"), values=self._row_values(pair))
+        keep = [symbol for symbol in selected if self.tree.exists(symbol)]
+        if keep:
+            self.tree.selection_set(keep)
+        self.tree.yview_moveto(scroll)
         self._update_action_state()
 
     def _sort_key(self, pair: Dict, column: str):
@@ -150,6 +222,7 @@ class PairSelectScreen(ttk.Frame):
     def _update_action_state(self) -> None:
         state = "normal" if self.tree.selection() else "disabled"
         self.select_btn.config(state=state)
+        self.bots_btn.config(state=state)
 
     def _on_select(self) -> None:
         selection = self.tree.selection()
@@ -160,3 +233,113 @@ class PairSelectScreen(ttk.Frame):
         symbol = values[0]
         self.app.select_pair(symbol)
 
+    def _on_run_bots(self) -> None:
+        symbols = [self.tree.item(item, "values")[0] for item in self.tree.selection()]
+        if not symbols:
+            self.status.set("Select one or more pairs first")
+            return
+        try:
+            self.app.start_paper_bots(symbols)
+        except Exception as exc:  # noqa: BLE001
+            self.status.set(f"Failed to start bots: {exc}")
+            return
+        self.stop_bots_btn.config(state="normal")
+        self.after(2000, self._poll_bots)
+
+    def _on_stop_bots(self) -> None:
+        self.app.stop_engine()
+        self.stop_bots_btn.config(state="disabled")
+        self.status.set("Bots stopped")
+
+    def _poll_bots(self) -> None:
+        engine_thread = self.app.engine_thread
+        if engine_thread is None or not self.winfo_exists():
+            return
+        stats = engine_thread.call(lambda: engine_thread.engine.stats())
+        capacity = stats.get("capacity_estimate")
+        self.status.set(
+            f"Bots running: {stats.get('running', 0)}/{stats.get('bots', 0)}  |  "
+            f"CPU {stats.get('cpu_pct', 0):.1f}%  |  decisions/s {stats.get('decisions_per_s', 0):.1f}  |  "
+            f"capacity ~{capacity if capacity is not None else '-'} bots"
+        )
+        self.after(2000, self._poll_bots)
+
+    def _on_screen(self) -> None:
+        if not self.app.ai_client.can_run_live():
+            messagebox.showinfo("AI", "OpenAI key not configured")
+            return
+        if not self.visible:
+            self.status.set("Load pairs first")
+            return
+        pairs = list(self.visible)
+        top_n = self.app.config_service.config.ai.screening_top_n
+        self.screen_btn.config(state="disabled")
+        self.status.set(f"AI screening top {min(top_n, len(pairs))} pairs...")
+        outcome: list = []
+
+        def job() -> None:
+            try:
+                outcome.append(("ok", self.app.screen_pairs(pairs)))
+            except Exception as exc:  # noqa: BLE001
+                outcome.append(("error", exc))
+
+        threading.Thread(target=job, name="bbot-ai-screening", daemon=True).start()
+        self.after(100, self._poll_screen, outcome)
+
+    def _poll_screen(self, outcome: list) -> None:
+        if not self.winfo_exists():
+            return
+        if not outcome:
+            self.after(100, self._poll_screen, outcome)
+            return
+        self.screen_btn.config(state="normal")
+        status, report = outcome[0]
+        if status == "error":
+            self.status.set(f"AI screening failed: {report}")
+            return
+        summary = report.summary()
+        self.status.set(
+            f"AI ranked {summary['ranked']} pairs in {summary['requests']} requests ({summary['elapsed_s']:.1f}s)"
+            + (f", {summary['failed_batches']} batches failed" if summary["failed_batches"] else "")
+        )
+        self._show_screening(report)
+
+    def _show_screening(self, report) -> None:
+        window = tk.Toplevel(self)
+        window.title("AI screening")
+        columns = ("rank", "symbol", "score", "grid_step_pct", "take_profit_pct", "stop_loss_pct", "budget_usdt", "reason")
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=min(20, max(5, len(report.rows))))
+        for col in columns:
+            tree.heading(col, text=col.replace("_", " ").title())
+            tree.column(col, width=320 if col == "reason" else 90, anchor="w" if col == "reason" else "center")
+        rows = {}
+        for rank, row in enumerate(report.rows, 1):
+            item = tree.insert(
+                "",
+                "end",
+                values=(
+                    rank,
+                    row.symbol,
+                    f"{row.score:.0f}",
+                    row.settings["grid_step_pct"],
+                    row.settings["take_profit_pct"],
+                    row.settings["stop_loss_pct"],
+                    row.settings["budget_usdt"],
+                    row.reason,
+                ),
+            )
+            rows[item] = row
+        tree.pack(fill="both", expand=True, padx=8, pady=8)
+        if report.missing or report.failed:
+            skipped = report.missing + [symbol for symbols, _ in report.failed for symbol in symbols]
+            ttk.Label(window, text=f"Not ranked: {', '.join(skipped)}").pack(anchor="w", padx=8)
+
+        def apply_selected() -> None:
+            selection = tree.selection()
+            if not selection:
+                return
+            row = rows[selection[0]]
+            self.app.apply_settings(row.settings)
+            self.app.select_pair(row.symbol)
+
+        ttk.Button(window, text="Apply settings & open pair", command=apply_selected).pack(anchor="e", padx=8, pady=(0, 8))
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
 from typing import Dict
 
+import numpy as np
+
+from ai.async_client import AiRequestCancelled
 from ai.client import TradeSettingsSchema
 from core.formatting import format_price, format_spread, format_volume
 from core.state import AppState
+from ui.widgets.log_view import BufferedLogView
 
 
 class TradeScreen(ttk.Frame):
@@ -20,8 +25,30 @@ class TradeScreen(ttk.Frame):
         self.auto_refresh_job: str | None = None
         self.validation_labels: Dict[str, tk.Label] = {}
         self.ai_buttons: list[ttk.Button] = []
+        self.sweep_rows: Dict[str, Dict] = {}
+        self._sweep_outcome: tuple | None = None
+        self._jobs: set[str] = set()
         self._build()
 
+    def destroy(self) -> None:
+        # Pending polls would otherwise fire on a destroyed frame (and keep it referenced).
+        for job in [*self._jobs, self.auto_refresh_job]:
+            if job:
+                self.after_cancel(job)
+        self._jobs.clear()
+        self.auto_refresh_job = None
+        super().destroy()
+
+    def _after(self, delay: int, callback, *args) -> None:
+        """``after`` whose job is cancelled when the screen is destroyed."""
+
+        def fire() -> None:
+            self._jobs.discard(job)
+            callback(*args)
+
+        job = self.after(delay, fire)
+        self._jobs.add(job)
+
     def _build(self) -> None:
         header = ttk.Frame(self)
         header.pack(fill="x", padx=10, pady=6)
@@ -85,6 +112,57 @@ class TradeScreen(ttk.Frame):
         self.conn_status = tk.StringVar(value="REST pending")
         ttk.Label(conn_box, textvariable=self.conn_status).pack(anchor="w", padx=6, pady=3)
 
+        backtest_box = ttk.Labelframe(left, text="Backtest: current vs AI vs sweep")
+        backtest_box.pack(fill="both", expand=True, pady=6)
+        backtest_controls = ttk.Frame(backtest_box)
+        backtest_controls.pack(fill="x", padx=6, pady=3)
+        self.sweep_btn = ttk.Button(backtest_controls, text="Run sweep", command=self._on_sweep)
+        self.sweep_btn.pack(side="left")
+        ttk.Button(backtest_controls, text="Use selected", command=self._apply_sweep_row).pack(side="left", padx=4)
+        self.sweep_status = tk.StringVar(value="")
+        ttk.Label(backtest_controls, textvariable=self.sweep_status).pack(side="left", padx=6)
+        columns = [
+            ("max_orders", "Orders"),
+            ("grid_step_pct", "Step %"),
+            ("take_profit_pct", "TP %"),
+            ("stop_loss_pct", "SL %"),
+            ("cooldown_seconds", "Cool s"),
+            ("return_pct", "Return %"),
+            ("max_drawdown_pct", "Max DD %"),
+            ("fills", "Fills"),
+            ("fees", "Fees"),
+        ]
+        self.sweep_columns = [key for key, _ in columns]
+        self.sweep_table = ttk.Treeview(backtest_box, columns=self.sweep_columns, height=8)
+        self.sweep_table.heading("#0", text="Source")
+        self.sweep_table.column("#0", width=70)
+        for key, label in columns:
+            self.sweep_table.heading(key, text=label)
+            self.sweep_table.column(key, width=62, anchor="e")
+        self.sweep_table.pack(fill="both", expand=True, padx=6, pady=3)
+
+        pnl_box = ttk.Labelframe(left, text="Positions / PnL (paper)")
+        pnl_box.pack(fill="both", expand=True, pady=6)
+        self.pnl_totals = tk.StringVar(value="Engine not running")
+        ttk.Label(pnl_box, textvariable=self.pnl_totals).pack(anchor="w", padx=6, pady=3)
+        pnl_columns = [
+            ("quantity", "Qty"),
+            ("avg_price", "Avg"),
+            ("mark", "Mark"),
+            ("unrealized", "uPnL"),
+            ("realized", "rPnL"),
+            ("fees", "Fees"),
+        ]
+        self.pnl_columns = [key for key, _ in pnl_columns]
+        self.pnl_table = ttk.Treeview(pnl_box, columns=self.pnl_columns, height=4)
+        self.pnl_table.heading("#0", text="Symbol")
+        self.pnl_table.column("#0", width=90)
+        for key, label in pnl_columns:
+            self.pnl_table.heading(key, text=label)
+            self.pnl_table.column(key, width=70, anchor="e")
+        self.pnl_table.pack(fill="both", expand=True, padx=6, pady=3)
+        self._after(1000, self._refresh_pnl)
+
         # Settings + AI column
         settings_box = ttk.Labelframe(right, text="Bot settings (paper mode)")
         settings_box.pack(fill="x", pady=6)
@@ -127,7 +205,14 @@ class TradeScreen(ttk.Frame):
         # AI chat
         ai_box = ttk.Labelframe(right, text="AI copilot")
         ai_box.pack(fill="both", expand=True, pady=6)
-        self.chat_log = tk.Text(ai_box, height=10, state="disabled")
+        ui_cfg = self.app.config_service.config.ui
+        self.chat_log = BufferedLogView(
+            ai_box,
+            max_lines=ui_cfg.chat_max_lines,
+            height=10,
+            flush_ms=ui_cfg.log_flush_ms,
+            sources=("user", "ai"),
+        )
         self.chat_log.pack(fill="both", expand=True, padx=6, pady=4)
         self.chat_input = tk.Entry(ai_box)
         self.chat_input.pack(fill="x", padx=6)
@@ -147,7 +232,13 @@ class TradeScreen(ttk.Frame):
         self._toggle_ai_ui()
 
         # Logs
-        self.log_box = tk.Text(self, height=6, state="disabled")
+        self.log_box = BufferedLogView(
+            self,
+            max_lines=ui_cfg.log_max_lines,
+            height=6,
+            flush_ms=ui_cfg.log_flush_ms,
+            sources=("bot", "ai", "ui"),
+        )
         self.log_box.pack(fill="x", padx=10, pady=6)
 
     def refresh_market(self) -> None:
@@ -179,15 +270,85 @@ class TradeScreen(ttk.Frame):
         self._validate_settings()
 
     def _on_start(self) -> None:
-        self.app.state.set_state(AppState.RUNNING)
-        self._log("Bot started in paper mode")
+        try:
+            self.app.start_paper_engine(self.symbol, on_report=self._on_engine_report)
+        except Exception as exc:  # noqa: BLE001
+            self.app.state.set_state(AppState.ERROR, str(exc))
+            self._log(f"Engine start failed: {exc}", level="ERROR")
+        else:
+            self._log("Bot started in paper mode")
         self.app.refresh_status_bar()
 
     def _on_stop(self) -> None:
-        self.app.state.set_state(AppState.STOPPED)
+        self.app.stop_engine()
         self._log("Bot stopped")
         self.app.refresh_status_bar()
 
+    def _on_engine_report(self, report) -> None:
+        # Called on the engine thread; the log view is safe to write from there.
+        self._log(f"Paper {report.status()}: {report.action.describe()}")
+
+    def _refresh_pnl(self) -> None:
+        book = self.app.position_book
+        if book is not None and len(book):
+            totals = book.totals()
+            self.pnl_totals.set(
+                f"PnL {totals['pnl']:+.4f}  (realized {totals['realized']:+.4f}, unrealized {totals['unrealized']:+.4f})"
+                f"  fees {totals['fees']:.4f}  exposure {totals['exposure']:.2f}"
+            )
+            columns = book.columns()
+            self.pnl_table.delete(*self.pnl_table.get_children())
+            for i in book.top(20):
+                values = ["-" if np.isnan(columns[key][i]) else f"{columns[key][i]:.6g}" for key in self.pnl_columns]
+                self.pnl_table.insert("", "end", text=book.symbols[i], values=values)
+        self._after(1000, self._refresh_pnl)
+
+    def _on_sweep(self) -> None:
+        named = {"Current": {k: self._parse_value(v.get()) for k, v in self.settings_vars.items()}}
+        if self.last_ai_payload and self.last_ai_payload.get("settings"):
+            named["AI"] = dict(self.last_ai_payload["settings"])
+        self.sweep_btn.config(state="disabled")
+        self.sweep_status.set("Fetching history and sweeping...")
+        self._sweep_outcome = None
+
+        def job() -> None:
+            try:
+                self._sweep_outcome = ("ok", self.app.run_sweep(self.symbol, named))
+            except Exception as exc:  # noqa: BLE001
+                self._sweep_outcome = ("error", exc)
+
+        threading.Thread(target=job, name="bbot-sweep", daemon=True).start()
+        self._after(250, self._poll_sweep)
+
+    def _poll_sweep(self) -> None:
+        if self._sweep_outcome is None:
+            self._after(250, self._poll_sweep)
+            return
+        status, payload = self._sweep_outcome
+        self.sweep_btn.config(state="normal")
+        if status == "error":
+            self.sweep_status.set("Sweep failed")
+            self._log(f"Backtest sweep failed: {payload}", level="ERROR")
+            return
+        self.sweep_table.delete(*self.sweep_table.get_children())
+        self.sweep_rows = {}
+        for label, settings, summary in payload:
+            values = [settings.get(key, summary.get(key, "")) for key in self.sweep_columns]
+            self.sweep_table.insert("", "end", iid=label, text=label, values=values)
+            self.sweep_rows[label] = settings
+        self.sweep_status.set(f"{len(payload)} rows")
+        self._log("Backtest sweep finished", source="ui")
+
+    def _apply_sweep_row(self) -> None:
+        selected = self.sweep_table.selection()
+        if not selected:
+            return
+        for key, value in self.sweep_rows.get(selected[0], {}).items():
+            if key in self.settings_vars:
+                self.settings_vars[key].set(str(value))
+        self._render_preview()
+        self._log(f"Loaded {selected[0]} settings into fields", source="ui")
+
     def _on_send(self) -> None:
         if not self.app.ai_client.can_run_live():
             messagebox.showinfo("AI", "OpenAI key not configured")
@@ -195,15 +356,45 @@ class TradeScreen(ttk.Frame):
         message = self.chat_input.get().strip()
         if not message:
             return
-        self._log(f"User -> AI: {message}")
-        try:
-            response = self.app.run_ai(message)
-            self.last_ai_payload = response
-            self._log("🧠 AI EXPLANATION:\n" + response.get("explanation", ""))
-            settings_json = json.dumps(response.get("settings", {}), indent=2)
-            self._log("⚙️ SETTINGS_JSON:\n" + settings_json)
-        except Exception as exc:  # noqa: BLE001
-            messagebox.showerror("AI", str(exc))
+        self._log(f"User -> AI: {message}", source="ai")
+        self.chat_log.write(f"You: {message}", source="user")
+        self.chat_log.write("🧠 AI EXPLANATION:", source="ai")
+        self.chat_log.write("", source="ai")
+        # Sending again while an answer is still coming cancels the older request (same channel).
+        outcome: list = []
+
+        def job() -> None:
+            try:
+                # Explanation tokens go straight to the chat buffer (thread-safe); the frame
+                # flush renders them as they arrive.
+                response = self.app.stream_ai(message, on_text=lambda text: self.chat_log.write(text, source="ai", append=True))
+                outcome.append(("ok", response))
+            except AiRequestCancelled:
+                outcome.append(("cancelled", None))
+            except Exception as exc:  # noqa: BLE001
+                outcome.append(("error", exc))
+
+        threading.Thread(target=job, name="bbot-ai-request", daemon=True).start()
+        self._after(50, self._poll_ai, outcome)
+
+    def _poll_ai(self, outcome: list) -> None:
+        if not outcome:
+            self._after(50, self._poll_ai, outcome)
+            return
+        status, payload = outcome[0]
+        if status == "cancelled":
+            self._log("AI request superseded by a newer message", source="ai")
+            return
+        if status == "error":
+            self.chat_log.write(f"AI error: {payload}", level="ERROR", source="ai")
+            self._log(f"AI request failed: {payload}", level="ERROR", source="ai")
+            messagebox.showerror("AI", str(payload))
+            return
+        self.last_ai_payload = payload
+        settings_json = json.dumps(payload.get("settings", {}), indent=2)
+        self.chat_log.write("⚙️ SETTINGS_JSON:\n" + settings_json, source="ai")
+        ttft = self.app.ai_client.last_ttft_ms
+        self._log(f"AI response received (first token {ttft:.0f}ms)" if ttft else "AI response received", source="ai")
         self._render_preview()
 
     def _apply_ai_json(self) -> None:
@@ -219,7 +410,7 @@ class TradeScreen(ttk.Frame):
             self.settings_vars[key].set(str(value))
         self.app.apply_settings(validated.model_dump())
         self._render_preview()
-        self._log("Applied AI JSON to fields")
+        self._log("Applied AI JSON to fields", source="ai")
 
     def _copy_json(self) -> None:
         if not self.last_ai_payload:
@@ -227,13 +418,13 @@ class TradeScreen(ttk.Frame):
         payload = json.dumps(self.last_ai_payload.get("settings", {}), indent=2)
         self.clipboard_clear()
         self.clipboard_append(payload)
-        self._log("Copied AI JSON to clipboard")
+        self._log("Copied AI JSON to clipboard", source="ui")
 
     def _copy_effective_settings(self) -> None:
         payload = self.preview.get("1.0", "end-1c")
         self.clipboard_clear()
         self.clipboard_append(payload)
-        self._log("Copied effective settings")
+        self._log("Copied effective settings", source="ui")
 
     def _parse_value(self, value: str):
         try:
@@ -280,7 +471,7 @@ class TradeScreen(ttk.Frame):
             if key in self.settings_vars:
                 self.settings_vars[key].set(str(val))
         self._render_preview()
-        self._log(f"Applied {preset} preset")
+        self._log(f"Applied {preset} preset", source="ui")
 
     def _validate_settings(self) -> None:
         errors = {}
@@ -347,11 +538,8 @@ class TradeScreen(ttk.Frame):
         for btn in self.ai_buttons:
             btn.config(state=state)
 
-    def _log(self, text: str) -> None:
-        self.log_box.config(state="normal")
-        self.log_box.insert("end", text + "\n")
-        self.log_box.see("end")
-        self.log_box.config(state="disabled")
+    def _log(self, text: str, *, level: str = "INFO", source: str = "bot") -> None:
+        self.log_box.write(text, level=level, source=source)
 
     def _set_text(self, widget: tk.Text, content: str) -> None:
         widget.config(state="normal")
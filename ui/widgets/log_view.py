@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import threading
+import tkinter as tk
+from collections import deque
+from dataclasses import dataclass, replace
+from tkinter import ttk
+from typing import Deque, Dict, Iterable, List, Tuple
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LEVEL_COLORS = {"DEBUG": "#8a8f98", "WARNING": "#c98a00", "ERROR": "#d64545"}
+
+
+@dataclass
+class LogEntry:
+    text: str
+    level: str
+    source: str
+    lines: int
+    continues: bool = False
+
+
+class LogBuffer:
+    """Ring buffer mirroring the widget content plus the batch not rendered yet.
+
+    ``push`` may be called from any thread; ``drain`` runs on the Tk thread once per frame and
+    reports how many leading lines must be deleted. Trimming waits until the cap is exceeded by
+    ``trim_slack`` lines so old lines are removed in bulk instead of one delete per insert.
+    An ``append`` push extends the last entry instead of starting a line (streamed text).
+    """
+
+    def __init__(self, max_lines: int = 2000, *, trim_slack: int | None = None) -> None:
+        self.max_lines = max(1, max_lines)
+        self.trim_slack = trim_slack if trim_slack is not None else max(1, self.max_lines // 10)
+        self.entries: Deque[LogEntry] = deque()
+        self.total_lines = 0
+        self._pending: List[LogEntry] = []
+        self._lock = threading.Lock()
+
+    def push(self, text: str, *, level: str = "INFO", source: str = "app", append: bool = False) -> None:
+        lines = text.count("\n") + (0 if append else 1)
+        entry = LogEntry(text=text, level=level.upper(), source=source, lines=lines, continues=append)
+        with self._lock:
+            self._pending.append(entry)
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def drain(self) -> Tuple[List[LogEntry], int]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        # Returned entries are what to render: new lines, plus (first only) text that extends
+        # the last line already on screen.
+        batch: List[LogEntry] = []
+        for entry in pending:
+            if entry.continues and self.entries:
+                last = self.entries[-1]
+                last.text += entry.text
+                last.lines += entry.lines
+                self.total_lines += entry.lines
+                if batch:
+                    batch[-1] = replace(batch[-1], text=batch[-1].text + entry.text, lines=batch[-1].lines + entry.lines)
+                else:
+                    batch.append(entry)
+                continue
+            if entry.continues:
+                entry = replace(entry, continues=False, lines=entry.lines + 1)
+            self.entries.append(entry)
+            self.total_lines += entry.lines
+            batch.append(replace(entry))
+        trimmed = 0
+        if self.total_lines > self.max_lines + self.trim_slack:
+            while self.total_lines > self.max_lines:
+                old = self.entries.popleft()
+                self.total_lines -= old.lines
+                trimmed += old.lines
+        return batch, trimmed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+        self.entries.clear()
+        self.total_lines = 0
+
+
+class BufferedLogView(ttk.Frame):
+    """Bounded Text view fed through a :class:`LogBuffer`.
+
+    Writes are coalesced and rendered with a single ``insert`` per frame. Each entry carries a
+    level tag and a source tag, so filtering toggles the tags' ``elide`` option instead of
+    rebuilding the widget.
+    """
+
+    def __init__(
+        self,
+        master,
+        *,
+        max_lines: int = 2000,
+        height: int = 6,
+        flush_ms: int = 50,
+        sources: Iterable[str] = (),
+        show_filters: bool = True,
+    ) -> None:
+        super().__init__(master)
+        self.buffer = LogBuffer(max_lines)
+        self.flush_ms = flush_ms
+        self.min_level = tk.StringVar(value="DEBUG")
+        self.source_vars: Dict[str, tk.BooleanVar] = {}
+        self._flush_job: str | None = None
+
+        if show_filters:
+            bar = ttk.Frame(self)
+            bar.pack(fill="x")
+            ttk.Label(bar, text="Level").pack(side="left")
+            level_combo = ttk.Combobox(bar, width=9, state="readonly", textvariable=self.min_level, values=list(LEVELS))
+            level_combo.bind("<<ComboboxSelected>>", lambda *_: self._apply_level_filter())
+            level_combo.pack(side="left", padx=(2, 8))
+            for source in sources:
+                var = tk.BooleanVar(value=True)
+                self.source_vars[source] = var
+                ttk.Checkbutton(bar, text=source, variable=var, command=lambda s=source: self._apply_source_filter(s)).pack(
+                    side="left", padx=2
+                )
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.text = tk.Text(body, height=height, state="disabled", wrap="word")
+        scroll = ttk.Scrollbar(body, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        for level, color in LEVEL_COLORS.items():
+            self.text.tag_configure(f"level:{level}", foreground=color)
+        self._schedule_flush()
+
+    def write(self, text: str, *, level: str = "INFO", source: str = "app", append: bool = False) -> None:
+        """Queue a message (``append`` continues the last line); safe to call from worker threads."""
+
+        self.buffer.push(text, level=level, source=source, append=append)
+
+    def clear(self) -> None:
+        self.buffer.clear()
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
+
+    def contents(self) -> str:
+        return "\n".join(entry.text for entry in self.buffer.entries)
+
+    def destroy(self) -> None:
+        if self._flush_job:
+            self.after_cancel(self._flush_job)
+            self._flush_job = None
+        super().destroy()
+
+    def _schedule_flush(self) -> None:
+        self._flush_job = self.after(self.flush_ms, self._flush)
+
+    def _flush(self) -> None:
+        try:
+            if self.buffer.has_pending():
+                self._render(*self.buffer.drain())
+        finally:
+            self._schedule_flush()
+
+    def _render(self, batch: List[LogEntry], trimmed: int) -> None:
+        if not batch:
+            return
+        follow = self.text.yview()[1] >= 0.999
+        self.text.config(state="normal")
+        if batch[0].continues:
+            head, batch = batch[0], batch[1:]
+            # Before the newline that ends the last rendered line.
+            self.text.insert("end-2c", head.text, (f"level:{head.level}", f"source:{head.source}"))
+        chunks: list = []
+        for entry in batch:
+            chunks.extend([entry.text + "\n", (f"level:{entry.level}", f"source:{entry.source}")])
+        if chunks:
+            self.text.insert("end", *chunks)
+        if trimmed:
+            self.text.delete("1.0", f"{trimmed + 1}.0")
+        self.text.config(state="disabled")
+        if follow:
+            self.text.see("end")
+
+    def _apply_level_filter(self) -> None:
+        threshold = LEVELS.index(self.min_level.get()) if self.min_level.get() in LEVELS else 0
+        for idx, level in enumerate(LEVELS):
+            self.text.tag_configure(f"level:{level}", elide=True if idx < threshold else "")
+
+    def _apply_source_filter(self, source: str) -> None:
+        visible = self.source_vars[source].get()
+        self.text.tag_configure(f"source:{source}", elide="" if visible else True)